@@ -11,10 +11,14 @@ from importlib import import_module
 from flask import Flask, Response, request
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 from pythonjsonlogger import jsonlogger
+from werkzeug.middleware.proxy_fix import ProxyFix
 
+from app.commands import register_commands
 from app.config import get_config
 from app.extensions import cors, db, jwt, migrate
+from app.utils import template_registry
 from app.utils.jwt.callbacks import setup_jwt_callbacks
+from app.utils.rate_limit import init_rate_limiting
 from app.utils.sentry import initialize_sentry, register_sentry_user_context
 
 REQUEST_COUNT = Counter(
@@ -52,6 +56,11 @@ def create_app(config_name=None):
     # Load configuration
     app.config.from_object(get_config(config_name))
 
+    # Take the client address and scheme from the trusted reverse proxy (nginx)
+    proxies = app.config.get("TRUSTED_PROXY_COUNT", 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
+
     # Register logger and error handlers
     setup_logging(app)
     initialize_sentry()
@@ -63,10 +72,14 @@ def create_app(config_name=None):
 
     register_metrics(app)
 
+    init_rate_limiting(app)
+
     register_healthcheck(app)
 
     register_blueprints(app)
 
+    register_commands(app)
+
     setup_jwt_callbacks(jwt)
 
     # Import and register models (so migrations can see them)
@@ -162,6 +175,9 @@ def initialize_extensions(app):
 
         CloudinaryService.configure()
 
+    # Compiled document/email templates
+    template_registry.configure(app.config.get("TEMPLATE_BYTECODE_CACHE_DIR"))
+
     app.logger.info("Extensions initialized")
 
 
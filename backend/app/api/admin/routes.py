@@ -9,9 +9,12 @@ from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.extensions import db
-from app.models import AuditLog, Notification, User
+from app.models import AuditLog, NotificationBroadcast, User
+from app.services.broadcast_service import BroadcastService
+from app.services.notification_service import NotificationService
 from app.utils.decorators import admin_required
 from app.utils.response_formatter import format_response
+from app.utils.role_cache import invalidate_user_role
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +99,7 @@ def promote_user_to_admin(user_id):
 
         user.role = target_role
         db.session.commit()
+        invalidate_user_role(user_id)
 
         # Log the admin action
         current_admin_id = get_jwt_identity()
@@ -138,6 +142,7 @@ def delete_user(user_id):
 
         db.session.delete(user)
         db.session.commit()
+        invalidate_user_role(user_id)
 
         # Log the admin action
         current_admin_id = get_jwt_identity()
@@ -178,9 +183,9 @@ def send_notification():
         if not user_id or not message:
             return jsonify(format_response(False, None, "user_id and message are required")), 400
 
-        notification = Notification(user_id=user_id, message=message)
-        db.session.add(notification)
+        notification = NotificationService.add_notification(user_id, message)
         db.session.commit()
+        NotificationService.publish_notification(notification)
 
         return jsonify(format_response(True, None, "Notification sent")), 201
 
@@ -192,6 +197,116 @@ def send_notification():
         )
 
 
+# ============================================================================
+# BROADCAST NOTIFICATION TO A SEGMENT
+# ============================================================================
+@admin_bp.route("/notifications/broadcast", methods=["POST"])
+@jwt_required()
+@admin_required
+def broadcast_notification():
+    """
+    Send a notification to every user in a segment (admin only)
+
+    Delivery runs in the background; poll the returned broadcast for progress.
+
+    Request JSON:
+        message: Notification message
+        segment: all, customers, admins or pending_orders (default all)
+
+    Returns:
+        202: Broadcast accepted
+        400: Bad request
+        500: Server error
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        message = (data.get("message") or "").strip()
+        segment = data.get("segment") or "all"
+
+        if not message:
+            return jsonify(format_response(False, None, "message is required")), 400
+        if len(message) > 255:
+            return jsonify(format_response(False, None, "message is too long")), 400
+        if segment not in BroadcastService.SEGMENTS:
+            return (
+                jsonify(
+                    format_response(
+                        False,
+                        None,
+                        f"Invalid segment. Must be one of: {', '.join(BroadcastService.SEGMENTS)}",
+                    )
+                ),
+                400,
+            )
+
+        current_admin_id = get_jwt_identity()
+        broadcast = BroadcastService.start_broadcast(int(current_admin_id), message, segment)
+        log_admin_action(
+            current_admin_id, f"Broadcast notification {broadcast.id} to segment '{segment}'"
+        )
+
+        return (
+            jsonify(
+                format_response(
+                    True,
+                    {"broadcast": BroadcastService.serialize(broadcast)},
+                    "Broadcast started",
+                )
+            ),
+            202,
+        )
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error starting broadcast: {str(e)}")
+        return (
+            jsonify(format_response(False, None, "An error occurred while starting broadcast")),
+            500,
+        )
+
+
+# ============================================================================
+# GET BROADCAST PROGRESS
+# ============================================================================
+@admin_bp.route("/notifications/broadcast/<int:broadcast_id>", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_broadcast(broadcast_id):
+    """
+    Get a broadcast's delivery progress (admin only)
+
+    Args:
+        broadcast_id: ID of the broadcast
+
+    Returns:
+        200: Broadcast progress
+        404: Broadcast not found
+        500: Server error
+    """
+    try:
+        broadcast = db.session.get(NotificationBroadcast, broadcast_id)
+        if not broadcast:
+            return jsonify(format_response(False, None, "Broadcast not found")), 404
+
+        return (
+            jsonify(
+                format_response(
+                    True,
+                    {"broadcast": BroadcastService.serialize(broadcast)},
+                    "Broadcast fetched successfully",
+                )
+            ),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching broadcast: {str(e)}")
+        return (
+            jsonify(format_response(False, None, "An error occurred while fetching broadcast")),
+            500,
+        )
+
+
 # ============================================================================
 # GET AUDIT LOGS
 # ============================================================================
@@ -6,16 +6,23 @@ Handles: signup, login, logout, password reset
 import logging
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import UTC, datetime, timedelta
 
 from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import create_access_token, get_jwt, jwt_required
 from itsdangerous import URLSafeTimedSerializer
-from werkzeug.security import check_password_hash, generate_password_hash
 
 from app.extensions import db
-from app.models import BlacklistToken, Notification, User
+from app.models import User
 from app.services.email_service import EmailService
+from app.services.notification_service import NotificationService
+from app.utils.jwt.blocklist import is_token_revoked, revoke_token
+from app.utils.password_hasher import (
+    PasswordHasherBusy,
+    check_password,
+    hash_password,
+    needs_rehash,
+)
 from app.utils.response_formatter import format_response
 from app.utils.sentry import clear_sentry_user, set_sentry_user
 
@@ -50,6 +57,35 @@ def _issue_access_token(user, expires_delta):
     )
 
 
+def _verify_password(user, password):
+    """
+    Check a user's password, upgrading the stored hash if its cost is outdated
+
+    Raises:
+        PasswordHasherBusy: Hashing pool saturated
+    """
+    if not check_password(user.password_hash, password):
+        return False
+
+    if needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hash_password(password)
+            db.session.commit()
+        except Exception as e:
+            # The login itself is valid; the upgrade is retried next time
+            db.session.rollback()
+            logger.warning(f"Could not rehash password for user {user.id}: {str(e)}")
+    return True
+
+
+def _hasher_busy_response():
+    return (
+        jsonify(format_response(False, None, "Server is busy, please try again shortly")),
+        503,
+        {"Retry-After": "2"},
+    )
+
+
 # ============================================================================
 # SIGNUP
 # ============================================================================
@@ -91,7 +127,7 @@ def signup():
             return jsonify(format_response(False, None, "Email already exists")), 409
 
         # Create new user
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         new_user = User(
             username=username, email=email, phone_number=phone_number, password_hash=hashed_password
         )
@@ -100,12 +136,9 @@ def signup():
         db.session.commit()
 
         # Create welcome notification
-        notification = Notification(
-            user_id=new_user.id,
-            message="Your account has been created successfully.",
-            is_read=False,
+        NotificationService.add_notification(
+            new_user.id, "Your account has been created successfully."
         )
-        db.session.add(notification)
         db.session.commit()
 
         # Generate token
@@ -132,6 +165,9 @@ def signup():
             201,
         )
 
+    except PasswordHasherBusy:
+        db.session.rollback()
+        return _hasher_busy_response()
     except Exception as e:
         db.session.rollback()
         logger.error(f"Error during signup: {str(e)}")
@@ -169,7 +205,7 @@ def login():
         user = User.query.filter_by(email=email).first()
 
         # Verify credentials
-        if user and check_password_hash(user.password_hash, password):
+        if user and _verify_password(user, password):
             token = _issue_access_token(user, timedelta(days=1))
             set_sentry_user(user)
 
@@ -197,6 +233,8 @@ def login():
         else:
             return jsonify(format_response(False, None, "Invalid Email or Password!")), 400
 
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
     except Exception as e:
         logger.error(f"Error during login: {str(e)}")
         return jsonify(format_response(False, None, "Internal Server Error")), 500
@@ -218,17 +256,21 @@ def logout():
         500: Server error
     """
     try:
-        # Get the JWT ID from the token
-        jti = get_jwt()["jti"]
+        # Get the JWT ID and expiry from the token
+        claims = get_jwt()
+        jti = claims["jti"]
+        expires_at = (
+            datetime.fromtimestamp(claims["exp"], UTC).replace(tzinfo=None)
+            if claims.get("exp")
+            else None
+        )
 
         # Check if the token already exists in the blacklist
-        if BlacklistToken.query.filter_by(token=jti).first():
+        if is_token_revoked(jti):
             return jsonify(format_response(False, None, "Token already blacklisted")), 400
 
-        # Add token to blacklist
-        blacklisted_token = BlacklistToken(token=jti)
-        db.session.add(blacklisted_token)
-        db.session.commit()
+        # Add token to blacklist until it expires
+        revoke_token(jti, expires_at)
         clear_sentry_user()
 
         logger.info("User logged out successfully")
@@ -375,21 +417,23 @@ def reset_password(token):
 
         try:
             # Update password
-            user.password_hash = generate_password_hash(new_password)
+            user.password_hash = hash_password(new_password)
             user.reset_token = None
             user.reset_token_expiration = None
 
             # Create notification
-            notification = Notification(
-                user_id=user.id, message="Your password has been reset successfully.", is_read=False
+            NotificationService.add_notification(
+                user.id, "Your password has been reset successfully."
             )
-            db.session.add(notification)
             db.session.commit()
 
             logger.info(f"Password reset successful for: {email}")
 
             return jsonify(format_response(True, None, "Password reset successful")), 200
 
+        except PasswordHasherBusy:
+            db.session.rollback()
+            return _hasher_busy_response()
         except Exception as e:
             db.session.rollback()
             logger.error(f"Database error during password reset: {str(e)}")
@@ -430,11 +474,7 @@ def admin_login():
 
         user = User.query.filter_by(email=email).first()
 
-        if (
-            user
-            and (user.role or "").lower() == "admin"
-            and check_password_hash(user.password_hash, password)
-        ):
+        if user and (user.role or "").lower() == "admin" and _verify_password(user, password):
             # Create token with 2 hour expiration for admins
             access_token = _issue_access_token(user, timedelta(hours=6))
             set_sentry_user(user)
@@ -463,6 +503,8 @@ def admin_login():
         else:
             return jsonify(format_response(False, None, "Invalid credentials!")), 401
 
+    except PasswordHasherBusy:
+        return _hasher_busy_response()
     except Exception as e:
         logger.error(f"Admin login error: {str(e)}")
         return jsonify(format_response(False, None, "An error occurred during login")), 500
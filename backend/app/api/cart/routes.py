@@ -1,6 +1,6 @@
 """
 Cart Routes Blueprint
-Handles: view cart, add to cart, update quantity, remove items, clear cart
+Handles: view cart, cart summary, add to cart, bulk add, update quantity, remove items, clear cart
 """
 
 import logging
@@ -16,6 +16,51 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 cart_bp = Blueprint("cart", __name__)
 
+# Maximum items accepted by POST /api/cart/bulk
+BULK_MAX_ITEMS = 100
+
+
+def _parse_cart_item(data):
+    """
+    Validate one add-to-cart payload
+
+    Args:
+        data: Request JSON ({"productId", "quantity", "selectedVariation"?})
+
+    Returns:
+        tuple: (item dict or None, error message or None)
+    """
+    if not isinstance(data, dict) or "productId" not in data or "quantity" not in data:
+        return None, "productId and quantity are required"
+
+    try:
+        product_id = int(data["productId"])
+    except (ValueError, TypeError):
+        return None, "Invalid productId. Must be an integer"
+
+    quantity = data["quantity"]
+    if not isinstance(quantity, int) or quantity <= 0:
+        return None, "Invalid quantity. Must be a positive integer"
+
+    variation_name = None
+
+    if data.get("selectedVariation"):
+        variation = data["selectedVariation"]
+
+        if not isinstance(variation, dict):
+            return None, "Invalid selectedVariation. Must be an object"
+
+        if "ram" not in variation or "storage" not in variation or "price" not in variation:
+            return None, "Variation must include ram, storage, and price"
+
+        variation_name = f"{variation['ram']} - {variation['storage']}"
+
+        # The client's price is only sanity-checked; the server prices the line
+        if not isinstance(variation["price"], int | float) or variation["price"] <= 0:
+            return None, "Invalid variation price"
+
+    return {"product_id": product_id, "quantity": quantity, "variation_name": variation_name}, None
+
 
 # ============================================================================
 # GET CART
@@ -47,6 +92,33 @@ def get_cart():
         return jsonify(format_response(False, None, "An error occurred while fetching cart")), 500
 
 
+# ============================================================================
+# GET CART SUMMARY
+# ============================================================================
+@cart_bp.route("/summary", methods=["GET"])
+@jwt_required()
+def get_cart_summary():
+    """
+    Get cart line items with product summaries, unit prices and totals
+
+    Requires: Valid JWT token
+
+    Returns:
+        200: {"items": [...], "item_count": int, "total": float, "currency": "KES"}
+        500: Server error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+
+        summary = dict(CartService.get_cart_view(current_user_id), currency="KES")
+
+        return jsonify(format_response(True, summary, "Cart fetched successfully")), 200
+
+    except Exception as e:
+        logger.error(f"Error fetching cart summary: {str(e)}")
+        return jsonify(format_response(False, None, "An error occurred while fetching cart")), 500
+
+
 # ============================================================================
 # ADD TO CART
 # ============================================================================
@@ -78,70 +150,86 @@ def add_to_cart():
         current_user_id = get_jwt_identity()
         data = request.get_json()
 
-        # Validate required fields
-        if not data or "productId" not in data or "quantity" not in data:
-            return jsonify(format_response(False, None, "productId and quantity are required")), 400
+        item, error = _parse_cart_item(data)
+        if error:
+            return jsonify(format_response(False, None, error)), 400
 
-        try:
-            product_id = int(data["productId"])
-        except (ValueError, TypeError):
-            return (
-                jsonify(format_response(False, None, "Invalid productId. Must be an integer")),
-                400,
-            )
+        # Add to cart using service
+        success, message = CartService.add_to_cart(
+            current_user_id,
+            item["product_id"],
+            item["quantity"],
+            item["variation_name"],
+        )
 
-        if not isinstance(data["quantity"], int) or data["quantity"] <= 0:
-            return (
-                jsonify(
-                    format_response(False, None, "Invalid quantity. Must be a positive integer")
-                ),
-                400,
-            )
+        if not success:
+            return jsonify(format_response(False, None, message)), 400
 
-        # Handle variations if provided
-        variation_name = None
-        variation_price = None
+        logger.info(f"User {current_user_id} added product {item['product_id']} to cart")
+        return jsonify(format_response(True, None, message)), 201
 
-        if data.get("selectedVariation"):
-            variation = data["selectedVariation"]
+    except Exception as e:
+        logger.error(f"Error adding to cart: {str(e)}")
+        return jsonify(format_response(False, None, "An error occurred while adding to cart")), 500
 
-            if not isinstance(variation, dict):
-                return (
-                    jsonify(
-                        format_response(False, None, "Invalid selectedVariation. Must be an object")
-                    ),
-                    400,
-                )
 
-            if "ram" not in variation or "storage" not in variation or "price" not in variation:
-                return (
-                    jsonify(
-                        format_response(
-                            False, None, "Variation must include ram, storage, and price"
-                        )
-                    ),
-                    400,
-                )
+# ============================================================================
+# BULK ADD TO CART
+# ============================================================================
+@cart_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def bulk_add_to_cart():
+    """
+    Add many items to cart in one request (e.g. guest cart sync after login)
 
-            variation_name = f"{variation['ram']} - {variation['storage']}"
-            variation_price = variation["price"]
+    Requires: Valid JWT token
 
-            if not isinstance(variation_price, int | float) or variation_price <= 0:
-                return jsonify(format_response(False, None, "Invalid variation price")), 400
+    Expected JSON:
+    {
+        "items": [
+            {"productId": 123, "quantity": 2, "selectedVariation": {...}},
+            ...
+        ]
+    }
 
-        # Add to cart using service
-        success, message = CartService.add_to_cart(
-            current_user_id, product_id, data["quantity"], variation_name, variation_price
-        )
+    Returns:
+        200: Items added; unknown product IDs listed in "skipped"
+        400: Invalid request data
+        500: Server error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json(silent=True)
+
+        items = data.get("items") if isinstance(data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify(format_response(False, None, "items must be a non-empty list")), 400
+
+        if len(items) > BULK_MAX_ITEMS:
+            return (
+                jsonify(
+                    format_response(False, None, f"At most {BULK_MAX_ITEMS} items per request")
+                ),
+                400,
+            )
+
+        parsed = []
+        for index, raw_item in enumerate(items):
+            item, error = _parse_cart_item(raw_item)
+            if error:
+                return jsonify(format_response(False, None, f"items[{index}]: {error}")), 400
+            parsed.append(item)
+
+        success, result = CartService.bulk_add_to_cart(current_user_id, parsed)
 
         if not success:
-            return jsonify(format_response(False, None, message)), 400
+            return jsonify(format_response(False, None, result)), 400
 
-        logger.info(f"User {current_user_id} added product {product_id} to cart")
-        return jsonify(format_response(True, None, message)), 201
+        logger.info(f"User {current_user_id} bulk added {result['added']} item(s) to cart")
+        return jsonify(format_response(True, result, "Cart updated successfully")), 200
 
     except Exception as e:
-        logger.error(f"Error adding to cart: {str(e)}")
+        logger.error(f"Error bulk adding to cart: {str(e)}")
         return jsonify(format_response(False, None, "An error occurred while adding to cart")), 500
 
 
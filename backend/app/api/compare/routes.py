@@ -1,16 +1,17 @@
 """
 Compare Routes Blueprint
 Handles: product comparison list (max 3 items, auto-expires after 24hrs)
+Lists live in Redis sorted sets, with compares/compare_items as the fallback
 """
 
 import logging
-from datetime import UTC, datetime, timedelta
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.extensions import db
-from app.models import Compare, CompareItem, Product
+from app.services.compare_service import CompareService
+from app.utils.compare_store import ALREADY_PRESENT, FULL
 from app.utils.response_formatter import format_response
 
 logger = logging.getLogger(__name__)
@@ -28,7 +29,7 @@ def get_compare_list():
     """
     Get user's compare list
 
-    Note: Items older than 24 hours are automatically deleted
+    Note: Items older than 24 hours are no longer listed
 
     Requires: Valid JWT token
 
@@ -37,11 +38,10 @@ def get_compare_list():
         500: Server error
     """
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
 
-        # Get or create compare list
-        compare = Compare.query.filter_by(user_id=current_user_id).first()
-        if not compare:
+        product_ids = CompareService.get_product_ids(current_user_id)
+        if not product_ids:
             return (
                 jsonify(
                     format_response(
@@ -53,39 +53,100 @@ def get_compare_list():
                 200,
             )
 
-        # Delete items older than 24 hours
-        twenty_four_hours_ago = datetime.now(UTC) - timedelta(hours=24)
+        items = [{"id": product_id} for product_id in product_ids]
 
-        old_items = CompareItem.query.filter(
-            CompareItem.compare_id == compare.id, CompareItem.created_at <= twenty_four_hours_ago
-        ).all()
+        return (
+            jsonify(
+                format_response(True, {"product_ids": items}, "Compare list retrieved successfully")
+            ),
+            200,
+        )
 
-        for item in old_items:
-            db.session.delete(item)
+    except Exception as e:
+        logger.error(f"Error fetching compare list: {str(e)}")
+        return (
+            jsonify(format_response(False, None, "An error occurred while fetching compare list")),
+            500,
+        )
 
-        if old_items:
-            db.session.commit()
-            logger.info(
-                f"Deleted {len(old_items)} expired compare items for user {current_user_id}"
-            )
 
-        # Get remaining valid items
-        compare_items = CompareItem.query.filter_by(compare_id=compare.id).all()
+# ============================================================================
+# GET COMPARED PRODUCTS
+# ============================================================================
+@compare_bp.route("/products", methods=["GET"])
+@jwt_required()
+def get_compare_products():
+    """
+    Get the products in the user's compare list with their spec fields
+
+    Requires: Valid JWT token
 
-        # Return product IDs
-        items = [{"id": item.product_id} for item in compare_items]
+    Returns:
+        200: Compared products (same fields as the product list), oldest first
+        500: Server error
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+
+        products = CompareService.get_products(current_user_id)
 
         return (
             jsonify(
-                format_response(True, {"product_ids": items}, "Compare list retrieved successfully")
+                format_response(
+                    True,
+                    {"products": products, "count": len(products)},
+                    "Compared products retrieved successfully",
+                )
             ),
             200,
         )
 
     except Exception as e:
-        logger.error(f"Error fetching compare list: {str(e)}")
+        logger.error(f"Error fetching compared products: {str(e)}")
         return (
-            jsonify(format_response(False, None, "An error occurred while fetching compare list")),
+            jsonify(
+                format_response(False, None, "An error occurred while fetching compared products")
+            ),
+            500,
+        )
+
+
+# ============================================================================
+# GET COMPARE MATRIX
+# ============================================================================
+@compare_bp.route("/matrix", methods=["GET"])
+@jwt_required()
+def get_compare_matrix():
+    """
+    Get the compare list as an aligned spec matrix
+
+    Each row holds one spec (RAM, storage, battery, ...) with a value per
+    compared product in column order: the raw text and, where it has a unit,
+    the parsed number (GB, mAh, inches, MP). Rows also say whether the values
+    differ and which products have the best value.
+
+    Requires: Valid JWT token
+
+    Returns:
+        200: Products (columns) and spec rows
+        500: Server error
+    """
+    try:
+        current_user_id = int(get_jwt_identity())
+
+        matrix = CompareService.get_matrix(current_user_id)
+
+        return (
+            jsonify(format_response(True, matrix, "Compare matrix retrieved successfully")),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error building compare matrix: {str(e)}")
+        return (
+            jsonify(
+                format_response(False, None, "An error occurred while building compare matrix")
+            ),
             500,
         )
 
@@ -116,7 +177,7 @@ def add_to_compare():
         500: Server error
     """
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
         data = request.get_json()
 
         # Validate request
@@ -128,24 +189,11 @@ def add_to_compare():
         except (TypeError, ValueError):
             return jsonify(format_response(False, None, "Invalid product ID format")), 400
 
-        # Check if product exists
-        product = db.session.get(Product, product_id)
-        if not product:
+        result = CompareService.add_product(current_user_id, product_id)
+        if result is None:
             return jsonify(format_response(False, None, "Product not found")), 404
 
-        # Get or create compare list
-        compare = Compare.query.filter_by(user_id=current_user_id).first()
-        if not compare:
-            compare = Compare(user_id=current_user_id)
-            db.session.add(compare)
-            db.session.flush()
-
-        # Check if product already in compare list
-        existing_item = CompareItem.query.filter_by(
-            compare_id=compare.id, product_id=product_id
-        ).first()
-
-        if existing_item:
+        if result == ALREADY_PRESENT:
             return (
                 jsonify(
                     format_response(
@@ -157,16 +205,10 @@ def add_to_compare():
                 200,
             )
 
-        # Check if compare list has reached limit (3 items)
-        current_items_count = CompareItem.query.filter_by(compare_id=compare.id).count()
-        if current_items_count >= 3:
-            return jsonify(format_response(False, None, "Compare list is full (max 3 items)")), 400
-
-        # Add new item to compare list
-        compare_item = CompareItem(compare_id=compare.id, product_id=product_id)
-
-        db.session.add(compare_item)
-        db.session.commit()
+        if result == FULL:
+            max_items = current_app.config.get("COMPARE_MAX_ITEMS", 3)
+            message = f"Compare list is full (max {max_items} items)"
+            return jsonify(format_response(False, None, message)), 400
 
         logger.info(f"User {current_user_id} added product {product_id} to compare list")
         return (
@@ -205,28 +247,15 @@ def remove_from_compare(product_id):
 
     Returns:
         200: Product removed from compare list
-        404: Compare list or product not found
+        404: Product not in compare list
         500: Server error
     """
     try:
-        current_user_id = get_jwt_identity()
-
-        # Get compare list
-        compare = Compare.query.filter_by(user_id=current_user_id).first()
-        if not compare:
-            return jsonify(format_response(False, None, "Compare list not found")), 404
+        current_user_id = int(get_jwt_identity())
 
-        # Find and delete the compare item
-        compare_item = CompareItem.query.filter_by(
-            compare_id=compare.id, product_id=product_id
-        ).first()
-
-        if not compare_item:
+        if not CompareService.remove_product(current_user_id, product_id):
             return jsonify(format_response(False, None, "Product not found in compare list")), 404
 
-        db.session.delete(compare_item)
-        db.session.commit()
-
         logger.info(f"User {current_user_id} removed product {product_id} from compare list")
         return (
             jsonify(
@@ -266,11 +295,9 @@ def clear_compare():
         500: Server error
     """
     try:
-        current_user_id = get_jwt_identity()
+        current_user_id = int(get_jwt_identity())
 
-        # Get compare list
-        compare = Compare.query.filter_by(user_id=current_user_id).first()
-        if not compare:
+        if not CompareService.clear(current_user_id):
             return (
                 jsonify(
                     format_response(
@@ -280,13 +307,6 @@ def clear_compare():
                 200,
             )
 
-        # Delete all items
-        CompareItem.query.filter_by(compare_id=compare.id).delete()
-
-        # Delete compare list
-        db.session.delete(compare)
-        db.session.commit()
-
         logger.info(f"User {current_user_id} cleared their compare list")
         return (
             jsonify(
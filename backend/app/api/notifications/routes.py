@@ -3,13 +3,17 @@ Notifications Routes Blueprint
 Handles: user notifications
 """
 
+import json
 import logging
+import queue
+import time
 
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.extensions import db
-from app.models import Notification
+from app.services.notification_service import NOTIFICATION_CHANNEL, NotificationService
+from app.utils.event_hub import format_sse, get_event_hub
 from app.utils.response_formatter import format_response
 
 logger = logging.getLogger(__name__)
@@ -17,6 +21,9 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 notifications_bp = Blueprint("notifications", __name__)
 
+# How long a disconnected EventSource waits before reconnecting
+SSE_RETRY_MILLISECONDS = 3000
+
 
 # ============================================================================
 # GET USER NOTIFICATIONS
@@ -25,33 +32,35 @@ notifications_bp = Blueprint("notifications", __name__)
 @jwt_required()
 def get_user_notifications():
     """
-    Get notifications for the logged-in user
+    Get notifications for the logged-in user, newest first
+
+    Query Parameters:
+        limit: Page size (default 20, max 100)
+        cursor: next_cursor from the previous page
+        unread_only: Only return unread notifications (true/false)
 
     Returns:
-        200: List of notifications
+        200: Page of notifications with next_cursor and unread_count
+        400: Invalid limit or cursor
         500: Server error
     """
     try:
-        user_id = get_jwt_identity()
-        notifications = Notification.query.filter_by(user_id=user_id).all()
-        notifications_data = [
-            {
-                "id": notif.id,
-                "message": notif.message,
-                "is_read": notif.is_read,
-                "created_at": notif.created_at.isoformat(),
-            }
-            for notif in notifications
-        ]
+        user_id = int(get_jwt_identity())
+
+        try:
+            page = NotificationService.get_notifications_page(
+                user_id,
+                limit=request.args.get("limit"),
+                cursor=request.args.get("cursor"),
+                unread_only=request.args.get("unread_only", "").lower() == "true",
+            )
+        except ValueError:
+            return jsonify(format_response(False, None, "Invalid limit or cursor")), 400
+
+        page["unread_count"] = NotificationService.get_unread_count(user_id)
 
         return (
-            jsonify(
-                format_response(
-                    True,
-                    {"notifications": notifications_data},
-                    "Notifications fetched successfully",
-                )
-            ),
+            jsonify(format_response(True, page, "Notifications fetched successfully")),
             200,
         )
 
@@ -63,6 +72,112 @@ def get_user_notifications():
         )
 
 
+# ============================================================================
+# NOTIFICATION STREAM (SERVER-SENT EVENTS)
+# ============================================================================
+@notifications_bp.route("/stream", methods=["GET"])
+@jwt_required(locations=["headers", "query_string"])
+def stream_notifications():
+    """
+    Stream new notifications for the logged-in user as server-sent events
+
+    EventSource cannot set headers, so the token may also be passed as
+    ?jwt=<token> (nginx logs this path without its query string). Each
+    event's id is the notification ID; on reconnect the browser sends
+    Last-Event-ID and anything missed is replayed first. Streams close
+    after SSE_MAX_STREAM_SECONDS and the browser reconnects.
+
+    Events:
+        notification: {"id", "message", "is_read", "created_at"}
+
+    Returns:
+        200: text/event-stream
+    """
+    user_id = int(get_jwt_identity())
+    config = current_app.config
+    heartbeat = config.get("SSE_HEARTBEAT_SECONDS", 15)
+    max_seconds = config.get("SSE_MAX_STREAM_SECONDS", 300)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    # Register before replaying so nothing created in between is missed
+    hub = get_event_hub(NOTIFICATION_CHANNEL)
+    inbox = hub.register(user_id)
+
+    missed = []
+    if last_event_id is not None:
+        missed = NotificationService.get_notifications_since(user_id, last_event_id)
+    # Idle streams must not pin a database connection
+    db.session.remove()
+
+    def events():
+        sent_id = last_event_id or 0
+        try:
+            yield f"retry: {SSE_RETRY_MILLISECONDS}\n\n"
+
+            for notification in missed:
+                sent_id = notification["id"]
+                yield format_sse(json.dumps(notification), "notification", sent_id)
+
+            deadline = time.monotonic() + max_seconds
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    message = inbox.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                notification = message.get("notification") or {}
+                # Already delivered by the replay
+                if notification.get("id", 0) <= sent_id:
+                    continue
+                sent_id = notification["id"]
+                yield format_sse(json.dumps(notification), "notification", sent_id)
+        finally:
+            hub.unregister(user_id, inbox)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ============================================================================
+# GET UNREAD COUNT
+# ============================================================================
+@notifications_bp.route("/user/unread-count", methods=["GET"])
+@jwt_required()
+def get_unread_count():
+    """
+    Get the logged-in user's unread notification count
+
+    Returns:
+        200: Unread count
+        500: Server error
+    """
+    try:
+        count = NotificationService.get_unread_count(int(get_jwt_identity()))
+        return (
+            jsonify(format_response(True, {"unread_count": count}, "Unread count fetched")),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error fetching unread count: {str(e)}")
+        return (
+            jsonify(format_response(False, None, "An error occurred while fetching unread count")),
+            500,
+        )
+
+
 # ============================================================================
 # MARK NOTIFICATION AS READ
 # ============================================================================
@@ -78,15 +193,11 @@ def mark_notification_as_read(notification_id):
         500: Server error
     """
     try:
-        user_id = get_jwt_identity()
-        notification = Notification.query.filter_by(id=notification_id, user_id=user_id).first()
+        user_id = int(get_jwt_identity())
 
-        if not notification:
+        if not NotificationService.mark_as_read(notification_id, user_id):
             return jsonify(format_response(False, None, "Notification not found")), 404
 
-        notification.is_read = True
-        db.session.commit()
-
         return (
             jsonify(
                 format_response(
@@ -104,3 +215,35 @@ def mark_notification_as_read(notification_id):
             ),
             500,
         )
+
+
+# ============================================================================
+# MARK ALL NOTIFICATIONS AS READ
+# ============================================================================
+@notifications_bp.route("/user/read-all", methods=["PUT"])
+@jwt_required()
+def mark_all_notifications_as_read():
+    """
+    Mark every notification of the logged-in user as read
+
+    Returns:
+        200: Number of notifications marked as read
+        500: Server error
+    """
+    try:
+        count = NotificationService.mark_all_as_read(int(get_jwt_identity()))
+        return (
+            jsonify(format_response(True, {"updated": count}, "All notifications marked as read")),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error marking all notifications as read: {str(e)}")
+        return (
+            jsonify(
+                format_response(
+                    False, None, "An error occurred while marking notifications as read"
+                )
+            ),
+            500,
+        )
@@ -4,23 +4,37 @@ Handles: order creation, viewing orders, updating status, generating invoices/re
 """
 
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from io import BytesIO
 
-from flask import Blueprint, jsonify, request, send_file
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    jsonify,
+    request,
+    send_file,
+    stream_with_context,
+)
 from flask_jwt_extended import get_jwt_identity, jwt_required
-from xhtml2pdf import pisa
 
+from app.extensions import db
 from app.models import Order
-from app.services import OrderService
+from app.services import DocumentService, OrderService
 from app.utils.decorators import admin_required
+from app.utils.idempotency import idempotent
+from app.utils.pdf_renderer import PdfRenderUnavailable
 from app.utils.response_formatter import format_response
+from app.utils.zip_stream import stream_zip
 
 logger = logging.getLogger(__name__)
 
 # Create blueprint
 orders_bp = Blueprint("orders", __name__)
 
+# Orders loaded per query while streaming a document export
+EXPORT_BATCH_SIZE = 50
+
 
 # ============================================================================
 # GET USER ORDERS
@@ -58,11 +72,13 @@ def get_user_orders():
 # ============================================================================
 @orders_bp.route("/", methods=["POST"])
 @jwt_required()
+@idempotent
 def create_order():
     """
     Create a new order from cart
 
     Requires: Valid JWT token
+    Optional header: Idempotency-Key (repeats return the first response)
 
     Expected JSON:
     {
@@ -82,6 +98,8 @@ def create_order():
     Returns:
         201: Order created successfully
         400: Cart is empty or invalid data
+        409: Same Idempotency-Key still being processed
+        422: Idempotency-Key reused for a different request
         500: Server error
     """
     try:
@@ -199,6 +217,142 @@ def get_all_orders():
         return jsonify(format_response(False, None, "An error occurred while fetching orders")), 500
 
 
+# ============================================================================
+# EXPORT INVOICES/RECEIPTS AS ZIP (ADMIN ONLY)
+# ============================================================================
+@orders_bp.route("/admin/documents/export", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_documents():
+    """
+    Stream a ZIP of invoices or receipts for matching orders (Admin only)
+
+    Query params:
+        doc_type: 'invoice' (default) or 'receipt'
+        status: Order status to match (receipts always require 'Delivered')
+        start_date: Inclusive start date (YYYY-MM-DD)
+        end_date: Inclusive end date (YYYY-MM-DD)
+
+    At least one of status, start_date or end_date is required.
+
+    Requires: Valid JWT token with admin privileges
+
+    Returns:
+        200: ZIP archive streamed entry by entry
+        400: Invalid filters
+        403: Admin privileges required
+        500: Server error
+    """
+    try:
+        doc_type = request.args.get("doc_type", "invoice")
+        status = request.args.get("status")
+
+        if doc_type not in ["invoice", "receipt"]:
+            return (
+                jsonify(
+                    format_response(
+                        False, None, "Invalid document type. Must be 'invoice' or 'receipt'"
+                    )
+                ),
+                400,
+            )
+
+        if status and status not in OrderService.ORDER_STATUSES:
+            return jsonify(format_response(False, None, "Invalid order status")), 400
+
+        if doc_type == "receipt":
+            if status and status != "Delivered":
+                return (
+                    jsonify(
+                        format_response(
+                            False, None, "Receipts are only available for delivered orders"
+                        )
+                    ),
+                    400,
+                )
+            status = "Delivered"
+
+        try:
+            start_date = _parse_export_date(request.args.get("start_date"))
+            end_date = _parse_export_date(request.args.get("end_date"))
+        except ValueError:
+            return (
+                jsonify(format_response(False, None, "Dates must use the YYYY-MM-DD format")),
+                400,
+            )
+
+        if not (status or start_date or end_date):
+            return (
+                jsonify(
+                    format_response(False, None, "Provide a status or a start_date/end_date filter")
+                ),
+                400,
+            )
+
+        if start_date and end_date and start_date > end_date:
+            return (
+                jsonify(format_response(False, None, "start_date must be before end_date")),
+                400,
+            )
+
+        query = OrderService.get_orders_for_export(
+            status=status,
+            start_date=start_date,
+            end_date=end_date + timedelta(days=1) if end_date else None,
+        )
+        concurrency = max(1, current_app.config.get("PDF_RENDER_WORKERS", 1))
+
+        def entries():
+            failed = []
+            for batch in _iter_order_batches(query, EXPORT_BATCH_SIZE):
+                for order, content in DocumentService.get_pdfs(batch, doc_type, concurrency):
+                    if content:
+                        yield f"{doc_type}_{order.order_reference}.pdf", content
+                    else:
+                        failed.append(order.order_reference)
+
+                # Release the batch so memory stays flat across thousands of orders
+                for order in batch:
+                    db.session.expunge(order)
+
+            if failed:
+                logger.warning(f"Document export skipped {len(failed)} {doc_type}(s)")
+                errors = "Documents that could not be generated:\n" + "\n".join(failed) + "\n"
+                yield "errors.txt", errors.encode("utf-8")
+
+        filename = f"{doc_type}s_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        return Response(
+            stream_with_context(stream_zip(entries())),
+            mimetype="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    except Exception as e:
+        logger.error(f"Error exporting documents: {str(e)}")
+        return jsonify(format_response(False, None, "Failed to export documents")), 500
+
+
+def _parse_export_date(value):
+    """Parse an optional YYYY-MM-DD query value"""
+    if not value:
+        return None
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def _iter_order_batches(query, batch_size):
+    """Yield orders in id order, one keyset-paginated batch at a time"""
+    last_id = 0
+    while True:
+        batch = query.filter(Order.id > last_id).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].id
+
+
 # ============================================================================
 # GET ORDER DETAILS (ADMIN)
 # ============================================================================
@@ -355,15 +509,27 @@ def generate_document(order_reference, doc_type):
                 400,
             )
 
-        # Generate PDF
-        pdf_content = _generate_pdf(order, doc_type)
+        # Get cached PDF (rendered on first request for this order version)
+        try:
+            pdf_path, pdf_content = DocumentService.get_pdf_source(order, doc_type)
+        except PdfRenderUnavailable as e:
+            logger.warning(f"PDF renderer unavailable for {order_reference}: {str(e)}")
+            return (
+                jsonify(
+                    format_response(
+                        False, None, "Document generation is busy, please try again shortly"
+                    )
+                ),
+                503,
+                {"Retry-After": "5"},
+            )
 
-        if not pdf_content:
+        if not pdf_path and not pdf_content:
             return jsonify(format_response(False, None, "Failed to generate PDF")), 500
 
-        # Send PDF file
+        # Send PDF file (disk-backed documents are streamed straight from the file)
         return send_file(
-            BytesIO(pdf_content),
+            pdf_path or BytesIO(pdf_content),
             mimetype="application/pdf",
             as_attachment=True,
             download_name=f"{doc_type}_{order.order_reference}.pdf",
@@ -372,236 +538,3 @@ def generate_document(order_reference, doc_type):
     except Exception as e:
         logger.error(f"Error generating {doc_type}: {str(e)}")
         return jsonify(format_response(False, None, f"Failed to generate {doc_type}")), 500
-
-
-def _generate_pdf(order, doc_type):
-    """
-    Generate PDF content for invoice or receipt
-
-    Args:
-        order: Order object
-        doc_type: 'invoice' or 'receipt'
-
-    Returns:
-        bytes: PDF content or None if failed
-    """
-    try:
-        from flask import render_template_string
-
-        company_name = "Phone Home Kenya"
-
-        # Choose template based on document type
-        if doc_type == "invoice":
-            template = _get_invoice_template()
-        else:
-            template = _get_receipt_template()
-
-        # Render HTML
-        html = render_template_string(
-            template, order=order, company_name=company_name, now=datetime.now()
-        )
-
-        # Convert to PDF
-        pdf_buffer = BytesIO()
-        pisa_status = pisa.CreatePDF(BytesIO(html.encode("utf-8")), pdf_buffer)
-
-        if pisa_status.err:
-            logger.error(f"PDF generation error: {pisa_status.err}")
-            return None
-
-        pdf_buffer.seek(0)
-        return pdf_buffer.read()
-
-    except Exception as e:
-        logger.error(f"Error in _generate_pdf: {str(e)}")
-        return None
-
-
-def _get_invoice_template():
-    """Get invoice HTML template"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Invoice - {{ order.order_reference }}</title>
-        <style>
-            body { font-family: Arial, sans-serif; color: #e4e4e4; background-color: #111; padding: 20px; }
-            .document { max-width: 800px; margin: 0 auto; padding: 30px; background-color: #1a1a1a; border: 1px solid #333; }
-            .header { display: flex; justify-content: space-between; margin-bottom: 30px; border-bottom: 2px solid #e81cff; padding-bottom: 20px; }
-            h1, h2, h3 { color: #e81cff; margin-top: 0; }
-            .document-title { font-size: 24px; font-weight: bold; text-transform: uppercase; }
-            .company-name { font-size: 24px; font-weight: bold; color: #e81cff; }
-            .info-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-bottom: 20px; }
-            .info-box { padding: 15px; background-color: #222; border-radius: 5px; }
-            .info-box h3 { font-size: 16px; color: #e81cff; border-bottom: 1px solid #444; padding-bottom: 5px; }
-            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-            th { background-color: #333; color: #e81cff; text-align: left; padding: 10px; }
-            td { padding: 10px; border-bottom: 1px solid #444; }
-            .totals { margin-top: 20px; text-align: right; }
-            .total-row { font-weight: bold; font-size: 18px; color: #e81cff; }
-            .footer { margin-top: 30px; text-align: center; font-size: 12px; color: #888; border-top: 1px solid #444; padding-top: 20px; }
-        </style>
-    </head>
-    <body>
-        <div class="document">
-            <div class="header">
-                <div>
-                    <h1 class="document-title">INVOICE</h1>
-                    <p>Order #{{ order.order_reference }}</p>
-                </div>
-                <div class="company-name">{{ company_name }}</div>
-            </div>
-
-            <div class="info-grid">
-                <div class="info-box">
-                    <h3>ORDER INFORMATION</h3>
-                    <p><strong>Date:</strong> {{ order.created_at.strftime('%B %d, %Y') }}</p>
-                    <p><strong>Payment Method:</strong> {{ order.payment.payment_method if order.payment else "N/A" }}</p>
-                    <p><strong>Order Status:</strong> {{ order.status }}</p>
-                </div>
-
-                <div class="info-box">
-                    <h3>CUSTOMER DETAILS</h3>
-                    <p><strong>Name:</strong> {{ order.address.first_name }} {{ order.address.last_name }}</p>
-                    <p><strong>Phone:</strong> {{ order.address.phone }}</p>
-                    <p><strong>Address:</strong> {{ order.address.street }}, {{ order.address.city }}</p>
-                    {% if order.address.additional_info %}
-                    <p><strong>Additional:</strong> {{ order.address.additional_info }}</p>
-                    {% endif %}
-                </div>
-            </div>
-
-            <h2>ORDER ITEMS</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Item</th>
-                        <th>Variation</th>
-                        <th>Quantity</th>
-                        <th>Unit Price</th>
-                        <th>Total</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for item in order.order_items %}
-                    <tr>
-                        <td>{{ item.product.name }}</td>
-                        <td>{{ item.variation_name if item.variation_name else "Standard" }}</td>
-                        <td>{{ item.quantity }}</td>
-                        <td>KES {{ "%.2f"|format(item.variation_price or item.product.price) }}</td>
-                        <td>KES {{ "%.2f"|format((item.variation_price or item.product.price) * item.quantity) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-
-            <div class="totals">
-                <p class="total-row">TOTAL: KES {{ "%.2f"|format(order.total_amount) }}</p>
-            </div>
-
-            <div class="footer">
-                <p>Thank you for your order! This is not a receipt.</p>
-                <p>© {{ now.year }} {{ company_name }}. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
-
-
-def _get_receipt_template():
-    """Get receipt HTML template"""
-    return """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <title>Receipt - {{ order.order_reference }}</title>
-        <style>
-            body { font-family: Arial, sans-serif; color: #e4e4e4; background-color: #111; padding: 20px; }
-            .document { max-width: 800px; margin: 0 auto; padding: 30px; background-color: #1a1a1a; border: 1px solid #333; position: relative; }
-            .header { display: flex; justify-content: space-between; margin-bottom: 30px; border-bottom: 2px solid #4caf50; padding-bottom: 20px; }
-            h1, h2, h3 { color: #4caf50; margin-top: 0; }
-            .document-title { font-size: 24px; font-weight: bold; text-transform: uppercase; }
-            .company-name { font-size: 24px; font-weight: bold; color: #4caf50; }
-            .paid-stamp { position: absolute; top: 100px; right: 100px; font-size: 40px; color: #4caf50; border: 5px solid #4caf50; padding: 10px 20px; transform: rotate(-15deg); opacity: 0.7; }
-            .info-grid { display: grid; grid-template-columns: 1fr 1fr; gap: 20px; margin-bottom: 20px; }
-            .info-box { padding: 15px; background-color: #222; border-radius: 5px; }
-            .info-box h3 { font-size: 16px; color: #4caf50; border-bottom: 1px solid #444; padding-bottom: 5px; }
-            table { width: 100%; border-collapse: collapse; margin: 20px 0; }
-            th { background-color: #333; color: #4caf50; text-align: left; padding: 10px; }
-            td { padding: 10px; border-bottom: 1px solid #444; }
-            .totals { margin-top: 20px; text-align: right; }
-            .total-row { font-weight: bold; font-size: 18px; color: #4caf50; }
-            .footer { margin-top: 30px; text-align: center; font-size: 12px; color: #888; border-top: 1px solid #444; padding-top: 20px; }
-        </style>
-    </head>
-    <body>
-        <div class="document">
-            <div class="header">
-                <div>
-                    <h1 class="document-title">RECEIPT</h1>
-                    <p>Order #{{ order.order_reference }}</p>
-                </div>
-                <div class="company-name">{{ company_name }}</div>
-            </div>
-
-            <div class="paid-stamp">PAID</div>
-
-            <div class="info-grid">
-                <div class="info-box">
-                    <h3>PAYMENT INFORMATION</h3>
-                    <p><strong>Date:</strong> {{ order.created_at.strftime('%B %d, %Y') }}</p>
-                    <p><strong>Payment Method:</strong> {{ order.payment.payment_method if order.payment else "N/A" }}</p>
-                    <p><strong>Payment Status:</strong> PAID</p>
-                    {% if order.payment and order.payment.mpesa_receipt %}
-                    <p><strong>M-Pesa Receipt:</strong> {{ order.payment.mpesa_receipt }}</p>
-                    {% endif %}
-                </div>
-
-                <div class="info-box">
-                    <h3>CUSTOMER DETAILS</h3>
-                    <p><strong>Name:</strong> {{ order.address.first_name }} {{ order.address.last_name }}</p>
-                    <p><strong>Phone:</strong> {{ order.address.phone }}</p>
-                    <p><strong>Address:</strong> {{ order.address.street }}, {{ order.address.city }}</p>
-                </div>
-            </div>
-
-            <h2>ITEMS PURCHASED</h2>
-            <table>
-                <thead>
-                    <tr>
-                        <th>Item</th>
-                        <th>Variation</th>
-                        <th>Quantity</th>
-                        <th>Unit Price</th>
-                        <th>Total</th>
-                    </tr>
-                </thead>
-                <tbody>
-                    {% for item in order.order_items %}
-                    <tr>
-                        <td>{{ item.product.name }}</td>
-                        <td>{{ item.variation_name if item.variation_name else "Standard" }}</td>
-                        <td>{{ item.quantity }}</td>
-                        <td>KES {{ "%.2f"|format(item.variation_price or item.product.price) }}</td>
-                        <td>KES {{ "%.2f"|format((item.variation_price or item.product.price) * item.quantity) }}</td>
-                    </tr>
-                    {% endfor %}
-                </tbody>
-            </table>
-
-            <div class="totals">
-                <p class="total-row">TOTAL PAID: KES {{ "%.2f"|format(order.total_amount) }}</p>
-            </div>
-
-            <div class="footer">
-                <p>Thank you for your purchase!</p>
-                <p>This receipt serves as proof of payment.</p>
-                <p>© {{ now.year }} {{ company_name }}. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
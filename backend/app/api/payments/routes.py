@@ -1,17 +1,20 @@
 """
 Payments Routes Blueprint
-Handles: M-Pesa STK Push, callback, payment retry, status check
+Handles: M-Pesa STK Push, callback, payment retry, status check, status long-poll
 """
 
 import logging
 
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
 
 from app.extensions import db
 from app.models import Cart, Order, Payment
-from app.services import MpesaService, OrderService
+from app.services import CartService, InventoryService, MpesaService, OrderService
 from app.services.notification_service import create_notification
+from app.services.order_service import PAYMENT_STATUS_CHANNEL
+from app.utils.idempotency import idempotent, record_reference
+from app.utils.pubsub import listen
 from app.utils.response_formatter import format_response
 
 logger = logging.getLogger(__name__)
@@ -25,6 +28,7 @@ payments_bp = Blueprint("payments", __name__)
 # ============================================================================
 @payments_bp.route("/mpesa/initiate", methods=["POST"])
 @jwt_required()
+@idempotent
 def initiate_mpesa_payment():
     """
     Initiate M-Pesa STK Push payment and create order
@@ -45,10 +49,13 @@ def initiate_mpesa_payment():
     }
 
     Requires: Valid JWT token
+    Optional header: Idempotency-Key (repeats return the first response, no new STK push)
 
     Returns:
         201: Payment initiated, order created
         400: Invalid request or cart empty
+        409: Same Idempotency-Key still being processed
+        422: Idempotency-Key reused for a different request
         500: Server error
     """
     try:
@@ -63,6 +70,7 @@ def initiate_mpesa_payment():
             if field not in data:
                 return jsonify(format_response(False, None, f"{field} is required")), 400
 
+        CartService.persist_cart(current_user_id)
         cart = Cart.query.filter_by(user_id=current_user_id).first()
         if not cart or not cart.items:
             logger.warning(f"Empty cart for user {current_user_id}")
@@ -86,6 +94,8 @@ def initiate_mpesa_payment():
 
         order_reference = order.order_reference
         logger.info(f"Order created: {order_reference}")
+        # The order is committed: a retry must replay this response, not checkout again
+        record_reference(order_reference)
 
         # Initiate STK Push
         result = MpesaService.initiate_payment(
@@ -97,8 +107,9 @@ def initiate_mpesa_payment():
 
         if not result["success"]:
             logger.error(f"STK Push failed: {result.get('error')}")
-            # Update order status to failed
+            # Update order status to failed and give the stock back
             order.status = "Payment Failed"
+            InventoryService.release_reservation(order.id)
             db.session.commit()
             return jsonify(format_response(False, None, result["error"])), 400
 
@@ -256,6 +267,7 @@ def retry_mpesa_payment():
         400: Invalid request
         403: Unauthorized
         404: Order not found
+        409: Items in the order are no longer in stock
         500: Server error
     """
     try:
@@ -300,6 +312,13 @@ def retry_mpesa_payment():
 
         amount = payment.amount
 
+        # Take the stock again if the previous attempt released it
+        stock_error = InventoryService.hold_again(order.id)
+        if stock_error:
+            db.session.rollback()
+            logger.warning(f"Cannot retry payment for order {order_reference}: {stock_error}")
+            return jsonify(format_response(False, None, stock_error)), 409
+
         # Initiate new STK Push
         result = MpesaService.initiate_payment(
             MpesaService(),
@@ -323,6 +342,8 @@ def retry_mpesa_payment():
 
         db.session.commit()
 
+        OrderService.publish_payment_status(order_reference, payment)
+
         # Create notification
         create_notification(
             current_user_id,
@@ -385,23 +406,102 @@ def get_payment_status(order_reference):
         if not payment:
             return jsonify(format_response(False, None, "No payment record found")), 404
 
-        payment_data = {
-            "order_reference": order_reference,
-            "payment_method": payment.payment_method,
-            "payment_status": payment.status,
-            "amount": float(payment.amount),
-            "phone_number": payment.phone_number,
-            "transaction_id": payment.transaction_id,
-            "mpesa_receipt": payment.mpesa_receipt,
-            "failure_reason": payment.failure_reason,
-            "created_at": payment.created_at.isoformat(),
-            "updated_at": payment.updated_at.isoformat(),
-        }
         return (
-            jsonify(format_response(True, payment_data, "Payment status fetched successfully")),
+            jsonify(
+                format_response(
+                    True,
+                    _serialize_payment_status(order_reference, payment),
+                    "Payment status fetched successfully",
+                )
+            ),
             200,
         )
 
     except Exception as e:
         logger.error(f"Error fetching payment status: {str(e)}")
         return jsonify(format_response(False, None, "Failed to fetch payment status")), 500
+
+
+# ============================================================================
+# WAIT FOR PAYMENT STATUS CHANGE (LONG-POLL)
+# ============================================================================
+@payments_bp.route("/status/<string:order_reference>/wait", methods=["GET"])
+@jwt_required()
+def wait_for_payment_status(order_reference):
+    """
+    Long-poll for a payment status change
+
+    Parks the request until the M-Pesa callback updates the payment or the
+    timeout expires, instead of the client polling the status endpoint.
+    nginx routes this path to the gevent api-stream workers; parked on the
+    threaded api workers it would hold one of their few request slots.
+
+    Args:
+        order_reference: Order reference number
+
+    Query Parameters:
+        last_status: Status the client already knows (default: Pending)
+        timeout: Seconds to wait (capped at PAYMENT_STATUS_WAIT_TIMEOUT)
+
+    Requires: Valid JWT token
+
+    Returns:
+        200: Payment status ("changed" is false when the wait timed out)
+        403: Unauthorized
+        404: Order or payment not found
+        500: Server error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        last_status = request.args.get("last_status", "Pending")
+
+        max_timeout = current_app.config.get("PAYMENT_STATUS_WAIT_TIMEOUT", 25)
+        timeout = request.args.get("timeout", type=float, default=max_timeout)
+        timeout = min(max(timeout, 0), max_timeout)
+
+        # Subscribe before reading so a callback landing in between still wakes us
+        with listen(PAYMENT_STATUS_CHANNEL.format(order_reference=order_reference)) as updates:
+            order = Order.query.filter_by(order_reference=order_reference).first()
+            if not order:
+                return jsonify(format_response(False, None, "Order not found")), 404
+
+            if str(order.user_id) != current_user_id:
+                return jsonify(format_response(False, None, "Unauthorized access")), 403
+
+            payment = order.payment
+            if not payment:
+                return jsonify(format_response(False, None, "No payment record found")), 404
+
+            if payment.status == last_status:
+                # End the read transaction so the connection returns to the pool
+                # while parked; payment is expired and reloads on next access
+                db.session.rollback()
+                updates.wait(timeout)
+
+        payment_data = _serialize_payment_status(order_reference, payment)
+        payment_data["changed"] = payment.status != last_status
+
+        return (
+            jsonify(format_response(True, payment_data, "Payment status fetched successfully")),
+            200,
+        )
+
+    except Exception as e:
+        logger.error(f"Error waiting for payment status: {str(e)}")
+        return jsonify(format_response(False, None, "Failed to fetch payment status")), 500
+
+
+def _serialize_payment_status(order_reference, payment):
+    """Convert payment to the status payload returned to clients"""
+    return {
+        "order_reference": order_reference,
+        "payment_method": payment.payment_method,
+        "payment_status": payment.status,
+        "amount": float(payment.amount),
+        "phone_number": payment.phone_number,
+        "transaction_id": payment.transaction_id,
+        "mpesa_receipt": payment.mpesa_receipt,
+        "failure_reason": payment.failure_reason,
+        "created_at": payment.created_at.isoformat(),
+        "updated_at": payment.updated_at.isoformat(),
+    }
@@ -12,6 +12,7 @@ from app.models import Category, Product
 from app.services import ProductService
 from app.utils.decorators import admin_required
 from app.utils.response_formatter import format_response
+from app.utils.specs import NUMERIC_SPEC_COLUMNS
 
 logger = logging.getLogger(__name__)
 
@@ -33,13 +34,29 @@ def get_products():
         best_seller: Filter for best sellers (true/false)
         limit: Limit number of results
         sort: Sort order (newest, oldest, price_asc, price_desc)
+        min_ram / max_ram: RAM range in GB
+        min_storage / max_storage: Storage range in GB
+        min_battery / max_battery: Battery range in mAh
+        min_display / max_display: Screen size range in inches
     Returns:
         200: List of products
         500: Server error
     """
     try:
+        # Spec ranges are applied in SQL on the indexed numeric spec columns
+        spec_ranges = {}
+        for name in NUMERIC_SPEC_COLUMNS:
+            bounds = []
+            for bound in ("min", "max"):
+                try:
+                    bounds.append(float(request.args[f"{bound}_{name}"]))
+                except (KeyError, ValueError):
+                    bounds.append(None)
+            if bounds != [None, None]:
+                spec_ranges[name] = tuple(bounds)
+
         # Get all products
-        products = ProductService.get_all_products()
+        products = ProductService.get_all_products(spec_ranges)
 
         # Filter by type if specified
         product_type = request.args.get("type")
@@ -152,7 +169,8 @@ def create_product():
         image_urls: List of image files
         hasVariation: Boolean (optional)
         isBestSeller: Boolean (optional)
-        variations: JSON array of variations (optional)
+        stock: Units in stock (optional; blank = not stock-tracked)
+        variations: JSON array of variations, each with optional stock (optional)
         ... type-specific fields
 
     Returns:
@@ -189,6 +207,7 @@ def create_product():
             "type": request.form.get("type"),
             "hasVariation": request.form.get("hasVariation", "false").lower() == "true",
             "isBestSeller": request.form.get("isBestSeller", "false").lower() == "true",
+            "stock": request.form.get("stock"),  # Blank = not stock-tracked
             "variations": request.form.get("variations"),  # JSON string
         }
 
@@ -290,6 +309,10 @@ def update_product(product_id):
                 request.form.get("isBestSeller", "false").lower() == "true"
             )
 
+        # Stock (blank stops tracking stock)
+        if "stock" in request.form:
+            product_data["stock"] = request.form.get("stock")
+
         # Variations
         if request.form.get("variations"):
             product_data["variations"] = request.form.get("variations")
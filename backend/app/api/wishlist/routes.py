@@ -1,15 +1,17 @@
 """
 Wishlist Routes Blueprint
-Handles: viewing wishlist, adding/removing products
+Handles: viewing wishlist, adding/removing products, bulk add
 """
 
 import logging
 
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy import select
 
 from app.extensions import db
 from app.models import Product, WishList
+from app.services.wishlist_service import WishlistService
 from app.utils.response_formatter import format_response
 
 logger = logging.getLogger(__name__)
@@ -17,6 +19,9 @@ logger = logging.getLogger(__name__)
 # Create blueprint
 wishlist_bp = Blueprint("wishlist", __name__)
 
+# Maximum products accepted by POST /api/wishlist/bulk
+BULK_MAX_ITEMS = 100
+
 
 # ============================================================================
 # GET WISHLIST
@@ -116,18 +121,13 @@ def add_to_wishlist():
             return jsonify(format_response(False, None, "Product not found")), 404
 
         # Get or create wishlist
-        wishlist = WishList.query.filter_by(user_id=current_user_id).first()
-        if not wishlist:
-            wishlist = WishList(user_id=current_user_id)
-            db.session.add(wishlist)
-            db.session.flush()
+        wishlist_id = WishlistService.get_wishlist_id(current_user_id, create=True)
 
-        # Check if product already in wishlist
-        if product in wishlist.products:
+        # Insert the association row; an existing one is left untouched
+        if not WishlistService.add_product(wishlist_id, product_id):
+            db.session.commit()
             return jsonify(format_response(True, None, "Product already in wishlist")), 201
 
-        # Add product to wishlist
-        wishlist.products.append(product)
         db.session.commit()
 
         logger.info(f"User {current_user_id} added product {product_id} to wishlist")
@@ -142,6 +142,73 @@ def add_to_wishlist():
         )
 
 
+# ============================================================================
+# BULK ADD TO WISHLIST
+# ============================================================================
+@wishlist_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+def bulk_add_to_wishlist():
+    """
+    Add many products to wishlist in one request (e.g. guest sync after login)
+
+    Expected JSON:
+    {
+        "product_ids": [123, 456]
+    }
+
+    Requires: Valid JWT token
+
+    Returns:
+        200: Products added; unknown product IDs listed in "skipped"
+        400: Invalid product IDs
+        500: Server error
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        data = request.get_json(silent=True)
+
+        raw_ids = data.get("product_ids") if isinstance(data, dict) else None
+        if not isinstance(raw_ids, list) or not raw_ids:
+            return (
+                jsonify(format_response(False, None, "product_ids must be a non-empty list")),
+                400,
+            )
+
+        if len(raw_ids) > BULK_MAX_ITEMS:
+            return (
+                jsonify(
+                    format_response(False, None, f"At most {BULK_MAX_ITEMS} products per request")
+                ),
+                400,
+            )
+
+        try:
+            product_ids = {int(product_id) for product_id in raw_ids}
+        except (TypeError, ValueError):
+            return jsonify(format_response(False, None, "Invalid product ID format")), 400
+
+        # Validate every ID in one IN query
+        known_ids = set(db.session.scalars(select(Product.id).where(Product.id.in_(product_ids))))
+
+        added = 0
+        if known_ids:
+            wishlist_id = WishlistService.get_wishlist_id(current_user_id, create=True)
+            added = WishlistService.add_products(wishlist_id, known_ids)
+            db.session.commit()
+
+        result = {"added": added, "skipped": sorted(product_ids - known_ids)}
+        logger.info(f"User {current_user_id} bulk added {added} product(s) to wishlist")
+        return jsonify(format_response(True, result, "Wishlist updated successfully")), 200
+
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error bulk adding to wishlist: {str(e)}")
+        return (
+            jsonify(format_response(False, None, "An error occurred while adding to wishlist")),
+            500,
+        )
+
+
 # ============================================================================
 # REMOVE FROM WISHLIST
 # ============================================================================
@@ -165,21 +232,16 @@ def remove_from_wishlist(product_id):
         current_user_id = get_jwt_identity()
 
         # Get wishlist
-        wishlist = WishList.query.filter_by(user_id=current_user_id).first()
-        if not wishlist:
+        wishlist_id = WishlistService.get_wishlist_id(current_user_id)
+        if wishlist_id is None:
             return jsonify(format_response(False, None, "Wishlist not found")), 404
 
-        # Get product
-        product = db.session.get(Product, product_id)
-        if not product:
-            return jsonify(format_response(False, None, "Product not found")), 404
-
-        # Check if product is in wishlist
-        if product not in wishlist.products:
+        # Remove the association row directly
+        if not WishlistService.remove_product(wishlist_id, product_id):
+            if db.session.get(Product, product_id) is None:
+                return jsonify(format_response(False, None, "Product not found")), 404
             return jsonify(format_response(False, None, "Product not found in wishlist")), 404
 
-        # Remove product from wishlist
-        wishlist.products.remove(product)
         db.session.commit()
 
         logger.info(f"User {current_user_id} removed product {product_id} from wishlist")
@@ -0,0 +1,119 @@
+"""
+CLI commands
+Maintenance jobs run with `flask <command>` (e.g. from cron or a one-off container)
+"""
+
+import logging
+import time
+
+import click
+
+logger = logging.getLogger(__name__)
+
+
+def register_commands(app):
+    """
+    Register maintenance CLI commands
+
+    Args:
+        app: Flask application instance
+    """
+
+    @app.cli.command("purge-expired-tokens")
+    def purge_expired_tokens_command():
+        """Delete blocklisted JWTs whose expiry has passed."""
+        from app.utils.jwt.blocklist import purge_expired_tokens
+
+        deleted = purge_expired_tokens()
+        click.echo(f"Purged {deleted} expired blocklisted token(s)")
+
+    @app.cli.command("prune-notifications")
+    @click.option("--days", type=int, default=None, help="Override NOTIFICATION_RETENTION_DAYS.")
+    def prune_notifications_command(days):
+        """Delete read notifications older than the retention age."""
+        from app.services.retention_service import RetentionService
+
+        deleted = RetentionService.prune_read_notifications(max_age_days=days)
+        click.echo(f"Pruned {deleted} read notification(s)")
+
+    @app.cli.command("archive-audit-logs")
+    @click.option("--days", type=int, default=None, help="Override AUDIT_LOG_RETENTION_DAYS.")
+    def archive_audit_logs_command(days):
+        """Move audit logs from old months into audit_logs_archive."""
+        from app.services.retention_service import RetentionService
+
+        archived = RetentionService.archive_audit_logs(max_age_days=days)
+        for month, count in archived.items():
+            click.echo(f"{month}: archived {count} audit log(s)")
+        click.echo(f"Archived {sum(archived.values())} audit log(s)")
+
+    @app.cli.command("release-stock-holds")
+    @click.option("--limit", type=int, default=100, help="Maximum holds to release.")
+    def release_stock_holds_command(limit):
+        """Release stock held by M-Pesa orders whose payment window has passed."""
+        from app.services.inventory_service import InventoryService
+
+        released = InventoryService.release_expired_reservations(limit=limit)
+        click.echo(f"Released {released} expired stock hold(s)")
+
+    @app.cli.command("backfill-spec-attributes")
+    @click.option("--batch-size", type=int, default=500, help="Products per batch.")
+    def backfill_spec_attributes_command(batch_size):
+        """Parse RAM, storage, battery and display numbers into the spec columns."""
+        from app.services.product_service import ProductService
+
+        updated = ProductService.backfill_numeric_specs(batch_size=batch_size)
+        click.echo(f"Updated numeric specs of {updated} product(s)")
+
+    @app.cli.command("deliver-broadcasts")
+    def deliver_broadcasts_command():
+        """Deliver queued notification broadcasts and resume interrupted ones."""
+        from app.services.broadcast_service import BroadcastService
+
+        sent = BroadcastService.deliver_pending()
+        click.echo(f"Delivered {sent} broadcast notification(s)")
+
+    @app.cli.command("maintenance-worker")
+    @click.option("--interval", type=int, default=3600, help="Seconds between runs.")
+    @click.option(
+        "--broadcast-interval", type=int, default=5, help="Seconds between broadcast polls."
+    )
+    @click.option("--metrics-port", type=int, default=9101, help="Prometheus port (0 disables).")
+    def maintenance_worker_command(interval, broadcast_interval, metrics_port):
+        """Run the retention and cleanup jobs on a schedule and deliver broadcasts."""
+        from prometheus_client import start_http_server
+
+        from app.extensions import db
+        from app.services.broadcast_service import BroadcastService
+        from app.services.inventory_service import InventoryService
+        from app.services.retention_service import RetentionService
+        from app.utils.jwt.blocklist import purge_expired_tokens
+
+        if metrics_port:
+            start_http_server(metrics_port)
+
+        jobs = [
+            ("purge-expired-tokens", purge_expired_tokens),
+            ("prune-notifications", RetentionService.prune_read_notifications),
+            ("prune-idempotency-keys", RetentionService.prune_idempotency_keys),
+            ("archive-audit-logs", RetentionService.archive_audit_logs),
+            ("release-stock-holds", InventoryService.release_expired_reservations),
+        ]
+        next_run = 0.0
+        while True:
+            if time.monotonic() >= next_run:
+                for name, job in jobs:
+                    try:
+                        job()
+                    except Exception as e:
+                        db.session.rollback()
+                        logger.error(f"Maintenance job {name} failed: {str(e)}")
+                next_run = time.monotonic() + interval
+
+            try:
+                BroadcastService.deliver_pending()
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Broadcast delivery failed: {str(e)}")
+            db.session.remove()
+            time.sleep(broadcast_interval)
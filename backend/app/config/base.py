@@ -3,6 +3,7 @@ Base configuration shared across all environments
 """
 
 import os
+import tempfile
 from datetime import timedelta
 
 from dotenv import load_dotenv
@@ -51,6 +52,38 @@ class BaseConfig:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
+    # Revoked-token Bloom filter (sized for expected live revocations; rebuilt periodically)
+    JWT_BLOCKLIST_BLOOM_CAPACITY = int(os.getenv("JWT_BLOCKLIST_BLOOM_CAPACITY", 100000))
+    JWT_BLOCKLIST_REBUILD_SECONDS = int(os.getenv("JWT_BLOCKLIST_REBUILD_SECONDS", 300))
+
+    # Per-worker role cache for admin checks (invalidated on role change / user deletion)
+    ROLE_CACHE_TTL = int(os.getenv("ROLE_CACHE_TTL", 30))
+
+    # Per-worker cart read-model cache (invalidated on cart change; TTL bounds price edits)
+    CART_CACHE_TTL = int(os.getenv("CART_CACHE_TTL", 30))
+
+    # Cart store: "sql" (carts/cart_items) or "redis" (hashes written behind to SQL)
+    CART_STORE_BACKEND = os.getenv("CART_STORE_BACKEND", "sql")
+    CART_STORE_TTL = int(os.getenv("CART_STORE_TTL", 7 * 24 * 3600))
+    CART_WRITE_BEHIND_SECONDS = float(os.getenv("CART_WRITE_BEHIND_SECONDS", 5))
+
+    # Compare lists: "redis" (sorted sets, SQL when Redis is down) or "sql" (compares tables)
+    COMPARE_STORE_BACKEND = os.getenv("COMPARE_STORE_BACKEND", "redis")
+    COMPARE_TTL_HOURS = float(os.getenv("COMPARE_TTL_HOURS", 24))
+    COMPARE_MAX_ITEMS = int(os.getenv("COMPARE_MAX_ITEMS", 3))
+
+    # Per-worker parsed spec cache for the compare matrix (entries keyed by product version)
+    SPEC_CACHE_SIZE = int(os.getenv("SPEC_CACHE_SIZE", 5000))
+
+    # Per-worker product/variation price index (rebuilt on catalog change; TTL is a backstop)
+    CATALOG_PRICE_INDEX_TTL = int(os.getenv("CATALOG_PRICE_INDEX_TTL", 300))
+
+    # How long an M-Pesa order holds its stock while the payment is pending
+    STOCK_HOLD_SECONDS = int(os.getenv("STOCK_HOLD_SECONDS", 900))
+
+    # Idempotency-Key responses for checkout endpoints (replayed, then pruned after this)
+    IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
     # Database
     SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -92,10 +125,76 @@ class BaseConfig:
     # Redis
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+    # Payment status long-poll (seconds a client request may stay parked)
+    PAYMENT_STATUS_WAIT_TIMEOUT = int(os.getenv("PAYMENT_STATUS_WAIT_TIMEOUT", 25))
+
+    # Rendered invoice/receipt PDF cache (backend: disk, memory or s3)
+    DOCUMENT_CACHE_BACKEND = os.getenv("DOCUMENT_CACHE_BACKEND", "disk")
+    DOCUMENT_CACHE_DIR = os.getenv(
+        "DOCUMENT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "phonehome-documents")
+    )
+    DOCUMENT_CACHE_MAX_ITEMS = int(os.getenv("DOCUMENT_CACHE_MAX_ITEMS", 256))
+    DOCUMENT_CACHE_S3_BUCKET = os.getenv("DOCUMENT_CACHE_S3_BUCKET")
+    DOCUMENT_CACHE_S3_PREFIX = os.getenv("DOCUMENT_CACHE_S3_PREFIX", "documents/")
+    DOCUMENT_CACHE_S3_ENDPOINT_URL = os.getenv("DOCUMENT_CACHE_S3_ENDPOINT_URL")
+
+    # Compiled Jinja bytecode for document/email templates (empty disables the disk cache)
+    TEMPLATE_BYTECODE_CACHE_DIR = os.getenv(
+        "TEMPLATE_BYTECODE_CACHE_DIR", os.path.join(tempfile.gettempdir(), "phonehome-jinja")
+    )
+
+    # PDF render pool (0 workers renders inline in the request thread)
+    PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", 2))
+    PDF_RENDER_MAX_PENDING = int(os.getenv("PDF_RENDER_MAX_PENDING", 8))
+    PDF_RENDER_QUEUE_TIMEOUT = float(os.getenv("PDF_RENDER_QUEUE_TIMEOUT", 5))
+    PDF_RENDER_TIMEOUT = float(os.getenv("PDF_RENDER_TIMEOUT", 30))
+
+    # Password hashing pool (werkzeug method string; 0 workers hashes inline).
+    # MAX_PENDING defaults to one below the gunicorn threads per worker so a
+    # login burst always leaves a request thread for other traffic
+    PASSWORD_HASH_METHOD = os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_MAX_PENDING = int(
+        os.getenv("PASSWORD_HASH_MAX_PENDING", max(1, int(os.getenv("GUNICORN_THREADS", 2)) - 1))
+    )
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 2))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", 5))
+
+    # Server-sent event streams (see /api/notifications/stream)
+    SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+    SSE_MAX_STREAM_SECONDS = float(os.getenv("SSE_MAX_STREAM_SECONDS", 300))
+    SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", 100))
+
+    # Admin notification broadcasts (users per INSERT ... SELECT chunk). With
+    # ASYNC on, `flask maintenance-worker` delivers them; a running broadcast
+    # without progress for STALE_SECONDS is resumed from its cursor
+    NOTIFICATION_BROADCAST_ASYNC = True
+    NOTIFICATION_BROADCAST_CHUNK_SIZE = int(os.getenv("NOTIFICATION_BROADCAST_CHUNK_SIZE", 5000))
+    NOTIFICATION_BROADCAST_STALE_SECONDS = int(
+        os.getenv("NOTIFICATION_BROADCAST_STALE_SECONDS", 300)
+    )
+
+    # Retention jobs (flask prune-notifications / archive-audit-logs / maintenance-worker)
+    NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", 90))
+    AUDIT_LOG_RETENTION_DAYS = int(os.getenv("AUDIT_LOG_RETENTION_DAYS", 365))
+    RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", 1000))
+    RETENTION_BATCH_PAUSE_SECONDS = float(os.getenv("RETENTION_BATCH_PAUSE_SECONDS", 0.05))
+
     # Celery
     CELERY_BROKER_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
     # Password Reset
     PASSWORD_RESET_TIMEOUT = int(os.getenv("PASSWORD_RESET_TIMEOUT", 3600))  # 1 hour
-    RESET_EMAIL_LIMIT = int(os.getenv("RESET_EMAIL_LIMIT", 3))
+    RESET_EMAIL_LIMIT = int(os.getenv("RESET_EMAIL_LIMIT", 3))  # per email per hour
+
+    # Rate limits ("<count>/<second|minute|hour|day>", token buckets in Redis)
+    RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "10/minute")  # per IP
+    RATE_LIMIT_LOGIN_ACCOUNT = os.getenv("RATE_LIMIT_LOGIN_ACCOUNT", "5/minute")  # per email
+    RATE_LIMIT_FORGOT_PASSWORD = os.getenv("RATE_LIMIT_FORGOT_PASSWORD", "5/minute")  # per IP
+    RATE_LIMIT_CATALOG = os.getenv("RATE_LIMIT_CATALOG", "300/minute")  # per user or IP
+
+    # Reverse proxies in front of the app (nginx = 1) whose X-Forwarded-For/-Proto are
+    # trusted, so per-IP limits see the client address; 0 when serving clients directly
+    TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 1))
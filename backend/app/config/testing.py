@@ -20,6 +20,21 @@ class TestingConfig(BaseConfig):
     }
     SQLALCHEMY_ECHO = False
 
+    # Use the in-process fallbacks instead of a live Redis server
+    REDIS_URL = None
+
+    # Keep rendered documents in memory so tests never touch the filesystem
+    DOCUMENT_CACHE_BACKEND = "memory"
+
+    # Render PDFs inline instead of spawning worker processes
+    PDF_RENDER_WORKERS = 0
+
+    # Deliver broadcasts before the request returns
+    NOTIFICATION_BROADCAST_ASYNC = False
+
+    # No pause between retention batches
+    RETENTION_BATCH_PAUSE_SECONDS = 0
+
     # Deterministic secrets for tests
     SECRET_KEY = "test-secret-key"
     JWT_SECRET_KEY = "test-jwt-secret-key"
@@ -10,11 +10,14 @@ from .cart import Cart, CartItem
 # Catalog models
 from .category import Brand, Category, brand_categories
 
+# Idempotency models
+from .idempotency import IdempotencyKey
+
 # Notification models
-from .notification import AuditLog, Notification
+from .notification import AuditLog, AuditLogArchive, Notification, NotificationBroadcast
 
 # Order models
-from .order import Address, Order, OrderItem
+from .order import Address, Order, OrderItem, StockReservation
 
 # Payment models
 from .payment import Payment
@@ -53,12 +56,16 @@ __all__ = [
     # Orders
     "Order",
     "OrderItem",
+    "StockReservation",
     "Address",
     # Payment
     "Payment",
+    "IdempotencyKey",
     # Reviews
     "Review",
     # Notifications
     "Notification",
+    "NotificationBroadcast",
     "AuditLog",
+    "AuditLogArchive",
 ]
@@ -28,12 +28,18 @@ class CartItem(db.Model):
     """Individual items in a cart"""
 
     __tablename__ = "cart_items"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "cart_id", "product_id", "variation_name", name="uq_cart_items_cart_product_variation"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     cart_id = db.Column(db.Integer, db.ForeignKey("carts.id"), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey("products.id"), nullable=False)
     quantity = db.Column(db.Integer, nullable=False, default=1)
-    variation_name = db.Column(db.String(255), nullable=True)  # e.g., "8GB - 256GB"
+    # e.g. "8GB - 256GB"; "" (not NULL) without a variation so the unique key applies
+    variation_name = db.Column(db.String(255), nullable=False, default="", server_default="")
     variation_price = db.Column(db.Integer, nullable=True)
 
     # Relationships
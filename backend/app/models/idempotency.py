@@ -0,0 +1,32 @@
+"""
+Idempotency key model
+"""
+
+from datetime import datetime
+
+from app.extensions import db
+
+
+class IdempotencyKey(db.Model):
+    """Response stored for a client-supplied Idempotency-Key"""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    key = db.Column(db.String(255), nullable=False)
+    # SHA-256 of method, path and body; a reused key must carry the same request
+    request_hash = db.Column(db.String(64), nullable=False)
+    # processing -> completed
+    status = db.Column(db.String(20), nullable=False, default="processing")
+    response_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.JSON, nullable=True)
+    # What the request created (e.g. an order reference), set once it is committed
+    reference = db.Column(db.String(50), nullable=True)
+    # Indexed for the retention job's age scan
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IdempotencyKey user_id={self.user_id} {self.key} {self.status}>"
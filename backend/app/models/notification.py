@@ -11,17 +11,48 @@ class Notification(db.Model):
     """User notification model"""
 
     __tablename__ = "notifications"
+    __table_args__ = (
+        # Serves per-user listing (newest first) and unread filtering
+        db.Index("ix_notifications_user_read_created", "user_id", "is_read", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     message = db.Column(db.String(255), nullable=False)
     is_read = db.Column(db.Boolean, default=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Indexed for the retention job's age scan
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f"<Notification user_id={self.user_id} read={self.is_read}>"
 
 
+class NotificationBroadcast(db.Model):
+    """Admin broadcast to a segment of users, with delivery progress"""
+
+    __tablename__ = "notification_broadcasts"
+
+    id = db.Column(db.Integer, primary_key=True)
+    admin_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    message = db.Column(db.String(255), nullable=False)
+    segment = db.Column(db.String(50), nullable=False)
+    # queued -> running -> completed | failed
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    total_recipients = db.Column(db.Integer, nullable=False, default=0)
+    sent_count = db.Column(db.Integer, nullable=False, default=0)
+    # Delivery cursor: highest users.id already covered, committed with each chunk
+    last_user_id = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Last progress of the delivering worker; a stale "running" row is resumed
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    completed_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<NotificationBroadcast {self.id} {self.segment} {self.status}>"
+
+
 class AuditLog(db.Model):
     """Admin action audit log"""
 
@@ -30,7 +61,25 @@ class AuditLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     admin_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     action = db.Column(db.String(255), nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
 
     def __repr__(self):
         return f"<AuditLog admin_id={self.admin_id}: {self.action[:30]}>"
+
+
+class AuditLogArchive(db.Model):
+    """Audit log rows moved out of audit_logs, grouped by month"""
+
+    __tablename__ = "audit_logs_archive"
+
+    # Same ID as the original audit_logs row
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    # No foreign key: archived entries outlive the admin account
+    admin_id = db.Column(db.Integer, nullable=False)
+    action = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime)
+    archive_month = db.Column(db.String(7), nullable=False, index=True)  # "YYYY-MM"
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<AuditLogArchive {self.archive_month} admin_id={self.admin_id}>"
@@ -63,6 +63,23 @@ class OrderItem(db.Model):
         return f"<OrderItem order_id={self.order_id} product_id={self.product_id}>"
 
 
+class StockReservation(db.Model):
+    """Stock taken by an order: held until payment, committed, or released back"""
+
+    __tablename__ = "stock_reservations"
+    __table_args__ = (db.Index("ix_stock_reservations_status_expires_at", "status", "expires_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    order_id = db.Column(db.Integer, db.ForeignKey("orders.id"), nullable=False, unique=True)
+    status = db.Column(db.String(20), nullable=False, default="held")  # held/committed/released
+    expires_at = db.Column(db.DateTime, nullable=True)  # Only for held reservations
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<StockReservation order_id={self.order_id} {self.status}>"
+
+
 class Address(db.Model):
     """Shipping/billing address model"""
 
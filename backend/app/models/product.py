@@ -22,7 +22,14 @@ class Product(db.Model):
     brand_id = db.Column(db.Integer, db.ForeignKey("brands.id"), nullable=False)
     hasVariation = db.Column(db.Boolean, default=False)
     isBestSeller = db.Column(db.Boolean, default=False)
+    stock = db.Column(db.Integer, nullable=True)  # None = not stock-tracked
     type = db.Column(db.String(50), nullable=False)  # Discriminator column
+
+    # Numbers parsed from the subclass spec text (app.utils.specs) for range filters
+    ram_gb = db.Column(db.Float, nullable=True, index=True)
+    storage_gb = db.Column(db.Float, nullable=True, index=True)
+    battery_mah = db.Column(db.Float, nullable=True, index=True)
+    display_inches = db.Column(db.Float, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -52,6 +59,7 @@ class ProductVariation(db.Model):
     ram = db.Column(db.String(50), nullable=False)
     storage = db.Column(db.String(50), nullable=False)
     price = db.Column(db.Float, nullable=False)
+    stock = db.Column(db.Integer, nullable=True)  # None = not stock-tracked
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -4,9 +4,8 @@ User and authentication related models
 
 from datetime import datetime
 
-from werkzeug.security import check_password_hash, generate_password_hash
-
 from app.extensions import db
+from app.utils.password_hasher import check_password, hash_password
 
 
 class User(db.Model):
@@ -23,6 +22,8 @@ class User(db.Model):
     role = db.Column(db.String(50), default="user")
     reset_token = db.Column(db.String(256))
     reset_token_expiration = db.Column(db.DateTime)
+    # Denormalized count kept in step by NotificationService
+    unread_notifications = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -50,11 +51,11 @@ class User(db.Model):
 
     def set_password(self, password):
         """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Verify password"""
-        return check_password_hash(self.password_hash, password)
+        return check_password(self.password_hash, password)
 
     def __repr__(self):
         return f"<User {self.username}>"
@@ -67,6 +68,7 @@ class BlacklistToken(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     token = db.Column(db.String(500), nullable=False, unique=True)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def __repr__(self):
@@ -12,6 +12,8 @@ wishlist_products = db.Table(
     db.Column("wishlist_id", db.Integer, db.ForeignKey("wishlists.id"), primary_key=True),
     db.Column("product_id", db.Integer, db.ForeignKey("products.id"), primary_key=True),
     db.Column("created_at", db.DateTime, default=datetime.utcnow),
+    # The primary key leads with wishlist_id; product-wide deletes need their own index
+    db.Index("ix_wishlist_products_product_id", "product_id"),
 )
 
 
@@ -21,7 +23,7 @@ class WishList(db.Model):
     __tablename__ = "wishlists"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Many-to-many relationship with products
@@ -4,26 +4,38 @@ Business logic layer
 """
 
 # Import services for easy access
+from app.services.broadcast_service import BroadcastService
 from app.services.cart_service import CartService
 from app.services.cloudinary_service import CloudinaryService, upload_image, upload_images
+from app.services.compare_service import CompareService
+from app.services.document_service import DocumentService
 
 # Keep existing services
 from app.services.email_service import EmailService
+from app.services.inventory_service import InventoryService
 from app.services.mpesa_service import MpesaService
 from app.services.notification_service import NotificationService, create_notification
 from app.services.order_service import OrderService
 from app.services.product_service import ProductService
+from app.services.retention_service import RetentionService
+from app.services.wishlist_service import WishlistService
 
 __all__ = [
     # New services
     "NotificationService",
     "create_notification",
+    "BroadcastService",
     "CloudinaryService",
     "upload_image",
     "upload_images",
     "ProductService",
     "CartService",
+    "CompareService",
+    "WishlistService",
     "OrderService",
+    "InventoryService",
+    "DocumentService",
+    "RetentionService",
     # Existing services
     "EmailService",
     "MpesaService",
@@ -0,0 +1,291 @@
+"""
+Broadcast Service
+Sends one notification to a whole segment of users
+
+Rows are written with INSERT ... SELECT straight from the users table in
+chunks of users.id, so the database does the fan-out: no per-user ORM
+objects or commits. Each chunk commits with the unread-counter update for
+exactly the users it inserted (INSERT ... RETURNING) and the broadcast's
+progress: sent_count and the last_user_id cursor.
+
+Web requests only queue broadcasts; the maintenance worker delivers them
+(deliver_pending). Because the cursor commits with each chunk, a broadcast
+left "running" by a worker that died is picked up again once its heartbeat
+is older than NOTIFICATION_BROADCAST_STALE_SECONDS and resumes where it
+stopped, without sending anyone a second copy.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import and_, exists, false, func, insert, literal, or_, select, true, update
+
+from app.extensions import db
+from app.models import Notification, NotificationBroadcast, Order, User
+
+logger = logging.getLogger(__name__)
+
+# Orders that have not reached a final state
+PENDING_ORDER_STATUSES = [
+    "Order Placed",
+    "Pending Payment",
+    "Packing",
+    "Shipped",
+    "Out for Delivery",
+]
+
+
+def _segment_filter(segment):
+    """WHERE clause on users selecting a segment's recipients"""
+    if segment == "all":
+        return true()
+    if segment == "customers":
+        return or_(User.role.is_(None), func.lower(User.role) == "user")
+    if segment == "admins":
+        return func.lower(User.role) == "admin"
+    if segment == "pending_orders":
+        return exists().where(Order.user_id == User.id, Order.status.in_(PENDING_ORDER_STATUSES))
+    raise ValueError(f"Unknown segment: {segment}")
+
+
+def _claimable():
+    """WHERE clause on notification_broadcasts selecting broadcasts a worker may take"""
+    stale = datetime.utcnow() - timedelta(
+        seconds=current_app.config.get("NOTIFICATION_BROADCAST_STALE_SECONDS", 300)
+    )
+    return or_(
+        NotificationBroadcast.status == "queued",
+        and_(NotificationBroadcast.status == "running", NotificationBroadcast.heartbeat_at < stale),
+    )
+
+
+class BroadcastService:
+    """Service for admin notification broadcasts"""
+
+    SEGMENTS = ["all", "customers", "admins", "pending_orders"]
+
+    @staticmethod
+    def start_broadcast(admin_id, message, segment):
+        """
+        Record a broadcast for delivery
+
+        The maintenance worker delivers it, unless NOTIFICATION_BROADCAST_ASYNC
+        is off (then it is delivered before returning).
+
+        Args:
+            admin_id: ID of the admin sending the broadcast
+            message: Notification message
+            segment: One of SEGMENTS
+
+        Returns:
+            NotificationBroadcast
+
+        Raises:
+            ValueError: Unknown segment
+        """
+        _segment_filter(segment)
+
+        broadcast = NotificationBroadcast(
+            admin_id=admin_id,
+            message=message,
+            segment=segment,
+            status="queued",
+            total_recipients=BroadcastService.count_recipients(segment),
+            sent_count=0,
+        )
+        db.session.add(broadcast)
+        db.session.commit()
+
+        if not current_app.config.get("NOTIFICATION_BROADCAST_ASYNC", True):
+            BroadcastService.run_broadcast(broadcast.id)
+            db.session.refresh(broadcast)
+
+        return broadcast
+
+    @staticmethod
+    def count_recipients(segment):
+        """
+        Count users in a segment
+
+        Args:
+            segment: One of SEGMENTS
+
+        Returns:
+            int
+        """
+        return db.session.scalar(
+            select(func.count()).select_from(User).where(_segment_filter(segment))
+        )
+
+    @staticmethod
+    def deliver_pending():
+        """
+        Deliver queued broadcasts and resume stale running ones (maintenance worker)
+
+        Returns:
+            int: Number of notifications inserted
+        """
+        broadcast_ids = db.session.scalars(
+            select(NotificationBroadcast.id).where(_claimable()).order_by(NotificationBroadcast.id)
+        ).all()
+        return sum(BroadcastService.run_broadcast(broadcast_id) for broadcast_id in broadcast_ids)
+
+    @staticmethod
+    def run_broadcast(broadcast_id):
+        """
+        Deliver a broadcast chunk by chunk, starting after its cursor
+
+        Only runs if the broadcast is queued, or running with a stale
+        heartbeat; claiming it is one conditional UPDATE, so two workers
+        never deliver the same broadcast.
+
+        Args:
+            broadcast_id: NotificationBroadcast ID
+
+        Returns:
+            int: Number of notifications inserted
+        """
+        now = datetime.utcnow()
+        claimed = db.session.execute(
+            update(NotificationBroadcast)
+            .where(NotificationBroadcast.id == broadcast_id, _claimable())
+            .values(
+                status="running",
+                started_at=func.coalesce(NotificationBroadcast.started_at, now),
+                heartbeat_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        if not claimed:
+            return 0
+
+        broadcast = db.session.execute(
+            select(
+                NotificationBroadcast.segment,
+                NotificationBroadcast.message,
+                NotificationBroadcast.sent_count,
+                NotificationBroadcast.last_user_id,
+            ).where(NotificationBroadcast.id == broadcast_id)
+        ).one()
+
+        chunk_size = current_app.config.get("NOTIFICATION_BROADCAST_CHUNK_SIZE", 5000)
+        segment = _segment_filter(broadcast.segment)
+        sent = broadcast.sent_count
+        last_id = broadcast.last_user_id
+        inserted = 0
+
+        try:
+            while True:
+                upper_id = BroadcastService._chunk_upper_bound(segment, last_id, chunk_size)
+                if upper_id is None:
+                    break
+
+                recipient_ids = BroadcastService._insert_chunk(
+                    broadcast.message, (segment, User.id > last_id, User.id <= upper_id)
+                )
+                if recipient_ids:
+                    db.session.execute(
+                        update(User)
+                        .where(User.id.in_(recipient_ids))
+                        .values(
+                            unread_notifications=User.unread_notifications + 1,
+                            updated_at=User.updated_at,
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+
+                inserted += len(recipient_ids)
+                sent += len(recipient_ids)
+                last_id = upper_id
+                db.session.execute(
+                    update(NotificationBroadcast)
+                    .where(NotificationBroadcast.id == broadcast_id)
+                    .values(sent_count=sent, last_user_id=last_id, heartbeat_at=datetime.utcnow())
+                )
+                db.session.commit()
+
+            db.session.execute(
+                update(NotificationBroadcast)
+                .where(NotificationBroadcast.id == broadcast_id)
+                .values(status="completed", completed_at=datetime.utcnow())
+            )
+            db.session.commit()
+
+            logger.info(f"Broadcast {broadcast_id} delivered to {sent} user(s)")
+            return inserted
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error delivering broadcast {broadcast_id}: {str(e)}")
+
+            db.session.execute(
+                update(NotificationBroadcast)
+                .where(NotificationBroadcast.id == broadcast_id)
+                .values(status="failed", error=str(e)[:255], completed_at=datetime.utcnow())
+            )
+            db.session.commit()
+            return inserted
+
+    @staticmethod
+    def serialize(broadcast):
+        """
+        Broadcast progress as a dictionary
+
+        Args:
+            broadcast: NotificationBroadcast
+
+        Returns:
+            dict
+        """
+        total = broadcast.total_recipients or 0
+        return {
+            "id": broadcast.id,
+            "message": broadcast.message,
+            "segment": broadcast.segment,
+            "status": broadcast.status,
+            "total_recipients": total,
+            "sent_count": broadcast.sent_count,
+            "progress": round(broadcast.sent_count / total * 100, 1) if total else 100.0,
+            "error": broadcast.error,
+            "created_at": broadcast.created_at.isoformat() if broadcast.created_at else None,
+            "started_at": broadcast.started_at.isoformat() if broadcast.started_at else None,
+            "completed_at": (
+                broadcast.completed_at.isoformat() if broadcast.completed_at else None
+            ),
+        }
+
+    @staticmethod
+    def _chunk_upper_bound(segment, last_id, chunk_size):
+        """Highest user ID in the next chunk (primary-key range scan), or None when done"""
+        ids = (
+            select(User.id)
+            .where(segment, User.id > last_id)
+            .order_by(User.id)
+            .limit(chunk_size)
+            .subquery()
+        )
+        return db.session.scalar(select(func.max(ids.c.id)))
+
+    @staticmethod
+    def _insert_chunk(message, conditions):
+        """
+        INSERT ... SELECT one notification per user matching conditions
+
+        Returns:
+            list: IDs of the users notified
+        """
+        now = datetime.utcnow()
+        recipients = select(
+            User.id,
+            literal(message),
+            false(),
+            literal(now),
+        ).where(*conditions)
+
+        return db.session.scalars(
+            insert(Notification)
+            .from_select(["user_id", "message", "is_read", "created_at"], recipients)
+            .returning(Notification.user_id)
+        ).all()
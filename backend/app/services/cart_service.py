@@ -1,16 +1,37 @@
 """
 Cart Service
 Handles shopping cart operations
+
+Carts live in carts/cart_items, or in Redis hashes when
+CART_STORE_BACKEND = "redis" (see app.utils.cart_store). Each operation
+falls back to SQL if Redis fails; those SQL writes bump carts.updated_at
+so the Redis copy is re-hydrated instead of flushed over them once Redis
+is back.
 """
 
 import logging
+import time
 from collections import defaultdict
+from datetime import datetime
+from types import SimpleNamespace
+
+import redis
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select, update
 
 from app.extensions import db
-from app.models import Cart, CartItem, Product
+from app.models import Brand, Cart, CartItem, Product
+from app.utils.cart_cache import get_cart_cache, invalidate_cart
+from app.utils.cart_store import get_cart_store
+from app.utils.price_index import get_price_index
+from app.utils.redis_client import mark_unavailable
+from app.utils.sql import dialect_insert
 
 logger = logging.getLogger(__name__)
 
+# Unique key of a cart line; variation_name is "" for products without variations
+CART_ITEM_KEY = ["cart_id", "product_id", "variation_name"]
+
 
 class CartService:
     """Service for managing shopping carts"""
@@ -36,6 +57,107 @@ class CartService:
 
         return cart
 
+    @staticmethod
+    def get_cart_view(user_id):
+        """
+        Get the cart read model: line items with product summaries and totals
+
+        Served from the per-worker cart cache; on a miss, loaded with one joined
+        query (or from the Redis cart plus one product query).
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            dict: {"items": [...], "item_count": int, "total": float}
+        """
+        return get_cart_cache().get(user_id, lambda: CartService._load_cart_view(user_id))
+
+    @staticmethod
+    def persist_cart(user_id):
+        """
+        Write the user's Redis cart to SQL before checkout reads it
+
+        Waits for an in-flight write-behind flush of the same cart, so the
+        SQL rows are a consistent snapshot. No-op with the SQL cart store.
+
+        Args:
+            user_id: ID of the user
+        """
+        store = get_cart_store()
+        if store is None:
+            return
+
+        try:
+            deadline = time.monotonic() + 5
+            while not store.acquire_flush_lock(user_id):
+                if time.monotonic() > deadline:
+                    raise RuntimeError("Timed out waiting for cart flush")
+                time.sleep(0.05)
+            try:
+                if store.take_dirty(user_id):
+                    CartService._flush_store_cart(store, user_id)
+            except Exception:
+                db.session.rollback()
+                store.mark_dirty(user_id)
+                raise
+            finally:
+                store.release_flush_lock(user_id)
+        except redis.RedisError as e:
+            mark_unavailable(error=e)
+
+    @staticmethod
+    def forget_cart(user_id):
+        """
+        Drop the user's Redis cart after checkout emptied the SQL cart
+
+        Args:
+            user_id: ID of the user
+        """
+        store = get_cart_store()
+        if store is None:
+            return
+
+        try:
+            store.discard(user_id)
+        except redis.RedisError as e:
+            mark_unavailable(error=e)
+
+    @staticmethod
+    def flush_dirty_carts(limit=100):
+        """
+        Write dirty Redis carts to SQL (the write-behind step)
+
+        Args:
+            limit: Maximum carts to flush in this call
+
+        Returns:
+            int: Number of carts written
+        """
+        store = get_cart_store()
+        if store is None:
+            return 0
+
+        flushed = 0
+        for user_id in store.pop_dirty(limit):
+            if not store.acquire_flush_lock(user_id):
+                # Another worker is flushing it; try again next round
+                store.mark_dirty(user_id)
+                continue
+            try:
+                if CartService._flush_store_cart(store, user_id):
+                    flushed += 1
+            except Exception as e:
+                db.session.rollback()
+                store.mark_dirty(user_id)
+                logger.error(f"Error flushing cart for user {user_id}: {str(e)}")
+            finally:
+                store.release_flush_lock(user_id)
+
+        if flushed:
+            logger.info(f"Flushed {flushed} cart(s) to the database")
+        return flushed
+
     @staticmethod
     def get_cart_contents(user_id):
         """
@@ -48,22 +170,11 @@ class CartService:
             Dictionary of cart items grouped by product_id
         """
         try:
-            cart = Cart.query.filter_by(user_id=user_id).first()
-
-            if not cart or not cart.items:
-                return {}
-
-            # Group items by product_id and variation
             grouped_items = defaultdict(dict)
-            for item in cart.items:
-                variation_name = item.variation_name or None
-                grouped_items[item.product_id][variation_name] = {
-                    "quantity": item.quantity,
-                    "price": (
-                        float(item.variation_price)
-                        if item.variation_price
-                        else float(item.product.price)
-                    ),
+            for item in CartService.get_cart_view(user_id)["items"]:
+                grouped_items[item["product_id"]][item["variation_name"]] = {
+                    "quantity": item["quantity"],
+                    "price": item["unit_price"],
                 }
 
             return dict(grouped_items)
@@ -73,53 +184,74 @@ class CartService:
             return {}
 
     @staticmethod
-    def add_to_cart(user_id, product_id, quantity, variation_name=None, variation_price=None):
+    def add_to_cart(user_id, product_id, quantity, variation_name=None):
         """
         Add item to cart
 
+        One INSERT ... SELECT ... ON CONFLICT DO UPDATE adds the line or bumps
+        its quantity, so concurrent adds of the same item never duplicate it.
+        Variation prices come from the price index, not the client.
+
         Args:
             user_id: ID of the user
             product_id: ID of the product
             quantity: Quantity to add
             variation_name: Optional variation (e.g., "8GB - 256GB")
-            variation_price: Price for this variation
 
         Returns:
             tuple: (success: bool, message: str)
         """
         try:
-            # Validate product exists
-            product = Product.query.get(product_id)
-            if not product:
-                return False, "Product not found"
-
             # Validate quantity
             if not isinstance(quantity, int) or quantity <= 0:
                 return False, "Invalid quantity"
 
-            # Get or create cart
-            cart = CartService.get_or_create_cart(user_id)
-
-            # Check if item already exists
-            cart_item = CartItem.query.filter_by(
-                cart_id=cart.id, product_id=product_id, variation_name=variation_name
-            ).first()
-
-            if cart_item:
-                # Update quantity
-                cart_item.quantity += quantity
-            else:
-                # Create new cart item
-                cart_item = CartItem(
-                    cart_id=cart.id,
-                    product_id=product_id,
-                    quantity=quantity,
-                    variation_name=variation_name,
-                    variation_price=variation_price,
+            variation_price = None
+            if variation_name:
+                variation_price = get_price_index().variation_price(product_id, variation_name)
+                if variation_price is None:
+                    if db.session.get(Product, product_id) is None:
+                        return False, "Product not found"
+                    return False, "Variation not found"
+                variation_price = round(variation_price)
+
+            store = get_cart_store()
+            if store is not None:
+                try:
+                    if db.session.get(Product, product_id) is None:
+                        return False, "Product not found"
+                    CartService._load_store(store, user_id)
+                    store.add(
+                        user_id,
+                        [
+                            {
+                                "product_id": product_id,
+                                "variation_name": variation_name,
+                                "quantity": quantity,
+                                "variation_price": variation_price,
+                            }
+                        ],
+                    )
+                    invalidate_cart(user_id)
+                    return True, "Product added to cart successfully"
+                except redis.RedisError as e:
+                    mark_unavailable(error=e)
+
+            added = CartService._upsert_item(
+                user_id, product_id, quantity, variation_name, variation_price
+            )
+            if not added:
+                # Nothing matched: unknown product, or the user has no cart yet
+                if db.session.get(Product, product_id) is None:
+                    return False, "Product not found"
+                CartService._ensure_cart(user_id)
+                CartService._upsert_item(
+                    user_id, product_id, quantity, variation_name, variation_price
                 )
-                db.session.add(cart_item)
 
+            CartService._touch_cart(user_id)
             db.session.commit()
+            invalidate_cart(user_id)
 
             logger.info(f"Added to cart: Product {product_id} x{quantity} for user {user_id}")
             return True, "Product added to cart successfully"
@@ -129,10 +261,98 @@ class CartService:
             logger.error(f"Error adding to cart: {str(e)}")
             return False, str(e)
 
+    @staticmethod
+    def bulk_add_to_cart(user_id, items):
+        """
+        Add many items to the cart in one transaction
+
+        Product IDs are validated with a single IN query and all lines are
+        written with one multi-row upsert; unknown products are skipped.
+
+        Args:
+            user_id: ID of the user
+            items: List of dicts with product_id, quantity, variation_name
+
+        Returns:
+            tuple: (success: bool, result: dict or error message)
+        """
+        try:
+            # Merge repeated (product, variation) pairs from the payload
+            merged = {}
+            for item in items:
+                key = (item["product_id"], item.get("variation_name") or "")
+                if key in merged:
+                    merged[key]["quantity"] += item["quantity"]
+                else:
+                    merged[key] = dict(item)
+
+            requested_ids = {product_id for product_id, _ in merged}
+            known_ids = set(
+                db.session.scalars(select(Product.id).where(Product.id.in_(requested_ids)))
+            )
+            skipped = requested_ids - known_ids
+
+            # Price variations server-side; lines with unknown variations are skipped
+            price_index = get_price_index()
+            rows = []
+            for (product_id, variation_name), item in merged.items():
+                if product_id not in known_ids:
+                    continue
+                variation_price = None
+                if variation_name:
+                    variation_price = price_index.variation_price(product_id, variation_name)
+                    if variation_price is None:
+                        skipped.add(product_id)
+                        continue
+                    variation_price = round(variation_price)
+                rows.append(
+                    {
+                        "product_id": product_id,
+                        "quantity": item["quantity"],
+                        "variation_name": variation_name,
+                        "variation_price": variation_price,
+                    }
+                )
+            skipped = sorted(skipped)
+
+            store = get_cart_store() if rows else None
+            if store is not None:
+                try:
+                    CartService._load_store(store, user_id)
+                    store.add(user_id, rows)
+                    invalidate_cart(user_id)
+                    return True, {"added": len(rows), "skipped": skipped}
+                except redis.RedisError as e:
+                    mark_unavailable(error=e)
+
+            if rows:
+                cart_id = CartService._ensure_cart(user_id)
+                for row in rows:
+                    row["cart_id"] = cart_id
+
+                statement = dialect_insert(CartItem).values(rows)
+                db.session.execute(
+                    statement.on_conflict_do_update(
+                        index_elements=CART_ITEM_KEY,
+                        set_={"quantity": CartItem.quantity + statement.excluded.quantity},
+                    )
+                )
+                CartService._touch_cart(user_id)
+                db.session.commit()
+                invalidate_cart(user_id)
+
+            logger.info(f"Bulk added {len(rows)} cart item(s) for user {user_id}")
+            return True, {"added": len(rows), "skipped": skipped}
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error bulk adding to cart: {str(e)}")
+            return False, str(e)
+
     @staticmethod
     def update_cart_item(user_id, product_id, quantity, variation_name=None):
         """
-        Update quantity of cart item
+        Update quantity of cart item with a single UPDATE
 
         Args:
             user_id: ID of the user
@@ -144,25 +364,34 @@ class CartService:
             tuple: (success: bool, message: str)
         """
         try:
-            cart = Cart.query.filter_by(user_id=user_id).first()
-            if not cart:
-                return False, "Cart not found"
-
             # Validate quantity
             if not isinstance(quantity, int) or quantity <= 0:
                 return False, "Invalid quantity"
 
-            # Find cart item
-            cart_item = CartItem.query.filter_by(
-                cart_id=cart.id, product_id=product_id, variation_name=variation_name
-            ).first()
-
-            if not cart_item:
-                return False, "Cart item not found"
-
-            # Update quantity
-            cart_item.quantity = quantity
+            store = get_cart_store()
+            if store is not None:
+                try:
+                    CartService._load_store(store, user_id)
+                    if not store.set_quantity(user_id, product_id, variation_name, quantity):
+                        return False, "Cart item not found"
+                    invalidate_cart(user_id)
+                    return True, "Cart item updated successfully"
+                except redis.RedisError as e:
+                    mark_unavailable(error=e)
+
+            result = db.session.execute(
+                update(CartItem)
+                .where(*CartService._item_filter(user_id, product_id, variation_name))
+                .values(quantity=quantity)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.session.rollback()
+                return False, CartService._missing_item_message(user_id)
+
+            CartService._touch_cart(user_id)
             db.session.commit()
+            invalidate_cart(user_id)
 
             logger.info(f"Updated cart item: Product {product_id} to quantity {quantity}")
             return True, "Cart item updated successfully"
@@ -175,7 +404,9 @@ class CartService:
     @staticmethod
     def remove_from_cart(user_id, product_id, variation_name=None):
         """
-        Remove item from cart
+        Remove item from cart with a single DELETE
+
+        An emptied cart row is kept; it is reused by the next add.
 
         Args:
             user_id: ID of the user
@@ -186,26 +417,29 @@ class CartService:
             tuple: (success: bool, message: str)
         """
         try:
-            cart = Cart.query.filter_by(user_id=user_id).first()
-            if not cart:
-                return False, "Cart not found"
-
-            # Find and delete cart item
-            cart_item = CartItem.query.filter_by(
-                cart_id=cart.id, product_id=product_id, variation_name=variation_name
-            ).first()
-
-            if not cart_item:
-                return False, "Cart item not found"
-
-            db.session.delete(cart_item)
-
-            # Check if cart is empty and delete cart
-            remaining_items = CartItem.query.filter_by(cart_id=cart.id).count()
-            if remaining_items == 1:  # This one we're about to delete
-                db.session.delete(cart)
-
+            store = get_cart_store()
+            if store is not None:
+                try:
+                    CartService._load_store(store, user_id)
+                    if not store.remove(user_id, product_id, variation_name):
+                        return False, "Cart item not found"
+                    invalidate_cart(user_id)
+                    return True, "Cart item removed successfully"
+                except redis.RedisError as e:
+                    mark_unavailable(error=e)
+
+            result = db.session.execute(
+                delete(CartItem)
+                .where(*CartService._item_filter(user_id, product_id, variation_name))
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount == 0:
+                db.session.rollback()
+                return False, CartService._missing_item_message(user_id)
+
+            CartService._touch_cart(user_id)
             db.session.commit()
+            invalidate_cart(user_id)
 
             logger.info(f"Removed from cart: Product {product_id} for user {user_id}")
             return True, "Cart item removed successfully"
@@ -227,6 +461,16 @@ class CartService:
             tuple: (success: bool, message: str)
         """
         try:
+            store = get_cart_store()
+            if store is not None:
+                try:
+                    CartService._load_store(store, user_id)
+                    store.clear(user_id)
+                    invalidate_cart(user_id)
+                    return True, "Cart cleared successfully"
+                except redis.RedisError as e:
+                    mark_unavailable(error=e)
+
             cart = Cart.query.filter_by(user_id=user_id).first()
             if not cart:
                 return True, "Cart already empty"
@@ -237,6 +481,7 @@ class CartService:
             # Delete cart
             db.session.delete(cart)
             db.session.commit()
+            invalidate_cart(user_id)
 
             logger.info(f"Cleared cart for user {user_id}")
             return True, "Cart cleared successfully"
@@ -258,21 +503,287 @@ class CartService:
             float: Total cart value
         """
         try:
-            cart = Cart.query.filter_by(user_id=user_id).first()
-            if not cart:
-                return 0.0
-
-            total = 0.0
-            for item in cart.items:
-                price = (
-                    float(item.variation_price)
-                    if item.variation_price
-                    else float(item.product.price)
-                )
-                total += price * item.quantity
-
-            return round(total, 2)
+            return CartService.get_cart_view(user_id)["total"]
 
         except Exception as e:
             logger.error(f"Error calculating cart total: {str(e)}")
             return 0.0
+
+    @staticmethod
+    def get_cart_lines(user_id):
+        """
+        Read the user's SQL cart lines with one column-only query
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            list: Rows with product_id, variation_name, quantity, variation_price
+        """
+        return db.session.execute(
+            select(
+                CartItem.product_id,
+                CartItem.variation_name,
+                CartItem.quantity,
+                CartItem.variation_price,
+            )
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .where(Cart.user_id == user_id)
+            .order_by(CartItem.id)
+        ).all()
+
+    @staticmethod
+    def price_lines(lines):
+        """
+        Price cart lines from the price index in one pass (no product loads)
+
+        Args:
+            lines: Rows with product_id, quantity, variation_name, variation_price
+
+        Returns:
+            tuple: (list of dicts with product_id, quantity, variation_name,
+                    unit_price, line_total; total: float)
+
+        Raises:
+            ValueError: A line's product no longer exists
+        """
+        price_index = get_price_index()
+        priced = []
+        total = 0.0
+        for line in lines:
+            unit_price = price_index.unit_price(
+                line.product_id, line.variation_name, fallback=line.variation_price
+            )
+            if unit_price is None:
+                raise ValueError(f"Product {line.product_id} is no longer available")
+            line_total = round(unit_price * line.quantity, 2)
+            total += line_total
+            priced.append(
+                {
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "variation_name": line.variation_name or None,
+                    "unit_price": unit_price,
+                    "line_total": line_total,
+                }
+            )
+        return priced, round(total, 2)
+
+    @staticmethod
+    def _load_cart_view(user_id):
+        """Build the cart view from one cart_items/products/brands join"""
+        store = get_cart_store()
+        if store is not None:
+            try:
+                CartService._load_store(store, user_id)
+                return CartService._view_from_lines(store.lines(user_id))
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        rows = db.session.execute(
+            select(
+                CartItem.product_id,
+                CartItem.quantity,
+                CartItem.variation_name,
+                CartItem.variation_price,
+                Product.name,
+                Product.price,
+                Product.image_urls,
+                Brand.name.label("brand_name"),
+            )
+            .join(Cart, Cart.id == CartItem.cart_id)
+            .join(Product, Product.id == CartItem.product_id)
+            .outerjoin(Brand, Brand.id == Product.brand_id)
+            .where(Cart.user_id == user_id)
+            .order_by(CartItem.id)
+        ).all()
+        return CartService._build_view(rows, {row.product_id: row for row in rows})
+
+    @staticmethod
+    def _view_from_lines(lines):
+        """Build the cart view from Redis cart lines plus one products/brands query"""
+        product_ids = {line["product_id"] for line in lines}
+        products = {}
+        if product_ids:
+            products = {
+                row.product_id: row
+                for row in db.session.execute(
+                    select(
+                        Product.id.label("product_id"),
+                        Product.name,
+                        Product.price,
+                        Product.image_urls,
+                        Brand.name.label("brand_name"),
+                    )
+                    .outerjoin(Brand, Brand.id == Product.brand_id)
+                    .where(Product.id.in_(product_ids))
+                )
+            }
+        return CartService._build_view(
+            [SimpleNamespace(**line) for line in lines if line["product_id"] in products], products
+        )
+
+    @staticmethod
+    def _build_view(lines, products):
+        price_index = get_price_index()
+        items = []
+        total = 0.0
+        for line in lines:
+            product = products[line.product_id]
+            unit_price = price_index.unit_price(
+                line.product_id, line.variation_name, fallback=line.variation_price
+            )
+            if unit_price is None:
+                unit_price = float(product.price)
+            line_total = round(unit_price * line.quantity, 2)
+            total += line_total
+            items.append(
+                {
+                    "product_id": line.product_id,
+                    "name": product.name,
+                    "image_url": product.image_urls[0] if product.image_urls else None,
+                    "brand": product.brand_name,
+                    "variation_name": line.variation_name or None,
+                    "quantity": line.quantity,
+                    "unit_price": unit_price,
+                    "line_total": line_total,
+                }
+            )
+
+        return {
+            "items": items,
+            "item_count": sum(item["quantity"] for item in items),
+            "total": round(total, 2),
+        }
+
+    @staticmethod
+    def _load_store(store, user_id):
+        """Hydrate the user's Redis cart from SQL on first use"""
+
+        def sql_version():
+            return CartService._sql_version(user_id)
+
+        def sql_lines():
+            return [row._asdict() for row in CartService.get_cart_lines(user_id)]
+
+        store.ensure_loaded(user_id, sql_version, sql_lines)
+
+    @staticmethod
+    def _flush_store_cart(store, user_id):
+        """
+        Write the user's Redis cart to SQL (caller holds its flush lock)
+
+        A Redis cart older than SQL, i.e. SQL was written through the fallback
+        while Redis was unreachable, is dropped instead of written.
+
+        Returns:
+            bool: False when the Redis cart was stale and dropped
+        """
+        synced = store.synced_version(user_id)
+        if synced is not None and synced != CartService._sql_version(user_id):
+            store.discard(user_id)
+            invalidate_cart(user_id)
+            logger.info(f"Dropped stale Redis cart for user {user_id}")
+            return False
+
+        CartService._write_lines(user_id, store.lines(user_id))
+        db.session.commit()
+        store.set_synced_version(user_id, CartService._sql_version(user_id))
+        return True
+
+    @staticmethod
+    def _sql_version(user_id):
+        """carts.updated_at of the user's cart as a string, "0" when there is no cart"""
+        updated_at = db.session.scalar(select(Cart.updated_at).where(Cart.user_id == user_id))
+        return updated_at.isoformat() if updated_at is not None else "0"
+
+    @staticmethod
+    def _touch_cart(user_id):
+        """
+        Bump carts.updated_at after a SQL cart write (no commit)
+
+        Only needed with the Redis cart store, whose copy it marks as stale.
+        """
+        if current_app.config.get("CART_STORE_BACKEND", "sql") != "redis":
+            return
+        db.session.execute(
+            update(Cart)
+            .where(Cart.user_id == user_id)
+            .values(updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _write_lines(user_id, lines):
+        """Replace the user's SQL cart lines with the given lines (no commit)"""
+        product_ids = {line["product_id"] for line in lines}
+        known_ids = set()
+        if product_ids:
+            known_ids = set(
+                db.session.scalars(select(Product.id).where(Product.id.in_(product_ids)))
+            )
+
+        cart_id = CartService._ensure_cart(user_id)
+        db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+
+        rows = [dict(line, cart_id=cart_id) for line in lines if line["product_id"] in known_ids]
+        if rows:
+            db.session.execute(insert(CartItem), rows)
+
+    @staticmethod
+    def _cart_id_subquery(user_id):
+        return select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+
+    @staticmethod
+    def _item_filter(user_id, product_id, variation_name):
+        """WHERE clause selecting one line of the user's cart"""
+        return (
+            CartItem.cart_id == CartService._cart_id_subquery(user_id),
+            CartItem.product_id == product_id,
+            CartItem.variation_name == (variation_name or ""),
+        )
+
+    @staticmethod
+    def _missing_item_message(user_id):
+        """Error message for an update/remove that matched no row"""
+        cart_id = db.session.scalar(select(Cart.id).where(Cart.user_id == user_id))
+        return "Cart not found" if cart_id is None else "Cart item not found"
+
+    @staticmethod
+    def _ensure_cart(user_id):
+        """Create the user's cart if missing (race-safe, no commit) and return its ID"""
+        now = datetime.utcnow()
+        db.session.execute(
+            dialect_insert(Cart)
+            .values(user_id=int(user_id), created_at=now, updated_at=now)
+            .on_conflict_do_nothing(index_elements=["user_id"])
+        )
+        return db.session.scalar(select(Cart.id).where(Cart.user_id == user_id))
+
+    @staticmethod
+    def _upsert_item(user_id, product_id, quantity, variation_name, variation_price):
+        """
+        INSERT ... SELECT one line from the user's cart and the product row,
+        adding to the quantity on conflict
+
+        Returns:
+            bool: False when the cart or the product does not exist
+        """
+        source = select(
+            Cart.id,
+            Product.id,
+            literal(quantity),
+            literal(variation_name or ""),
+            literal(variation_price, type_=CartItem.variation_price.type),
+        ).where(Cart.user_id == user_id, Product.id == product_id)
+
+        statement = dialect_insert(CartItem).from_select(
+            ["cart_id", "product_id", "quantity", "variation_name", "variation_price"], source
+        )
+        result = db.session.execute(
+            statement.on_conflict_do_update(
+                index_elements=CART_ITEM_KEY,
+                set_={"quantity": CartItem.quantity + statement.excluded.quantity},
+            )
+        )
+        return result.rowcount > 0
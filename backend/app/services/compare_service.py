@@ -0,0 +1,270 @@
+"""
+Compare Service
+Handles the product comparison list (max COMPARE_MAX_ITEMS, expires after COMPARE_TTL_HOURS)
+
+Lists live in Redis sorted sets (see app.utils.compare_store). When Redis
+is not configured or fails, compares/compare_items are used instead; there
+reads filter out expired rows rather than deleting them, and the next add
+prunes them.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+import redis
+from flask import current_app
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import with_polymorphic
+
+from app.extensions import db
+from app.models import Brand, Category, Compare, CompareItem, Product
+from app.services.product_service import ProductService
+from app.utils.compare_store import ADDED, ALREADY_PRESENT, FULL, get_compare_store
+from app.utils.price_index import get_price_index
+from app.utils.redis_client import mark_unavailable
+from app.utils.specs import SPEC_ROWS, get_spec_cache, parse_specs
+
+logger = logging.getLogger(__name__)
+
+
+class CompareService:
+    """Service for managing compare lists"""
+
+    @staticmethod
+    def get_product_ids(user_id):
+        """
+        Product IDs in the user's compare list, oldest first
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            list: Product IDs
+        """
+        store = get_compare_store()
+        if store is not None:
+            try:
+                return store.product_ids(user_id)
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        return list(
+            db.session.scalars(
+                select(CompareItem.product_id)
+                .join(Compare, Compare.id == CompareItem.compare_id)
+                .where(Compare.user_id == user_id, CompareItem.created_at > _cutoff())
+                .order_by(CompareItem.created_at, CompareItem.id)
+            )
+        )
+
+    @staticmethod
+    def get_products(user_id):
+        """
+        Products in the user's compare list with their spec fields
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            list: Product dictionaries, oldest first
+        """
+        return ProductService.get_products_by_ids(CompareService.get_product_ids(user_id))
+
+    @staticmethod
+    def get_matrix(user_id):
+        """
+        Side-by-side spec matrix of the user's compare list
+
+        Product headers come from one query on products, brands and categories.
+        Parsed specs come from the per-worker spec cache; products edited since
+        they were cached (or never cached) are loaded in one polymorphic query.
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            dict: products (column headers) and rows, each row's values aligned
+            with products; rows no compared product has are left out
+        """
+        product_ids = CompareService.get_product_ids(user_id)
+        if not product_ids:
+            return {"products": [], "rows": []}
+
+        headers = {
+            row.id: row
+            for row in db.session.execute(
+                select(
+                    Product.id,
+                    Product.updated_at,
+                    Product.name,
+                    Product.price,
+                    Product.image_urls,
+                    Product.type,
+                    Product.hasVariation,
+                    Brand.name.label("brand"),
+                    Category.name.label("category"),
+                )
+                .join(Brand, Brand.id == Product.brand_id)
+                .join(Category, Category.id == Product.category_id)
+                .where(Product.id.in_(product_ids))
+            )
+        }
+        product_ids = [product_id for product_id in product_ids if product_id in headers]
+
+        cache = get_spec_cache()
+        specs = {}
+        for product_id in product_ids:
+            cached = cache.get(product_id, headers[product_id].updated_at)
+            if cached is not None:
+                specs[product_id] = cached
+
+        missing = [product_id for product_id in product_ids if product_id not in specs]
+        if missing:
+            entity = with_polymorphic(Product, "*")
+            for product in db.session.scalars(select(entity).where(entity.id.in_(missing))):
+                specs[product.id] = parse_specs(product)
+                cache.put(product.id, product.updated_at, specs[product.id])
+
+        rows = []
+        for field, label, unit, _, higher_is_better in SPEC_ROWS:
+            values = [specs[product_id][field] for product_id in product_ids]
+            if all(value["raw"] is None for value in values):
+                continue
+
+            numbers = [value["value"] for value in values if value["value"] is not None]
+            best = []
+            if higher_is_better and len(numbers) > 1 and len(set(numbers)) > 1:
+                best = [
+                    product_id
+                    for product_id, value in zip(product_ids, values, strict=True)
+                    if value["value"] == max(numbers)
+                ]
+            rows.append(
+                {
+                    "key": field,
+                    "label": label,
+                    "unit": unit,
+                    "values": values,
+                    "differs": len({value["raw"] for value in values}) > 1,
+                    "best": best,
+                }
+            )
+
+        products = [
+            {
+                "id": product_id,
+                "name": headers[product_id].name,
+                "brand": headers[product_id].brand,
+                "category": headers[product_id].category,
+                "type": headers[product_id].type,
+                "price": float(headers[product_id].price),
+                "hasVariation": headers[product_id].hasVariation,
+                "image_url": (headers[product_id].image_urls or [None])[0],
+            }
+            for product_id in product_ids
+        ]
+        return {"products": products, "rows": rows}
+
+    @staticmethod
+    def add_product(user_id, product_id):
+        """
+        Add a product to the user's compare list
+
+        Args:
+            user_id: ID of the user
+            product_id: ID of the product
+
+        Returns:
+            int or None: ADDED, ALREADY_PRESENT or FULL; None for unknown products
+        """
+        if get_price_index().base_price(product_id) is None:
+            return None
+
+        store = get_compare_store()
+        if store is not None:
+            try:
+                return store.add(user_id, product_id)
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        compare_id = db.session.scalar(
+            select(Compare.id).where(Compare.user_id == user_id).limit(1)
+        )
+        if compare_id is None:
+            compare_id = db.session.scalar(
+                insert(Compare).values(user_id=user_id).returning(Compare.id)
+            )
+
+        db.session.execute(
+            delete(CompareItem).where(
+                CompareItem.compare_id == compare_id, CompareItem.created_at <= _cutoff()
+            )
+        )
+        listed = db.session.scalars(
+            select(CompareItem.product_id).where(CompareItem.compare_id == compare_id)
+        ).all()
+        if product_id in listed:
+            result = ALREADY_PRESENT
+        elif len(listed) >= current_app.config.get("COMPARE_MAX_ITEMS", 3):
+            result = FULL
+        else:
+            db.session.execute(
+                insert(CompareItem).values(
+                    compare_id=compare_id, product_id=product_id, created_at=datetime.utcnow()
+                )
+            )
+            result = ADDED
+        db.session.commit()
+        return result
+
+    @staticmethod
+    def remove_product(user_id, product_id):
+        """
+        Remove a product from the user's compare list
+
+        Returns:
+            bool: False when the product was not in the list
+        """
+        store = get_compare_store()
+        if store is not None:
+            try:
+                return store.remove(user_id, product_id)
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        result = db.session.execute(
+            delete(CompareItem).where(
+                CompareItem.compare_id.in_(select(Compare.id).where(Compare.user_id == user_id)),
+                CompareItem.product_id == product_id,
+            )
+        )
+        db.session.commit()
+        return result.rowcount > 0
+
+    @staticmethod
+    def clear(user_id):
+        """
+        Empty the user's compare list
+
+        Returns:
+            bool: False when there was no list to clear
+        """
+        store = get_compare_store()
+        if store is not None:
+            try:
+                return store.clear(user_id)
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        db.session.execute(
+            delete(CompareItem).where(
+                CompareItem.compare_id.in_(select(Compare.id).where(Compare.user_id == user_id))
+            )
+        )
+        result = db.session.execute(delete(Compare).where(Compare.user_id == user_id))
+        db.session.commit()
+        return result.rowcount > 0
+
+
+def _cutoff():
+    return datetime.utcnow() - timedelta(hours=current_app.config.get("COMPARE_TTL_HOURS", 24))
@@ -0,0 +1,267 @@
+"""
+Document Service
+Renders invoice and receipt PDFs and caches them per order version
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import inspect
+
+from app.utils.document_store import get_document_store
+from app.utils.pdf_renderer import PdfRenderUnavailable, render_pdf
+
+logger = logging.getLogger(__name__)
+
+# Bump when a template changes so previously cached PDFs are not served
+TEMPLATE_VERSION = 1
+
+
+class DocumentService:
+    """Service for rendering and caching order documents"""
+
+    DOC_TYPES = ("invoice", "receipt")
+
+    @staticmethod
+    def cache_key(order, doc_type):
+        """
+        Build the cache key for an order document
+
+        The version covers the order and payment updated_at timestamps,
+        since both templates read payment details.
+
+        Args:
+            order: Order object
+            doc_type: 'invoice' or 'receipt'
+
+        Returns:
+            str: "<order_reference>/<doc_type>/<version>"
+        """
+        payment = getattr(order, "payment", None)
+        parts = [
+            str(TEMPLATE_VERSION),
+            order.updated_at.isoformat() if order.updated_at else "",
+            payment.updated_at.isoformat() if payment and payment.updated_at else "",
+        ]
+        version = hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+        return f"{order.order_reference}/{doc_type}/{version}"
+
+    @staticmethod
+    def get_pdf(order, doc_type):
+        """
+        Get PDF bytes for an order document, rendering on a cache miss
+
+        Args:
+            order: Order object
+            doc_type: 'invoice' or 'receipt'
+
+        Returns:
+            bytes: PDF content or None if rendering failed
+        """
+        content, _path = DocumentService._get_cached(order, doc_type)
+        return content
+
+    @staticmethod
+    def get_pdf_source(order, doc_type):
+        """
+        Get the best source for sending a document in a response
+
+        Args:
+            order: Order object
+            doc_type: 'invoice' or 'receipt'
+
+        Returns:
+            tuple: (file_path: str or None, content: bytes or None)
+                   file_path is set when the store keeps the PDF on local disk
+
+        Raises:
+            PdfRenderUnavailable: Render pool saturated or render timed out
+        """
+        content, path = DocumentService._get_cached(order, doc_type, want_path=True)
+        if path:
+            return path, None
+        return None, content
+
+    @staticmethod
+    def get_pdfs(orders, doc_type, concurrency=1):
+        """
+        Get PDFs for a batch of orders, rendering cache misses in parallel
+
+        Renders that fail or find the render pool saturated come back as None,
+        so one bad order does not abort a bulk export.
+
+        Args:
+            orders: List of Order objects
+            doc_type: 'invoice' or 'receipt'
+            concurrency: Maximum renders submitted at once
+
+        Returns:
+            list: (order, content: bytes or None) pairs in input order
+        """
+        store = get_document_store()
+        contents = {}
+        misses = []
+
+        for order in orders:
+            key = DocumentService.cache_key(order, doc_type)
+            content = _read_cached(store, key)
+            if content:
+                contents[order.id] = content
+            else:
+                misses.append((order, key, DocumentService.snapshot(order)))
+
+        if misses:
+            app = current_app._get_current_object()
+
+            def render(snapshot):
+                with app.app_context():
+                    try:
+                        return render_pdf(doc_type, snapshot)
+                    except PdfRenderUnavailable as e:
+                        logger.warning(f"Skipping {snapshot['order_reference']}: {str(e)}")
+                        return None
+
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+                rendered = executor.map(render, [snapshot for _, _, snapshot in misses])
+                for (order, key, _snapshot), content in zip(misses, rendered, strict=True):
+                    if not content:
+                        continue
+                    contents[order.id] = content
+                    try:
+                        store.put(key, content)
+                    except Exception as e:
+                        logger.warning(f"Document cache write failed for {key}: {str(e)}")
+
+        return [(order, contents.get(order.id)) for order in orders]
+
+    @staticmethod
+    def render(order, doc_type):
+        """
+        Render an order document to PDF without using the cache
+
+        Rendering runs in the PDF render pool, so only a plain-data snapshot
+        of the order leaves this process.
+
+        Args:
+            order: Order object
+            doc_type: 'invoice', 'receipt' or 'payment_slip'
+
+        Returns:
+            bytes: PDF content or None if failed
+
+        Raises:
+            PdfRenderUnavailable: Render pool saturated or render timed out
+        """
+        return render_pdf(doc_type, DocumentService.snapshot(order))
+
+    @staticmethod
+    def snapshot(order):
+        """
+        Copy the order fields the document templates read into plain data
+
+        Args:
+            order: Order object
+
+        Returns:
+            dict: Picklable order snapshot
+        """
+        payment = getattr(order, "payment", None)
+        address = getattr(order, "address", None)
+
+        return {
+            "order_reference": order.order_reference,
+            "status": getattr(order, "status", None),
+            "created_at": order.created_at,
+            "total_amount": order.total_amount,
+            "rendered_at": datetime.now(),
+            "payment": (
+                {
+                    "payment_method": payment.payment_method,
+                    "status": payment.status,
+                    "amount": payment.amount,
+                    "transaction_id": payment.transaction_id,
+                    "mpesa_receipt": payment.mpesa_receipt,
+                    "created_at": payment.created_at,
+                }
+                if payment
+                else None
+            ),
+            "address": (
+                {
+                    "first_name": address.first_name,
+                    "last_name": address.last_name,
+                    "email": address.email,
+                    "phone": address.phone,
+                    "street": address.street,
+                    "city": address.city,
+                    "additional_info": getattr(address, "additional_info", None),
+                }
+                if address
+                else None
+            ),
+            "order_items": [
+                {
+                    "product": {"name": item.product.name, "price": item.product.price},
+                    "variation_name": item.variation_name,
+                    "variation_price": item.variation_price,
+                    "quantity": item.quantity,
+                }
+                for item in order.order_items
+            ],
+        }
+
+    @staticmethod
+    def _get_cached(order, doc_type, want_path=False):
+        # Uncommitted changes would be cached under the previous version
+        if _has_pending_changes(order):
+            return DocumentService.render(order, doc_type), None
+
+        key = DocumentService.cache_key(order, doc_type)
+        store = get_document_store()
+
+        if want_path:
+            try:
+                path = store.path(key)
+                if path:
+                    return None, path
+            except Exception as e:
+                logger.warning(f"Document cache read failed for {key}: {str(e)}")
+
+        content = _read_cached(store, key)
+        if content:
+            return content, None
+
+        content = DocumentService.render(order, doc_type)
+        if not content:
+            return None, None
+
+        try:
+            store.put(key, content)
+            if want_path:
+                path = store.path(key)
+                if path:
+                    return None, path
+        except Exception as e:
+            logger.warning(f"Document cache write failed for {key}: {str(e)}")
+
+        return content, None
+
+
+def _read_cached(store, key):
+    try:
+        return store.get(key)
+    except Exception as e:
+        logger.warning(f"Document cache read failed for {key}: {str(e)}")
+        return None
+
+
+def _has_pending_changes(order):
+    state = inspect(order, raiseerr=False)
+    if state is None or state.session is None:
+        return False
+    session = state.session
+    payment = getattr(order, "payment", None)
+    return session.is_modified(order) or (payment is not None and session.is_modified(payment))
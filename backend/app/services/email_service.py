@@ -6,13 +6,15 @@ Handles sending various types of emails (order confirmations, password resets, e
 import base64
 import logging
 from datetime import UTC, datetime, timedelta
-from io import BytesIO
 
-from flask import current_app, render_template_string
+from flask import current_app
 from itsdangerous import URLSafeTimedSerializer
 from sib_api_v3_sdk import ApiClient, Configuration, TransactionalEmailsApi
 from sib_api_v3_sdk.models import SendSmtpEmail, SendSmtpEmailAttachment, SendSmtpEmailTo
-from xhtml2pdf import pisa
+
+from app.services.document_service import DocumentService
+from app.utils import template_registry
+from app.utils.pdf_renderer import render_pdf
 
 logger = logging.getLogger(__name__)
 
@@ -20,73 +22,8 @@ logger = logging.getLogger(__name__)
 class EmailService:
     """Service for sending emails via Brevo (Sendinblue)"""
 
-    # Base email template
-    BASE_TEMPLATE = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {
-                font-family: Arial, sans-serif;
-                background-color: #2a2a2a;
-                color: #ffffff;
-                padding: 20px;
-            }
-            .container {
-                max-width: 600px;
-                margin: 0 auto;
-                background-color: #333333;
-                padding: 30px;
-                border-radius: 5px;
-            }
-            .header {
-                color: #d4af37;
-                text-align: center;
-                border-bottom: 1px solid #d4af37;
-                padding-bottom: 10px;
-            }
-            .content {
-                margin: 20px 0;
-                line-height: 1.6;
-                color: #fff
-            }
-            .button {
-                background-color: #d4af37;
-                color: #2a2a2a !important;
-                padding: 10px 20px;
-                text-decoration: none;
-                border-radius: 5px;
-                font-weight: bold;
-                display: inline-block;
-            }
-            .footer {
-                text-align: center;
-                margin-top: 20px;
-                font-size: 12px;
-                color: #aaaaaa;
-            }
-            .order-item {
-                margin-bottom: 10px;
-                padding-bottom: 10px;
-                border-bottom: 1px solid #444;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>{{ subject }}</h1>
-            </div>
-            <div class="content">
-                {{ content|safe }}
-            </div>
-            <div class="footer">
-                © {{ current_year }} Phone Home Kenya. All rights reserved.
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    # Base email template (see app/templates/emails)
+    BASE_TEMPLATE = "emails/base.html"
 
     def __init__(self, config=None):
         """
@@ -193,49 +130,75 @@ class EmailService:
             logger.error(f"Failed to send email to {to_email}: {str(e)}")
             return {"success": False, "error": f"Failed to send email: {str(e)}"}
 
-    def _generate_pdf(self, content, filename):
+    def _generate_pdf(self, doc_type, order, filename):
         """
-        Generate PDF from HTML content
+        Render a PDF in the render pool and wrap it as an attachment
 
         Args:
-            content: HTML content
+            doc_type: Document type known to the PDF renderer
+            order: Order object
             filename: Base filename for PDF
 
         Returns:
             SendSmtpEmailAttachment or None
         """
         try:
-            # Create PDF in memory
-            pdf_buffer = BytesIO()
-            pisa_status = pisa.CreatePDF(content, dest=pdf_buffer)
+            pdf_content = render_pdf(doc_type, DocumentService.snapshot(order))
 
-            if pisa_status.err:
+            if not pdf_content:
                 logger.error("Failed to generate PDF")
                 return None
 
-            # Get PDF content and encode
-            pdf_buffer.seek(0)
-            pdf_content = pdf_buffer.getvalue()
-            pdf_base64 = base64.b64encode(pdf_content).decode("utf-8")
+            return self._build_attachment(pdf_content, filename)
 
-            # Create attachment object
-            attachment = SendSmtpEmailAttachment(
-                name=f"{filename}.pdf",
-                content=pdf_base64,
-            )
+        except Exception as e:
+            logger.error(f"Error generating PDF {filename}: {str(e)}")
+            return None
+
+    def _document_attachment(self, order, doc_type):
+        """
+        Attach the cached invoice/receipt PDF served by the orders API
+
+        Args:
+            order: Order object
+            doc_type: 'invoice' or 'receipt'
+
+        Returns:
+            SendSmtpEmailAttachment or None
+        """
+        try:
+            pdf_content = DocumentService.get_pdf(order, doc_type)
+            if not pdf_content:
+                logger.error(f"Failed to get {doc_type} PDF for {order.order_reference}")
+                return None
 
-            return attachment
+            return self._build_attachment(pdf_content, f"{doc_type}_{order.order_reference}")
 
         except Exception as e:
-            logger.error(f"Error generating PDF {filename}: {str(e)}")
+            logger.error(f"Error attaching {doc_type} for {order.order_reference}: {str(e)}")
             return None
 
+    @staticmethod
+    def _build_attachment(pdf_content, filename):
+        """
+        Build a Brevo attachment from PDF bytes
+
+        Args:
+            pdf_content: PDF bytes
+            filename: Base filename for PDF
+
+        Returns:
+            SendSmtpEmailAttachment
+        """
+        pdf_base64 = base64.b64encode(pdf_content).decode("utf-8")
+        return SendSmtpEmailAttachment(name=f"{filename}.pdf", content=pdf_base64)
+
     def _render_template(self, template, **context):
         """
         Render email template
 
         Args:
-            template: Template string
+            template: Registered template name (e.g. "emails/base.html")
             **context: Template context variables
 
         Returns:
@@ -246,7 +209,7 @@ class EmailService:
             if "current_year" not in context:
                 context["current_year"] = datetime.now(UTC).year
 
-            return render_template_string(source=template, **context)
+            return template_registry.render(template, **context)
         except Exception as e:
             logger.error(f"Template rendering failed: {str(e)}")
             raise
@@ -362,54 +325,8 @@ class EmailService:
                 template=self.BASE_TEMPLATE, subject=subject, content=content
             )
 
-            # Generate PDF invoice
-            invoice_content = self._render_template(
-                """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial; }
-                    .header { text-align: center; }
-                    .details { margin: 20px 0; }
-                    .item { margin: 10px 0; }
-                    .total { font-weight: bold; font-size: 18px; }
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>Invoice for Order #{{ order.order_reference }}</h1>
-                    <p>Date: {{ order.created_at.strftime('%B %d, %Y') }}</p>
-                </div>
-
-                <div class="details">
-                    <h2>Customer Details:</h2>
-                    <p>Name: {{ order.address.first_name }} {{ order.address.last_name }}</p>
-                    <p>Email: {{ order.address.email }}</p>
-                    <p>Phone: {{ order.address.phone }}</p>
-                    <p>Address: {{ order.address.street }}, {{ order.address.city }}</p>
-                </div>
-
-                <div class="items">
-                    <h2>Order Items:</h2>
-                    {% for item in order.order_items %}
-                    <div class="item">
-                        <p><strong>{{ item.product.name }}</strong> x {{ item.quantity }}</p>
-                        <p>Price: Kshs {{ "%.2f"|format(item.variation_price or item.product.price) }}</p>
-                    </div>
-                    {% endfor %}
-                </div>
-
-                <div class="total">
-                    <p>Total Amount: Kshs {{ "%.2f"|format(order.total_amount) }}</p>
-                </div>
-            </body>
-            </html>
-            """,
-                order=order,
-            )
-
-            pdf_attachment = self._generate_pdf(invoice_content, f"invoice_{order.order_reference}")
+            # Attach the same cached invoice the orders API serves
+            pdf_attachment = self._document_attachment(order, "invoice")
 
             attachments = [pdf_attachment] if pdf_attachment else None
 
@@ -474,50 +391,12 @@ class EmailService:
                 template=self.BASE_TEMPLATE, subject=subject, content=content
             )
 
-            # Generate receipt PDF
-            receipt_content = self._render_template(
-                """
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body { font-family: Arial; }
-                    .header { text-align: center; }
-                    .details { margin: 20px 0; }
-                    .total { font-weight: bold; font-size: 18px; }
-                </style>
-            </head>
-            <body>
-                <div class="header">
-                    <h1>Payment Receipt - Order #{{ order.order_reference }}</h1>
-                    <p>Date: {{ payment.created_at.strftime('%B %d, %Y %H:%M') }}</p>
-                </div>
-
-                <div class="details">
-                    <h2>Payment Details:</h2>
-                    <p>Status: {{ payment.status }}</p>
-                    <p>Method: {{ payment.payment_method }}</p>
-                    <p>Amount: Kshs {{ payment.amount }}</p>
-                    <p>Transaction ID: {{ payment.transaction_id or 'N/A' }}</p>
-                    {% if payment.mpesa_receipt %}
-                    <p>M-Pesa Receipt: {{ payment.mpesa_receipt }}</p>
-                    {% endif %}
-                </div>
-
-                <div class="details">
-                    <h2>Customer Details:</h2>
-                    <p>Name: {{ order.address.first_name }} {{ order.address.last_name }}</p>
-                    <p>Email: {{ order.address.email }}</p>
-                    <p>Phone: {{ order.address.phone }}</p>
-                </div>
-            </body>
-            </html>
-            """,
-                order=order,
-                payment=payment,
-            )
-
-            pdf_attachment = self._generate_pdf(receipt_content, f"receipt_{order.order_reference}")
+            # Successful payments get the cached receipt the orders API serves;
+            # other outcomes get a one-off payment slip
+            if payment.status == "Success":
+                pdf_attachment = self._document_attachment(order, "receipt")
+            else:
+                pdf_attachment = self._payment_slip_attachment(order)
 
             attachments = [pdf_attachment] if pdf_attachment else None
 
@@ -538,6 +417,18 @@ class EmailService:
             logger.error(f"Error sending payment notification: {str(e)}")
             return {"success": False, "error": f"Failed to send payment notification: {str(e)}"}
 
+    def _payment_slip_attachment(self, order):
+        """
+        Render a payment slip PDF for a payment that did not succeed
+
+        Args:
+            order: Order object (its payment is the one being reported)
+
+        Returns:
+            SendSmtpEmailAttachment or None
+        """
+        return self._generate_pdf("payment_slip", order, f"receipt_{order.order_reference}")
+
     def send_shipment_update(self, order, old_status, new_status):
         """
         Send shipment status update email
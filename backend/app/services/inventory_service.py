@@ -0,0 +1,290 @@
+"""
+Inventory Service
+Stock reservation at checkout and stock holds for pending M-Pesa payments
+
+Stock lives on products.stock (lines without a variation) and
+product_variations.stock; NULL means the item is not stock-tracked.
+Reserving locks the affected rows in a fixed order (products, then
+variations, each by id) and decrements them with conditional
+UPDATE ... WHERE stock >= quantity. Concurrent buyers of the last units
+queue on the row locks instead of deadlocking, and whoever loses the race
+gets "Insufficient stock" rather than an oversold order.
+
+Every order gets a StockReservation. COD orders commit theirs at once;
+M-Pesa orders hold stock for STOCK_HOLD_SECONDS. A failed, expired or
+canceled payment releases the stock; a payment that succeeds after its
+hold was released takes the stock again if it is still there.
+
+Methods other than release_expired_reservations() work inside the
+caller's transaction and do not commit.
+"""
+
+import logging
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import Integer, String, func, insert, literal, select, union_all, update
+
+from app.extensions import db
+from app.models import Order, OrderItem, Product, ProductVariation, StockReservation
+
+logger = logging.getLogger(__name__)
+
+PRODUCTS = Product.__table__
+VARIATIONS = ProductVariation.__table__
+
+
+class InventoryService:
+    """Service for stock reservations"""
+
+    @staticmethod
+    def reserve_lines(lines):
+        """
+        Take stock for the lines an order is about to be written from
+
+        Args:
+            lines: Dicts with product_id, variation_name (None for none) and quantity,
+                   e.g. from CartService.price_lines
+
+        Returns:
+            str or None: Error message when an item does not have enough stock
+        """
+        # Literal rows rather than VALUES: SQLite cannot name VALUES columns
+        rows = [
+            select(
+                literal(line["product_id"], Integer).label("product_id"),
+                literal(line["variation_name"] or "", String).label("variation_name"),
+                literal(line["quantity"], Integer).label("quantity"),
+            )
+            for line in lines
+        ]
+        return InventoryService._adjust(union_all(*rows), -1)
+
+    @staticmethod
+    def create_reservation(order_id, hold=False):
+        """
+        Record the stock taken for a new order
+
+        Args:
+            order_id: ID of the order
+            hold: Hold the stock until payment (M-Pesa) instead of committing it (COD)
+        """
+        expires_at = None
+        if hold:
+            hold_seconds = current_app.config.get("STOCK_HOLD_SECONDS", 900)
+            expires_at = datetime.utcnow() + timedelta(seconds=hold_seconds)
+        db.session.execute(
+            insert(StockReservation).values(
+                order_id=order_id,
+                status="held" if hold else "committed",
+                expires_at=expires_at,
+            )
+        )
+
+    @staticmethod
+    def commit_reservation(order_id):
+        """
+        Keep an order's stock for good once it is paid
+
+        Returns:
+            bool: False when the hold had lapsed and the stock has since sold out
+        """
+        if InventoryService._set_status(order_id, ["held"], "committed"):
+            return True
+
+        if InventoryService._set_status(order_id, ["released"], "committed"):
+            error = InventoryService._adjust(InventoryService._order_lines(order_id), -1)
+            if error:
+                # Paid regardless; leave the stock alone for the admins to sort out
+                InventoryService._set_status(order_id, ["committed"], "released")
+                logger.warning(f"Order {order_id} paid after its stock hold lapsed: {error}")
+                return False
+        return True
+
+    @staticmethod
+    def hold_again(order_id):
+        """
+        Renew an order's hold before retrying its payment
+
+        Returns:
+            str or None: Error message when released stock is no longer available
+        """
+        hold_seconds = current_app.config.get("STOCK_HOLD_SECONDS", 900)
+        expires_at = datetime.utcnow() + timedelta(seconds=hold_seconds)
+
+        if InventoryService._set_status(order_id, ["released"], "held", expires_at=expires_at):
+            error = InventoryService._adjust(InventoryService._order_lines(order_id), -1)
+            if error:
+                InventoryService._set_status(order_id, ["held"], "released")
+                return error
+            return None
+
+        InventoryService._set_status(order_id, ["held"], "held", expires_at=expires_at)
+        return None
+
+    @staticmethod
+    def release_reservation(order_id):
+        """
+        Give an order's stock back (payment failed or order canceled)
+
+        Returns:
+            bool: True if stock was released (False if it already was)
+        """
+        if not InventoryService._set_status(order_id, ["held", "committed"], "released"):
+            return False
+        InventoryService._adjust(InventoryService._order_lines(order_id), 1)
+        return True
+
+    @staticmethod
+    def release_expired_reservations(limit=100):
+        """
+        Release holds whose payment window has passed and fail their payment
+
+        Commits after each order.
+
+        Args:
+            limit: Maximum number of holds to release
+
+        Returns:
+            int: Number of holds released
+        """
+        from app.services.order_service import OrderService
+
+        order_ids = db.session.scalars(
+            select(StockReservation.order_id)
+            .where(
+                StockReservation.status == "held",
+                StockReservation.expires_at < datetime.utcnow(),
+            )
+            .order_by(StockReservation.expires_at)
+            .limit(limit)
+        ).all()
+
+        released = 0
+        for order_id in order_ids:
+            if not InventoryService.release_reservation(order_id):
+                db.session.rollback()
+                continue
+
+            order = db.session.get(Order, order_id)
+            if order.status == "Pending Payment":
+                order.status = "Payment Failed"
+                if order.payment and order.payment.status == "Pending":
+                    order.payment.status = "Failed"
+                    order.payment.failure_reason = "Payment window expired"
+            db.session.commit()
+            released += 1
+
+            if order.payment:
+                OrderService.publish_payment_status(order.order_reference, order.payment)
+            logger.info(f"Released expired stock hold for order {order.order_reference}")
+
+        return released
+
+    @staticmethod
+    def _order_lines(order_id):
+        return select(
+            OrderItem.product_id,
+            func.coalesce(OrderItem.variation_name, "").label("variation_name"),
+            OrderItem.quantity,
+        ).where(OrderItem.order_id == order_id)
+
+    @staticmethod
+    def _set_status(order_id, from_statuses, status, **values):
+        result = db.session.execute(
+            update(StockReservation)
+            .where(
+                StockReservation.order_id == order_id,
+                StockReservation.status.in_(from_statuses),
+            )
+            .values(status=status, updated_at=datetime.utcnow(), **values)
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def _adjust(lines, direction):
+        """
+        Add (direction 1) or take (direction -1) the quantities of lines
+
+        Args:
+            lines: Select of (product_id, variation_name, quantity); "" is no variation
+            direction: 1 to give stock back, -1 to take it
+
+        Returns:
+            str or None: Error message when taking more than is in stock
+        """
+        lines = lines.subquery()
+        variation_name = VARIATIONS.c.ram + " - " + VARIATIONS.c.storage
+
+        targets = [
+            (
+                PRODUCTS,
+                select(func.sum(lines.c.quantity))
+                .where(lines.c.product_id == PRODUCTS.c.id, lines.c.variation_name == "")
+                .scalar_subquery(),
+                PRODUCTS.c.id.in_(select(lines.c.product_id).where(lines.c.variation_name == "")),
+                [PRODUCTS.c.name],
+            ),
+            (
+                VARIATIONS,
+                select(func.sum(lines.c.quantity))
+                .where(
+                    lines.c.product_id == VARIATIONS.c.product_id,
+                    lines.c.variation_name == variation_name,
+                )
+                .scalar_subquery(),
+                VARIATIONS.c.product_id.in_(
+                    select(lines.c.product_id).where(lines.c.variation_name != "")
+                ),
+                [
+                    select(PRODUCTS.c.name)
+                    .where(PRODUCTS.c.id == VARIATIONS.c.product_id)
+                    .scalar_subquery(),
+                    variation_name,
+                ],
+            ),
+        ]
+
+        # Lock rows in a fixed order (products, then variations, each by id) and
+        # check every line before changing anything
+        locked = []
+        for table, needed, in_lines, labels in targets:
+            rows = db.session.execute(
+                select(table.c.id, table.c.stock, needed, *labels)
+                .where(in_lines, table.c.stock.is_not(None), needed.is_not(None))
+                .order_by(table.c.id)
+                .with_for_update()
+            ).all()
+            if direction < 0:
+                short = next((row for row in rows if row[1] < row[2]), None)
+                if short is not None:
+                    return f"Insufficient stock for {_describe(short[3:])}"
+            if rows:
+                locked.append((table, needed, rows))
+
+        for table, needed, rows in locked:
+            ids = [row[0] for row in rows]
+            statement = update(table).where(table.c.id.in_(ids))
+            if direction < 0:
+                statement = statement.where(table.c.stock >= needed)
+            updated = db.session.scalars(
+                statement.values(stock=table.c.stock + direction * needed).returning(table.c.id)
+            ).all()
+
+            # Without row locks (SQLite) another checkout can commit between the check
+            # and the first write; undo this statement's rows and report the shortage
+            if len(updated) != len(ids):
+                db.session.execute(
+                    update(table)
+                    .where(table.c.id.in_(updated))
+                    .values(stock=table.c.stock - direction * needed)
+                )
+                missed = next(row for row in rows if row[0] not in set(updated))
+                return f"Insufficient stock for {_describe(missed[3:])}"
+
+        return None
+
+
+def _describe(labels):
+    name, *variation = labels
+    return f"{name} ({variation[0]})" if variation else name
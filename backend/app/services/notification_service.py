@@ -3,17 +3,48 @@ Notification Service
 Handles creating and managing user notifications
 """
 
+import base64
+import binascii
 import logging
+from datetime import datetime
+
+from sqlalchemy import and_, case, or_
 
 from app.extensions import db
-from app.models import Notification
+from app.models import Notification, User
+from app.utils.pubsub import publish
 
 logger = logging.getLogger(__name__)
 
+# New notifications are announced here for the SSE stream
+NOTIFICATION_CHANNEL = "notifications:new"
+
 
 class NotificationService:
     """Service for managing user notifications"""
 
+    DEFAULT_PAGE_SIZE = 20
+    MAX_PAGE_SIZE = 100
+
+    @staticmethod
+    def add_notification(user_id, message):
+        """
+        Add a notification to the current transaction without committing
+
+        Keeps the user's unread counter in step; the caller commits.
+
+        Args:
+            user_id: ID of the user
+            message: Notification message
+
+        Returns:
+            Notification object
+        """
+        notification = Notification(user_id=user_id, message=message, is_read=False)
+        db.session.add(notification)
+        NotificationService._adjust_unread_count(user_id, 1)
+        return notification
+
     @staticmethod
     def create_notification(user_id, message):
         """
@@ -27,9 +58,9 @@ class NotificationService:
             Notification object or None if failed
         """
         try:
-            notification = Notification(user_id=user_id, message=message, is_read=False)
-            db.session.add(notification)
+            notification = NotificationService.add_notification(user_id, message)
             db.session.commit()
+            NotificationService.publish_notification(notification)
 
             logger.info(f"Notification created for user {user_id}: {message[:50]}")
             return notification
@@ -39,6 +70,45 @@ class NotificationService:
             logger.error(f"Error creating notification: {str(e)}")
             return None
 
+    @staticmethod
+    def publish_notification(notification):
+        """
+        Push a committed notification to the user's open streams
+
+        Args:
+            notification: Notification object (already committed)
+        """
+        publish(
+            NOTIFICATION_CHANNEL,
+            {
+                "user_id": notification.user_id,
+                "notification": NotificationService._serialize(notification),
+            },
+        )
+
+    @staticmethod
+    def get_notifications_since(user_id, last_id, limit=100):
+        """
+        Get notifications created after a given one, oldest first
+
+        Used to replay what a reconnecting stream missed.
+
+        Args:
+            user_id: ID of the user
+            last_id: ID of the last notification the client received
+            limit: Maximum number of notifications
+
+        Returns:
+            List of notification dictionaries
+        """
+        notifications = (
+            Notification.query.filter(Notification.user_id == user_id, Notification.id > last_id)
+            .order_by(Notification.id.asc())
+            .limit(limit)
+            .all()
+        )
+        return [NotificationService._serialize(n) for n in notifications]
+
     @staticmethod
     def get_user_notifications(user_id, unread_only=False):
         """
@@ -59,20 +129,78 @@ class NotificationService:
 
             notifications = query.order_by(Notification.created_at.desc()).all()
 
-            return [
-                {
-                    "id": n.id,
-                    "message": n.message,
-                    "is_read": n.is_read,
-                    "created_at": n.created_at.isoformat(),
-                }
-                for n in notifications
-            ]
+            return [NotificationService._serialize(n) for n in notifications]
 
         except Exception as e:
             logger.error(f"Error fetching notifications: {str(e)}")
             return []
 
+    @staticmethod
+    def get_notifications_page(user_id, limit=None, cursor=None, unread_only=False):
+        """
+        Get one page of a user's notifications, newest first
+
+        Uses keyset pagination on (created_at, id), so every page costs one
+        index range scan regardless of how deep the client has scrolled.
+
+        Args:
+            user_id: ID of the user
+            limit: Page size (default DEFAULT_PAGE_SIZE, capped at MAX_PAGE_SIZE)
+            cursor: next_cursor from the previous page, or None for the first page
+            unread_only: If True, only return unread notifications
+
+        Returns:
+            dict: {"notifications": [...], "next_cursor": str or None}
+
+        Raises:
+            ValueError: Invalid cursor
+        """
+        limit = int(limit or NotificationService.DEFAULT_PAGE_SIZE)
+        limit = min(max(limit, 1), NotificationService.MAX_PAGE_SIZE)
+
+        query = Notification.query.filter_by(user_id=user_id)
+        if unread_only:
+            query = query.filter_by(is_read=False)
+
+        if cursor:
+            created_at, notification_id = NotificationService._decode_cursor(cursor)
+            query = query.filter(
+                or_(
+                    Notification.created_at < created_at,
+                    and_(Notification.created_at == created_at, Notification.id < notification_id),
+                )
+            )
+
+        rows = (
+            query.order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(limit + 1)
+            .all()
+        )
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = NotificationService._encode_cursor(rows[-1])
+
+        return {
+            "notifications": [NotificationService._serialize(n) for n in rows],
+            "next_cursor": next_cursor,
+        }
+
+    @staticmethod
+    def get_unread_count(user_id):
+        """
+        Get a user's unread notification count from the denormalized counter
+
+        Args:
+            user_id: ID of the user
+
+        Returns:
+            int
+        """
+        count = db.session.query(User.unread_notifications).filter(User.id == user_id).scalar()
+        return max(count or 0, 0)
+
     @staticmethod
     def mark_as_read(notification_id, user_id):
         """
@@ -91,7 +219,12 @@ class NotificationService:
             if not notification:
                 return False
 
-            notification.is_read = True
+            # Conditional update so concurrent calls decrement the counter once
+            updated = Notification.query.filter_by(id=notification_id, is_read=False).update(
+                {"is_read": True}, synchronize_session="fetch"
+            )
+            if updated:
+                NotificationService._adjust_unread_count(user_id, -updated)
             db.session.commit()
 
             logger.info(f"Notification {notification_id} marked as read")
@@ -117,6 +250,8 @@ class NotificationService:
             count = Notification.query.filter_by(user_id=user_id, is_read=False).update(
                 {"is_read": True}
             )
+            if count:
+                NotificationService._adjust_unread_count(user_id, -count)
 
             db.session.commit()
 
@@ -128,6 +263,42 @@ class NotificationService:
             logger.error(f"Error marking all notifications as read: {str(e)}")
             return 0
 
+    @staticmethod
+    def _adjust_unread_count(user_id, delta):
+        """Atomically add delta to a user's unread counter (never below zero)"""
+        new_count = User.unread_notifications + delta
+        db.session.query(User).filter(User.id == user_id).update(
+            {
+                User.unread_notifications: case((new_count < 0, 0), else_=new_count),
+                # Counter changes are not profile edits
+                User.updated_at: User.updated_at,
+            },
+            synchronize_session=False,
+        )
+
+    @staticmethod
+    def _serialize(notification):
+        return {
+            "id": notification.id,
+            "message": notification.message,
+            "is_read": notification.is_read,
+            "created_at": notification.created_at.isoformat(),
+        }
+
+    @staticmethod
+    def _encode_cursor(notification):
+        raw = f"{notification.created_at.isoformat()}|{notification.id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def _decode_cursor(cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+            created_at, notification_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(created_at), int(notification_id)
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise ValueError("Invalid cursor") from e
+
 
 # Convenience function for easy import
 def create_notification(user_id, message):
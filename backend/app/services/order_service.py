@@ -5,13 +5,23 @@ Handles order creation, management, and status updates
 
 import logging
 
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import joinedload, selectinload
+
 from app.extensions import db
-from app.models import Address, Cart, Order, OrderItem, Payment
+from app.models import Address, Cart, CartItem, Order, OrderItem, Payment
+from app.services.cart_service import CartService
 from app.services.email_service import EmailService
+from app.services.inventory_service import InventoryService
 from app.services.notification_service import create_notification
+from app.utils.cart_cache import invalidate_cart
+from app.utils.pubsub import publish
 
 logger = logging.getLogger(__name__)
 
+# Channel carrying payment status changes for one order
+PAYMENT_STATUS_CHANNEL = "payments:status:{order_reference}"
+
 
 class OrderService:
     """Service for managing orders"""
@@ -43,9 +53,13 @@ class OrderService:
             tuple: (order_object, error_message)
         """
         try:
+            # Checkout reads the SQL cart; write any Redis-resident cart through first
+            CartService.persist_cart(user_id)
+
             # Validate cart exists and has items
-            cart = Cart.query.filter_by(user_id=user_id).first()
-            if not cart or not cart.items:
+            cart_id = db.session.scalar(select(Cart.id).where(Cart.user_id == user_id))
+            lines = CartService.get_cart_lines(user_id) if cart_id else []
+            if not lines:
                 return None, "Cart is empty"
 
             address_data = order_data.get("address") or {}
@@ -56,36 +70,46 @@ class OrderService:
             if missing_fields:
                 return None, f"Invalid address: missing {', '.join(missing_fields)}"
 
-            computed_total = 0
-            for cart_item in cart.items:
-                unit_price = (
-                    cart_item.variation_price
-                    if cart_item.variation_price
-                    else (cart_item.product.price if cart_item.product else 0)
-                )
-                computed_total += float(unit_price) * cart_item.quantity
+            # Server-side prices from the catalog price index, not the stored cart prices;
+            # the order items are written from these same priced lines
+            priced_lines, computed_total = CartService.price_lines(lines)
 
             requested_total = float(order_data.get("total_amount") or 0)
             if round(requested_total, 2) != round(computed_total, 2):
                 return None, "Total amount does not match cart total"
 
+            # Take stock for every priced line before writing the order; if it is short,
+            # reclaim lapsed M-Pesa holds once and try again. The failed attempt's
+            # row locks are dropped first: reclaiming locks rows of its own, and
+            # holding both would break the products-then-variations lock order
+            stock_error = InventoryService.reserve_lines(priced_lines)
+            if stock_error:
+                db.session.rollback()
+                if InventoryService.release_expired_reservations():
+                    stock_error = InventoryService.reserve_lines(priced_lines)
+            if stock_error:
+                db.session.rollback()
+                return None, stock_error
+
             # Create address
-            address = OrderService._create_address(user_id, address_data)
-            if not address:
+            address_id = OrderService._create_address(user_id, address_data)
+            if not address_id:
                 return None, "Failed to create address"
 
             # Generate order reference
             order_reference = Order.generate_order_reference()
 
-            # Create payment record
-            payment = Payment(
-                order_reference=order_reference,
-                amount=order_data.get("total_amount"),
-                payment_method=order_data.get("payment_method"),
-                status="Pending",
+            # Create payment record (RETURNING gives the ID without a flush)
+            payment_id = db.session.scalar(
+                insert(Payment)
+                .values(
+                    order_reference=order_reference,
+                    amount=order_data.get("total_amount"),
+                    payment_method=order_data.get("payment_method"),
+                    status="Pending",
+                )
+                .returning(Payment.id)
             )
-            db.session.add(payment)
-            db.session.flush()  # Get payment ID
 
             # Determine initial order status
             initial_status = (
@@ -93,35 +117,34 @@ class OrderService:
             )
 
             # Create order
-            order = Order(
-                user_id=user_id,
-                order_reference=order_reference,
-                address_id=address.id,
-                payment_id=payment.id,
-                total_amount=order_data.get("total_amount"),
-                status=initial_status,
-            )
-            db.session.add(order)
-            db.session.flush()  # Get order ID
-
-            # Create order items from cart
-            for cart_item in cart.items:
-                order_item = OrderItem(
-                    order_id=order.id,
-                    product_id=cart_item.product_id,
-                    quantity=cart_item.quantity,
-                    variation_name=cart_item.variation_name,
-                    variation_price=cart_item.variation_price,
+            order_id = db.session.scalar(
+                insert(Order)
+                .values(
+                    user_id=user_id,
+                    order_reference=order_reference,
+                    address_id=address_id,
+                    payment_id=payment_id,
+                    total_amount=order_data.get("total_amount"),
+                    status=initial_status,
                 )
-                db.session.add(order_item)
+                .returning(Order.id)
+            )
 
-            # Clear cart
-            for item in cart.items:
-                db.session.delete(item)
-            db.session.delete(cart)
+            # Write the priced lines as order items in one statement, then clear the cart
+            db.session.execute(
+                insert(OrderItem), OrderService._order_item_rows(order_id, priced_lines)
+            )
+            InventoryService.create_reservation(
+                order_id, hold=order_data.get("payment_method") != "COD"
+            )
+            db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id))
+            db.session.execute(delete(Cart).where(Cart.id == cart_id))
 
             # Commit all changes
             db.session.commit()
+            CartService.forget_cart(user_id)
+            invalidate_cart(user_id)
+            order = db.session.get(Order, order_id)
 
             # Create notification
             if order_data.get("payment_method") == "COD":
@@ -143,29 +166,49 @@ class OrderService:
 
     @staticmethod
     def _create_address(user_id, address_data):
-        """Create address from order data"""
+        """Create address from order data; returns the new address ID"""
         try:
             if not address_data:
                 return None
 
-            address = Address(
-                user_id=user_id,
-                first_name=address_data.get("firstName"),
-                last_name=address_data.get("lastName"),
-                email=address_data.get("email"),
-                phone=address_data.get("phone"),
-                city=address_data.get("city"),
-                street=address_data.get("street"),
-                additional_info=address_data.get("additionalInfo"),
+            return db.session.scalar(
+                insert(Address)
+                .values(
+                    user_id=user_id,
+                    first_name=address_data.get("firstName"),
+                    last_name=address_data.get("lastName"),
+                    email=address_data.get("email"),
+                    phone=address_data.get("phone"),
+                    city=address_data.get("city"),
+                    street=address_data.get("street"),
+                    additional_info=address_data.get("additionalInfo"),
+                )
+                .returning(Address.id)
             )
-            db.session.add(address)
-            db.session.flush()
-            return address
 
         except Exception as e:
             logger.error(f"Error creating address: {str(e)}")
             return None
 
+    @staticmethod
+    def _order_item_rows(order_id, priced_lines):
+        """
+        order_items rows for lines priced by CartService.price_lines
+
+        Variation lines keep the unit price the order total was checked
+        against; base products are priced from products.price.
+        """
+        return [
+            {
+                "order_id": order_id,
+                "product_id": line["product_id"],
+                "quantity": line["quantity"],
+                "variation_name": line["variation_name"],
+                "variation_price": round(line["unit_price"]) if line["variation_name"] else None,
+            }
+            for line in priced_lines
+        ]
+
     @staticmethod
     def get_user_orders(user_id):
         """
@@ -300,18 +343,14 @@ class OrderService:
             old_status = order.status
             order.status = new_status
 
+            # Canceled orders give their stock back
+            if new_status == "Canceled" and old_status != "Canceled":
+                InventoryService.release_reservation(order.id)
+
             # If delivered, mark payment as success
             if new_status == "Delivered" and order.payment:
                 order.payment.status = "Success"
 
-                # Send payment confirmation
-                try:
-                    EmailService().send_payment_notification(order.payment)
-                except Exception as email_error:
-                    logger.warning(
-                        f"Failed to send payment notification for {order.order_reference}: {email_error}"
-                    )
-
                 create_notification(
                     order.user_id,
                     f"Payment for Order #{order.order_reference} confirmed. Check your email for receipt.",
@@ -319,6 +358,18 @@ class OrderService:
 
             db.session.commit()
 
+            if new_status == "Delivered" and order.payment:
+                OrderService.publish_payment_status(order.order_reference, order.payment)
+
+                # Send payment confirmation after commit so the attached receipt
+                # is the cached one the orders API serves
+                try:
+                    EmailService().send_payment_notification(order.payment)
+                except Exception as email_error:
+                    logger.warning(
+                        f"Failed to send payment notification for {order.order_reference}: {email_error}"
+                    )
+
             # Send notifications
             create_notification(
                 order.user_id,
@@ -359,6 +410,34 @@ class OrderService:
             logger.error(f"Error fetching all orders: {str(e)}")
             return []
 
+    @staticmethod
+    def get_orders_for_export(status=None, start_date=None, end_date=None):
+        """
+        Build the query for orders included in a bulk document export
+
+        Args:
+            status: Optional order status to match
+            start_date: Optional inclusive lower bound on created_at
+            end_date: Optional exclusive upper bound on created_at
+
+        Returns:
+            Query of orders with their document relationships eager-loaded, ordered by id
+        """
+        query = Order.query.options(
+            joinedload(Order.address),
+            joinedload(Order.payment),
+            selectinload(Order.order_items).joinedload(OrderItem.product),
+        )
+
+        if status:
+            query = query.filter(Order.status == status)
+        if start_date:
+            query = query.filter(Order.created_at >= start_date)
+        if end_date:
+            query = query.filter(Order.created_at < end_date)
+
+        return query.order_by(Order.id)
+
     @staticmethod
     def update_payment_status(order_reference, payment_data):
         """
@@ -391,14 +470,7 @@ class OrderService:
             if payment.status == "Success":
                 # Update order status
                 order.status = "Order Placed"
-
-                # Send confirmation email (best-effort)
-                try:
-                    EmailService().send_order_confirmation(order)
-                except Exception as email_error:
-                    logger.warning(
-                        f"Failed to send order confirmation for {order.order_reference}: {email_error}"
-                    )
+                InventoryService.commit_reservation(order.id)
 
                 create_notification(
                     order.user_id,
@@ -406,6 +478,7 @@ class OrderService:
                 )
             else:
                 order.status = "Payment Failed"
+                InventoryService.release_reservation(order.id)
 
                 create_notification(
                     order.user_id,
@@ -414,6 +487,18 @@ class OrderService:
 
             db.session.commit()
 
+            OrderService.publish_payment_status(order_reference, payment)
+
+            # Send confirmation email after commit so the attached invoice is
+            # the cached one the orders API serves (best-effort)
+            if payment.status == "Success":
+                try:
+                    EmailService().send_order_confirmation(order)
+                except Exception as email_error:
+                    logger.warning(
+                        f"Failed to send order confirmation for {order.order_reference}: {email_error}"
+                    )
+
             logger.info(f"Payment status updated for order {order_reference}: {payment.status}")
             return True, "Payment status updated"
 
@@ -421,3 +506,17 @@ class OrderService:
             db.session.rollback()
             logger.error(f"Error updating payment status: {str(e)}")
             return False, str(e)
+
+    @staticmethod
+    def publish_payment_status(order_reference, payment):
+        """
+        Wake clients waiting on this order's payment status
+
+        Args:
+            order_reference: Order reference number
+            payment: Payment object (already committed)
+        """
+        publish(
+            PAYMENT_STATUS_CHANNEL.format(order_reference=order_reference),
+            {"order_reference": order_reference, "payment_status": payment.status},
+        )
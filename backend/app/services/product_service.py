@@ -5,6 +5,10 @@ Handles all product-related business logic
 
 import json
 import logging
+from datetime import datetime
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import joinedload, selectinload, with_polymorphic
 
 from app.extensions import db
 from app.models import (
@@ -19,6 +23,9 @@ from app.models import (
     Tablet,
 )
 from app.services.cloudinary_service import upload_images
+from app.utils.cart_cache import invalidate_cart
+from app.utils.price_index import bump_catalog_version
+from app.utils.specs import NUMERIC_SPEC_COLUMNS, numeric_specs
 
 logger = logging.getLogger(__name__)
 
@@ -67,6 +74,7 @@ class ProductService:
 
             # Create product instance
             product = ProductService._build_product_instance(ProductModel, product_data, image_urls)
+            ProductService._set_numeric_specs(product)
 
             db.session.add(product)
             db.session.flush()  # Get product ID for variations
@@ -78,6 +86,7 @@ class ProductService:
                     ProductService._create_variations(product.id, variations_json)
 
             db.session.commit()
+            bump_catalog_version()
 
             logger.info(f"Product created: {product.name} (ID: {product.id})")
             return product, None
@@ -99,6 +108,7 @@ class ProductService:
             "brand_id": data.get("brand_id"),
             "hasVariation": data.get("hasVariation", False),
             "isBestSeller": data.get("isBestSeller", False),
+            "stock": _parse_stock(data.get("stock")),
         }
 
         # Add type-specific fields
@@ -147,6 +157,7 @@ class ProductService:
                     ram=variation.get("ram"),
                     storage=variation.get("storage"),
                     price=float(variation.get("price", 0)),
+                    stock=_parse_stock(variation.get("stock")),
                 )
                 db.session.add(new_variation)
 
@@ -194,15 +205,22 @@ class ProductService:
                 product.isBestSeller = product_data["isBestSeller"]
             if "hasVariation" in product_data:
                 product.hasVariation = product_data["hasVariation"]
+            if "stock" in product_data:
+                product.stock = _parse_stock(product_data["stock"])
 
             # Update type-specific fields
             ProductService._update_type_specific_fields(product, product_data)
+            ProductService._set_numeric_specs(product)
+
+            # Subclass-only edits do not touch products, so bump the version by hand
+            product.updated_at = datetime.utcnow()
 
             # Update variations if provided
             if product.hasVariation and "variations" in product_data:
                 ProductService._update_variations(product.id, product_data["variations"])
 
             db.session.commit()
+            bump_catalog_version()
 
             logger.info(f"Product updated: {product.name} (ID: {product.id})")
             return product, None
@@ -238,6 +256,55 @@ class ProductService:
             if "battery" in data:
                 product.battery = data["battery"]
 
+    @staticmethod
+    def _set_numeric_specs(product):
+        """Fill the indexed numeric spec columns from the spec text fields"""
+        for column, value in numeric_specs(product).items():
+            setattr(product, column, value)
+
+    @staticmethod
+    def backfill_numeric_specs(batch_size=500):
+        """
+        Recompute the numeric spec columns of every product
+
+        Walks products by ID in batches (one polymorphic query each) and
+        writes only rows whose values changed, committing per batch.
+
+        Args:
+            batch_size: Products per batch
+
+        Returns:
+            int: Number of products updated
+        """
+        entity = with_polymorphic(Product, "*")
+        columns = [column for _, column, _ in NUMERIC_SPEC_COLUMNS.values()]
+        table = Product.__table__
+        updated = 0
+        last_id = 0
+
+        while True:
+            products = db.session.scalars(
+                select(entity).where(entity.id > last_id).order_by(entity.id).limit(batch_size)
+            ).all()
+            if not products:
+                return updated
+            last_id = products[-1].id
+
+            changes = []
+            for product in products:
+                values = numeric_specs(product)
+                if any(getattr(product, column) != values[column] for column in columns):
+                    changes.append({"b_id": product.id, **{f"b_{k}": v for k, v in values.items()}})
+            if changes:
+                db.session.execute(
+                    update(table)
+                    .where(table.c.id == bindparam("b_id"))
+                    .values({column: bindparam(f"b_{column}") for column in columns}),
+                    changes,
+                )
+            db.session.commit()
+            updated += len(changes)
+
     @staticmethod
     def _update_variations(product_id, variations_data):
         """Update product variations"""
@@ -258,9 +325,15 @@ class ProductService:
 
                 if existing:
                     existing.price = price
+                    if "stock" in variation_data:
+                        existing.stock = _parse_stock(variation_data["stock"])
                 else:
                     new_variation = ProductVariation(
-                        product_id=product_id, ram=ram, storage=storage, price=price
+                        product_id=product_id,
+                        ram=ram,
+                        storage=storage,
+                        price=price,
+                        stock=_parse_stock(variation_data.get("stock")),
                     )
                     db.session.add(new_variation)
 
@@ -269,15 +342,26 @@ class ProductService:
             raise
 
     @staticmethod
-    def get_all_products():
+    def get_all_products(spec_ranges=None):
         """
         Get all products with ratings
 
+        Args:
+            spec_ranges: Optional {filter name: (min, max)} over NUMERIC_SPEC_COLUMNS
+                (e.g. {"ram": (8, None)}); either bound may be None
+
         Returns:
             List of product dictionaries
         """
         try:
-            products = Product.query.all()
+            conditions = []
+            for name, (minimum, maximum) in (spec_ranges or {}).items():
+                column = getattr(Product, NUMERIC_SPEC_COLUMNS[name][1])
+                if minimum is not None:
+                    conditions.append(column >= minimum)
+                if maximum is not None:
+                    conditions.append(column <= maximum)
+            products = Product.query.filter(*conditions).all()
             return [ProductService._serialize_product(p) for p in products]
         except Exception as e:
             logger.error(f"Error fetching products: {str(e)}")
@@ -305,13 +389,71 @@ class ProductService:
             return None
 
     @staticmethod
-    def _serialize_product(product, include_reviews=False):
-        """Convert product to dictionary"""
-        # Calculate average rating
-        reviews = Review.query.filter_by(product_id=product.id).all()
-        avg_rating = 0
-        if reviews:
-            avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1)
+    def get_products_by_ids(product_ids):
+        """
+        Get several products with their spec fields in a fixed number of queries
+
+        Subclass columns, category and brand come from one polymorphic query;
+        variations and ratings take one query each for the whole batch.
+
+        Args:
+            product_ids: Product IDs; the result keeps this order
+
+        Returns:
+            List of product dictionaries (unknown IDs are skipped)
+        """
+        product_ids = [int(product_id) for product_id in product_ids]
+        if not product_ids:
+            return []
+
+        entity = with_polymorphic(Product, "*")
+        products = db.session.scalars(
+            select(entity)
+            .where(entity.id.in_(product_ids))
+            .options(
+                selectinload(entity.variations),
+                joinedload(entity.category),
+                joinedload(entity.brand),
+            )
+        ).all()
+        ratings = {
+            product_id: (round(float(average), 1), count)
+            for product_id, average, count in db.session.execute(
+                select(Review.product_id, func.avg(Review.rating), func.count(Review.id))
+                .where(Review.product_id.in_(product_ids))
+                .group_by(Review.product_id)
+            )
+        }
+
+        by_id = {product.id: product for product in products}
+        return [
+            ProductService._serialize_product(
+                by_id[product_id], rating=ratings.get(product_id, (0, 0))
+            )
+            for product_id in product_ids
+            if product_id in by_id
+        ]
+
+    @staticmethod
+    def _serialize_product(product, include_reviews=False, rating=None):
+        """
+        Convert product to dictionary
+
+        Args:
+            product: Product instance
+            include_reviews: Include the serialized reviews
+            rating: Precomputed (average, count); queried from reviews when omitted
+        """
+        reviews = []
+        if rating is None or include_reviews:
+            reviews = Review.query.filter_by(product_id=product.id).all()
+        if rating is None:
+            # Calculate average rating
+            avg_rating = 0
+            if reviews:
+                avg_rating = round(sum(r.rating for r in reviews) / len(reviews), 1)
+            rating = (avg_rating, len(reviews))
+        avg_rating, review_count = rating
 
         data = {
             "id": product.id,
@@ -326,14 +468,21 @@ class ProductService:
             "type": product.type,
             "hasVariation": product.hasVariation,
             "isBestSeller": product.isBestSeller,
+            "stock": product.stock,
             "rating": avg_rating,
-            "review_count": len(reviews),
+            "review_count": review_count,
         }
 
         # Add variations if available
         if product.hasVariation:
             data["variations"] = [
-                {"id": v.id, "ram": v.ram, "storage": v.storage, "price": float(v.price)}
+                {
+                    "id": v.id,
+                    "ram": v.ram,
+                    "storage": v.storage,
+                    "price": float(v.price),
+                    "stock": v.stock,
+                }
                 for v in product.variations
             ]
 
@@ -410,22 +559,26 @@ class ProductService:
             tuple: (success: bool, error_message: str or None)
         """
         try:
-            from app.models import CartItem, CompareItem, OrderItem, WishList
+            from app.models import Cart, CartItem, CompareItem, OrderItem
+            from app.services.wishlist_service import WishlistService
 
             product = Product.query.get(product_id)
             if not product:
                 return False, "Product not found"
 
             # Delete related records
+            cart_user_ids = db.session.scalars(
+                select(Cart.user_id)
+                .join(CartItem, CartItem.cart_id == Cart.id)
+                .where(CartItem.product_id == product_id)
+                .distinct()
+            ).all()
             CartItem.query.filter_by(product_id=product_id).delete()
             OrderItem.query.filter_by(product_id=product_id).delete()
             CompareItem.query.filter_by(product_id=product_id).delete()
 
             # Remove from wishlists
-            wishlists = WishList.query.all()
-            for wishlist in wishlists:
-                if product in wishlist.products:
-                    wishlist.products.remove(product)
+            WishlistService.remove_product_everywhere(product_id)
 
             # Delete variations
             ProductVariation.query.filter_by(product_id=product_id).delete()
@@ -436,6 +589,10 @@ class ProductService:
             # Delete product
             db.session.delete(product)
             db.session.commit()
+            bump_catalog_version()
+
+            for user_id in cart_user_ids:
+                invalidate_cart(user_id)
 
             logger.info(f"Product deleted: {product.name} (ID: {product_id})")
             return True, None
@@ -444,3 +601,13 @@ class ProductService:
             db.session.rollback()
             logger.error(f"Error deleting product {product_id}: {str(e)}")
             return False, str(e)
+
+
+def _parse_stock(value):
+    """Stock from form/JSON input; blank means the item is not stock-tracked"""
+    if value is None or value == "":
+        return None
+    stock = int(value)
+    if stock < 0:
+        raise ValueError("Stock cannot be negative")
+    return stock
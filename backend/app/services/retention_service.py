@@ -0,0 +1,222 @@
+"""
+Retention Service
+Prunes old read notifications and idempotency keys, and archives old
+audit logs by month
+
+Both jobs work in small batches of primary keys and commit after each, so
+no statement holds locks on the live tables for long. An optional pause
+between batches leaves room for regular traffic.
+
+Metrics: retention_rows_total, retention_job_duration_seconds,
+retention_last_success_timestamp_seconds.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import delete, func, insert, literal, select
+
+from app.extensions import db
+from app.models import AuditLog, AuditLogArchive, IdempotencyKey, Notification
+
+logger = logging.getLogger(__name__)
+
+RETENTION_ROWS = Counter(
+    "retention_rows_total",
+    "Rows removed from live tables by retention jobs",
+    ["table", "action"],
+)
+
+RETENTION_DURATION = Histogram(
+    "retention_job_duration_seconds",
+    "Retention job run time",
+    ["job"],
+)
+
+RETENTION_LAST_SUCCESS = Gauge(
+    "retention_last_success_timestamp_seconds",
+    "Unix time of the last successful retention job run",
+    ["job"],
+)
+
+
+class RetentionService:
+    """Service for pruning and archiving old rows"""
+
+    @staticmethod
+    def prune_read_notifications(max_age_days=None, batch_size=None):
+        """
+        Delete read notifications older than max_age_days
+
+        Unread notifications are never pruned, so unread counters stay valid.
+
+        Args:
+            max_age_days: Age threshold (default NOTIFICATION_RETENTION_DAYS)
+            batch_size: Rows per delete (default RETENTION_BATCH_SIZE)
+
+        Returns:
+            int: Number of notifications deleted
+        """
+        config = current_app.config
+        max_age_days = max_age_days or config.get("NOTIFICATION_RETENTION_DAYS", 90)
+        batch_size = batch_size or config.get("RETENTION_BATCH_SIZE", 1000)
+        cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+
+        started = time.perf_counter()
+        deleted = 0
+        while True:
+            ids = db.session.scalars(
+                select(Notification.id)
+                .where(Notification.created_at < cutoff, Notification.is_read.is_(True))
+                .order_by(Notification.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            db.session.execute(delete(Notification).where(Notification.id.in_(ids)))
+            db.session.commit()
+
+            deleted += len(ids)
+            RETENTION_ROWS.labels("notifications", "deleted").inc(len(ids))
+            RetentionService._pause()
+
+        RETENTION_DURATION.labels("prune_notifications").observe(time.perf_counter() - started)
+        RETENTION_LAST_SUCCESS.labels("prune_notifications").set_to_current_time()
+        logger.info(f"Pruned {deleted} read notification(s) older than {max_age_days} days")
+        return deleted
+
+    @staticmethod
+    def prune_idempotency_keys(max_age_hours=None, batch_size=None):
+        """
+        Delete stored Idempotency-Key responses older than max_age_hours
+
+        Args:
+            max_age_hours: Age threshold (default IDEMPOTENCY_KEY_TTL_HOURS)
+            batch_size: Rows per delete (default RETENTION_BATCH_SIZE)
+
+        Returns:
+            int: Number of keys deleted
+        """
+        config = current_app.config
+        max_age_hours = max_age_hours or config.get("IDEMPOTENCY_KEY_TTL_HOURS", 24)
+        batch_size = batch_size or config.get("RETENTION_BATCH_SIZE", 1000)
+        cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+
+        started = time.perf_counter()
+        deleted = 0
+        while True:
+            ids = db.session.scalars(
+                select(IdempotencyKey.id)
+                .where(IdempotencyKey.created_at < cutoff)
+                .order_by(IdempotencyKey.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                break
+
+            db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids)))
+            db.session.commit()
+
+            deleted += len(ids)
+            RETENTION_ROWS.labels("idempotency_keys", "deleted").inc(len(ids))
+            RetentionService._pause()
+
+        RETENTION_DURATION.labels("prune_idempotency_keys").observe(time.perf_counter() - started)
+        RETENTION_LAST_SUCCESS.labels("prune_idempotency_keys").set_to_current_time()
+        logger.info(f"Pruned {deleted} idempotency key(s) older than {max_age_hours} hours")
+        return deleted
+
+    @staticmethod
+    def archive_audit_logs(max_age_days=None, batch_size=None):
+        """
+        Move audit logs from whole months older than max_age_days to audit_logs_archive
+
+        Rows are tagged with their month ("YYYY-MM") so an archived month can
+        be exported or dropped as a unit.
+
+        Args:
+            max_age_days: Age threshold (default AUDIT_LOG_RETENTION_DAYS)
+            batch_size: Rows per move (default RETENTION_BATCH_SIZE)
+
+        Returns:
+            dict: {"YYYY-MM": rows archived}
+        """
+        config = current_app.config
+        max_age_days = max_age_days or config.get("AUDIT_LOG_RETENTION_DAYS", 365)
+        batch_size = batch_size or config.get("RETENTION_BATCH_SIZE", 1000)
+
+        # Only whole months: everything before the start of the cutoff's month
+        cutoff = _month_start(datetime.utcnow() - timedelta(days=max_age_days))
+
+        started = time.perf_counter()
+        archived = {}
+        oldest = db.session.scalar(
+            select(func.min(AuditLog.created_at)).where(AuditLog.created_at < cutoff)
+        )
+        month = _month_start(oldest) if oldest else cutoff
+
+        while month < cutoff:
+            next_month = _next_month(month)
+            label = month.strftime("%Y-%m")
+            count = RetentionService._archive_range(month, next_month, label, batch_size)
+            if count:
+                archived[label] = count
+                logger.info(f"Archived {count} audit log(s) for {label}")
+            month = next_month
+
+        RETENTION_DURATION.labels("archive_audit_logs").observe(time.perf_counter() - started)
+        RETENTION_LAST_SUCCESS.labels("archive_audit_logs").set_to_current_time()
+        return archived
+
+    @staticmethod
+    def _archive_range(start, end, label, batch_size):
+        """Move one month of audit logs in batches; returns rows moved"""
+        moved = 0
+        while True:
+            ids = db.session.scalars(
+                select(AuditLog.id)
+                .where(AuditLog.created_at >= start, AuditLog.created_at < end)
+                .order_by(AuditLog.id)
+                .limit(batch_size)
+            ).all()
+            if not ids:
+                return moved
+
+            # Copy and delete in one transaction so a row is never in both or neither
+            db.session.execute(
+                insert(AuditLogArchive).from_select(
+                    ["id", "admin_id", "action", "created_at", "archive_month", "archived_at"],
+                    select(
+                        AuditLog.id,
+                        AuditLog.admin_id,
+                        AuditLog.action,
+                        AuditLog.created_at,
+                        literal(label),
+                        literal(datetime.utcnow()),
+                    ).where(AuditLog.id.in_(ids)),
+                )
+            )
+            db.session.execute(delete(AuditLog).where(AuditLog.id.in_(ids)))
+            db.session.commit()
+
+            moved += len(ids)
+            RETENTION_ROWS.labels("audit_logs", "archived").inc(len(ids))
+            RetentionService._pause()
+
+    @staticmethod
+    def _pause():
+        pause = current_app.config.get("RETENTION_BATCH_PAUSE_SECONDS", 0)
+        if pause:
+            time.sleep(pause)
+
+
+def _month_start(moment):
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(month):
+    return (month + timedelta(days=32)).replace(day=1)
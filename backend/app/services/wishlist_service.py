@@ -0,0 +1,129 @@
+"""
+Wishlist Service
+Membership changes as direct statements on wishlist_products
+
+Adding, removing and membership checks never load the wishlist's product
+collection: each is one statement on the association table, whose primary
+key (wishlist_id, product_id) makes duplicates a no-op via ON CONFLICT.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from app.extensions import db
+from app.models import WishList, wishlist_products
+from app.utils.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+
+class WishlistService:
+    """Service for managing wishlists"""
+
+    @staticmethod
+    def get_wishlist_id(user_id, create=False):
+        """
+        ID of the user's wishlist
+
+        Args:
+            user_id: ID of the user
+            create: Create the wishlist (flushed, not committed) if missing
+
+        Returns:
+            int or None
+        """
+        wishlist_id = db.session.scalar(
+            select(WishList.id).where(WishList.user_id == user_id).limit(1)
+        )
+        if wishlist_id is None and create:
+            wishlist = WishList(user_id=user_id)
+            db.session.add(wishlist)
+            db.session.flush()
+            wishlist_id = wishlist.id
+        return wishlist_id
+
+    @staticmethod
+    def add_product(wishlist_id, product_id):
+        """
+        Add a product with INSERT ... ON CONFLICT DO NOTHING (no commit)
+
+        Args:
+            wishlist_id: Wishlist ID
+            product_id: Product ID
+
+        Returns:
+            bool: False when the product was already in the wishlist
+        """
+        result = db.session.execute(
+            dialect_insert(wishlist_products)
+            .values(wishlist_id=wishlist_id, product_id=product_id, created_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["wishlist_id", "product_id"])
+        )
+        return result.rowcount == 1
+
+    @staticmethod
+    def add_products(wishlist_id, product_ids):
+        """
+        Add many products in one multi-row INSERT ... ON CONFLICT DO NOTHING (no commit)
+
+        Args:
+            wishlist_id: Wishlist ID
+            product_ids: Iterable of product IDs (must exist)
+
+        Returns:
+            int: Number of products newly added
+        """
+        product_ids = sorted(set(product_ids))
+        if not product_ids:
+            return 0
+
+        now = datetime.utcnow()
+        result = db.session.execute(
+            dialect_insert(wishlist_products)
+            .values(
+                [
+                    {"wishlist_id": wishlist_id, "product_id": product_id, "created_at": now}
+                    for product_id in product_ids
+                ]
+            )
+            .on_conflict_do_nothing(index_elements=["wishlist_id", "product_id"])
+        )
+        return result.rowcount
+
+    @staticmethod
+    def remove_product(wishlist_id, product_id):
+        """
+        Remove a product from one wishlist (no commit)
+
+        Args:
+            wishlist_id: Wishlist ID
+            product_id: Product ID
+
+        Returns:
+            bool: False when the product was not in the wishlist
+        """
+        result = db.session.execute(
+            delete(wishlist_products).where(
+                wishlist_products.c.wishlist_id == wishlist_id,
+                wishlist_products.c.product_id == product_id,
+            )
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def remove_product_everywhere(product_id):
+        """
+        Remove a product from every wishlist in one DELETE (no commit)
+
+        Args:
+            product_id: Product ID
+
+        Returns:
+            int: Number of wishlists the product was removed from
+        """
+        result = db.session.execute(
+            delete(wishlist_products).where(wishlist_products.c.product_id == product_id)
+        )
+        return result.rowcount
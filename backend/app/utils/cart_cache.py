@@ -0,0 +1,114 @@
+"""
+Cart cache
+Short-lived per-worker cache of each user's cart read model
+
+The cart badge, cart page and checkout all read the same cart several
+times per visit. Entries are dropped in every worker through pub/sub
+whenever the cart changes; the TTL only bounds staleness from catalog
+price edits, which do not invalidate carts.
+"""
+
+import threading
+import time
+
+from flask import current_app
+
+from app.utils.pubsub import listen, publish, resubscribe_to_redis
+
+CART_CHANNEL = "cart:invalidate"
+
+
+class CartCache:
+    """user_id -> cart view cache with TTL and invalidation versions"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._versions = {}
+        self._subscription = None
+
+    def get(self, user_id, loader):
+        """
+        Get a user's cart view, calling loader() on a miss
+
+        Args:
+            user_id: User ID
+            loader: Callable returning the cart view
+
+        Returns:
+            dict: Cart view
+        """
+        user_id = int(user_id)
+        with self._lock:
+            self._drain_invalidations()
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            version = self._versions.get(user_id, 0)
+
+        view = loader()
+
+        with self._lock:
+            # Skip caching if the cart changed while we were reading
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = (view, time.monotonic() + self.ttl)
+        return view
+
+    def invalidate(self, user_id):
+        """
+        Drop a cached cart in this worker
+
+        Args:
+            user_id: User ID
+        """
+        user_id = int(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def _drain_invalidations(self):
+        if self._subscription is None:
+            subscription = listen(CART_CHANNEL)
+        else:
+            subscription = resubscribe_to_redis(self._subscription)
+        if subscription is not None:
+            self._subscription = subscription
+            # Anything cached before subscribing may have missed an invalidation
+            self._entries.clear()
+
+        while True:
+            message = self._subscription.wait(timeout=0)
+            if message is None:
+                break
+            if isinstance(message, dict) and "user_id" in message:
+                user_id = int(message["user_id"])
+                self._entries.pop(user_id, None)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+def get_cart_cache():
+    """
+    Get the cart cache for the current app (one per worker process)
+
+    Returns:
+        CartCache
+    """
+    cache = current_app.extensions.get("cart_cache")
+    if cache is None:
+        cache = CartCache(ttl=current_app.config.get("CART_CACHE_TTL", 30))
+        current_app.extensions["cart_cache"] = cache
+    return cache
+
+
+def invalidate_cart(user_id):
+    """
+    Invalidate a user's cached cart in every worker
+
+    Call after committing any change to the user's cart.
+
+    Args:
+        user_id: User ID
+    """
+    get_cart_cache().invalidate(user_id)
+    publish(CART_CHANNEL, {"user_id": int(user_id)})
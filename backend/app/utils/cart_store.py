@@ -0,0 +1,325 @@
+"""
+Redis cart store
+Keeps each user's cart in a Redis hash and writes it behind to SQL
+
+With CART_STORE_BACKEND = "redis", CartService reads and mutates carts
+here instead of in carts/cart_items. Every change marks the user dirty;
+a per-worker thread flushes dirty carts to SQL every
+CART_WRITE_BEHIND_SECONDS, and checkout flushes the user's cart
+synchronously before reading it. A cart missing from Redis is hydrated
+from SQL on first use, so SQL stays the durable copy.
+
+While Redis is unreachable CartService writes SQL directly and bumps
+carts.updated_at. Each hash records the SQL version (carts.updated_at) it
+was hydrated from or last flushed to; a hash whose version no longer
+matches SQL is stale, so it is re-hydrated on next use and never flushed
+over the newer SQL lines.
+
+Hash layout (key cart:{user_id}):
+    _loaded             "1" once hydrated (an empty cart still has this field)
+    _synced             SQL version the hash matches (see CartService._sql_version)
+    q:{product}|{var}   quantity of a line ("" variation for none)
+    p:{product}|{var}   variation price of a line, when given
+"""
+
+import logging
+import threading
+
+from flask import current_app
+
+from app.utils.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+DIRTY_KEY = "cart:dirty"
+LOADED_FIELD = "_loaded"
+SYNCED_FIELD = "_synced"
+
+# Hydrate a cart (ARGV: ttl, user_id, stale version, field, value, ...). With
+# stale version "" only a missing cart is filled; otherwise an existing cart is
+# replaced (and its pending flush dropped) only if it still holds that version
+# and is not being flushed (KEYS: cart, dirty set, flush lock)
+HYDRATE_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    if ARGV[3] == '' or redis.call('EXISTS', KEYS[3]) == 1
+            or redis.call('HGET', KEYS[1], '_synced') ~= ARGV[3] then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('SREM', KEYS[2], ARGV[2])
+end
+redis.call('HSET', KEYS[1], unpack(ARGV, 4))
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
+
+# Record the SQL version of a cart that still exists (ARGV: version)
+SYNC_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], '_synced', ARGV[1])
+return 1
+"""
+
+# Empty a cart but keep its SQL version (ARGV: ttl, user_id)
+CLEAR_SCRIPT = """
+local synced = redis.call('HGET', KEYS[1], '_synced')
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], '_loaded', '1')
+if synced then
+    redis.call('HSET', KEYS[1], '_synced', synced)
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+redis.call('SADD', KEYS[2], ARGV[2])
+return 1
+"""
+
+# Set a line's quantity only if the line exists (ARGV: field, quantity, ttl, user_id)
+SET_QUANTITY_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('SADD', KEYS[2], ARGV[4])
+return 1
+"""
+
+
+def _line(product_id, variation_name):
+    return f"{int(product_id)}|{variation_name or ''}"
+
+
+class RedisCartStore:
+    """Cart lines in Redis hashes with a dirty set for write-behind"""
+
+    def __init__(self, client, ttl):
+        self.client = client
+        self.ttl = ttl
+        self._hydrate = client.register_script(HYDRATE_SCRIPT)
+        self._set_quantity = client.register_script(SET_QUANTITY_SCRIPT)
+        self._sync = client.register_script(SYNC_SCRIPT)
+        self._clear = client.register_script(CLEAR_SCRIPT)
+        self._writer = None
+
+    @staticmethod
+    def key(user_id):
+        return f"cart:{int(user_id)}"
+
+    def ensure_loaded(self, user_id, version, loader):
+        """
+        Hydrate the user's cart from SQL if it is not in Redis yet, or if SQL
+        was written since (its version no longer matches the hash)
+
+        Args:
+            user_id: User ID
+            version: Callable returning the cart's current SQL version
+            loader: Callable returning the SQL lines (see lines())
+        """
+        loaded, synced = self.client.hmget(self.key(user_id), LOADED_FIELD, SYNCED_FIELD)
+        if loaded is not None:
+            # Hashes written before versions were recorded are trusted as is
+            if synced is None:
+                return
+            current = version()
+            if current == synced:
+                return
+            stale = synced
+        else:
+            current = version()
+            stale = ""
+
+        fields = [LOADED_FIELD, "1", SYNCED_FIELD, current]
+        for line in loader():
+            name = _line(line["product_id"], line["variation_name"])
+            fields += [f"q:{name}", line["quantity"]]
+            if line.get("variation_price") is not None:
+                fields += [f"p:{name}", line["variation_price"]]
+        self._hydrate(
+            keys=[self.key(user_id), DIRTY_KEY, self._lock_key(user_id)],
+            args=[self.ttl, int(user_id), stale, *fields],
+        )
+
+    def synced_version(self, user_id):
+        """SQL version the cart matches, or None when it has none recorded"""
+        return self.client.hget(self.key(user_id), SYNCED_FIELD)
+
+    def set_synced_version(self, user_id, version):
+        """Record the SQL version after a flush (no-op if the cart is gone)"""
+        self._sync(keys=[self.key(user_id)], args=[version])
+
+    def lines(self, user_id):
+        """
+        Current cart lines
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            list: Dicts with product_id, variation_name, quantity, variation_price
+        """
+        raw = self.client.hgetall(self.key(user_id))
+        lines = []
+        for field, quantity in raw.items():
+            if not field.startswith("q:"):
+                continue
+            name = field[2:]
+            product_id, variation_name = name.split("|", 1)
+            price = raw.get(f"p:{name}")
+            lines.append(
+                {
+                    "product_id": int(product_id),
+                    "variation_name": variation_name,
+                    "quantity": int(quantity),
+                    "variation_price": int(float(price)) if price is not None else None,
+                }
+            )
+        return sorted(lines, key=lambda line: (line["product_id"], line["variation_name"]))
+
+    def add(self, user_id, lines):
+        """
+        Add quantities to lines in one MULTI/EXEC
+
+        Args:
+            user_id: User ID
+            lines: Dicts with product_id, variation_name, quantity, variation_price
+        """
+        key = self.key(user_id)
+        pipe = self.client.pipeline()
+        for line in lines:
+            name = _line(line["product_id"], line.get("variation_name"))
+            pipe.hincrby(key, f"q:{name}", line["quantity"])
+            if line.get("variation_price") is not None:
+                pipe.hsetnx(key, f"p:{name}", line["variation_price"])
+        self._touch(pipe, user_id)
+        pipe.execute()
+
+    def set_quantity(self, user_id, product_id, variation_name, quantity):
+        """
+        Set an existing line's quantity
+
+        Returns:
+            bool: False when the line is not in the cart
+        """
+        field = f"q:{_line(product_id, variation_name)}"
+        result = self._set_quantity(
+            keys=[self.key(user_id), DIRTY_KEY],
+            args=[field, quantity, self.ttl, int(user_id)],
+        )
+        return bool(result)
+
+    def remove(self, user_id, product_id, variation_name):
+        """
+        Remove a line
+
+        Returns:
+            bool: False when the line is not in the cart
+        """
+        key = self.key(user_id)
+        name = _line(product_id, variation_name)
+        pipe = self.client.pipeline()
+        pipe.hdel(key, f"q:{name}", f"p:{name}")
+        self._touch(pipe, user_id)
+        return pipe.execute()[0] > 0
+
+    def clear(self, user_id):
+        """Empty the cart (kept as a hydrated, empty hash)"""
+        self._clear(keys=[self.key(user_id), DIRTY_KEY], args=[self.ttl, int(user_id)])
+
+    def discard(self, user_id):
+        """Drop the cached cart without scheduling a flush (SQL already matches)"""
+        pipe = self.client.pipeline()
+        pipe.delete(self.key(user_id))
+        pipe.srem(DIRTY_KEY, int(user_id))
+        pipe.execute()
+
+    def pop_dirty(self, count):
+        """Take up to count dirty user IDs off the dirty set"""
+        return [int(user_id) for user_id in self.client.spop(DIRTY_KEY, count) or []]
+
+    def take_dirty(self, user_id):
+        """Remove one user from the dirty set; returns True if they were dirty"""
+        return bool(self.client.srem(DIRTY_KEY, int(user_id)))
+
+    def mark_dirty(self, user_id):
+        self.client.sadd(DIRTY_KEY, int(user_id))
+
+    def acquire_flush_lock(self, user_id, timeout=30):
+        """Stop two workers flushing the same cart at once"""
+        return bool(self.client.set(self._lock_key(user_id), "1", nx=True, ex=timeout))
+
+    def release_flush_lock(self, user_id):
+        self.client.delete(self._lock_key(user_id))
+
+    def start_writer(self, app, interval):
+        """Start the write-behind thread for this worker"""
+        if self._writer is None and interval > 0:
+            self._writer = CartWriteBehind(app, interval)
+            self._writer.start()
+
+    def shutdown(self):
+        if self._writer is not None:
+            self._writer.stop()
+            self._writer = None
+
+    def _lock_key(self, user_id):
+        return f"{self.key(user_id)}:flush"
+
+    def _touch(self, pipe, user_id):
+        pipe.hset(self.key(user_id), LOADED_FIELD, "1")
+        pipe.expire(self.key(user_id), self.ttl)
+        pipe.sadd(DIRTY_KEY, int(user_id))
+
+
+class CartWriteBehind(threading.Thread):
+    """Daemon thread flushing dirty carts to SQL on an interval"""
+
+    def __init__(self, app, interval):
+        super().__init__(name="cart-write-behind", daemon=True)
+        self.app = app
+        self.interval = interval
+        self._stopped = threading.Event()
+
+    def run(self):
+        from app.extensions import db
+        from app.services.cart_service import CartService
+
+        while not self._stopped.wait(self.interval):
+            with self.app.app_context():
+                try:
+                    CartService.flush_dirty_carts()
+                except Exception as e:
+                    logger.error(f"Cart write-behind failed: {str(e)}")
+                finally:
+                    db.session.remove()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def get_cart_store():
+    """
+    Get the Redis cart store for the current app
+
+    Returns:
+        RedisCartStore, or None when CART_STORE_BACKEND is not "redis" or Redis is down
+    """
+    if current_app.config.get("CART_STORE_BACKEND", "sql") != "redis":
+        return None
+
+    client = get_redis()
+    if client is None:
+        return None
+
+    store = current_app.extensions.get("cart_store")
+    if store is None or store.client is not client:
+        if store is not None:
+            store.shutdown()
+        store = RedisCartStore(client, ttl=current_app.config.get("CART_STORE_TTL", 604800))
+        store.start_writer(
+            current_app._get_current_object(),
+            current_app.config.get("CART_WRITE_BEHIND_SECONDS", 5),
+        )
+        current_app.extensions["cart_store"] = store
+    return store
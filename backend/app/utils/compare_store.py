@@ -0,0 +1,124 @@
+"""
+Redis compare store
+Keeps each user's compare list in a Redis sorted set
+
+Key compare:{user_id} holds product IDs scored by the time they were
+added. Reads take the members added within COMPARE_TTL_HOURS with one
+ZRANGEBYSCORE and never write; older members are trimmed by the next add,
+and the key itself expires COMPARE_TTL_HOURS after the last add. Adding
+is one Lua script that trims, checks membership and the COMPARE_MAX_ITEMS
+cap, then adds, so two tabs cannot push a list past the cap.
+
+When Redis is down, CompareService falls back to compares/compare_items.
+"""
+
+import time
+
+from flask import current_app
+
+from app.utils.redis_client import get_redis
+
+# add() results
+ADDED = 1
+ALREADY_PRESENT = 0
+FULL = -1
+
+# Trim expired members, then add unless present or full (ARGV: now, ttl, max, product_id)
+ADD_SCRIPT = """
+local cutoff = tonumber(ARGV[1]) - tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', cutoff)
+if redis.call('ZSCORE', KEYS[1], ARGV[4]) then
+    return 0
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    return -1
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+
+class RedisCompareStore:
+    """Compare lists in Redis sorted sets scored by time added"""
+
+    def __init__(self, client, ttl, max_items):
+        self.client = client
+        self.ttl = ttl
+        self.max_items = max_items
+        self._add = client.register_script(ADD_SCRIPT)
+
+    @staticmethod
+    def key(user_id):
+        return f"compare:{int(user_id)}"
+
+    def product_ids(self, user_id):
+        """
+        Product IDs added within the TTL, oldest first
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            list: Product IDs
+        """
+        cutoff = time.time() - self.ttl
+        members = self.client.zrangebyscore(self.key(user_id), f"({cutoff}", "+inf")
+        return [int(member) for member in members]
+
+    def add(self, user_id, product_id):
+        """
+        Add a product unless it is already listed or the list is full
+
+        Returns:
+            int: ADDED, ALREADY_PRESENT or FULL
+        """
+        return int(
+            self._add(
+                keys=[self.key(user_id)],
+                args=[time.time(), self.ttl, self.max_items, int(product_id)],
+            )
+        )
+
+    def remove(self, user_id, product_id):
+        """
+        Remove a product
+
+        Returns:
+            bool: False when the product was not listed
+        """
+        return self.client.zrem(self.key(user_id), int(product_id)) > 0
+
+    def clear(self, user_id):
+        """
+        Drop the whole list
+
+        Returns:
+            bool: False when the list was already empty
+        """
+        return self.client.delete(self.key(user_id)) > 0
+
+
+def get_compare_store():
+    """
+    Get the Redis compare store for the current app
+
+    Returns:
+        RedisCompareStore, or None when COMPARE_STORE_BACKEND is not "redis" or Redis is down
+    """
+    if current_app.config.get("COMPARE_STORE_BACKEND", "redis") != "redis":
+        return None
+
+    client = get_redis()
+    if client is None:
+        return None
+
+    store = current_app.extensions.get("compare_store")
+    if store is None or store.client is not client:
+        store = RedisCompareStore(
+            client,
+            ttl=int(current_app.config.get("COMPARE_TTL_HOURS", 24) * 3600),
+            max_items=current_app.config.get("COMPARE_MAX_ITEMS", 3),
+        )
+        current_app.extensions["compare_store"] = store
+    return store
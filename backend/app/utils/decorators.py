@@ -7,8 +7,7 @@ from functools import wraps
 from flask import jsonify, request
 from flask_jwt_extended import get_jwt_identity
 
-from app.extensions import db
-from app.models import User
+from app.utils.role_cache import get_user_role
 
 
 def admin_required(f):
@@ -31,9 +30,8 @@ def admin_required(f):
         except (TypeError, ValueError):
             return jsonify({"error": "Admin privileges required"}), 403
 
-        user = db.session.get(User, current_user_id)
-
-        if not user or (user.role or "").lower() != "admin":
+        # Role comes from a short-TTL per-worker cache rather than a SELECT per call
+        if get_user_role(current_user_id) != "admin":
             return jsonify({"error": "Admin privileges required"}), 403
 
         return f(*args, **kwargs)
@@ -0,0 +1,196 @@
+"""
+Document store
+Pluggable storage for rendered PDF documents (invoices, receipts)
+
+Keys look like "<order_reference>/<doc_type>/<version>". Storing a new
+version drops older versions of the same document, so a store only ever
+holds the latest render of each document.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryDocumentStore:
+    """Bounded in-process LRU store (per worker)"""
+
+    def __init__(self, max_items=256):
+        self.max_items = max_items
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            content = self._items.get(key)
+            if content is not None:
+                self._items.move_to_end(key)
+            return content
+
+    def path(self, key):
+        """Memory documents have no file on disk"""
+        return None
+
+    def put(self, key, content):
+        prefix = _document_prefix(key)
+        with self._lock:
+            for stale in [k for k in self._items if k != key and k.startswith(prefix)]:
+                del self._items[stale]
+            self._items[key] = content
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+class DiskDocumentStore:
+    """
+    Local directory store
+
+    Files can be handed straight to send_file, which lets the WSGI server
+    stream them with sendfile instead of copying through Python.
+    """
+
+    def __init__(self, directory):
+        self.directory = os.path.abspath(directory)
+
+    def get(self, key):
+        file_path = self.path(key)
+        if file_path is None:
+            return None
+        try:
+            with open(file_path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def path(self, key):
+        file_path = self._file_path(key)
+        return file_path if os.path.isfile(file_path) else None
+
+    def put(self, key, content):
+        file_path = self._file_path(key)
+        directory = os.path.dirname(file_path)
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temp file and rename so readers never see a partial PDF
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, file_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self._remove_stale_versions(file_path)
+
+    def _file_path(self, key):
+        order_reference, doc_type, version = key.split("/")
+        return os.path.join(
+            self.directory,
+            secure_filename(order_reference),
+            f"{secure_filename(doc_type)}-{secure_filename(version)}.pdf",
+        )
+
+    @staticmethod
+    def _remove_stale_versions(file_path):
+        directory, filename = os.path.split(file_path)
+        doc_prefix = filename.split("-", 1)[0] + "-"
+        for name in os.listdir(directory):
+            if name != filename and name.startswith(doc_prefix) and name.endswith(".pdf"):
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+class S3DocumentStore:
+    """
+    S3-compatible object store (AWS S3, MinIO, R2, ...)
+
+    Requires boto3. Old versions are not deleted here; use a bucket
+    lifecycle rule on the prefix to expire them.
+    """
+
+    def __init__(self, bucket, prefix="documents/", endpoint_url=None):
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix
+        self._client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def get(self, key):
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._object_key(key))
+            return response["Body"].read()
+        except self._client.exceptions.NoSuchKey:
+            return None
+
+    def path(self, key):
+        """Objects are not on the local filesystem"""
+        return None
+
+    def put(self, key, content):
+        self._client.put_object(
+            Bucket=self.bucket,
+            Key=self._object_key(key),
+            Body=content,
+            ContentType="application/pdf",
+        )
+
+    def _object_key(self, key):
+        return f"{self.prefix}{key}.pdf"
+
+
+def get_document_store():
+    """
+    Get the document store configured for the current app
+
+    The store is created once per app and kept in app.extensions.
+
+    Returns:
+        MemoryDocumentStore, DiskDocumentStore or S3DocumentStore
+    """
+    store = current_app.extensions.get("document_store")
+    if store is None:
+        store = _create_store(current_app.config)
+        current_app.extensions["document_store"] = store
+    return store
+
+
+def _create_store(config):
+    backend = (config.get("DOCUMENT_CACHE_BACKEND") or "disk").lower()
+
+    if backend == "memory":
+        return MemoryDocumentStore(config.get("DOCUMENT_CACHE_MAX_ITEMS", 256))
+
+    if backend == "s3":
+        bucket = config.get("DOCUMENT_CACHE_S3_BUCKET")
+        try:
+            if not bucket:
+                raise ValueError("DOCUMENT_CACHE_S3_BUCKET is not set")
+            return S3DocumentStore(
+                bucket,
+                prefix=config.get("DOCUMENT_CACHE_S3_PREFIX", "documents/"),
+                endpoint_url=config.get("DOCUMENT_CACHE_S3_ENDPOINT_URL"),
+            )
+        except (ImportError, ValueError) as e:
+            logger.warning(f"S3 document store unavailable, using disk store: {e}")
+
+    return DiskDocumentStore(config.get("DOCUMENT_CACHE_DIR"))
+
+
+def _document_prefix(key):
+    return key.rsplit("/", 1)[0] + "/"
@@ -0,0 +1,190 @@
+"""
+Event hub
+Routes pub/sub events to many local listeners over one subscription
+
+Server-sent event streams park one connection per browser tab. Giving each
+its own Redis subscription would open thousands of Redis connections, so
+each worker process keeps a single subscription per channel and hands
+messages to per-key in-memory queues instead.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app
+
+from app.utils.pubsub import listen, resubscribe_to_redis
+
+logger = logging.getLogger(__name__)
+
+# Seconds a listener waits for a message before checking for shutdown
+POLL_SECONDS = 1.0
+
+
+class EventHub:
+    """Fans messages on one channel out to listeners keyed by message[key_field]"""
+
+    def __init__(self, app, channel, key_field="user_id", queue_size=100):
+        self.app = app
+        self.channel = channel
+        self.key_field = key_field
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._listeners = defaultdict(set)
+        self._thread = None
+        self._stopped = threading.Event()
+        self._subscribed = threading.Event()
+
+    def register(self, key):
+        """
+        Start receiving messages for a key
+
+        Args:
+            key: Value of message[key_field] to receive (e.g. a user ID)
+
+        Returns:
+            queue.Queue: Inbox of decoded messages
+        """
+        inbox = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._listeners[key].add(inbox)
+        self._ensure_running()
+        return inbox
+
+    def unregister(self, key, inbox):
+        """Stop receiving messages on an inbox returned by register()"""
+        with self._lock:
+            self._listeners[key].discard(inbox)
+            if not self._listeners[key]:
+                del self._listeners[key]
+
+    def listener_count(self):
+        """Number of registered inboxes"""
+        with self._lock:
+            return sum(len(inboxes) for inboxes in self._listeners.values())
+
+    def stop(self):
+        """Stop the subscription thread"""
+        self._stopped.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=POLL_SECONDS * 2)
+        self._thread = None
+
+    def dispatch(self, message):
+        """Deliver a message to every inbox registered for its key"""
+        if not isinstance(message, dict):
+            return
+        with self._lock:
+            inboxes = list(self._listeners.get(message.get(self.key_field), ()))
+
+        for inbox in inboxes:
+            try:
+                inbox.put_nowait(message)
+            except queue.Full:
+                # Slow consumer: drop its oldest message rather than block the hub
+                try:
+                    inbox.get_nowait()
+                    inbox.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._subscribed.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"event-hub:{self.channel}", daemon=True
+            )
+            self._thread.start()
+
+        # Don't let the first listener miss events published before the subscription
+        self._subscribed.wait(timeout=POLL_SECONDS * 2)
+
+    def _run(self):
+        with self.app.app_context():
+            subscription = listen(self.channel)
+            self._subscribed.set()
+            try:
+                while not self._stopped.is_set():
+                    subscription = self._consume(subscription)
+            finally:
+                subscription.close()
+
+    def _consume(self, subscription):
+        """
+        Wait one poll for a message and dispatch it
+
+        Args:
+            subscription: Current subscription
+
+        Returns:
+            Subscription: The subscription to poll next
+        """
+        started = time.monotonic()
+        message = subscription.wait(timeout=POLL_SECONDS)
+        if message is not None:
+            self.dispatch(message)
+        elif not subscription.is_local and time.monotonic() - started < POLL_SECONDS / 2:
+            # wait() returns early only when the Redis connection dropped
+            logger.warning(f"Event hub lost its subscription to {self.channel}; resubscribing")
+            subscription.close()
+            time.sleep(POLL_SECONDS)
+            return listen(self.channel)
+
+        # Subscribed while Redis was down: rejoin the other workers once it is back
+        replacement = resubscribe_to_redis(subscription)
+        if replacement is not None:
+            logger.info(f"Event hub moved its subscription to {self.channel} back to Redis")
+            return replacement
+        return subscription
+
+
+def get_event_hub(channel, key_field="user_id"):
+    """
+    Get this process's hub for a channel
+
+    Args:
+        channel: Pub/sub channel
+        key_field: Message field used to route messages to listeners
+
+    Returns:
+        EventHub
+    """
+    hubs = current_app.extensions.setdefault("event_hubs", {})
+    hub = hubs.get(channel)
+    if hub is None:
+        hub = EventHub(
+            current_app._get_current_object(),
+            channel,
+            key_field=key_field,
+            queue_size=current_app.config.get("SSE_QUEUE_SIZE", 100),
+        )
+        hubs[channel] = hub
+    return hub
+
+
+def format_sse(data, event=None, event_id=None):
+    """
+    Format one server-sent event
+
+    Args:
+        data: Event payload (already serialized to a string)
+        event: Optional event name
+        event_id: Optional event ID (sent back by the browser as Last-Event-ID)
+
+    Returns:
+        str
+    """
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in str(data).splitlines() or [""])
+    return "\n".join(lines) + "\n\n"
@@ -0,0 +1,232 @@
+"""
+Idempotency keys
+Replay the stored response for a repeated Idempotency-Key instead of re-running the view
+
+A client sends the same Idempotency-Key header on every attempt of one
+checkout. The first request claims the key with an INSERT ... ON CONFLICT
+DO NOTHING on idempotency_keys (unique per user) and runs the view; its
+response is stored on the row. Later requests with that key get the stored
+response (Idempotent-Replayed: true) without touching the order or M-Pesa
+code. A request that arrives while the first is still running gets 409;
+reusing a key for a different request body gets 422.
+
+Responses of 500 and above are not stored, so the client can retry them
+with the same key - unless the view already committed something a retry
+must not repeat. Such views call record_reference() (an M-Pesa checkout
+records its order once the order is committed), and from then on the
+response is stored whatever its status. The reference is returned in the
+Idempotent-Reference header so a retry can find what was created. Keys
+expire after IDEMPOTENCY_KEY_TTL_HOURS.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import current_app, g, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, or_, select, update
+
+from app.extensions import db
+from app.models import IdempotencyKey
+from app.utils.response_formatter import format_response
+from app.utils.sql import dialect_insert
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+REFERENCE_HEADER = "Idempotent-Reference"
+MAX_KEY_LENGTH = 255
+
+# A "processing" claim older than this belongs to a request that died mid-way
+PROCESSING_TIMEOUT = timedelta(minutes=5)
+
+
+def idempotent(f):
+    """
+    Decorator making a POST endpoint safe to retry with an Idempotency-Key header
+    Must be used with @jwt_required(); requests without the header run as usual
+
+    Usage:
+        @jwt_required()
+        @idempotent
+        def create_order():
+            ...
+    """
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return f(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            message = f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+            return jsonify(format_response(False, None, message)), 400
+
+        user_id = int(get_jwt_identity())
+        request_hash = _request_hash()
+
+        record = _claim(user_id, key, request_hash)
+        if record is not None:
+            return _existing_response(record, request_hash)
+
+        g.idempotency_key = (user_id, key)
+        g.idempotency_reference = None
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            if g.idempotency_reference is None:
+                _release(user_id, key)
+            else:
+                message = "Request failed after it was partly processed"
+                _store(
+                    user_id, key, make_response(jsonify(format_response(False, None, message)), 500)
+                )
+            raise
+
+        if response.status_code >= 500 and g.idempotency_reference is None:
+            _release(user_id, key)
+        else:
+            _store(user_id, key, response)
+        if g.idempotency_reference is not None:
+            response.headers[REFERENCE_HEADER] = g.idempotency_reference
+        return response
+
+    return decorated_function
+
+
+def record_reference(reference):
+    """
+    Record what the current idempotent request created, once it is committed
+
+    After this the response is stored even if the view goes on to fail, so
+    a retry replays it (with the reference) instead of running the view
+    again. Does nothing for requests without an Idempotency-Key.
+
+    Args:
+        reference: Reference of the created resource (e.g. an order reference)
+    """
+    if g.get("idempotency_key") is None:
+        return
+    user_id, key = g.idempotency_key
+    try:
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(reference=reference)
+        )
+        db.session.commit()
+        g.idempotency_reference = reference
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error recording reference for idempotency key {key}: {str(e)}")
+
+
+def _request_hash():
+    body = request.get_json(silent=True)
+    payload = json.dumps([request.method, request.path, body], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _claim(user_id, key, request_hash):
+    """Claim the key; returns None if claimed, else the existing record"""
+    now = datetime.utcnow()
+    ttl = timedelta(hours=current_app.config.get("IDEMPOTENCY_KEY_TTL_HOURS", 24))
+
+    for _ in range(2):
+        result = db.session.execute(
+            dialect_insert(IdempotencyKey)
+            .values(
+                user_id=user_id,
+                key=key,
+                request_hash=request_hash,
+                status="processing",
+                created_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=["user_id", "key"])
+        )
+        db.session.commit()
+        if result.rowcount:
+            return None
+
+        record = db.session.scalar(
+            select(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+            )
+        )
+        if record is None:
+            continue
+
+        # Expired keys and abandoned claims can be taken over (once)
+        stale = record.created_at < now - ttl or (
+            record.status == "processing" and record.created_at < now - PROCESSING_TIMEOUT
+        )
+        if not stale:
+            return record
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.id == record.id,
+                or_(
+                    IdempotencyKey.created_at < now - ttl,
+                    IdempotencyKey.status == "processing",
+                ),
+            )
+        )
+        db.session.commit()
+    return record
+
+
+def _existing_response(record, request_hash):
+    if record.request_hash != request_hash:
+        message = f"{IDEMPOTENCY_HEADER} was already used for a different request"
+        return jsonify(format_response(False, None, message)), 422
+
+    if record.status != "completed":
+        message = f"A request with this {IDEMPOTENCY_HEADER} is still being processed"
+        response = jsonify(format_response(False, None, message))
+        response.headers["Retry-After"] = "1"
+        return response, 409
+
+    response = jsonify(record.response_body)
+    response.status_code = record.response_code
+    response.headers[REPLAYED_HEADER] = "true"
+    if record.reference:
+        response.headers[REFERENCE_HEADER] = record.reference
+    return response
+
+
+def _store(user_id, key, response):
+    try:
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                status="completed",
+                response_code=response.status_code,
+                response_body=response.get_json(silent=True),
+                completed_at=datetime.utcnow(),
+            )
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error storing idempotent response for key {key}: {str(e)}")
+
+
+def _release(user_id, key):
+    try:
+        db.session.rollback()
+        db.session.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == "processing",
+            )
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error releasing idempotency key {key}: {str(e)}")
@@ -0,0 +1,257 @@
+"""
+JWT blocklist
+Tracks revoked access tokens without a database query per request
+
+- Every revoked JTI is stored in the blacklist_token table (durable record,
+  purged after expiry) and in Redis under a key whose TTL is the token's
+  remaining lifetime.
+- Each worker keeps an in-process Bloom filter of revoked JTIs. Tokens not
+  in the filter (the common case) are accepted without any network call.
+- New revocations are announced over pub/sub so every worker adds them to
+  its filter; the filter is also rebuilt periodically, which drops expired
+  entries and covers missed messages.
+- A worker that subscribed while Redis was down only hears its own
+  revocations; once Redis is back it re-subscribes there and rebuilds the
+  filter to pick up what other workers revoked in the meantime.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+
+import redis
+from flask import current_app
+from sqlalchemy import and_, or_
+
+from app.extensions import db
+from app.models import BlacklistToken
+from app.utils.pubsub import listen, publish, resubscribe_to_redis
+from app.utils.redis_client import get_redis, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+BLOCKLIST_KEY = "jwt:blocklist:{jti}"
+BLOCKLIST_CHANNEL = "jwt:blocklist"
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item):
+        return all(
+            self._bits[position // 8] & (1 << (position % 8)) for position in self._positions(item)
+        )
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+
+class TokenBlocklist:
+    """Per-process view of the revoked-token list"""
+
+    def __init__(self, capacity, rebuild_seconds):
+        self.capacity = capacity
+        self.rebuild_seconds = rebuild_seconds
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._built_at = 0.0
+        self._subscription = None
+
+    def is_revoked(self, jti):
+        """
+        Check whether a token has been revoked
+
+        Args:
+            jti: Token ID
+
+        Returns:
+            bool
+        """
+        self._refresh()
+        if jti not in self._bloom:
+            return False
+        return self._lookup(jti)
+
+    def revoke(self, jti, expires_at):
+        """
+        Revoke a token until it expires
+
+        Args:
+            jti: Token ID
+            expires_at: Token expiry (naive UTC datetime, None if it never expires)
+        """
+        db.session.add(BlacklistToken(token=jti, expires_at=expires_at))
+        db.session.commit()
+
+        self._cache_in_redis(jti, expires_at)
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+        publish(BLOCKLIST_CHANNEL, {"jti": jti})
+
+    def _refresh(self):
+        with self._lock:
+            # Subscribe before (re)building so no revocation falls in between
+            if self._subscription is None:
+                self._subscription = listen(BLOCKLIST_CHANNEL)
+            else:
+                subscription = resubscribe_to_redis(self._subscription)
+                if subscription is not None:
+                    # Revocations from other workers were missed while local
+                    self._subscription = subscription
+                    self._bloom = None
+
+            if self._bloom is None or time.monotonic() - self._built_at > self.rebuild_seconds:
+                self._rebuild()
+
+            while True:
+                message = self._subscription.wait(timeout=0)
+                if message is None:
+                    break
+                if isinstance(message, dict) and message.get("jti"):
+                    self._bloom.add(message["jti"])
+
+    def _rebuild(self):
+        bloom = BloomFilter(self.capacity)
+        for (jti,) in _active_tokens_query().with_entities(BlacklistToken.token):
+            bloom.add(jti)
+        self._bloom = bloom
+        self._built_at = time.monotonic()
+
+    def _lookup(self, jti):
+        client = get_redis()
+        if client is not None:
+            try:
+                if client.exists(BLOCKLIST_KEY.format(jti=jti)):
+                    return True
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        # Redis miss (restart, eviction) or outage: fall back to the durable record
+        token = _active_tokens_query().filter(BlacklistToken.token == jti).first()
+        if token is None:
+            return False
+
+        if token.expires_at:
+            self._cache_in_redis(jti, token.expires_at)
+        return True
+
+    @staticmethod
+    def _cache_in_redis(jti, expires_at):
+        client = get_redis()
+        if client is None:
+            return
+
+        ttl = None
+        if expires_at is not None:
+            ttl = max(1, int((expires_at - datetime.utcnow()).total_seconds()))
+        try:
+            client.set(BLOCKLIST_KEY.format(jti=jti), 1, ex=ttl)
+        except redis.RedisError as e:
+            mark_unavailable(error=e)
+
+
+def get_blocklist():
+    """
+    Get the blocklist for the current app (one per worker process)
+
+    Returns:
+        TokenBlocklist
+    """
+    blocklist = current_app.extensions.get("jwt_blocklist")
+    if blocklist is None:
+        blocklist = TokenBlocklist(
+            capacity=current_app.config.get("JWT_BLOCKLIST_BLOOM_CAPACITY", 100_000),
+            rebuild_seconds=current_app.config.get("JWT_BLOCKLIST_REBUILD_SECONDS", 300),
+        )
+        current_app.extensions["jwt_blocklist"] = blocklist
+    return blocklist
+
+
+def is_token_revoked(jti):
+    """
+    Check whether a token has been revoked
+
+    Args:
+        jti: Token ID
+
+    Returns:
+        bool
+    """
+    return get_blocklist().is_revoked(jti)
+
+
+def revoke_token(jti, expires_at):
+    """
+    Revoke a token until it expires
+
+    Args:
+        jti: Token ID
+        expires_at: Token expiry (naive UTC datetime)
+    """
+    get_blocklist().revoke(jti, expires_at)
+
+
+def purge_expired_tokens():
+    """
+    Delete blocklist rows for tokens that have expired
+
+    Rows without expires_at are purged once they are older than the access
+    token lifetime.
+
+    Returns:
+        int: Number of rows deleted
+    """
+    now = datetime.utcnow()
+    expired = BlacklistToken.expires_at < now
+
+    lifetime = _access_token_lifetime()
+    if lifetime is not None:
+        expired = or_(
+            expired,
+            and_(BlacklistToken.expires_at.is_(None), BlacklistToken.created_at < now - lifetime),
+        )
+
+    deleted = BlacklistToken.query.filter(expired).delete(synchronize_session=False)
+    db.session.commit()
+
+    logger.info(f"Purged {deleted} expired blocklisted token(s)")
+    return deleted
+
+
+def _active_tokens_query():
+    now = datetime.utcnow()
+    lifetime = _access_token_lifetime()
+
+    legacy_active = BlacklistToken.expires_at.is_(None)
+    if lifetime is not None:
+        legacy_active = and_(legacy_active, BlacklistToken.created_at >= now - lifetime)
+
+    return BlacklistToken.query.filter(or_(BlacklistToken.expires_at >= now, legacy_active))
+
+
+def _access_token_lifetime():
+    """Access token lifetime as a timedelta, or None when tokens never expire"""
+    lifetime = current_app.config.get("JWT_ACCESS_TOKEN_EXPIRES")
+    if lifetime is False or lifetime is None:
+        return None
+    if isinstance(lifetime, timedelta):
+        return lifetime
+    return timedelta(seconds=lifetime)
@@ -2,13 +2,12 @@
 JWT callbacks configuration
 """
 
-from app.models import BlacklistToken
+from app.utils.jwt.blocklist import is_token_revoked
 
 
 def is_token_blacklisted(jwt_payload):
     """Check if token JTI is in blacklist"""
-    jti = jwt_payload["jti"]
-    return BlacklistToken.query.filter_by(token=jti).first() is not None
+    return is_token_revoked(jwt_payload["jti"])
 
 
 def setup_jwt_callbacks(jwt):
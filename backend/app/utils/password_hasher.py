@@ -0,0 +1,255 @@
+"""
+Password hasher
+Hashes and verifies passwords in a bounded worker pool
+
+scrypt/pbkdf2 hashing is deliberately expensive. Run inline, a burst of
+login attempts ties up every request thread and starves other traffic.
+hash_password() and check_password() hand the work to a small thread pool
+instead (hashlib's scrypt and pbkdf2 release the GIL while hashing).
+
+- Backpressure: at most PASSWORD_HASH_MAX_PENDING hashes may be queued or
+  running per process; callers wait up to PASSWORD_HASH_QUEUE_TIMEOUT
+  seconds for a slot and then get PasswordHasherBusy. The bound has to be
+  below the worker's request threads (GUNICORN_THREADS) to ever bite; the
+  default of threads - 1 keeps one thread free for other traffic. The pool
+  never runs more threads than there are slots.
+- Timeouts: callers wait up to PASSWORD_HASH_TIMEOUT seconds for a result,
+  then get PasswordHasherBusy; the slot stays taken until the hash finishes.
+- Cost: PASSWORD_HASH_METHOD is a werkzeug method string such as
+  "scrypt:32768:8:1" or "pbkdf2:sha256:1000000". needs_rehash() reports
+  hashes made with other parameters so login can upgrade them.
+- Metrics: password_hash_total, password_hash_duration_seconds,
+  password_hash_in_flight.
+
+PASSWORD_HASH_WORKERS = 0 hashes inline in the calling thread.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from flask import current_app
+from prometheus_client import Counter, Gauge, Histogram
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+DEFAULT_METHOD = "scrypt:32768:8:1"
+
+PASSWORD_HASH_TOTAL = Counter(
+    "password_hash_total",
+    "Password hash operations by operation and outcome",
+    ["operation", "outcome"],
+)
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "Time from submitting a password hash operation to receiving the result",
+    ["operation"],
+)
+
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Password hash operations queued or running",
+)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated or a hash timed out"""
+
+
+def normalize_method(method):
+    """
+    Expand a werkzeug hash method to the full form stored in hashes
+
+    Args:
+        method: e.g. "scrypt", "pbkdf2:sha256" or "pbkdf2:sha256:600000"
+
+    Returns:
+        str: e.g. "scrypt:32768:8:1" or "pbkdf2:sha256:600000"
+
+    Raises:
+        ValueError: Unsupported method or wrong number of parameters
+    """
+    name, *args = (method or DEFAULT_METHOD).split(":")
+
+    if name == "scrypt":
+        if not args:
+            return DEFAULT_METHOD
+        if len(args) != 3:
+            raise ValueError("scrypt takes three parameters (n:r:p)")
+        return ":".join([name, *args])
+
+    if name == "pbkdf2":
+        if len(args) > 2:
+            raise ValueError("pbkdf2 takes at most two parameters (hash:iterations)")
+        hash_name = args[0] if args else "sha256"
+        iterations = args[1] if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{int(iterations)}"
+
+    raise ValueError(f"Unsupported password hash method: {name}")
+
+
+class PasswordHasher:
+    """Bounded thread pool for password hashing (one per gunicorn worker)"""
+
+    def __init__(self, method, workers, max_pending, queue_timeout, hash_timeout=None):
+        self.method = normalize_method(method)
+        self.workers = min(workers, max_pending)
+        self.queue_timeout = queue_timeout
+        self.hash_timeout = hash_timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def hash(self, password):
+        """
+        Hash a password with the configured method
+
+        Raises:
+            PasswordHasherBusy: Pool saturated or hash timed out
+        """
+        return self._run("hash", generate_password_hash, password, self.method)
+
+    def check(self, password_hash, password):
+        """
+        Verify a password against a stored hash
+
+        Raises:
+            PasswordHasherBusy: Pool saturated or hash timed out
+        """
+        return self._run("check", check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with a different method or cost"""
+        return (password_hash or "").split("$", 1)[0] != self.method
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run(self, operation, func, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            PASSWORD_HASH_TOTAL.labels(operation, "rejected").inc()
+            raise PasswordHasherBusy("Password hasher is busy")
+
+        PASSWORD_HASH_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            if self.workers <= 0:
+                try:
+                    result = func(*args)
+                finally:
+                    self._release()
+            else:
+                try:
+                    future = self._get_executor().submit(func, *args)
+                except Exception:
+                    self._release()
+                    raise
+
+                # The slot is held until the hash finishes, even if the caller gives up
+                future.add_done_callback(lambda _future: self._release())
+                try:
+                    result = future.result(timeout=self.hash_timeout)
+                except FutureTimeoutError as e:
+                    future.cancel()
+                    PASSWORD_HASH_TOTAL.labels(operation, "timeout").inc()
+                    raise PasswordHasherBusy(
+                        f"Password hash timed out after {self.hash_timeout}s"
+                    ) from e
+        except PasswordHasherBusy:
+            raise
+        except Exception:
+            PASSWORD_HASH_TOTAL.labels(operation, "error").inc()
+            raise
+        finally:
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+        PASSWORD_HASH_TOTAL.labels(operation, "success").inc()
+        return result
+
+    def _release(self):
+        PASSWORD_HASH_IN_FLIGHT.dec()
+        self._slots.release()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="password-hash"
+                )
+            return self._executor
+
+
+def get_password_hasher():
+    """
+    Get the password hasher configured for the current app
+
+    Returns:
+        PasswordHasher
+    """
+    hasher = current_app.extensions.get("password_hasher")
+    if hasher is None:
+        config = current_app.config
+        hasher = PasswordHasher(
+            method=config.get("PASSWORD_HASH_METHOD", DEFAULT_METHOD),
+            workers=config.get("PASSWORD_HASH_WORKERS", 2),
+            max_pending=config.get("PASSWORD_HASH_MAX_PENDING", 1),
+            queue_timeout=config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 2),
+            hash_timeout=config.get("PASSWORD_HASH_TIMEOUT", 5),
+        )
+        current_app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def hash_password(password):
+    """
+    Hash a password in the hashing pool
+
+    Args:
+        password: Plain-text password
+
+    Returns:
+        str: werkzeug-format password hash
+
+    Raises:
+        PasswordHasherBusy: Pool saturated or hash timed out
+    """
+    return get_password_hasher().hash(password)
+
+
+def check_password(password_hash, password):
+    """
+    Verify a password in the hashing pool
+
+    Args:
+        password_hash: Stored werkzeug-format hash
+        password: Plain-text password
+
+    Returns:
+        bool
+
+    Raises:
+        PasswordHasherBusy: Pool saturated or hash timed out
+    """
+    return get_password_hasher().check(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """
+    Whether a stored hash should be replaced with one using the current method
+
+    Args:
+        password_hash: Stored werkzeug-format hash
+
+    Returns:
+        bool
+    """
+    return get_password_hasher().needs_rehash(password_hash)
@@ -0,0 +1,238 @@
+"""
+PDF renderer
+Renders document PDFs in a bounded pool of worker processes
+
+xhtml2pdf/reportlab rendering is CPU-bound and holds the GIL, so rendering
+in the request thread stalls every other request in the same gunicorn
+worker. render_pdf() hands the work to a small ProcessPoolExecutor instead.
+
+- Backpressure: at most PDF_RENDER_MAX_PENDING renders may be queued or
+  running per process; callers wait up to PDF_RENDER_QUEUE_TIMEOUT seconds
+  for a slot and then get PdfRenderUnavailable.
+- Timeouts: callers wait up to PDF_RENDER_TIMEOUT seconds for a result.
+- Metrics: pdf_render_total, pdf_render_duration_seconds, pdf_render_in_flight.
+
+PDF_RENDER_WORKERS = 0 renders inline in the calling thread (used in tests).
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from types import SimpleNamespace
+
+from flask import current_app
+from prometheus_client import Counter, Gauge, Histogram
+from xhtml2pdf import pisa
+
+from app.utils import template_registry
+
+logger = logging.getLogger(__name__)
+
+# Document type -> registered template
+DOCUMENT_TEMPLATES = {
+    "invoice": "documents/invoice.html",
+    "receipt": "documents/receipt.html",
+    "payment_slip": "emails/payment_slip.html",
+}
+
+COMPANY_NAME = "Phone Home Kenya"
+
+PDF_RENDER_TOTAL = Counter(
+    "pdf_render_total",
+    "PDF renders by document type and outcome",
+    ["doc_type", "outcome"],
+)
+
+PDF_RENDER_DURATION = Histogram(
+    "pdf_render_duration_seconds",
+    "Time from submitting a PDF render to receiving the result",
+    ["doc_type"],
+)
+
+PDF_RENDER_IN_FLIGHT = Gauge(
+    "pdf_render_in_flight",
+    "PDF renders queued or running in the render pool",
+)
+
+
+class PdfRenderUnavailable(Exception):
+    """Raised when the render pool is saturated or a render timed out"""
+
+
+class PdfRenderPool:
+    """Bounded process pool for PDF rendering (one per gunicorn worker)"""
+
+    def __init__(
+        self, workers, max_pending, queue_timeout, render_timeout, bytecode_cache_dir=None
+    ):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.render_timeout = render_timeout
+        self.bytecode_cache_dir = bytecode_cache_dir
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def render(self, doc_type, snapshot):
+        """
+        Render a document, blocking until done or a limit is hit
+
+        Args:
+            doc_type: Key of DOCUMENT_TEMPLATES
+            snapshot: Plain-data order snapshot (see DocumentService.snapshot)
+
+        Returns:
+            bytes: PDF content
+
+        Raises:
+            PdfRenderUnavailable: Pool saturated or render timed out
+            Exception: Rendering failed
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            PDF_RENDER_TOTAL.labels(doc_type, "rejected").inc()
+            raise PdfRenderUnavailable("PDF renderer is busy")
+
+        PDF_RENDER_IN_FLIGHT.inc()
+        started = time.perf_counter()
+
+        if self.workers <= 0:
+            try:
+                return _render_document(doc_type, snapshot)
+            finally:
+                self._release()
+                PDF_RENDER_DURATION.labels(doc_type).observe(time.perf_counter() - started)
+
+        try:
+            future = self._get_executor().submit(_render_document, doc_type, snapshot)
+        except Exception as e:
+            self._release()
+            if isinstance(e, BrokenProcessPool):
+                self._reset_executor()
+            raise
+
+        # The slot is held until the worker finishes, even if the caller gives up
+        future.add_done_callback(lambda _future: self._release())
+
+        try:
+            return future.result(timeout=self.render_timeout)
+        except FutureTimeoutError as e:
+            future.cancel()
+            PDF_RENDER_TOTAL.labels(doc_type, "timeout").inc()
+            raise PdfRenderUnavailable(f"PDF render timed out after {self.render_timeout}s") from e
+        except BrokenProcessPool:
+            self._reset_executor()
+            raise
+        finally:
+            PDF_RENDER_DURATION.labels(doc_type).observe(time.perf_counter() - started)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._pid = None
+
+    def _release(self):
+        PDF_RENDER_IN_FLIGHT.dec()
+        self._slots.release()
+
+    def _get_executor(self):
+        with self._lock:
+            # A pool inherited across fork() is unusable; start a fresh one
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=template_registry.configure,
+                    initargs=(self.bytecode_cache_dir,),
+                )
+                self._pid = os.getpid()
+            return self._executor
+
+    def _reset_executor(self):
+        logger.warning("PDF render pool broke; starting a new one")
+        with self._lock:
+            self._executor = None
+
+
+def get_render_pool():
+    """
+    Get the render pool configured for the current app
+
+    Returns:
+        PdfRenderPool
+    """
+    pool = current_app.extensions.get("pdf_render_pool")
+    if pool is None:
+        config = current_app.config
+        pool = PdfRenderPool(
+            workers=config.get("PDF_RENDER_WORKERS", 2),
+            max_pending=config.get("PDF_RENDER_MAX_PENDING", 8),
+            queue_timeout=config.get("PDF_RENDER_QUEUE_TIMEOUT", 5),
+            render_timeout=config.get("PDF_RENDER_TIMEOUT", 30),
+            bytecode_cache_dir=config.get("TEMPLATE_BYTECODE_CACHE_DIR"),
+        )
+        current_app.extensions["pdf_render_pool"] = pool
+    return pool
+
+
+def render_pdf(doc_type, order_snapshot):
+    """
+    Render a document PDF in the render pool
+
+    Args:
+        doc_type: 'invoice', 'receipt' or 'payment_slip'
+        order_snapshot: Plain-data order snapshot (see DocumentService.snapshot)
+
+    Returns:
+        bytes: PDF content, or None if rendering failed
+
+    Raises:
+        PdfRenderUnavailable: Pool saturated or render timed out
+    """
+    try:
+        content = get_render_pool().render(doc_type, order_snapshot)
+    except PdfRenderUnavailable:
+        raise
+    except Exception as e:
+        PDF_RENDER_TOTAL.labels(doc_type, "error").inc()
+        logger.error(f"Error rendering {doc_type} PDF: {str(e)}")
+        return None
+
+    PDF_RENDER_TOTAL.labels(doc_type, "success").inc()
+    return content
+
+
+def _render_document(doc_type, snapshot):
+    """Render HTML and convert it to PDF (runs inside a worker process)"""
+    order = _to_namespace(snapshot)
+    html = template_registry.render(
+        DOCUMENT_TEMPLATES[doc_type],
+        order=order,
+        payment=order.payment,
+        company_name=COMPANY_NAME,
+        now=snapshot["rendered_at"],
+    )
+
+    pdf_buffer = BytesIO()
+    pisa_status = pisa.CreatePDF(BytesIO(html.encode("utf-8")), pdf_buffer)
+    if pisa_status.err:
+        raise RuntimeError(f"PDF generation error: {pisa_status.err}")
+
+    return pdf_buffer.getvalue()
+
+
+def _to_namespace(value):
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: _to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [_to_namespace(item) for item in value]
+    return value
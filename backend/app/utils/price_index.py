@@ -0,0 +1,186 @@
+"""
+Price index
+Per-worker lookup of authoritative product and variation prices
+
+Built from products and product_variations with two column-only queries
+and kept until the catalog version changes. Product writes bump the
+version in every worker through pub/sub; CATALOG_PRICE_INDEX_TTL bounds
+staleness if an invalidation is missed. Cart and checkout prices come
+from here, never from the client.
+"""
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import Product, ProductVariation
+from app.utils.pubsub import listen, publish, resubscribe_to_redis
+
+CATALOG_CHANNEL = "catalog:changed"
+
+
+def split_variation_name(variation_name):
+    """
+    Split a cart variation name ("8GB - 256GB") into (ram, storage)
+
+    Args:
+        variation_name: Variation name
+
+    Returns:
+        tuple: (ram, storage), or None when the name is not in that form
+    """
+    if not variation_name or " - " not in variation_name:
+        return None
+    ram, storage = variation_name.split(" - ", 1)
+    return ram.strip(), storage.strip()
+
+
+class PriceIndex:
+    """(product_id, ram, storage) -> price, rebuilt per catalog version"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._version = 0
+        self._built_version = None
+        self._expires_at = 0.0
+        self._base_prices = {}
+        self._variation_prices = {}
+        self._subscription = None
+
+    @property
+    def version(self):
+        """Catalog version this worker has seen"""
+        with self._lock:
+            self._drain_invalidations()
+            return self._version
+
+    def base_price(self, product_id):
+        """
+        Price of a product without a variation
+
+        Args:
+            product_id: Product ID
+
+        Returns:
+            float or None: None for unknown products
+        """
+        return self._snapshot()[0].get(int(product_id))
+
+    def variation_price(self, product_id, variation_name):
+        """
+        Price of a product variation
+
+        Args:
+            product_id: Product ID
+            variation_name: Cart variation name ("8GB - 256GB")
+
+        Returns:
+            float or None: None when the variation does not exist
+        """
+        parts = split_variation_name(variation_name)
+        if parts is None:
+            return None
+        return self._snapshot()[1].get((int(product_id), *parts))
+
+    def unit_price(self, product_id, variation_name=None, fallback=None):
+        """
+        Price one cart line
+
+        Args:
+            product_id: Product ID
+            variation_name: Optional variation name
+            fallback: Price to use when the variation no longer exists
+
+        Returns:
+            float or None: None for unknown products
+        """
+        base_prices, variation_prices = self._snapshot()
+        if variation_name:
+            parts = split_variation_name(variation_name)
+            price = variation_prices.get((int(product_id), *parts)) if parts else None
+            if price is not None:
+                return price
+            if fallback:
+                return float(fallback)
+        return base_prices.get(int(product_id))
+
+    def invalidate(self):
+        """Start a new catalog version in this worker"""
+        with self._lock:
+            self._version += 1
+
+    def _snapshot(self):
+        with self._lock:
+            self._drain_invalidations()
+            if self._built_version == self._version and self._expires_at > time.monotonic():
+                return self._base_prices, self._variation_prices
+            version = self._version
+
+        base_prices = {
+            product_id: float(price)
+            for product_id, price in db.session.execute(select(Product.id, Product.price))
+        }
+        variation_prices = {
+            (product_id, (ram or "").strip(), (storage or "").strip()): float(price)
+            for product_id, ram, storage, price in db.session.execute(
+                select(
+                    ProductVariation.product_id,
+                    ProductVariation.ram,
+                    ProductVariation.storage,
+                    ProductVariation.price,
+                )
+            )
+        }
+
+        with self._lock:
+            # Keep the build only if the catalog did not change while we were reading
+            if self._version == version:
+                self._base_prices = base_prices
+                self._variation_prices = variation_prices
+                self._built_version = version
+                self._expires_at = time.monotonic() + self.ttl
+        return base_prices, variation_prices
+
+    def _drain_invalidations(self):
+        if self._subscription is None:
+            subscription = listen(CATALOG_CHANNEL)
+        else:
+            subscription = resubscribe_to_redis(self._subscription)
+        if subscription is not None:
+            self._subscription = subscription
+            # A build from before subscribing may have missed a change
+            self._version += 1
+
+        while True:
+            message = self._subscription.wait(timeout=0)
+            if message is None:
+                break
+            self._version += 1
+
+
+def get_price_index():
+    """
+    Get the price index for the current app (one per worker process)
+
+    Returns:
+        PriceIndex
+    """
+    index = current_app.extensions.get("price_index")
+    if index is None:
+        index = PriceIndex(ttl=current_app.config.get("CATALOG_PRICE_INDEX_TTL", 300))
+        current_app.extensions["price_index"] = index
+    return index
+
+
+def bump_catalog_version():
+    """
+    Invalidate price indexes in every worker
+
+    Call after committing a change to product or variation prices.
+    """
+    get_price_index().invalidate()
+    publish(CATALOG_CHANNEL, {"changed_at": time.time()})
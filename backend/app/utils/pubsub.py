@@ -0,0 +1,203 @@
+"""
+Publish/subscribe helper
+Fans events out through Redis pub/sub so every gunicorn worker sees them,
+falling back to an in-process broker when Redis is not available
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+
+import redis
+
+from app.utils.redis_client import get_redis, mark_unavailable
+
+logger = logging.getLogger(__name__)
+
+
+class _LocalBroker:
+    """In-process broker used when Redis is disabled or unreachable"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, channel):
+        inbox = queue.Queue()
+        with self._lock:
+            self._subscribers[channel].add(inbox)
+        return inbox
+
+    def unsubscribe(self, channel, inbox):
+        with self._lock:
+            self._subscribers[channel].discard(inbox)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            inboxes = list(self._subscribers.get(channel, ()))
+        for inbox in inboxes:
+            inbox.put(message)
+        return len(inboxes)
+
+
+_local_broker = _LocalBroker()
+
+
+class Subscription:
+    """
+    A subscription to a single channel
+
+    Use as a context manager so the subscription is always released:
+
+        with listen("channel") as subscription:
+            message = subscription.wait(timeout=25)
+    """
+
+    def __init__(self, channel, redis_client=None):
+        self.channel = channel
+        self._pubsub = None
+        self._inbox = None
+
+        if redis_client is not None:
+            try:
+                self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                self._pubsub.subscribe(channel)
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+                self._pubsub = None
+
+        if self._pubsub is None:
+            self._inbox = _local_broker.subscribe(channel)
+
+    @property
+    def is_local(self):
+        """True when Redis was unavailable and only this process's messages arrive"""
+        return self._inbox is not None
+
+    def wait(self, timeout):
+        """
+        Block until a message arrives or the timeout expires
+
+        Args:
+            timeout: Maximum seconds to wait (0 polls without blocking)
+
+        Returns:
+            Decoded message dict, or None on timeout
+        """
+        if self._inbox is None and self._pubsub is None:
+            return None
+
+        if self._inbox is not None:
+            try:
+                return self._inbox.get(timeout=max(timeout, 0))
+            except queue.Empty:
+                return None
+
+        # Always read at least once so timeout=0 works as a non-blocking poll
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = max(deadline - time.monotonic(), 0)
+            try:
+                message = self._pubsub.get_message(timeout=remaining)
+            except redis.RedisError as e:
+                logger.warning(f"Lost pub/sub connection on {self.channel}: {e}")
+                return None
+            if message and message.get("type") == "message":
+                return _decode(message.get("data"))
+            if time.monotonic() >= deadline:
+                return None
+
+    def close(self):
+        """Release the subscription"""
+        if self._inbox is not None:
+            _local_broker.unsubscribe(self.channel, self._inbox)
+            self._inbox = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except redis.RedisError:
+                pass
+            self._pubsub = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def listen(channel):
+    """
+    Subscribe to a channel
+
+    Subscribe before reading the state you are waiting on, so an event
+    published in between is not lost.
+
+    Args:
+        channel: Channel name
+
+    Returns:
+        Subscription
+    """
+    return Subscription(channel, get_redis())
+
+
+def resubscribe_to_redis(subscription):
+    """
+    Move a subscription made while Redis was down back onto Redis
+
+    A local subscription only sees this process's messages, so long-lived
+    subscribers call this on every poll to rejoin the other workers once
+    Redis is reachable again.
+
+    Args:
+        subscription: Subscription returned by listen()
+
+    Returns:
+        Subscription or None: The new Redis subscription (the old one is
+        closed), or None while the current one should be kept
+    """
+    if not subscription.is_local or get_redis() is None:
+        return None
+
+    replacement = listen(subscription.channel)
+    if replacement.is_local:
+        replacement.close()
+        return None
+    subscription.close()
+    return replacement
+
+
+def publish(channel, payload):
+    """
+    Publish a JSON-serializable payload to a channel
+
+    Delivery is best-effort: failures are logged and never raised, so
+    callers can publish after a commit without guarding the call.
+
+    Args:
+        channel: Channel name
+        payload: JSON-serializable message
+    """
+    _local_broker.publish(channel, payload)
+
+    try:
+        client = get_redis()
+        if client is not None:
+            client.publish(channel, json.dumps(payload))
+    except redis.RedisError as e:
+        mark_unavailable(error=e)
+    except Exception as e:
+        logger.error(f"Error publishing to {channel}: {str(e)}")
+
+
+def _decode(data):
+    try:
+        return json.loads(data)
+    except (TypeError, ValueError):
+        return data
@@ -0,0 +1,264 @@
+"""
+Rate limiting
+Token-bucket request throttling applied before the view runs
+
+Each rule covers a group of endpoints and keys its buckets by client IP,
+authenticated user or the account named in the request body. Buckets live
+in Redis (one hash per key, updated atomically by a Lua script) so limits
+hold across workers; without Redis each worker falls back to an in-memory
+bucket table.
+
+Rejected requests get 429 with Retry-After before any database query,
+password hash or outgoing email.
+"""
+
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import redis
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from prometheus_client import Counter
+
+from app.utils.redis_client import get_redis, mark_unavailable
+from app.utils.response_formatter import format_response
+
+logger = logging.getLogger(__name__)
+
+BUCKET_KEY = "ratelimit:{rule}:{key}"
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+RATE_LIMIT_REJECTED = Counter(
+    "rate_limit_rejected_total",
+    "Requests rejected by rate limiting",
+    ["rule"],
+)
+
+# KEYS[1] bucket hash; ARGV capacity, refill per second, now, ttl (seconds)
+# Returns {allowed, milliseconds until a token is available}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+if allowed == 1 then
+    return {1, 0}
+end
+return {0, math.ceil((1 - tokens) / rate * 1000)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A limit shared by a group of endpoints"""
+
+    name: str
+    limit: str
+    key: str = "ip"
+    endpoints: frozenset = field(default_factory=frozenset)
+    blueprints: frozenset = field(default_factory=frozenset)
+    methods: frozenset = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE"})
+
+    def matches(self, endpoint, blueprint, method):
+        if method not in self.methods:
+            return False
+        return endpoint in self.endpoints or blueprint in self.blueprints
+
+
+def parse_limit(limit):
+    """
+    Parse a limit such as "10/minute" or "3/hour"
+
+    Args:
+        limit: "<count>/<second|minute|hour|day>"
+
+    Returns:
+        tuple: (count, period_seconds)
+
+    Raises:
+        ValueError: Malformed limit
+    """
+    count, _, period = str(limit).partition("/")
+    period = period.strip().lower().rstrip("s")
+    if period not in PERIODS:
+        raise ValueError(f"Invalid rate limit: {limit}")
+    return int(count), PERIODS[period]
+
+
+class MemoryBuckets:
+    """Per-process token buckets, least recently used evicted first"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def hit(self, key, capacity, period):
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+        return allowed, 0 if allowed else (1 - tokens) / rate
+
+
+class RateLimiter:
+    """Token-bucket limiter using Redis when available"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.memory = MemoryBuckets()
+        self._script = None
+
+    def check(self, rule, key, capacity, period):
+        """
+        Take a token from a bucket
+
+        Returns:
+            tuple: (allowed, seconds until the next token)
+        """
+        bucket_key = BUCKET_KEY.format(rule=rule, key=key)
+        client = get_redis()
+        if client is not None:
+            try:
+                if self._script is None:
+                    self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+                allowed, retry_ms = self._script(
+                    keys=[bucket_key], args=[capacity, capacity / period, time.time(), period]
+                )
+                return bool(allowed), retry_ms / 1000
+            except redis.RedisError as e:
+                mark_unavailable(error=e)
+
+        return self.memory.hit(bucket_key, capacity, period)
+
+
+def get_rate_limiter():
+    """
+    Get the rate limiter for the current app
+
+    Returns:
+        RateLimiter
+    """
+    limiter = current_app.extensions.get("rate_limiter")
+    if limiter is None:
+        limiter = RateLimiter(default_rules(current_app.config))
+        current_app.extensions["rate_limiter"] = limiter
+    return limiter
+
+
+def default_rules(config):
+    """
+    Build the limit rules from config
+
+    Args:
+        config: App config
+
+    Returns:
+        list: RateLimitRule instances
+    """
+    logins = frozenset({"auth.login", "auth.admin_login"})
+    return [
+        RateLimitRule("login", config.get("RATE_LIMIT_LOGIN", "10/minute"), "ip", logins),
+        RateLimitRule(
+            "login_account", config.get("RATE_LIMIT_LOGIN_ACCOUNT", "5/minute"), "account", logins
+        ),
+        RateLimitRule(
+            "forgot_password",
+            config.get("RATE_LIMIT_FORGOT_PASSWORD", "5/minute"),
+            "ip",
+            frozenset({"auth.forgot_password"}),
+        ),
+        RateLimitRule(
+            "reset_email",
+            f"{config.get('RESET_EMAIL_LIMIT', 3)}/hour",
+            "account",
+            frozenset({"auth.forgot_password"}),
+        ),
+        RateLimitRule(
+            "catalog",
+            config.get("RATE_LIMIT_CATALOG", "300/minute"),
+            "user",
+            blueprints=frozenset({"products", "categories", "brands", "home"}),
+            methods=frozenset({"GET"}),
+        ),
+    ]
+
+
+def init_rate_limiting(app):
+    """
+    Enforce the rate limit rules on every request
+
+    Args:
+        app: Flask app
+    """
+
+    @app.before_request
+    def enforce_rate_limits():
+        if not current_app.config.get("RATE_LIMIT_ENABLED", True) or request.endpoint is None:
+            return None
+
+        limiter = get_rate_limiter()
+        for rule in limiter.rules:
+            if not rule.matches(request.endpoint, request.blueprint, request.method):
+                continue
+
+            key = _request_key(rule.key)
+            if key is None:
+                continue
+
+            capacity, period = parse_limit(rule.limit)
+            allowed, retry_after = limiter.check(rule.name, key, capacity, period)
+            if not allowed:
+                RATE_LIMIT_REJECTED.labels(rule.name).inc()
+                logger.warning(f"Rate limit '{rule.name}' exceeded by {key}")
+                return (
+                    jsonify(
+                        format_response(False, None, "Too many requests, please try again later")
+                    ),
+                    429,
+                    {"Retry-After": str(max(1, math.ceil(retry_after)))},
+                )
+        return None
+
+
+def _request_key(kind):
+    """Bucket key for the current request, or None if the rule does not apply"""
+    if kind == "account":
+        data = request.get_json(silent=True) or {}
+        email = data.get("email") if isinstance(data, dict) else None
+        return f"account:{str(email).strip().lower()}" if email else None
+
+    if kind == "user":
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None
+        if identity is not None:
+            return f"user:{identity}"
+
+    return f"ip:{request.remote_addr}"
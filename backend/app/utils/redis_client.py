@@ -0,0 +1,70 @@
+"""
+Redis client helper
+Provides a shared, lazily-created Redis connection with graceful fallback
+"""
+
+import logging
+import time
+
+import redis
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before retrying a Redis server that failed to respond
+RETRY_AFTER_SECONDS = 30
+
+_clients = {}
+_unavailable_until = {}
+
+
+def get_redis(url=None):
+    """
+    Get a Redis client for the configured REDIS_URL
+
+    Args:
+        url: Optional Redis URL (defaults to current app REDIS_URL)
+
+    Returns:
+        redis.Redis instance, or None when Redis is disabled or unreachable
+    """
+    if url is None:
+        url = current_app.config.get("REDIS_URL")
+
+    if not url:
+        return None
+
+    if _unavailable_until.get(url, 0) > time.monotonic():
+        return None
+
+    client = _clients.get(url)
+    if client is not None:
+        return client
+
+    try:
+        client = redis.Redis.from_url(
+            url, socket_connect_timeout=1, socket_timeout=2, decode_responses=True
+        )
+        client.ping()
+    except redis.RedisError as e:
+        mark_unavailable(url, e)
+        return None
+
+    _clients[url] = client
+    return client
+
+
+def mark_unavailable(url=None, error=None):
+    """
+    Stop using a Redis server for RETRY_AFTER_SECONDS after a failure
+
+    Args:
+        url: Redis URL that failed (defaults to current app REDIS_URL)
+        error: Optional exception for logging
+    """
+    if url is None:
+        url = current_app.config.get("REDIS_URL")
+
+    _clients.pop(url, None)
+    _unavailable_until[url] = time.monotonic() + RETRY_AFTER_SECONDS
+    logger.warning(f"Redis unavailable, using in-process fallback: {error}")
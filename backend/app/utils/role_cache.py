@@ -0,0 +1,127 @@
+"""
+Role cache
+Short-lived per-worker cache of user roles for authorization checks
+
+Admin dashboards fire many requests in a row; caching the role for a few
+seconds saves a SELECT per request. Role changes and deletions invalidate
+the entry in every worker through pub/sub, so a demoted or deleted admin
+loses access immediately rather than after the TTL.
+"""
+
+import threading
+import time
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import User
+from app.utils.pubsub import listen, publish, resubscribe_to_redis
+
+ROLE_CHANNEL = "auth:roles"
+
+
+class RoleCache:
+    """user_id -> role cache with TTL and invalidation versions"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._versions = {}
+        self._subscription = None
+
+    def get_role(self, user_id):
+        """
+        Get a user's role, loading it from the database on a miss
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            str: Lower-case role, or None if the user does not exist
+        """
+        with self._lock:
+            self._drain_invalidations()
+            entry = self._entries.get(user_id)
+            if entry and entry[1] > time.monotonic():
+                return entry[0]
+            version = self._versions.get(user_id, 0)
+
+        user = db.session.get(User, user_id)
+        role = (user.role or "user").lower() if user else None
+
+        with self._lock:
+            # Skip caching if the user was invalidated while we were reading
+            if self._versions.get(user_id, 0) == version:
+                self._entries[user_id] = (role, time.monotonic() + self.ttl)
+        return role
+
+    def invalidate(self, user_id):
+        """
+        Drop a cached role in this worker
+
+        Args:
+            user_id: User ID
+        """
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+    def _drain_invalidations(self):
+        if self._subscription is None:
+            subscription = listen(ROLE_CHANNEL)
+        else:
+            subscription = resubscribe_to_redis(self._subscription)
+        if subscription is not None:
+            self._subscription = subscription
+            # Anything cached before subscribing may have missed an invalidation
+            self._entries.clear()
+
+        while True:
+            message = self._subscription.wait(timeout=0)
+            if message is None:
+                break
+            if isinstance(message, dict) and "user_id" in message:
+                user_id = message["user_id"]
+                self._entries.pop(user_id, None)
+                self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+def get_role_cache():
+    """
+    Get the role cache for the current app (one per worker process)
+
+    Returns:
+        RoleCache
+    """
+    cache = current_app.extensions.get("role_cache")
+    if cache is None:
+        cache = RoleCache(ttl=current_app.config.get("ROLE_CACHE_TTL", 30))
+        current_app.extensions["role_cache"] = cache
+    return cache
+
+
+def get_user_role(user_id):
+    """
+    Get a user's role through the per-worker cache
+
+    Args:
+        user_id: User ID
+
+    Returns:
+        str: Lower-case role, or None if the user does not exist
+    """
+    return get_role_cache().get_role(user_id)
+
+
+def invalidate_user_role(user_id):
+    """
+    Invalidate a user's cached role in every worker
+
+    Call after committing a role change or deleting the user.
+
+    Args:
+        user_id: User ID
+    """
+    get_role_cache().invalidate(user_id)
+    publish(ROLE_CHANNEL, {"user_id": user_id})
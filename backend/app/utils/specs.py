@@ -0,0 +1,195 @@
+"""
+Product spec parsing
+Turns free-text spec fields ("8GB", "5000mAh", '6.7" AMOLED') into numbers
+
+SPEC_ROWS lists the spec fields compared side by side, in display order,
+with the parser that extracts each one's numeric value. Parsed specs are
+kept per worker in a SpecCache keyed by product ID and updated_at, so a
+product is parsed again only after it is edited.
+
+NUMERIC_SPEC_COLUMNS maps the range-filterable specs to the indexed
+columns on products that ProductService fills on every write.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+_NUMBER = r"(\d{1,3}(?:,\d{3})+|\d+(?:[.,]\d+)?)"
+_CAPACITY = re.compile(_NUMBER + r"\s*(TB|GB|MB)\b", re.IGNORECASE)
+_MAH = re.compile(_NUMBER + r"\s*mAh\b", re.IGNORECASE)
+_INCHES = re.compile(_NUMBER + r"\s*(?:\"|”|''|-?\s*inch(?:es)?\b|in\b)", re.IGNORECASE)
+_MEGAPIXELS = re.compile(_NUMBER + r"\s*MP\b", re.IGNORECASE)
+
+_GB_PER_UNIT = {"tb": 1024, "gb": 1, "mb": 1 / 1024}
+
+
+def _to_number(text):
+    """'5,000' -> 5000.0, '6.7' and '6,7' -> 6.7"""
+    if re.fullmatch(r"\d{1,3}(?:,\d{3})+", text):
+        text = text.replace(",", "")
+    return float(text.replace(",", "."))
+
+
+def _tidy(value):
+    value = round(value, 2)
+    return int(value) if value.is_integer() else value
+
+
+def parse_capacity_gb(text):
+    """
+    Memory or storage size in GB (first size in the text)
+
+    Args:
+        text: e.g. "8GB", "1TB SSD", "512 MB"
+
+    Returns:
+        int or float or None
+    """
+    match = _CAPACITY.search(text or "")
+    if not match:
+        return None
+    return _tidy(_to_number(match.group(1)) * _GB_PER_UNIT[match.group(2).lower()])
+
+
+def parse_battery_mah(text):
+    """
+    Battery capacity in mAh
+
+    Args:
+        text: e.g. "5000mAh", "4,500 mAh with 45W charging"
+
+    Returns:
+        int or float or None
+    """
+    match = _MAH.search(text or "")
+    return _tidy(_to_number(match.group(1))) if match else None
+
+
+def parse_display_inches(text):
+    """
+    Screen diagonal in inches
+
+    Args:
+        text: e.g. '6.7" AMOLED', "6.1-inch OLED", "14 inches"
+
+    Returns:
+        int or float or None
+    """
+    match = _INCHES.search(text or "")
+    return _tidy(_to_number(match.group(1))) if match else None
+
+
+def parse_megapixels(text):
+    """
+    Highest camera resolution in megapixels
+
+    Args:
+        text: e.g. "50MP + 12MP + 10MP"
+
+    Returns:
+        int or float or None
+    """
+    values = [_to_number(value) for value in _MEGAPIXELS.findall(text or "")]
+    return _tidy(max(values)) if values else None
+
+
+# (field, label, unit, parser, higher_is_better); parser None for text-only rows
+SPEC_ROWS = [
+    ("ram", "RAM", "GB", parse_capacity_gb, True),
+    ("storage", "Storage", "GB", parse_capacity_gb, True),
+    ("processor", "Processor", None, None, False),
+    ("display", "Display", "in", parse_display_inches, False),
+    ("battery", "Battery", "mAh", parse_battery_mah, True),
+    ("main_camera", "Main Camera", "MP", parse_megapixels, True),
+    ("front_camera", "Front Camera", "MP", parse_megapixels, True),
+    ("os", "Operating System", None, None, False),
+    ("connectivity", "Connectivity", None, None, False),
+    ("colors", "Colors", None, None, False),
+]
+
+
+# Filter name -> (spec field, products column, parser)
+NUMERIC_SPEC_COLUMNS = {
+    "ram": ("ram", "ram_gb", parse_capacity_gb),
+    "storage": ("storage", "storage_gb", parse_capacity_gb),
+    "battery": ("battery", "battery_mah", parse_battery_mah),
+    "display": ("display", "display_inches", parse_display_inches),
+}
+
+
+def numeric_specs(product):
+    """
+    Values for the numeric spec columns of a product
+
+    Args:
+        product: Product instance (any subclass)
+
+    Returns:
+        dict: column name -> number or None
+    """
+    values = {}
+    for field, column, parser in NUMERIC_SPEC_COLUMNS.values():
+        raw = getattr(product, field, None)
+        values[column] = parser(raw) if isinstance(raw, str) else None
+    return values
+
+
+def parse_specs(product):
+    """
+    Raw and parsed value of every SPEC_ROWS field of a product
+
+    Fields the product type does not have are None.
+
+    Args:
+        product: Product instance (any subclass)
+
+    Returns:
+        dict: field -> {"raw": str or None, "value": number or None}
+    """
+    specs = {}
+    for field, _, _, parser, _ in SPEC_ROWS:
+        raw = getattr(product, field, None)
+        raw = raw.strip() if isinstance(raw, str) and raw.strip() else None
+        specs[field] = {"raw": raw, "value": parser(raw) if parser and raw else None}
+    return specs
+
+
+class SpecCache:
+    """Per-worker LRU of parsed specs keyed by (product ID, updated_at)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, product_id, version):
+        with self._lock:
+            entry = self._entries.get(product_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(product_id)
+            return entry[1]
+
+    def put(self, product_id, version, specs):
+        with self._lock:
+            self._entries[product_id] = (version, specs)
+            self._entries.move_to_end(product_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+def get_spec_cache():
+    """
+    Get the parsed spec cache for the current app (one per worker process)
+
+    Returns:
+        SpecCache
+    """
+    cache = current_app.extensions.get("spec_cache")
+    if cache is None:
+        cache = SpecCache(max_entries=current_app.config.get("SPEC_CACHE_SIZE", 5000))
+        current_app.extensions["spec_cache"] = cache
+    return cache
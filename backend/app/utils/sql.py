@@ -0,0 +1,32 @@
+"""
+SQL helpers
+Dialect-specific statements shared by services
+"""
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+
+def dialect_insert(table):
+    """
+    INSERT construct for the session's dialect, with ON CONFLICT support
+
+    PostgreSQL and SQLite share the on_conflict_do_nothing() /
+    on_conflict_do_update() / .excluded API.
+
+    Args:
+        table: Table or mapped class
+
+    Returns:
+        Insert
+
+    Raises:
+        NotImplementedError: Dialect without ON CONFLICT
+    """
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table)
+    if dialect == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT is not supported on {dialect}")
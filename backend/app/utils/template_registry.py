@@ -0,0 +1,99 @@
+"""
+Template registry
+Compiles the HTML templates in app/templates once per process
+
+Documents and emails used to be rendered with render_template_string,
+which parses and compiles the template source on every call. The registry
+keeps compiled templates in a jinja2.Environment and stores their bytecode
+on disk, so new workers skip compilation as well.
+
+The registry does not need a Flask app context, so it also works inside
+PDF render worker processes.
+"""
+
+import os
+import tempfile
+import threading
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
+
+_lock = threading.Lock()
+_environment = None
+_bytecode_cache_dir = os.path.join(tempfile.gettempdir(), "phonehome-jinja")
+
+
+def configure(bytecode_cache_dir=None):
+    """
+    Set where compiled template bytecode is stored
+
+    Must be called before the first render to take effect.
+
+    Args:
+        bytecode_cache_dir: Directory for bytecode files (None disables the disk cache)
+    """
+    global _bytecode_cache_dir, _environment
+    with _lock:
+        _bytecode_cache_dir = bytecode_cache_dir
+        _environment = None
+
+
+def get_environment():
+    """
+    Get the shared template environment, creating it on first use
+
+    Returns:
+        jinja2.Environment
+    """
+    global _environment
+    if _environment is None:
+        with _lock:
+            if _environment is None:
+                _environment = _create_environment(_bytecode_cache_dir)
+    return _environment
+
+
+def get_template(name):
+    """
+    Get a compiled template by name
+
+    Args:
+        name: Template path relative to app/templates (e.g. "documents/invoice.html")
+
+    Returns:
+        jinja2.Template
+    """
+    return get_environment().get_template(name)
+
+
+def render(name, **context):
+    """
+    Render a registered template
+
+    Args:
+        name: Template path relative to app/templates
+        **context: Template context variables
+
+    Returns:
+        Rendered template string
+    """
+    return get_template(name).render(**context)
+
+
+def _create_environment(bytecode_cache_dir):
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        try:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+        except OSError:
+            bytecode_cache = None
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=select_autoescape(["html"]),
+        bytecode_cache=bytecode_cache,
+        # Templates ship with the code, so never stat them for changes
+        auto_reload=False,
+    )
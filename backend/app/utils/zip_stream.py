@@ -0,0 +1,55 @@
+"""
+Streaming ZIP writer
+Builds a ZIP archive incrementally so it can be sent as a streamed response
+"""
+
+import time
+import zipfile
+
+
+class _ChunkBuffer:
+    """Write-only sink that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(entries):
+    """
+    Yield a ZIP archive chunk by chunk
+
+    Only the current entry is held in memory. The buffer has no seek(), so
+    zipfile writes data descriptors after each entry instead of seeking
+    back to patch headers.
+
+    Args:
+        entries: Iterable of (filename, bytes) pairs
+
+    Yields:
+        bytes: Consecutive pieces of the archive
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for filename, content in entries:
+            info = zipfile.ZipInfo(filename, date_time=time.localtime()[:6])
+            archive.writestr(info, content)
+
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+
+    chunk = buffer.drain()
+    if chunk:
+        yield chunk
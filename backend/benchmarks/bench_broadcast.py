@@ -0,0 +1,81 @@
+"""
+Broadcast fan-out benchmark
+Compares notifying every user with one create_notification() commit per
+user against the chunked INSERT ... SELECT broadcast
+
+The per-row path is timed on a sample and extrapolated, since running it
+for every user is the problem being measured.
+
+Usage (from backend/):
+    python -m benchmarks.bench_broadcast --users 100000
+    python -m benchmarks.bench_broadcast --users 20000 --chunk-size 2000
+"""
+
+import argparse
+import time
+
+from sqlalchemy import insert
+
+from app import create_app
+from app.extensions import db
+from app.models import Notification, User
+from app.services.broadcast_service import BroadcastService
+from app.services.notification_service import NotificationService
+
+
+def _seed_users(count):
+    rows = [
+        {
+            "username": f"bench{i}",
+            "email": f"bench{i}@example.com",
+            "phone_number": "0700000000",
+            "password_hash": "x",
+            "role": "user",
+            "unread_notifications": 0,
+        }
+        for i in range(count)
+    ]
+    db.session.execute(insert(User), rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=500, help="users timed on the per-row path")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    app.config["NOTIFICATION_BROADCAST_ASYNC"] = False
+    app.config["NOTIFICATION_BROADCAST_CHUNK_SIZE"] = args.chunk_size
+
+    with app.app_context():
+        db.create_all()
+        _seed_users(args.users)
+        admin_id = db.session.query(User.id).first()[0]
+
+        sample_ids = [row[0] for row in db.session.query(User.id).limit(args.sample)]
+        started = time.perf_counter()
+        for user_id in sample_ids:
+            NotificationService.create_notification(user_id, "Per-row notification")
+        per_row = (time.perf_counter() - started) / len(sample_ids)
+
+        started = time.perf_counter()
+        broadcast = BroadcastService.start_broadcast(admin_id, "Broadcast notification", "all")
+        bulk = time.perf_counter() - started
+
+        assert Notification.query.filter_by(message="Broadcast notification").count() == (
+            broadcast.sent_count
+        )
+
+        print(f"users:                  {args.users}")
+        print(f"per-row (extrapolated): {per_row * args.users:10.2f} s")
+        print(f"broadcast:              {bulk:10.2f} s  ({broadcast.sent_count} rows)")
+        print(f"speedup:                {per_row * args.users / bulk:10.1f}x")
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Login throughput benchmark
+Floods /api/auth/login from concurrent clients while probing /health, with
+password hashing inline (old behaviour) and in the bounded hashing pool
+
+Reports login throughput and latency, logins rejected with 503 by the
+pool's backpressure, and how long unrelated requests wait meanwhile.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login --clients 16 --requests 20
+    python -m benchmarks.bench_login --method pbkdf2:sha256:600000 --workers 4
+"""
+
+import argparse
+import statistics
+import threading
+import time
+
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.extensions import db
+from app.models import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "bench-password-123"
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _run(app, clients, requests_per_client):
+    login_latencies = []
+    health_latencies = []
+    statuses = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_client():
+        with app.test_client() as client:
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                response = client.post(
+                    "/api/auth/login", json={"email": EMAIL, "password": PASSWORD}
+                )
+                elapsed = time.perf_counter() - started
+                with lock:
+                    login_latencies.append(elapsed)
+                    statuses.append(response.status_code)
+
+    def health_probe():
+        with app.test_client() as client:
+            while not done.is_set():
+                started = time.perf_counter()
+                client.get("/health")
+                health_latencies.append(time.perf_counter() - started)
+                time.sleep(0.01)
+
+    probe = threading.Thread(target=health_probe)
+    probe.start()
+
+    threads = [threading.Thread(target=login_client) for _ in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    done.set()
+    probe.join()
+
+    succeeded = statuses.count(200)
+    return {
+        "logins/s": succeeded / wall,
+        "p50 (ms)": statistics.median(login_latencies) * 1000,
+        "p95 (ms)": _percentile(login_latencies, 95) * 1000,
+        "503s": statuses.count(503),
+        "health p95 (ms)": _percentile(health_latencies, 95) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=10, help="logins per client")
+    parser.add_argument("--method", default="scrypt:32768:8:1")
+    parser.add_argument("--workers", type=int, default=2, help="hashing pool threads")
+    parser.add_argument("--max-pending", type=int, default=16)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    app.config["PASSWORD_HASH_METHOD"] = args.method
+
+    modes = {
+        "inline": {"PASSWORD_HASH_WORKERS": 0, "PASSWORD_HASH_MAX_PENDING": 10_000},
+        "pool": {
+            "PASSWORD_HASH_WORKERS": args.workers,
+            "PASSWORD_HASH_MAX_PENDING": args.max_pending,
+        },
+    }
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(
+            User(
+                username="bench",
+                email=EMAIL,
+                phone_number="0700000000",
+                password_hash=generate_password_hash(PASSWORD, method=args.method),
+            )
+        )
+        db.session.commit()
+
+        columns = ["logins/s", "p50 (ms)", "p95 (ms)", "503s", "health p95 (ms)"]
+        print(f"{'mode':<8}" + "".join(f"{column:>17}" for column in columns))
+        for mode, overrides in modes.items():
+            app.config.update(overrides)
+            hasher = app.extensions.pop("password_hasher", None)
+            if hasher is not None:
+                hasher.shutdown()
+
+            result = _run(app, args.clients, args.requests)
+            print(
+                f"{mode:<8}"
+                + "".join(
+                    f"{result[column]:>17.1f}" if column != "503s" else f"{result[column]:>17}"
+                    for column in columns
+                )
+            )
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
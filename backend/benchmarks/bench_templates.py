@@ -0,0 +1,116 @@
+"""
+Template rendering benchmark
+Compares per-document render time of the old render_template_string path
+(parse + compile on every call) with the precompiled template registry
+
+Usage (from backend/):
+    python -m benchmarks.bench_templates --iterations 200
+    python -m benchmarks.bench_templates --pdf   # include xhtml2pdf conversion
+"""
+
+import argparse
+import time
+from datetime import datetime
+from io import BytesIO
+from types import SimpleNamespace
+
+from app import create_app
+from app.utils import template_registry
+
+TEMPLATES = ["documents/invoice.html", "documents/receipt.html", "emails/base.html"]
+
+
+def _sample_context():
+    address = SimpleNamespace(
+        first_name="Jane",
+        last_name="Doe",
+        email="jane@example.com",
+        phone="0712345678",
+        street="123 Market Street",
+        city="Nairobi",
+        additional_info="Gate B",
+    )
+    payment = SimpleNamespace(
+        payment_method="MPESA",
+        mpesa_receipt="QWERTY12345",
+        status="Success",
+        amount=165000,
+        transaction_id="TX-1",
+        created_at=datetime(2026, 1, 10, 9, 0),
+    )
+    items = [
+        SimpleNamespace(
+            product=SimpleNamespace(name=f"Phone {i}", price=55000),
+            variation_name="8GB / 256GB",
+            variation_price=55000,
+            quantity=1,
+        )
+        for i in range(3)
+    ]
+    order = SimpleNamespace(
+        order_reference="PHK-BENCH-001",
+        created_at=datetime(2026, 1, 10, 8, 45),
+        status="Delivered",
+        payment=payment,
+        address=address,
+        order_items=items,
+        total_amount=165000,
+    )
+    return {
+        "order": order,
+        "payment": payment,
+        "company_name": "Phone Home Kenya",
+        "now": datetime.now(),
+        "subject": "Order Confirmation",
+        "content": "<p>Thank you for your order!</p>",
+        "current_year": 2026,
+    }
+
+
+def _time_per_call(func, iterations):
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--pdf", action="store_true", help="also time HTML -> PDF conversion")
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    context = _sample_context()
+    environment = template_registry.get_environment()
+
+    if args.pdf:
+        from xhtml2pdf import pisa
+
+        def to_pdf(html):
+            pisa.CreatePDF(BytesIO(html.encode("utf-8")), BytesIO())
+
+    else:
+
+        def to_pdf(_html):
+            return None
+
+    print(f"{'template':<26} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>9}")
+    with app.app_context():
+        for name in TEMPLATES:
+            source, _filename, _uptodate = environment.loader.get_source(environment, name)
+
+            def before(source=source):
+                to_pdf(app.jinja_env.from_string(source).render(**context))
+
+            def after(name=name):
+                to_pdf(template_registry.render(name, **context))
+
+            before_ms = _time_per_call(before, args.iterations)
+            after_ms = _time_per_call(after, args.iterations)
+            print(f"{name:<26} {before_ms:>12.3f} {after_ms:>12.3f} {before_ms / after_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
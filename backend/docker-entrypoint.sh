@@ -17,6 +17,17 @@ case "${1:-web}" in
       --threads "${GUNICORN_THREADS:-2}" \
       --timeout "${GUNICORN_TIMEOUT:-120}"
     ;;
+  stream)
+    # Long-lived connections (SSE, payment status long-poll): gevent parks idle
+    # clients on greenlets
+    exec gunicorn wsgi:app \
+      --config gunicorn_stream.conf.py \
+      --bind 0.0.0.0:8000 \
+      --worker-class gevent \
+      --workers "${STREAM_WORKERS:-2}" \
+      --worker-connections "${STREAM_WORKER_CONNECTIONS:-2000}" \
+      --timeout "${GUNICORN_TIMEOUT:-120}"
+    ;;
   *)
     exec "$@"
     ;;
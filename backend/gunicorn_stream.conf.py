@@ -0,0 +1,12 @@
+"""
+Gunicorn settings for the gevent stream workers (docker-entrypoint.sh stream)
+
+gevent patches sockets, but psycopg2 talks to Postgres through libpq's own
+sockets; without a wait callback every query would block the whole hub.
+"""
+
+
+def post_fork(server, worker):
+    from psycogreen.gevent import patch_psycopg
+
+    patch_psycopg()
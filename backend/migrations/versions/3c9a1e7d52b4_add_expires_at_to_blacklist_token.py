@@ -0,0 +1,49 @@
+"""add expires_at to blacklist_token
+
+Revision ID: 3c9a1e7d52b4
+Revises: 5f6f12b4379e
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "3c9a1e7d52b4"
+down_revision = "5f6f12b4379e"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if _column_exists(bind, "blacklist_token", "expires_at"):
+        return
+
+    with op.batch_alter_table("blacklist_token", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("expires_at", sa.DateTime(), nullable=True))
+        batch_op.create_index(
+            batch_op.f("ix_blacklist_token_expires_at"), ["expires_at"], unique=False
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if not _column_exists(bind, "blacklist_token", "expires_at"):
+        return
+
+    with op.batch_alter_table("blacklist_token", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_blacklist_token_expires_at"))
+        batch_op.drop_column("expires_at")
@@ -0,0 +1,43 @@
+"""add wishlist membership indexes
+
+Revision ID: 5d8b2f6a9c31
+Revises: 9f3c5d7e2b18
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from alembic import op
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8b2f6a9c31"
+down_revision = "9f3c5d7e2b18"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_wishlist_products_product_id", "wishlist_products", ["product_id"]),
+    ("ix_wishlists_user_id", "wishlists", ["user_id"]),
+]
+
+
+def _index_exists(bind, table_name, index_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+    for index_name, table_name, columns in INDEXES:
+        if not _index_exists(bind, table_name, index_name):
+            op.create_index(index_name, table_name, columns, unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    for index_name, table_name, _ in INDEXES:
+        if _index_exists(bind, table_name, index_name):
+            op.drop_index(index_name, table_name=table_name)
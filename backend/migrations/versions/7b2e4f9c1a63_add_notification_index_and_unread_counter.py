@@ -0,0 +1,71 @@
+"""add notification index and unread counter
+
+Revision ID: 7b2e4f9c1a63
+Revises: 3c9a1e7d52b4
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "7b2e4f9c1a63"
+down_revision = "3c9a1e7d52b4"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_notifications_user_read_created"
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def _index_exists(bind, table_name, index_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not _index_exists(bind, "notifications", INDEX_NAME):
+        op.create_index(
+            INDEX_NAME, "notifications", ["user_id", "is_read", "created_at"], unique=False
+        )
+
+    if not _column_exists(bind, "users", "unread_notifications"):
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    "unread_notifications", sa.Integer(), nullable=False, server_default="0"
+                )
+            )
+
+        op.execute(
+            """
+            UPDATE users SET unread_notifications = (
+                SELECT COUNT(*) FROM notifications
+                WHERE notifications.user_id = users.id AND notifications.is_read = false
+            )
+            """
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if _column_exists(bind, "users", "unread_notifications"):
+        with op.batch_alter_table("users", schema=None) as batch_op:
+            batch_op.drop_column("unread_notifications")
+
+    if _index_exists(bind, "notifications", INDEX_NAME):
+        op.drop_index(INDEX_NAME, table_name="notifications")
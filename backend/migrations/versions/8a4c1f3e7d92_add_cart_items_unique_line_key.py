@@ -0,0 +1,94 @@
+"""add unique (cart_id, product_id, variation_name) to cart_items
+
+Revision ID: 8a4c1f3e7d92
+Revises: 5d8b2f6a9c31
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "8a4c1f3e7d92"
+down_revision = "5d8b2f6a9c31"
+branch_labels = None
+depends_on = None
+
+CONSTRAINT_NAME = "uq_cart_items_cart_product_variation"
+
+
+def _constraint_exists(bind):
+    inspector = inspect(bind)
+    if not inspector.has_table("cart_items"):
+        return False
+    return any(
+        constraint["name"] == CONSTRAINT_NAME
+        for constraint in inspector.get_unique_constraints("cart_items")
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    if not inspect(bind).has_table("cart_items") or _constraint_exists(bind):
+        return
+
+    # NULL never conflicts in a unique key, so "no variation" is stored as ""
+    op.execute("UPDATE cart_items SET variation_name = '' WHERE variation_name IS NULL")
+
+    # Fold duplicate lines into the oldest one before adding the constraint
+    op.execute(
+        """
+        UPDATE cart_items SET quantity = (
+            SELECT SUM(dup.quantity) FROM cart_items dup
+            WHERE dup.cart_id = cart_items.cart_id
+              AND dup.product_id = cart_items.product_id
+              AND dup.variation_name = cart_items.variation_name
+        )
+        WHERE id IN (
+            SELECT MIN(id) FROM cart_items
+            GROUP BY cart_id, product_id, variation_name
+            HAVING COUNT(*) > 1
+        )
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_items WHERE id NOT IN (
+            SELECT keep_id FROM (
+                SELECT MIN(id) AS keep_id FROM cart_items
+                GROUP BY cart_id, product_id, variation_name
+            ) keepers
+        )
+        """
+    )
+
+    with op.batch_alter_table("cart_items") as batch_op:
+        batch_op.alter_column(
+            "variation_name",
+            existing_type=sa.String(length=255),
+            nullable=False,
+            server_default="",
+        )
+        batch_op.create_unique_constraint(
+            CONSTRAINT_NAME, ["cart_id", "product_id", "variation_name"]
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    if not _constraint_exists(bind):
+        return
+
+    with op.batch_alter_table("cart_items") as batch_op:
+        batch_op.drop_constraint(CONSTRAINT_NAME, type_="unique")
+        batch_op.alter_column(
+            "variation_name",
+            existing_type=sa.String(length=255),
+            nullable=True,
+            server_default=None,
+        )
+
+    op.execute("UPDATE cart_items SET variation_name = NULL WHERE variation_name = ''")
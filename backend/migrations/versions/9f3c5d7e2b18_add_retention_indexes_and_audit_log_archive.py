@@ -0,0 +1,68 @@
+"""add retention indexes and audit_logs_archive
+
+Revision ID: 9f3c5d7e2b18
+Revises: e41d8a2b6c07
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "9f3c5d7e2b18"
+down_revision = "e41d8a2b6c07"
+branch_labels = None
+depends_on = None
+
+CREATED_AT_INDEXES = {
+    "notifications": "ix_notifications_created_at",
+    "audit_logs": "ix_audit_logs_created_at",
+}
+
+
+def _index_exists(bind, table_name, index_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    for table_name, index_name in CREATED_AT_INDEXES.items():
+        if not _index_exists(bind, table_name, index_name):
+            op.create_index(index_name, table_name, ["created_at"], unique=False)
+
+    if not inspect(bind).has_table("audit_logs_archive"):
+        op.create_table(
+            "audit_logs_archive",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("admin_id", sa.Integer(), nullable=False),
+            sa.Column("action", sa.String(length=255), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("archive_month", sa.String(length=7), nullable=False),
+            sa.Column("archived_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_audit_logs_archive_archive_month",
+            "audit_logs_archive",
+            ["archive_month"],
+            unique=False,
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table("audit_logs_archive"):
+        op.drop_index("ix_audit_logs_archive_archive_month", table_name="audit_logs_archive")
+        op.drop_table("audit_logs_archive")
+
+    for table_name, index_name in CREATED_AT_INDEXES.items():
+        if _index_exists(bind, table_name, index_name):
+            op.drop_index(index_name, table_name=table_name)
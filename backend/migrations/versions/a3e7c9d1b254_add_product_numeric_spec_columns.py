@@ -0,0 +1,63 @@
+"""add numeric spec columns to products
+
+Revision ID: a3e7c9d1b254
+Revises: f8b1e3a7c540
+Create Date: 2026-10-19 18:00:00.000000
+
+Run `flask backfill-spec-attributes` after upgrading to fill the columns
+for existing products; new and edited products are filled on save.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "a3e7c9d1b254"
+down_revision = "f8b1e3a7c540"
+branch_labels = None
+depends_on = None
+
+SPEC_COLUMNS = ["ram_gb", "storage_gb", "battery_mah", "display_inches"]
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def _index_exists(bind, table_name, index_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    for column_name in SPEC_COLUMNS:
+        if not _column_exists(bind, "products", column_name):
+            with op.batch_alter_table("products", schema=None) as batch_op:
+                batch_op.add_column(sa.Column(column_name, sa.Float(), nullable=True))
+
+        index_name = f"ix_products_{column_name}"
+        if not _index_exists(bind, "products", index_name):
+            op.create_index(index_name, "products", [column_name], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    for column_name in SPEC_COLUMNS:
+        index_name = f"ix_products_{column_name}"
+        if _index_exists(bind, "products", index_name):
+            op.drop_index(index_name, table_name="products")
+
+        if _column_exists(bind, "products", column_name):
+            with op.batch_alter_table("products", schema=None) as batch_op:
+                batch_op.drop_column(column_name)
@@ -0,0 +1,58 @@
+"""add delivery cursor to notification_broadcasts
+
+Revision ID: c5f2a8e1d934
+Revises: a3e7c9d1b254
+Create Date: 2026-10-19 20:00:00.000000
+
+Broadcasts still "running" were started by in-process delivery threads
+that kept no cursor, so they cannot be resumed safely; they are marked
+failed.
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "c5f2a8e1d934"
+down_revision = "a3e7c9d1b254"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table("notification_broadcasts", schema=None) as batch_op:
+        if not _column_exists(bind, "notification_broadcasts", "last_user_id"):
+            batch_op.add_column(
+                sa.Column("last_user_id", sa.Integer(), nullable=False, server_default="0")
+            )
+        if not _column_exists(bind, "notification_broadcasts", "heartbeat_at"):
+            batch_op.add_column(sa.Column("heartbeat_at", sa.DateTime(), nullable=True))
+
+    op.execute(
+        "UPDATE notification_broadcasts SET status = 'failed', "
+        "error = 'Interrupted before delivery could be resumed', "
+        "completed_at = CURRENT_TIMESTAMP "
+        "WHERE status = 'running' AND heartbeat_at IS NULL"
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table("notification_broadcasts", schema=None) as batch_op:
+        if _column_exists(bind, "notification_broadcasts", "heartbeat_at"):
+            batch_op.drop_column("heartbeat_at")
+        if _column_exists(bind, "notification_broadcasts", "last_user_id"):
+            batch_op.drop_column("last_user_id")
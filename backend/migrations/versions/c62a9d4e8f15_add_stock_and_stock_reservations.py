@@ -0,0 +1,68 @@
+"""add stock columns and stock_reservations
+
+Revision ID: c62a9d4e8f15
+Revises: 8a4c1f3e7d92
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "c62a9d4e8f15"
+down_revision = "8a4c1f3e7d92"
+branch_labels = None
+depends_on = None
+
+STOCK_TABLES = ["products", "product_variations"]
+STATUS_INDEX = "ix_stock_reservations_status_expires_at"
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # Nullable: existing products stay untracked until an admin sets their stock
+    for table_name in STOCK_TABLES:
+        if not _column_exists(bind, table_name, "stock"):
+            with op.batch_alter_table(table_name, schema=None) as batch_op:
+                batch_op.add_column(sa.Column("stock", sa.Integer(), nullable=True))
+
+    if not inspect(bind).has_table("stock_reservations"):
+        op.create_table(
+            "stock_reservations",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("order_id", sa.Integer(), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("expires_at", sa.DateTime(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["order_id"], ["orders.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("order_id"),
+        )
+        op.create_index(
+            STATUS_INDEX, "stock_reservations", ["status", "expires_at"], unique=False
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table("stock_reservations"):
+        op.drop_index(STATUS_INDEX, table_name="stock_reservations")
+        op.drop_table("stock_reservations")
+
+    for table_name in STOCK_TABLES:
+        if _column_exists(bind, table_name, "stock"):
+            with op.batch_alter_table(table_name, schema=None) as batch_op:
+                batch_op.drop_column("stock")
@@ -0,0 +1,49 @@
+"""add notification_broadcasts
+
+Revision ID: e41d8a2b6c07
+Revises: 7b2e4f9c1a63
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "e41d8a2b6c07"
+down_revision = "7b2e4f9c1a63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table("notification_broadcasts"):
+        return
+
+    op.create_table(
+        "notification_broadcasts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("admin_id", sa.Integer(), nullable=False),
+        sa.Column("message", sa.String(length=255), nullable=False),
+        sa.Column("segment", sa.String(length=50), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("total_recipients", sa.Integer(), nullable=False),
+        sa.Column("sent_count", sa.Integer(), nullable=False),
+        sa.Column("error", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["admin_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table("notification_broadcasts"):
+        op.drop_table("notification_broadcasts")
@@ -0,0 +1,41 @@
+"""add reference to idempotency_keys
+
+Revision ID: e4a9c2f7b815
+Revises: c5f2a8e1d934
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "e4a9c2f7b815"
+down_revision = "c5f2a8e1d934"
+branch_labels = None
+depends_on = None
+
+
+def _column_exists(bind, table_name, column_name):
+    inspector = inspect(bind)
+    if not inspector.has_table(table_name):
+        return False
+    return any(column["name"] == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not _column_exists(bind, "idempotency_keys", "reference"):
+        with op.batch_alter_table("idempotency_keys", schema=None) as batch_op:
+            batch_op.add_column(sa.Column("reference", sa.String(length=50), nullable=True))
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if _column_exists(bind, "idempotency_keys", "reference"):
+        with op.batch_alter_table("idempotency_keys", schema=None) as batch_op:
+            batch_op.drop_column("reference")
@@ -0,0 +1,50 @@
+"""add idempotency_keys
+
+Revision ID: f8b1e3a7c540
+Revises: c62a9d4e8f15
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import inspect
+
+
+# revision identifiers, used by Alembic.
+revision = "f8b1e3a7c540"
+down_revision = "c62a9d4e8f15"
+branch_labels = None
+depends_on = None
+
+CREATED_AT_INDEX = "ix_idempotency_keys_created_at"
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    if not inspect(bind).has_table("idempotency_keys"):
+        op.create_table(
+            "idempotency_keys",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("key", sa.String(length=255), nullable=False),
+            sa.Column("request_hash", sa.String(length=64), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("response_code", sa.Integer(), nullable=True),
+            sa.Column("response_body", sa.JSON(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),
+        )
+        op.create_index(CREATED_AT_INDEX, "idempotency_keys", ["created_at"], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    if inspect(bind).has_table("idempotency_keys"):
+        op.drop_index(CREATED_AT_INDEX, table_name="idempotency_keys")
+        op.drop_table("idempotency_keys")
@@ -51,6 +51,24 @@ def db(app):
     """Create clean database for each test"""
     with app.app_context():
         _db.create_all()
+
+        # Per-process caches and pools start fresh for each test
+        for name in (
+            "jwt_blocklist",
+            "document_store",
+            "role_cache",
+            "password_hasher",
+            "rate_limiter",
+            "cart_cache",
+            "cart_store",
+            "compare_store",
+            "price_index",
+            "spec_cache",
+        ):
+            extension = app.extensions.pop(name, None)
+            if hasattr(extension, "shutdown"):
+                extension.shutdown()
+
         yield _db
         _db.session.remove()
         _db.drop_all()
@@ -73,6 +91,24 @@ def runner(app):
 # ============================================================================
 
 
+@pytest.fixture
+def file_db_app(tmp_path, monkeypatch):
+    """App on a file-backed SQLite database so each thread gets its own connection"""
+    from app.config.testing import TestingConfig
+
+    monkeypatch.setattr(TestingConfig, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path}/app.db")
+    monkeypatch.setattr(
+        TestingConfig, "SQLALCHEMY_ENGINE_OPTIONS", {"connect_args": {"timeout": 30}}
+    )
+    file_app = create_app("testing")
+
+    with file_app.app_context():
+        _db.create_all()
+        yield file_app
+        _db.session.remove()
+        _db.drop_all()
+
+
 @pytest.fixture
 def user(db):
     """Create a test user"""
@@ -55,3 +55,60 @@ def test_promote_user_duplicate_action_is_idempotent(client, admin_headers, user
     assert first.status_code == 200
     assert second.status_code == 200
     assert "promoted to admin" in second.get_json()["message"]
+
+
+def test_demoted_admin_loses_access_immediately(client, admin_headers, user):
+    promoted = client.put(f"/api/admin/users/{user.id}/promote", headers=admin_headers)
+    assert promoted.status_code == 200
+
+    login = client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "password123"}
+    )
+    user_headers = {"Authorization": f"Bearer {login.json['data']['token']}"}
+    assert client.get("/api/admin/users", headers=user_headers).status_code == 200
+
+    demoted = client.put(
+        f"/api/admin/users/{user.id}/promote", json={"role": "user"}, headers=admin_headers
+    )
+    assert demoted.status_code == 200
+
+    # The cached admin role must not outlive the demotion
+    assert client.get("/api/admin/users", headers=user_headers).status_code == 403
+
+
+def test_broadcast_notification_reports_progress(client, admin_headers, user):
+    response = client.post(
+        "/api/admin/notifications/broadcast",
+        json={"message": "Store closed on Monday", "segment": "all"},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 202
+    broadcast = response.get_json()["data"]["broadcast"]
+
+    progress = client.get(
+        f"/api/admin/notifications/broadcast/{broadcast['id']}", headers=admin_headers
+    ).get_json()["data"]["broadcast"]
+    assert progress["status"] == "completed"
+    assert progress["sent_count"] == progress["total_recipients"] == 2
+    assert progress["progress"] == 100.0
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{"segment": "all"}, {"message": "Hi", "segment": "vip"}, {"message": "x" * 256}],
+)
+def test_broadcast_notification_validation(client, admin_headers, payload):
+    response = client.post(
+        "/api/admin/notifications/broadcast", json=payload, headers=admin_headers
+    )
+
+    assert response.status_code == 400
+
+
+def test_broadcast_requires_admin(client, auth_headers):
+    response = client.post(
+        "/api/admin/notifications/broadcast", json={"message": "Hi"}, headers=auth_headers
+    )
+
+    assert response.status_code == 403
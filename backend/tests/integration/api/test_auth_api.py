@@ -1,3 +1,8 @@
+from app.extensions import db
+from app.models import User
+from app.utils.password_hasher import PasswordHasher, PasswordHasherBusy
+
+
 def _assert_response_shape(payload):
     assert {"success", "data", "message"}.issubset(payload.keys())
 
@@ -60,3 +65,45 @@ def test_logout_unauthenticated_returns_401(client):
 
     assert response.status_code == 401
     assert {"error", "message"}.issubset(body.keys())
+
+
+def test_logout_revokes_token_for_later_requests(client, auth_headers):
+    response = client.delete("/api/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+
+    reused = client.get("/api/profile/", headers=auth_headers)
+
+    assert reused.status_code == 401
+    assert reused.get_json()["error"] == "Token revoked"
+
+
+def test_login_upgrades_outdated_password_hash(app, client, user, monkeypatch):
+    monkeypatch.setitem(app.config, "PASSWORD_HASH_METHOD", "pbkdf2:sha256:1000")
+
+    response = client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "password123"}
+    )
+    assert response.status_code == 200
+
+    stored = db.session.get(User, user.id).password_hash
+    assert stored.startswith("pbkdf2:sha256:1000$")
+
+    # The upgraded hash still verifies
+    again = client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "password123"}
+    )
+    assert again.status_code == 200
+
+
+def test_login_returns_503_when_hasher_is_saturated(client, user, monkeypatch):
+    def busy(self, password_hash, password):
+        raise PasswordHasherBusy("Password hasher is busy")
+
+    monkeypatch.setattr(PasswordHasher, "check", busy)
+
+    response = client.post(
+        "/api/auth/login", json={"email": "test@example.com", "password": "password123"}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
@@ -1,3 +1,6 @@
+from app.models import CartItem
+
+
 def _assert_response_shape(payload):
     assert {"success", "data", "message"}.issubset(payload.keys())
 
@@ -437,3 +440,73 @@ def test_get_cart_unauthenticated(client):
 
     assert response.status_code == 401
     assert {"error", "message"}.issubset(response.get_json().keys())
+
+
+def test_bulk_add_to_cart_merges_with_existing_items(
+    client, auth_headers, cart_with_items, product, multiple_products, product_with_variation
+):
+    response = client.post(
+        "/api/cart/bulk",
+        headers=auth_headers,
+        json={
+            "items": [
+                {"productId": product.id, "quantity": 1},
+                {"productId": product.id, "quantity": 2},
+                {"productId": multiple_products[1].id, "quantity": 1},
+                {
+                    "productId": product_with_variation.id,
+                    "quantity": 1,
+                    "selectedVariation": {"ram": "12GB", "storage": "512GB", "price": 1},
+                },
+                {
+                    "productId": product_with_variation.id,
+                    "quantity": 1,
+                    "selectedVariation": {"ram": "4GB", "storage": "64GB", "price": 1},
+                },
+                {"productId": 999999, "quantity": 1},
+            ]
+        },
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    _assert_response_shape(body)
+    assert body["data"] == {"added": 3, "skipped": [product_with_variation.id, 999999]}
+
+    rows = {
+        (item.product_id, item.variation_name or None): item
+        for item in CartItem.query.filter_by(cart_id=cart_with_items.id)
+    }
+    assert len(rows) == 4
+    assert rows[(product.id, None)].quantity == 5
+    # The client-sent variation price is ignored; the catalog price is stored
+    assert rows[(product_with_variation.id, "12GB - 512GB")].variation_price == 120000
+
+
+def test_bulk_add_to_cart_rejects_invalid_item(client, auth_headers, product):
+    response = client.post(
+        "/api/cart/bulk",
+        headers=auth_headers,
+        json={"items": [{"productId": product.id, "quantity": 1}, {"productId": product.id}]},
+    )
+    body = response.get_json()
+
+    assert response.status_code == 400
+    assert body["message"] == "items[1]: productId and quantity are required"
+
+
+def test_get_cart_summary_returns_line_items_and_total(client, auth_headers, cart_with_items):
+    response = client.get("/api/cart/summary", headers=auth_headers)
+    body = response.get_json()
+
+    assert response.status_code == 200
+    _assert_response_shape(body)
+    assert len(body["data"]["items"]) == 2
+    assert body["data"]["currency"] == "KES"
+    assert body["data"]["total"] == sum(item["line_total"] for item in body["data"]["items"])
+
+    client.delete("/api/cart/clear", headers=auth_headers)
+
+    body = client.get("/api/cart/summary", headers=auth_headers).get_json()
+    assert body["data"]["items"] == []
+    assert body["data"]["total"] == 0.0
@@ -1,3 +1,9 @@
+from sqlalchemy import event
+
+from app.extensions import db
+from app.services.product_service import ProductService
+
+
 def test_add_to_compare_authorized_success(client, auth_headers, product):
     response = client.post("/api/compare", headers=auth_headers, json={"product_id": product.id})
 
@@ -48,3 +54,94 @@ def test_clear_compare_idempotent_when_already_empty(client, auth_headers):
 
     assert first.status_code == 200
     assert second.status_code == 200
+
+
+def test_compare_products_returns_specs_in_list_order(
+    client, auth_headers, product, product_with_variation
+):
+    for product_id in (product_with_variation.id, product.id):
+        client.post("/api/compare", headers=auth_headers, json={"product_id": product_id})
+
+    response = client.get("/api/compare/products", headers=auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert data["count"] == 2
+    first, second = data["products"]
+    assert [first["id"], second["id"]] == [product_with_variation.id, product.id]
+    assert {"ram", "storage", "battery", "processor", "display"} <= set(first)
+    assert len(first["variations"]) == 2
+    assert second["brand"] and second["category"]
+
+
+def test_compare_list_is_capped_and_removal_frees_a_slot(client, auth_headers, multiple_products):
+    statuses = [
+        client.post("/api/compare", headers=auth_headers, json={"product_id": p.id}).status_code
+        for p in multiple_products[:4]
+    ]
+    assert statuses == [201, 201, 201, 400]
+
+    removed = client.delete(f"/api/compare/{multiple_products[0].id}", headers=auth_headers)
+    added = client.post(
+        "/api/compare", headers=auth_headers, json={"product_id": multiple_products[3].id}
+    )
+    listed = client.get("/api/compare", headers=auth_headers).get_json()["data"]["product_ids"]
+
+    assert removed.status_code == 200
+    assert added.status_code == 201
+    assert [item["id"] for item in listed] == [p.id for p in multiple_products[1:4]]
+
+
+def _polymorphic_selects(app, client, headers):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        if "phones" in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_execute)
+    try:
+        response = client.get("/api/compare/matrix", headers=headers)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_execute)
+    return response, len(statements)
+
+
+def test_compare_matrix_aligns_parsed_specs(
+    app, client, auth_headers, product, product_with_variation
+):
+    for product_id in (product.id, product_with_variation.id):
+        client.post("/api/compare", headers=auth_headers, json={"product_id": product_id})
+
+    response, polymorphic = _polymorphic_selects(app, client, auth_headers)
+
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert [p["id"] for p in data["products"]] == [product.id, product_with_variation.id]
+    assert polymorphic == 1
+    rows = {row["key"]: row for row in data["rows"]}
+    assert rows["battery"]["values"] == [
+        {"raw": "3000mAh", "value": 3000},
+        {"raw": "4000mAh", "value": 4000},
+    ]
+    assert rows["battery"]["best"] == [product_with_variation.id]
+    assert rows["ram"]["differs"] is False and rows["ram"]["best"] == []
+    assert rows["display"]["values"][0]["value"] == 6.1
+    assert rows["processor"]["unit"] is None
+
+
+def test_compare_matrix_reuses_parsed_specs_until_product_changes(
+    app, client, auth_headers, product
+):
+    client.post("/api/compare", headers=auth_headers, json={"product_id": product.id})
+    _polymorphic_selects(app, client, auth_headers)
+
+    _, polymorphic = _polymorphic_selects(app, client, auth_headers)
+    assert polymorphic == 0
+
+    ProductService.update_product(product.id, {"battery": "3349 mAh"})
+    response, polymorphic = _polymorphic_selects(app, client, auth_headers)
+
+    assert polymorphic == 1
+    rows = {row["key"]: row for row in response.get_json()["data"]["rows"]}
+    assert rows["battery"]["values"] == [{"raw": "3349 mAh", "value": 3349}]
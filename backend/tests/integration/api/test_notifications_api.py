@@ -1,4 +1,5 @@
 from app.models import Notification
+from app.services.notification_service import NotificationService
 
 
 def test_get_notifications_authorized_success(client, auth_headers, user, db):
@@ -47,3 +48,80 @@ def test_mark_notification_duplicate_action_is_idempotent(client, auth_headers,
 
     assert first.status_code == 200
     assert second.status_code == 200
+
+
+def test_get_notifications_is_paginated_with_unread_count(client, auth_headers, user):
+    for i in range(3):
+        NotificationService.create_notification(user.id, f"Update {i}")
+
+    first = client.get("/api/notifications/user?limit=2", headers=auth_headers).get_json()
+    assert [n["message"] for n in first["data"]["notifications"]] == ["Update 2", "Update 1"]
+    assert first["data"]["unread_count"] == 3
+
+    cursor = first["data"]["next_cursor"]
+    second = client.get(
+        f"/api/notifications/user?limit=2&cursor={cursor}", headers=auth_headers
+    ).get_json()
+    assert [n["message"] for n in second["data"]["notifications"]] == ["Update 0"]
+    assert second["data"]["next_cursor"] is None
+
+
+def test_get_notifications_invalid_cursor_returns_400(client, auth_headers):
+    response = client.get("/api/notifications/user?cursor=%%%", headers=auth_headers)
+
+    assert response.status_code == 400
+
+
+def test_unread_count_and_read_all(client, auth_headers, user):
+    NotificationService.create_notification(user.id, "A")
+    NotificationService.create_notification(user.id, "B")
+
+    count = client.get("/api/notifications/user/unread-count", headers=auth_headers)
+    assert count.get_json()["data"]["unread_count"] == 2
+
+    read_all = client.put("/api/notifications/user/read-all", headers=auth_headers)
+    assert read_all.get_json()["data"]["updated"] == 2
+
+    count = client.get("/api/notifications/user/unread-count", headers=auth_headers)
+    assert count.get_json()["data"]["unread_count"] == 0
+
+
+def test_stream_replays_missed_notifications(app, client, auth_headers, user, monkeypatch):
+    monkeypatch.setitem(app.config, "SSE_MAX_STREAM_SECONDS", 0.2)
+    first = NotificationService.create_notification(user.id, "Seen")
+    NotificationService.create_notification(user.id, "Missed 1")
+    NotificationService.create_notification(user.id, "Missed 2")
+
+    response = client.get(
+        "/api/notifications/stream", headers={**auth_headers, "Last-Event-ID": str(first.id)}
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    body = response.get_data(as_text=True)
+    assert "Seen" not in body
+    assert body.index("Missed 1") < body.index("Missed 2")
+    assert "event: notification" in body
+
+
+def test_stream_pushes_new_notifications(app, client, auth_token, user, monkeypatch):
+    monkeypatch.setitem(app.config, "SSE_MAX_STREAM_SECONDS", 5)
+
+    # EventSource cannot set headers, so the token goes in the query string
+    response = client.get(f"/api/notifications/stream?jwt={auth_token}", buffered=False)
+    stream = iter(response.response)
+    assert next(stream).decode().startswith("retry:")
+
+    NotificationService.create_notification(user.id, "Your order shipped")
+
+    event = next(stream).decode()
+    response.close()
+
+    assert "event: notification" in event
+    assert "Your order shipped" in event
+
+
+def test_stream_requires_authentication(client):
+    response = client.get("/api/notifications/stream")
+
+    assert response.status_code == 401
@@ -1,5 +1,9 @@
+import threading
+
+from flask_jwt_extended import create_access_token
+
 from app.extensions import db
-from app.models import CartItem
+from app.models import Brand, Cart, CartItem, Category, IdempotencyKey, Order, Product, User
 
 
 def _assert_response_shape(payload):
@@ -74,3 +78,120 @@ def test_get_all_orders_unauthorized_for_non_admin(client, auth_headers):
 
     assert response.status_code == 403
     assert "error" in response.get_json()
+
+
+def test_create_order_replays_response_for_repeated_idempotency_key(
+    client, auth_headers, cart, product, monkeypatch
+):
+    from app.services.order_service import OrderService
+
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    calls = []
+    create_order = OrderService.create_order
+
+    def counting_create_order(*args, **kwargs):
+        calls.append(1)
+        return create_order(*args, **kwargs)
+
+    monkeypatch.setattr(OrderService, "create_order", counting_create_order)
+    headers = {**auth_headers, "Idempotency-Key": "checkout-1"}
+    payload = _order_payload(total=float(product.price))
+
+    first = client.post("/api/orders/", headers=headers, json=payload)
+    second = client.post("/api/orders/", headers=headers, json=payload)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+    assert Order.query.count() == 1
+
+
+def test_create_order_rejects_idempotency_key_reused_for_other_request(
+    client, auth_headers, cart, product
+):
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    headers = {**auth_headers, "Idempotency-Key": "checkout-2"}
+
+    client.post("/api/orders/", headers=headers, json=_order_payload(total=float(product.price)))
+    response = client.post("/api/orders/", headers=headers, json=_order_payload(total=1))
+
+    assert response.status_code == 422
+    assert response.get_json()["message"] == (
+        "Idempotency-Key was already used for a different request"
+    )
+
+
+def test_create_order_server_error_releases_idempotency_key(
+    client, auth_headers, cart, product, monkeypatch
+):
+    from app.services.order_service import OrderService
+
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    headers = {**auth_headers, "Idempotency-Key": "checkout-3"}
+    payload = _order_payload(total=float(product.price))
+    create_order = OrderService.create_order
+
+    def failing_create_order(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(OrderService, "create_order", failing_create_order)
+    assert client.post("/api/orders/", headers=headers, json=payload).status_code == 500
+    assert IdempotencyKey.query.count() == 0
+
+    monkeypatch.setattr(OrderService, "create_order", create_order)
+    assert client.post("/api/orders/", headers=headers, json=payload).status_code == 201
+
+
+def test_parallel_identical_submissions_create_one_order(file_db_app):
+    category = Category(name="Phones")
+    brand = Brand(name="Acme")
+    db.session.add_all([category, brand])
+    db.session.flush()
+    product = Product(
+        name="Race Phone",
+        price=1000,
+        description="x",
+        image_urls=[],
+        category_id=category.id,
+        brand_id=brand.id,
+    )
+    user = User(username="racer", email="racer@example.com", phone_number="07", password_hash="x")
+    db.session.add_all([product, user])
+    db.session.flush()
+    cart = Cart(user_id=user.id)
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    headers = {
+        "Authorization": f"Bearer {create_access_token(identity=str(user.id))}",
+        "Idempotency-Key": "double-click",
+    }
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+    responses = []
+
+    def submit():
+        with file_db_app.test_client() as client:
+            barrier.wait()
+            response = client.post("/api/orders/", headers=headers, json=_order_payload(1000))
+            responses.append((response.status_code, response.get_json()))
+
+    threads = [threading.Thread(target=submit) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    statuses = [status for status, _ in responses]
+    assert set(statuses) <= {201, 409}, responses
+    assert 201 in statuses
+    references = {body["data"]["order_reference"] for status, body in responses if status == 201}
+    assert len(references) == 1
+    assert Order.query.count() == 1
@@ -1,8 +1,16 @@
 """Integration tests for order document generation endpoints and helpers."""
 
+import io
+import zipfile
+from datetime import datetime, timedelta
+
 import pytest
 
 from app.models import Address, Order, OrderItem, Payment
+from app.services import DocumentService
+from app.utils import template_registry
+from app.utils.document_store import DiskDocumentStore
+from app.utils.pdf_renderer import PdfRenderUnavailable
 
 
 def _orders_routes():
@@ -12,6 +20,13 @@ def _orders_routes():
     return routes
 
 
+def _template_source(name):
+    """Read a registered template's source."""
+    environment = template_registry.get_environment()
+    source, _filename, _uptodate = environment.loader.get_source(environment, name)
+    return source
+
+
 @pytest.fixture
 def another_user(create_user):
     """Create a second user to validate ownership checks."""
@@ -148,39 +163,225 @@ def test_generate_document_unauthorized_access(client, detailed_order):
     assert response.json["error"] == "Authorization required"
 
 
-def test_generate_pdf_invoice_path(app, detailed_order):
-    """Exercise invoice path in _generate_pdf and ensure non-empty bytes are returned."""
+def test_render_invoice_path(app, detailed_order):
+    """Exercise invoice path in DocumentService.render and ensure non-empty bytes are returned."""
     with app.app_context():
-        pdf_content = _orders_routes()._generate_pdf(detailed_order, "invoice")
+        pdf_content = DocumentService.render(detailed_order, "invoice")
 
     assert pdf_content is not None
     assert isinstance(pdf_content, bytes)
     assert len(pdf_content) > 0
 
 
-def test_generate_pdf_receipt_path(app, detailed_order):
-    """Exercise receipt path in _generate_pdf and ensure non-empty bytes are returned."""
+def test_render_receipt_path(app, detailed_order):
+    """Exercise receipt path in DocumentService.render and ensure non-empty bytes are returned."""
     with app.app_context():
-        pdf_content = _orders_routes()._generate_pdf(detailed_order, "receipt")
+        pdf_content = DocumentService.render(detailed_order, "receipt")
 
     assert pdf_content is not None
     assert isinstance(pdf_content, bytes)
     assert len(pdf_content) > 0
 
 
-def test_get_invoice_template_contains_expected_placeholders():
-    """Template helper should expose invoice-specific labels and placeholders."""
-    template = _orders_routes()._get_invoice_template()
+def test_invoice_template_contains_expected_placeholders():
+    """Registered invoice template should expose invoice-specific labels and placeholders."""
+    template = _template_source("documents/invoice.html")
 
     assert "INVOICE" in template
     assert "ORDER ITEMS" in template
     assert "{{ order.order_reference }}" in template
 
 
-def test_get_receipt_template_contains_expected_placeholders():
-    """Template helper should expose receipt-specific labels and placeholders."""
-    template = _orders_routes()._get_receipt_template()
+def test_receipt_template_contains_expected_placeholders():
+    """Registered receipt template should expose receipt-specific labels and placeholders."""
+    template = _template_source("documents/receipt.html")
 
     assert "RECEIPT" in template
     assert "TOTAL PAID" in template
     assert "{{ order.order_reference }}" in template
+
+
+@pytest.fixture
+def render_calls(app, monkeypatch):
+    """Count real renders while starting from an empty document cache."""
+    app.extensions.pop("document_store", None)
+    calls = []
+    original_render = DocumentService.render
+
+    def counting_render(order, doc_type):
+        calls.append(doc_type)
+        return original_render(order, doc_type)
+
+    monkeypatch.setattr(DocumentService, "render", staticmethod(counting_render))
+    yield calls
+    app.extensions.pop("document_store", None)
+
+
+def test_generate_document_repeat_download_served_from_cache(
+    client, auth_headers, detailed_order, render_calls
+):
+    """A second download of the same order version should not render the PDF again."""
+    url = f"/api/orders/document/{detailed_order.order_reference}/invoice"
+
+    first = client.get(url, headers=auth_headers)
+    second = client.get(url, headers=auth_headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.data == first.data
+    assert render_calls == ["invoice"]
+
+
+def test_generate_document_rerenders_after_order_update(
+    client, db, auth_headers, detailed_order, render_calls
+):
+    """Changing the order's updated_at should invalidate the cached document."""
+    url = f"/api/orders/document/{detailed_order.order_reference}/invoice"
+
+    client.get(url, headers=auth_headers)
+    detailed_order.updated_at = datetime.utcnow() + timedelta(minutes=5)
+    db.session.commit()
+    response = client.get(url, headers=auth_headers)
+
+    assert response.status_code == 200
+    assert render_calls == ["invoice", "invoice"]
+
+
+def test_generate_document_served_from_disk_store(
+    app, client, auth_headers, detailed_order, render_calls, tmp_path
+):
+    """Disk-backed documents should be streamed from the cached file."""
+    app.extensions["document_store"] = DiskDocumentStore(str(tmp_path))
+    url = f"/api/orders/document/{detailed_order.order_reference}/receipt"
+
+    first = client.get(url, headers=auth_headers)
+    second = client.get(url, headers=auth_headers)
+
+    cached_files = list((tmp_path / detailed_order.order_reference).glob("receipt-*.pdf"))
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert second.data.startswith(b"%PDF")
+    assert len(cached_files) == 1
+    assert cached_files[0].read_bytes() == second.data
+    assert render_calls == ["receipt"]
+
+
+def test_generate_document_returns_503_when_renderer_busy(
+    client, auth_headers, detailed_order, render_calls, monkeypatch
+):
+    """A saturated render pool should surface as a retryable 503."""
+
+    def busy(_order, _doc_type):
+        raise PdfRenderUnavailable("PDF renderer is busy")
+
+    monkeypatch.setattr(DocumentService, "render", staticmethod(busy))
+
+    response = client.get(
+        f"/api/orders/document/{detailed_order.order_reference}/invoice", headers=auth_headers
+    )
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+    assert response.json["success"] is False
+
+
+EXPORT_URL = "/api/orders/admin/documents/export"
+
+
+def _zip_names(response):
+    """Read the entry names of a streamed ZIP response."""
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.testzip() is None
+        return sorted(archive.namelist())
+
+
+def test_export_documents_streams_zip_for_status_filter(
+    client, admin_headers, detailed_order, order
+):
+    """Admin export should include only orders matching the status filter."""
+    response = client.get(f"{EXPORT_URL}?status=Delivered", headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/zip"
+    assert "attachment;" in response.headers["Content-Disposition"]
+    assert _zip_names(response) == ["invoice_PHK-DOC-001.pdf"]
+
+
+def test_export_documents_receipts_for_date_range(client, admin_headers, detailed_order, order):
+    """Receipt exports only include delivered orders inside the date range."""
+    today = datetime.utcnow().strftime("%Y-%m-%d")
+
+    response = client.get(
+        f"{EXPORT_URL}?doc_type=receipt&start_date={today}&end_date={today}",
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 200
+    assert _zip_names(response) == ["receipt_PHK-DOC-001.pdf"]
+
+
+def test_export_documents_empty_range_returns_empty_zip(client, admin_headers, detailed_order):
+    """A range with no orders should still return a valid, empty archive."""
+    response = client.get(
+        f"{EXPORT_URL}?start_date=2001-01-01&end_date=2001-01-31", headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    assert _zip_names(response) == []
+
+
+def test_export_documents_lists_failed_renders(
+    client, admin_headers, detailed_order, render_calls, monkeypatch
+):
+    """Orders whose PDF cannot be rendered are listed in errors.txt instead of aborting."""
+    monkeypatch.setattr(
+        "app.services.document_service.render_pdf", lambda _doc_type, _snapshot: None
+    )
+
+    response = client.get(f"{EXPORT_URL}?status=Delivered", headers=admin_headers)
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.namelist() == ["errors.txt"]
+        assert b"PHK-DOC-001" in archive.read("errors.txt")
+
+
+def test_export_documents_reuses_cached_pdf(
+    client, auth_headers, admin_headers, detailed_order, render_calls
+):
+    """Documents already cached by a customer download are not rendered again."""
+    client.get(
+        f"/api/orders/document/{detailed_order.order_reference}/invoice", headers=auth_headers
+    )
+    render_calls.clear()
+
+    response = client.get(f"{EXPORT_URL}?status=Delivered", headers=admin_headers)
+
+    assert _zip_names(response) == ["invoice_PHK-DOC-001.pdf"]
+    assert render_calls == []
+
+
+@pytest.mark.parametrize(
+    "query, message",
+    [
+        ("", "Provide a status or a start_date/end_date filter"),
+        ("?doc_type=statement&status=Delivered", "Invalid document type"),
+        ("?status=Lost", "Invalid order status"),
+        ("?start_date=01-02-2026", "Dates must use the YYYY-MM-DD format"),
+        ("?start_date=2026-02-01&end_date=2026-01-01", "start_date must be before end_date"),
+        ("?doc_type=receipt&status=Shipped", "Receipts are only available for delivered orders"),
+    ],
+)
+def test_export_documents_rejects_invalid_filters(client, admin_headers, query, message):
+    """Invalid export filters should return 400 with a helpful message."""
+    response = client.get(f"{EXPORT_URL}{query}", headers=admin_headers)
+
+    assert response.status_code == 400
+    assert message in response.json["message"]
+
+
+def test_export_documents_requires_admin(client, auth_headers):
+    """Regular users cannot export documents."""
+    response = client.get(f"{EXPORT_URL}?status=Delivered", headers=auth_headers)
+
+    assert response.status_code == 403
@@ -1,5 +1,9 @@
+import threading
+import time
+
 from app.extensions import db
 from app.models import CartItem, Order
+from app.utils.pubsub import publish
 
 
 def _assert_response_shape(payload):
@@ -51,6 +55,38 @@ def test_initiate_mpesa_happy_path(client, auth_headers, cart, product, monkeypa
     assert {"order_reference", "checkout_request_id"}.issubset(body["data"].keys())
 
 
+def test_initiate_mpesa_replay_does_not_send_second_stk_push(
+    client, auth_headers, cart, product, monkeypatch
+):
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    pushes = []
+
+    class DummyMpesaService:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def initiate_payment(self, *args, **kwargs):
+            pushes.append(kwargs)
+            return {
+                "success": True,
+                "checkout_request_id": "ws_123",
+                "merchant_request_id": "mr_123",
+            }
+
+    monkeypatch.setattr("app.api.payments.routes.MpesaService", DummyMpesaService)
+    headers = {**auth_headers, "Idempotency-Key": "stk-1"}
+    payload = _payment_payload(total=float(product.price))
+
+    first = client.post("/api/payments/mpesa/initiate", headers=headers, json=payload)
+    second = client.post("/api/payments/mpesa/initiate", headers=headers, json=payload)
+
+    assert first.status_code == second.status_code == 201
+    assert second.get_json() == first.get_json()
+    assert len(pushes) == 1
+    assert Order.query.count() == 1
+
+
 def test_initiate_mpesa_empty_cart_error(client, auth_headers):
     response = client.post(
         "/api/payments/mpesa/initiate", headers=auth_headers, json=_payment_payload()
@@ -236,3 +272,97 @@ def test_callback_update_failure_is_non_blocking(client, order, monkeypatch):
 
     assert response.status_code == 200
     _assert_response_shape(body)
+
+
+def test_wait_for_payment_status_returns_immediately_when_status_differs(
+    client, auth_headers, order
+):
+    response = client.get(
+        f"/api/payments/status/{order.order_reference}/wait?last_status=Failed&timeout=5",
+        headers=auth_headers,
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    _assert_response_shape(body)
+    assert body["data"]["payment_status"] == "Pending"
+    assert body["data"]["changed"] is True
+
+
+def test_wait_for_payment_status_times_out_without_change(client, auth_headers, order):
+    response = client.get(
+        f"/api/payments/status/{order.order_reference}/wait?timeout=0", headers=auth_headers
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body["data"]["payment_status"] == "Pending"
+    assert body["data"]["changed"] is False
+
+
+def test_wait_for_payment_status_wakes_on_published_update(app, client, auth_headers, order):
+    channel = f"payments:status:{order.order_reference}"
+
+    def _publish_update():
+        with app.app_context():
+            publish(channel, {"payment_status": "Success"})
+
+    publisher = threading.Timer(0.2, _publish_update)
+    publisher.start()
+
+    started = time.monotonic()
+    response = client.get(
+        f"/api/payments/status/{order.order_reference}/wait?timeout=10", headers=auth_headers
+    )
+    publisher.join()
+
+    assert response.status_code == 200
+    assert time.monotonic() - started < 5
+
+
+def test_wait_for_payment_status_unauthorized_access(client, auth_headers, order, create_user):
+    other = create_user(username="other", email="other@ex.com", password="pw")
+    order.user_id = other.id
+    db.session.commit()
+
+    response = client.get(
+        f"/api/payments/status/{order.order_reference}/wait?timeout=0", headers=auth_headers
+    )
+
+    assert response.status_code == 403
+
+
+def test_wait_for_payment_status_order_not_found(client, auth_headers):
+    response = client.get("/api/payments/status/PHK-404/wait?timeout=0", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+def test_initiate_mpesa_failure_after_order_is_replayed_with_its_reference(
+    client, auth_headers, cart, product, monkeypatch
+):
+    db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1))
+    db.session.commit()
+    pushes = []
+
+    class BrokenMpesaService:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def initiate_payment(self, *args, **kwargs):
+            pushes.append(kwargs)
+            raise RuntimeError("connection reset")
+
+    monkeypatch.setattr("app.api.payments.routes.MpesaService", BrokenMpesaService)
+    headers = {**auth_headers, "Idempotency-Key": "stk-2"}
+    payload = _payment_payload(total=float(product.price))
+
+    first = client.post("/api/payments/mpesa/initiate", headers=headers, json=payload)
+    second = client.post("/api/payments/mpesa/initiate", headers=headers, json=payload)
+
+    order = Order.query.one()
+    assert first.status_code == second.status_code == 500
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert first.headers["Idempotent-Reference"] == order.order_reference
+    assert second.headers["Idempotent-Reference"] == order.order_reference
+    assert len(pushes) == 1
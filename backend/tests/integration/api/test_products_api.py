@@ -3,12 +3,14 @@ from types import SimpleNamespace
 
 import pytest
 
+from app.services.product_service import ProductService
+
 
 def _assert_response_shape(payload):
     assert {"success", "data", "message"}.issubset(payload.keys())
 
 
-def _sample_products():
+def _sample_products(spec_ranges=None):
     return [
         {
             "id": 1,
@@ -571,3 +573,13 @@ def test_add_product_variations_handles_exception(client, admin_headers, product
 
     assert response.status_code == 500
     _assert_response_shape(body)
+
+
+def test_get_products_filters_by_spec_ranges(client, product, product_with_variation):
+    ProductService.backfill_numeric_specs()
+
+    response = client.get("/api/products/?min_battery=3500&max_display=6.5&min_ram=abc")
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert [p["id"] for p in body["data"]["products"]] == [product_with_variation.id]
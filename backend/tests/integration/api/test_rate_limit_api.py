@@ -0,0 +1,71 @@
+class _FakeEmailService:
+    sent = []
+
+    def send_password_reset(self, email, _reset_url):
+        self.sent.append(email)
+        return {"success": True}
+
+
+def test_login_is_throttled_per_account(client, user):
+    payload = {"email": "test@example.com", "password": "wrong-password"}
+
+    statuses = [client.post("/api/auth/login", json=payload).status_code for _ in range(6)]
+
+    assert statuses[:5] == [400] * 5
+    assert statuses[5] == 429
+
+
+def test_throttled_login_returns_retry_after(client, user):
+    payload = {"email": "test@example.com", "password": "wrong-password"}
+    for _ in range(5):
+        client.post("/api/auth/login", json=payload)
+
+    response = client.post("/api/auth/login", json=payload)
+
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["success"] is False
+
+
+def test_forgot_password_enforces_reset_email_limit(app, client, user, monkeypatch):
+    _FakeEmailService.sent = []
+    monkeypatch.setattr(
+        "app.api.auth.routes.EmailService.init_app", lambda _app: _FakeEmailService()
+    )
+    limit = app.config["RESET_EMAIL_LIMIT"]
+
+    statuses = [
+        client.post("/api/auth/forgot-password", json={"email": user.email}).status_code
+        for _ in range(limit + 1)
+    ]
+
+    assert statuses == [200] * limit + [429]
+    assert len(_FakeEmailService.sent) == limit
+
+
+def test_catalog_is_throttled_per_client(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "RATE_LIMIT_CATALOG", "2/minute")
+
+    statuses = [client.get("/api/products/").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 429]
+
+
+def test_rate_limiting_can_be_disabled(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "RATE_LIMIT_CATALOG", "1/minute")
+    monkeypatch.setitem(app.config, "RATE_LIMIT_ENABLED", False)
+
+    statuses = [client.get("/api/products/").status_code for _ in range(3)]
+
+    assert statuses == [200, 200, 200]
+
+
+def test_anonymous_clients_behind_proxy_get_separate_buckets(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "RATE_LIMIT_CATALOG", "1/minute")
+
+    def get(ip):
+        # nginx appends the connecting address to whatever the client sent
+        headers = {"X-Forwarded-For": f"10.9.9.9, {ip}"}
+        return client.get("/api/products/", headers=headers).status_code
+
+    assert [get("198.51.100.1"), get("198.51.100.1"), get("198.51.100.2")] == [200, 429, 200]
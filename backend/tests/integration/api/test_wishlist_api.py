@@ -41,3 +41,33 @@ def test_remove_from_wishlist_not_found(client, auth_headers, product):
 
     assert response.status_code == 404
     _assert_response_shape(body)
+
+
+def test_bulk_add_to_wishlist_skips_duplicates_and_unknown_ids(
+    client, auth_headers, wishlist, product, multiple_products
+):
+    response = client.post(
+        "/api/wishlist/bulk",
+        headers=auth_headers,
+        json={
+            "product_ids": [product.id, multiple_products[0].id, multiple_products[1].id, 999999]
+        },
+    )
+    body = response.get_json()
+
+    assert response.status_code == 200
+    _assert_response_shape(body)
+    assert body["data"] == {"added": 2, "skipped": [999999]}
+
+    items = client.get("/api/wishlist/", headers=auth_headers).get_json()["data"]["wishlist"]
+    assert {item["id"] for item in items} == {
+        product.id,
+        multiple_products[0].id,
+        multiple_products[1].id,
+    }
+
+
+def test_bulk_add_to_wishlist_requires_list(client, auth_headers):
+    response = client.post("/api/wishlist/bulk", headers=auth_headers, json={"product_ids": 5})
+
+    assert response.status_code == 400
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Notification, NotificationBroadcast, User
+from app.services.broadcast_service import BroadcastService
+
+
+def _add_users(db, count, role="user"):
+    users = [
+        User(
+            username=f"{role}{i}",
+            email=f"{role}{i}@example.com",
+            phone_number="0700000000",
+            password_hash="x",
+            role=role,
+        )
+        for i in range(count)
+    ]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def test_broadcast_to_all_inserts_one_row_per_user_in_chunks(app, db, admin_user, monkeypatch):
+    monkeypatch.setitem(app.config, "NOTIFICATION_BROADCAST_CHUNK_SIZE", 3)
+    users = _add_users(db, 7)
+
+    broadcast = BroadcastService.start_broadcast(admin_user.id, "Flash sale!", "all")
+
+    assert broadcast.status == "completed"
+    assert broadcast.total_recipients == 8
+    assert broadcast.sent_count == 8
+    assert Notification.query.filter_by(message="Flash sale!").count() == 8
+    assert {u.unread_notifications for u in User.query.all()} == {1}
+    assert Notification.query.filter_by(user_id=users[0].id).one().is_read is False
+
+
+def test_broadcast_segments_select_recipients(db, admin_user, user, order):
+    _add_users(db, 2)
+
+    assert BroadcastService.count_recipients("customers") == 3
+    assert BroadcastService.count_recipients("admins") == 1
+    assert BroadcastService.count_recipients("pending_orders") == 1
+
+    broadcast = BroadcastService.start_broadcast(admin_user.id, "Your order", "pending_orders")
+
+    assert broadcast.sent_count == 1
+    assert Notification.query.filter_by(message="Your order").one().user_id == user.id
+
+
+def test_broadcast_rejects_unknown_segment(db, admin_user):
+    with pytest.raises(ValueError):
+        BroadcastService.start_broadcast(admin_user.id, "Hello", "vip")
+
+    assert NotificationBroadcast.query.count() == 0
+
+
+def test_failed_broadcast_is_marked_failed(db, admin_user, monkeypatch):
+    def fail(*_args):
+        raise RuntimeError("insert failed")
+
+    monkeypatch.setattr(BroadcastService, "_insert_chunk", staticmethod(fail))
+
+    broadcast = BroadcastService.start_broadcast(admin_user.id, "Hello", "all")
+
+    assert broadcast.status == "failed"
+    assert "insert failed" in broadcast.error
+
+
+def test_async_broadcast_is_queued_for_the_maintenance_worker(
+    app, db, admin_user, runner, monkeypatch
+):
+    monkeypatch.setitem(app.config, "NOTIFICATION_BROADCAST_ASYNC", True)
+    _add_users(db, 2)
+
+    broadcast = BroadcastService.start_broadcast(admin_user.id, "Queued", "all")
+
+    assert broadcast.status == "queued"
+    assert Notification.query.count() == 0
+
+    result = runner.invoke(args=["deliver-broadcasts"])
+
+    assert "Delivered 3 broadcast notification(s)" in result.output
+    db.session.refresh(broadcast)
+    assert broadcast.status == "completed"
+    assert broadcast.sent_count == 3
+
+
+def test_stale_running_broadcast_resumes_after_its_cursor(app, db, admin_user, monkeypatch):
+    monkeypatch.setitem(app.config, "NOTIFICATION_BROADCAST_ASYNC", True)
+    users = _add_users(db, 4)
+    broadcast = BroadcastService.start_broadcast(admin_user.id, "Resumed", "customers")
+
+    # A worker delivered the first two users, then died
+    broadcast.status = "running"
+    broadcast.sent_count = 2
+    broadcast.last_user_id = users[1].id
+    broadcast.heartbeat_at = datetime.utcnow()
+    db.session.commit()
+
+    assert BroadcastService.deliver_pending() == 0
+
+    broadcast.heartbeat_at = datetime.utcnow() - timedelta(minutes=10)
+    db.session.commit()
+
+    assert BroadcastService.deliver_pending() == 2
+    db.session.refresh(broadcast)
+    assert broadcast.status == "completed"
+    assert broadcast.sent_count == 4
+    assert broadcast.last_user_id == users[3].id
+    assert sorted(n.user_id for n in Notification.query.filter_by(message="Resumed")) == [
+        users[2].id,
+        users[3].id,
+    ]
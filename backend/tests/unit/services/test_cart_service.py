@@ -1,6 +1,7 @@
-from types import SimpleNamespace
+import threading
 
-from app.models import Cart, CartItem
+from app.extensions import db
+from app.models import Brand, Cart, CartItem, Category, Product, User
 
 
 def _cart_service(app):
@@ -37,14 +38,16 @@ def test_get_cart_contents_groups_items_and_variations(app, cart_with_items):
     assert contents[item.product_id]["8GB - 256GB"]["price"] == 1234.0
 
 
-def test_get_cart_contents_handles_exception(app, user, monkeypatch):
-    cart_service = _cart_service(app)
+def _break_cart_view(cart_service, monkeypatch):
+    def _raise(_user_id):
+        raise RuntimeError("query failed")
 
-    class BrokenQuery:
-        def filter_by(self, **_kwargs):
-            raise RuntimeError("query failed")
+    monkeypatch.setattr(cart_service, "_load_cart_view", staticmethod(_raise))
 
-    monkeypatch.setattr("app.services.cart_service.Cart.query", BrokenQuery())
+
+def test_get_cart_contents_handles_exception(app, user, monkeypatch):
+    cart_service = _cart_service(app)
+    _break_cart_view(cart_service, monkeypatch)
 
     assert cart_service.get_cart_contents(user.id) == {}
 
@@ -173,30 +176,16 @@ def test_remove_from_cart_happy_path_removes_item(app, user, product):
     assert CartItem.query.filter_by(product_id=product.id).first() is None
 
 
-def test_remove_from_cart_deletes_cart_when_last_item_branch(app, user, product, monkeypatch):
+def test_remove_from_cart_keeps_emptied_cart_for_reuse(app, user, product):
     cart_service = _cart_service(app)
-    cart = cart_service.get_or_create_cart(user.id)
-    cart_item = CartItem(cart_id=cart.id, product_id=product.id, quantity=1)
-    from app.extensions import db
-
-    db.session.add(cart_item)
-    db.session.commit()
-
-    class QueryStub:
-        def __init__(self, item):
-            self.item = item
-
-        def filter_by(self, **kwargs):
-            if "product_id" in kwargs:
-                return SimpleNamespace(first=lambda: self.item)
-            return SimpleNamespace(count=lambda: 1)
-
-    monkeypatch.setattr("app.services.cart_service.CartItem.query", QueryStub(cart_item))
+    cart_service.add_to_cart(user.id, product.id, 1)
 
     success, _ = cart_service.remove_from_cart(user.id, product.id)
+    cart_service.add_to_cart(user.id, product.id, 2)
 
     assert success is True
-    assert Cart.query.filter_by(user_id=user.id).first() is None
+    assert Cart.query.filter_by(user_id=user.id).count() == 1
+    assert CartItem.query.filter_by(product_id=product.id).one().quantity == 2
 
 
 def test_remove_from_cart_handles_exception(app, user, product, monkeypatch):
@@ -204,14 +193,14 @@ def test_remove_from_cart_handles_exception(app, user, product, monkeypatch):
     cart_service.add_to_cart(user.id, product.id, 1)
 
     monkeypatch.setattr(
-        "app.services.cart_service.db.session.delete",
-        lambda _obj: (_ for _ in ()).throw(RuntimeError("delete failed")),
+        "app.services.cart_service.db.session.commit",
+        lambda: (_ for _ in ()).throw(RuntimeError("commit failed")),
     )
 
     success, message = cart_service.remove_from_cart(user.id, product.id)
 
     assert success is False
-    assert "delete failed" in message
+    assert "commit failed" in message
 
 
 def test_clear_cart_removes_cart_record(app, cart_with_items):
@@ -268,11 +257,119 @@ def test_get_cart_total_calculates_variation_and_base_prices(app, cart_with_item
 
 def test_get_cart_total_handles_exception(app, user, monkeypatch):
     cart_service = _cart_service(app)
+    _break_cart_view(cart_service, monkeypatch)
 
-    class BrokenQuery:
-        def filter_by(self, **_kwargs):
-            raise RuntimeError("query failed")
+    assert cart_service.get_cart_total(user.id) == 0.0
 
-    monkeypatch.setattr("app.services.cart_service.Cart.query", BrokenQuery())
 
-    assert cart_service.get_cart_total(user.id) == 0.0
+def test_get_cart_view_returns_line_items_with_product_summary(app, cart_with_items, product):
+    cart_service = _cart_service(app)
+
+    view = cart_service.get_cart_view(cart_with_items.user_id)
+
+    line = next(item for item in view["items"] if item["product_id"] == product.id)
+    assert line["name"] == product.name
+    assert line["image_url"] == product.image_urls[0]
+    assert line["brand"] == product.brand.name
+    assert line["unit_price"] == product.price
+    assert line["line_total"] == product.price * line["quantity"]
+    assert view["item_count"] == sum(item["quantity"] for item in view["items"])
+    assert view["total"] == round(sum(item["line_total"] for item in view["items"]), 2)
+
+
+def test_get_cart_view_is_cached_until_cart_changes(app, user, product, monkeypatch):
+    cart_service = _cart_service(app)
+    cart_service.add_to_cart(user.id, product.id, 1)
+
+    loads = []
+    original = cart_service._load_cart_view
+
+    def _counting_load(user_id):
+        loads.append(user_id)
+        return original(user_id)
+
+    monkeypatch.setattr(cart_service, "_load_cart_view", staticmethod(_counting_load))
+
+    assert cart_service.get_cart_view(user.id)["item_count"] == 1
+    assert cart_service.get_cart_view(str(user.id))["item_count"] == 1
+    assert len(loads) == 1
+
+    cart_service.add_to_cart(str(user.id), product.id, 2)
+
+    assert cart_service.get_cart_view(user.id)["item_count"] == 3
+    assert len(loads) == 2
+
+
+def test_add_to_cart_keeps_variations_as_separate_lines(app, user, product_with_variation):
+    cart_service = _cart_service(app)
+    product_id = product_with_variation.id
+    cart_service.add_to_cart(user.id, product_id, 1)
+    cart_service.add_to_cart(user.id, product_id, 1, "8GB - 256GB")
+    cart_service.add_to_cart(user.id, product_id, 2, "8GB - 256GB")
+
+    lines = {item.variation_name: item.quantity for item in CartItem.query.all()}
+
+    assert lines == {"": 1, "8GB - 256GB": 3}
+
+
+def test_add_to_cart_prices_variation_from_catalog(app, user, product_with_variation):
+    cart_service = _cart_service(app)
+
+    success, _ = cart_service.add_to_cart(user.id, product_with_variation.id, 1, "12GB - 512GB")
+
+    assert success is True
+    assert CartItem.query.one().variation_price == 120000
+    assert cart_service.get_cart_view(user.id)["total"] == 120000
+
+
+def test_add_to_cart_rejects_unknown_variation(app, user, product_with_variation):
+    cart_service = _cart_service(app)
+
+    success, message = cart_service.add_to_cart(user.id, product_with_variation.id, 1, "4GB - 64GB")
+
+    assert success is False
+    assert message == "Variation not found"
+    assert CartItem.query.count() == 0
+
+
+def test_parallel_adds_never_duplicate_cart_lines(file_db_app):
+    from app.services.cart_service import CartService
+
+    category = Category(name="Phones")
+    brand = Brand(name="Acme")
+    db.session.add_all([category, brand])
+    db.session.flush()
+    product = Product(
+        name="Race Phone",
+        price=1000,
+        description="x",
+        image_urls=[],
+        category_id=category.id,
+        brand_id=brand.id,
+    )
+    user = User(username="racer", email="racer@example.com", phone_number="07", password_hash="x")
+    db.session.add_all([product, user])
+    db.session.commit()
+    user_id, product_id = str(user.id), product.id
+
+    workers = 8
+    barrier = threading.Barrier(workers)
+    results = []
+
+    def add_once():
+        with file_db_app.app_context():
+            barrier.wait()
+            results.append(CartService.add_to_cart(user_id, product_id, 1))
+            db.session.remove()
+
+    threads = [threading.Thread(target=add_once) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(success for success, _ in results), results
+    assert Cart.query.count() == 1
+    lines = CartItem.query.all()
+    assert len(lines) == 1
+    assert lines[0].quantity == workers
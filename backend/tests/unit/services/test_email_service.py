@@ -169,36 +169,40 @@ def test_send_email_exception_is_mapped_and_logged(monkeypatch, caplog):
 
 def test_generate_pdf_success_returns_attachment(monkeypatch):
     service = EmailService(_email_config())
+    order = _order(address=_address())
+    order.payment = _payment(order=order)
+    order.status = "Payment Failed"
+    rendered = {}
 
     class DummyAttachment:
         def __init__(self, name, content):
             self.name = name
             self.content = content
 
-    def fake_create_pdf(content, dest):
-        assert content == "<h1>Invoice</h1>"
-        dest.write(b"fake-pdf-content")
-        return SimpleNamespace(err=False)
+    def fake_render_pdf(doc_type, snapshot):
+        rendered["doc_type"] = doc_type
+        rendered["snapshot"] = snapshot
+        return b"fake-pdf-content"
 
-    monkeypatch.setattr("app.services.email_service.pisa.CreatePDF", fake_create_pdf)
+    monkeypatch.setattr("app.services.email_service.render_pdf", fake_render_pdf)
     monkeypatch.setattr("app.services.email_service.SendSmtpEmailAttachment", DummyAttachment)
 
-    attachment = service._generate_pdf("<h1>Invoice</h1>", "invoice_123")
+    attachment = service._generate_pdf("payment_slip", order, "receipt_123")
 
-    assert attachment.name == "invoice_123.pdf"
+    assert rendered["doc_type"] == "payment_slip"
+    assert rendered["snapshot"]["order_reference"] == "ORD-12345"
+    assert rendered["snapshot"]["payment"]["mpesa_receipt"] == "MPESA-001"
+    assert attachment.name == "receipt_123.pdf"
     assert attachment.content == base64.b64encode(b"fake-pdf-content").decode("utf-8")
 
 
 def test_generate_pdf_returns_none_when_pdf_generation_fails(monkeypatch, caplog):
     service = EmailService(_email_config())
 
-    def fake_create_pdf(_content, dest=None):
-        return SimpleNamespace(err=True)
-
-    monkeypatch.setattr("app.services.email_service.pisa.CreatePDF", fake_create_pdf)
+    monkeypatch.setattr("app.services.email_service.render_pdf", lambda _doc_type, _snapshot: None)
 
     with caplog.at_level(logging.ERROR):
-        result = service._generate_pdf("<h1>Invoice</h1>", "invoice_123")
+        result = service._generate_pdf("payment_slip", _order(), "receipt_123")
 
     assert result is None
     assert "Failed to generate PDF" in caplog.text
@@ -207,51 +211,98 @@ def test_generate_pdf_returns_none_when_pdf_generation_fails(monkeypatch, caplog
 def test_generate_pdf_returns_none_on_exception(monkeypatch, caplog):
     service = EmailService(_email_config())
 
-    def fake_create_pdf(_content, dest=None):
+    def fake_render_pdf(_doc_type, _snapshot):
         raise RuntimeError("engine unavailable")
 
-    monkeypatch.setattr("app.services.email_service.pisa.CreatePDF", fake_create_pdf)
+    monkeypatch.setattr("app.services.email_service.render_pdf", fake_render_pdf)
 
     with caplog.at_level(logging.ERROR):
-        result = service._generate_pdf("<h1>Invoice</h1>", "invoice_123")
+        result = service._generate_pdf("payment_slip", _order(), "receipt_123")
 
     assert result is None
-    assert "Error generating PDF invoice_123" in caplog.text
+    assert "Error generating PDF receipt_123" in caplog.text
+
+
+def test_document_attachment_reuses_cached_document_bytes(monkeypatch):
+    service = EmailService(_email_config())
+    order = _order()
+    requested = []
+
+    class DummyAttachment:
+        def __init__(self, name, content):
+            self.name = name
+            self.content = content
+
+    def fake_get_pdf(pdf_order, doc_type):
+        requested.append((pdf_order, doc_type))
+        return b"cached-invoice"
+
+    monkeypatch.setattr(email_service_module.DocumentService, "get_pdf", fake_get_pdf)
+    monkeypatch.setattr("app.services.email_service.SendSmtpEmailAttachment", DummyAttachment)
+
+    attachment = service._document_attachment(order, "invoice")
+
+    assert requested == [(order, "invoice")]
+    assert attachment.name == "invoice_ORD-12345.pdf"
+    assert attachment.content == base64.b64encode(b"cached-invoice").decode("utf-8")
+
+
+def test_document_attachment_returns_none_when_document_unavailable(monkeypatch, caplog):
+    service = EmailService(_email_config())
+
+    monkeypatch.setattr(
+        email_service_module.DocumentService, "get_pdf", lambda _order, _doc_type: None
+    )
+
+    with caplog.at_level(logging.ERROR):
+        result = service._document_attachment(_order(), "receipt")
+
+    assert result is None
+    assert "Failed to get receipt PDF for ORD-12345" in caplog.text
 
 
 def test_render_template_injects_current_year(monkeypatch):
     service = EmailService(_email_config())
     captured = {}
 
-    def fake_render_template_string(source, **context):
-        captured["source"] = source
+    def fake_render(name, **context):
+        captured["name"] = name
         captured["context"] = context
         return "rendered-template"
 
-    monkeypatch.setattr(
-        "app.services.email_service.render_template_string",
-        fake_render_template_string,
-    )
+    monkeypatch.setattr(email_service_module.template_registry, "render", fake_render)
 
-    result = service._render_template("{{ subject }}", subject="Hello", content="Body")
+    result = service._render_template(EmailService.BASE_TEMPLATE, subject="Hello", content="Body")
 
     assert result == "rendered-template"
-    assert captured["source"] == "{{ subject }}"
+    assert captured["name"] == "emails/base.html"
     assert captured["context"]["subject"] == "Hello"
     assert "current_year" in captured["context"]
 
 
+def test_render_template_renders_registered_base_template():
+    service = EmailService(_email_config())
+
+    html = service._render_template(
+        EmailService.BASE_TEMPLATE, subject="Hello & welcome", content="<p>Body</p>"
+    )
+
+    assert "<h1>Hello &amp; welcome</h1>" in html
+    assert "<p>Body</p>" in html
+    assert str(datetime.now(UTC).year) in html
+
+
 def test_render_template_raises_on_render_error(monkeypatch, caplog):
     service = EmailService(_email_config())
 
     def explode(*_args, **_kwargs):
         raise ValueError("template parse error")
 
-    monkeypatch.setattr("app.services.email_service.render_template_string", explode)
+    monkeypatch.setattr(email_service_module.template_registry, "render", explode)
 
     with caplog.at_level(logging.ERROR):
         with pytest.raises(ValueError, match="template parse error"):
-            service._render_template("{{ subject }}", subject="Hello")
+            service._render_template(EmailService.BASE_TEMPLATE, subject="Hello")
 
     assert "Template rendering failed" in caplog.text
 
@@ -321,7 +372,11 @@ def test_send_order_confirmation_success_with_attachment_and_item_format_error(m
         return "<html>rendered</html>"
 
     monkeypatch.setattr(service, "_render_template", fake_render_template)
-    monkeypatch.setattr(service, "_generate_pdf", lambda _content, _name: "pdf-attachment")
+    monkeypatch.setattr(
+        service,
+        "_document_attachment",
+        lambda _order, doc_type: "pdf-attachment" if doc_type == "invoice" else None,
+    )
 
     def fake_send_email(**kwargs):
         send_calls.update(kwargs)
@@ -332,7 +387,7 @@ def test_send_order_confirmation_success_with_attachment_and_item_format_error(m
     result = service.send_order_confirmation(order)
 
     assert result == {"success": True}
-    assert len(render_calls) == 2
+    assert len(render_calls) == 1
     assert send_calls["to_email"] == "buyer@example.com"
     assert send_calls["attachments"] == ["pdf-attachment"]
 
@@ -344,7 +399,7 @@ def test_send_order_confirmation_without_pdf_attachment(monkeypatch):
     monkeypatch.setattr(
         service, "_render_template", lambda *_args, **_kwargs: "<html>rendered</html>"
     )
-    monkeypatch.setattr(service, "_generate_pdf", lambda _content, _name: None)
+    monkeypatch.setattr(service, "_document_attachment", lambda _order, _doc_type: None)
 
     captured = {}
 
@@ -393,7 +448,7 @@ def test_send_payment_notification_success_with_receipt_and_transaction(monkeypa
         return "<html>payment rendered</html>"
 
     monkeypatch.setattr(service, "_render_template", fake_render_template)
-    monkeypatch.setattr(service, "_generate_pdf", lambda _content, _name: "receipt-pdf")
+    monkeypatch.setattr(service, "_generate_pdf", lambda doc_type, _order, _name: f"{doc_type}-pdf")
 
     def fake_send_email(**kwargs):
         send_calls.update(kwargs)
@@ -404,9 +459,33 @@ def test_send_payment_notification_success_with_receipt_and_transaction(monkeypa
     result = service.send_payment_notification(payment)
 
     assert result == {"success": True}
-    assert len(render_calls) == 2
+    assert len(render_calls) == 1
     assert send_calls["subject"] == "Payment Failed - Order #ORD-12345"
-    assert send_calls["attachments"] == ["receipt-pdf"]
+    assert send_calls["attachments"] == ["payment_slip-pdf"]
+
+
+def test_send_payment_notification_success_attaches_cached_receipt(monkeypatch):
+    service = EmailService(_email_config())
+    payment = _payment(status="Success")
+    send_calls = {}
+
+    monkeypatch.setattr(service, "_render_template", lambda **_kwargs: "<html>paid</html>")
+    monkeypatch.setattr(
+        service,
+        "_document_attachment",
+        lambda _order, doc_type: f"cached-{doc_type}",
+    )
+
+    def fake_send_email(**kwargs):
+        send_calls.update(kwargs)
+        return {"success": True}
+
+    monkeypatch.setattr(service, "_send_email", fake_send_email)
+
+    result = service.send_payment_notification(payment)
+
+    assert result == {"success": True}
+    assert send_calls["attachments"] == ["cached-receipt"]
 
 
 def test_send_payment_notification_handles_exception(monkeypatch):
@@ -0,0 +1,294 @@
+import threading
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import (
+    Brand,
+    Cart,
+    CartItem,
+    Category,
+    Order,
+    Product,
+    ProductVariation,
+    StockReservation,
+    User,
+)
+from app.services.inventory_service import InventoryService
+from app.services.order_service import OrderService
+
+
+def _payload(total_amount, payment_method="COD"):
+    return {
+        "address": {
+            "firstName": "John",
+            "lastName": "Doe",
+            "email": "john@example.com",
+            "phone": "0712345678",
+            "city": "Nairobi",
+            "street": "Moi Avenue",
+        },
+        "payment_method": payment_method,
+        "total_amount": total_amount,
+    }
+
+
+def _fill_cart(user_id, *lines):
+    cart = Cart.query.filter_by(user_id=user_id).first()
+    if cart is None:
+        cart = Cart(user_id=user_id)
+        db.session.add(cart)
+        db.session.flush()
+    for product_id, quantity, variation_name in lines:
+        db.session.add(
+            CartItem(
+                cart_id=cart.id,
+                product_id=product_id,
+                quantity=quantity,
+                variation_name=variation_name,
+            )
+        )
+    db.session.commit()
+
+
+def _set_stock(product, stock, variation_stock=None):
+    db.session.execute(db.update(Product).where(Product.id == product.id).values(stock=stock))
+    db.session.execute(
+        db.update(ProductVariation)
+        .where(ProductVariation.product_id == product.id)
+        .values(stock=variation_stock)
+    )
+    db.session.commit()
+
+
+def _stock(model, row_id):
+    return db.session.scalar(db.select(model.stock).where(model.id == row_id))
+
+
+def test_checkout_takes_product_and_variation_stock(app, user, product, product_with_variation):
+    _set_stock(product, 5)
+    _set_stock(product_with_variation, None, variation_stock=3)
+    _fill_cart(user.id, (product.id, 2, ""), (product_with_variation.id, 1, "12GB - 512GB"))
+
+    order, error = OrderService.create_order(user.id, _payload(2 * 120000 + 120000))
+
+    assert error is None
+    assert _stock(Product, product.id) == 3
+    stocks = {v.storage: _stock(ProductVariation, v.id) for v in product_with_variation.variations}
+    assert stocks == {"256GB": 3, "512GB": 2}
+    # Untracked stock stays untracked
+    assert _stock(Product, product_with_variation.id) is None
+    assert StockReservation.query.filter_by(order_id=order.id).one().status == "committed"
+
+
+def test_checkout_rejects_lines_beyond_stock_and_changes_nothing(
+    app, user, product, product_with_variation
+):
+    _set_stock(product, 5)
+    _set_stock(product_with_variation, None, variation_stock=1)
+    _fill_cart(user.id, (product.id, 1, ""), (product_with_variation.id, 2, "8GB - 256GB"))
+
+    order, error = OrderService.create_order(user.id, _payload(120000 + 2 * 100000))
+
+    assert order is None
+    assert error == "Insufficient stock for Samsung Galaxy S24 (8GB - 256GB)"
+    assert _stock(Product, product.id) == 5
+    assert Order.query.count() == 0
+    assert CartItem.query.count() == 2
+
+
+def test_mpesa_order_holds_stock_until_payment_fails(app, user, product):
+    _set_stock(product, 2)
+    _fill_cart(user.id, (product.id, 2, ""))
+
+    order, error = OrderService.create_order(user.id, _payload(240000, "MPESA"))
+    assert error is None
+    reservation = StockReservation.query.filter_by(order_id=order.id).one()
+    assert reservation.status == "held"
+    assert reservation.expires_at > datetime.utcnow()
+    assert _stock(Product, product.id) == 0
+
+    OrderService.update_payment_status(order.order_reference, {"status": "Failed"})
+
+    assert _stock(Product, product.id) == 2
+    assert StockReservation.query.filter_by(order_id=order.id).one().status == "released"
+
+    # Releasing twice does not give the stock back twice
+    assert InventoryService.release_reservation(order.id) is False
+    assert _stock(Product, product.id) == 2
+
+
+def test_checkout_reserves_exactly_the_lines_it_orders(app, user, product, monkeypatch):
+    from app.services.cart_service import CartService
+
+    _set_stock(product, 5)
+    _fill_cart(user.id, (product.id, 1, ""))
+    price_lines = CartService.price_lines
+
+    def price_then_change_from_another_tab(lines):
+        priced = price_lines(lines)
+        db.session.execute(db.update(CartItem).values(quantity=3))
+        return priced
+
+    monkeypatch.setattr(CartService, "price_lines", price_then_change_from_another_tab)
+
+    order, error = OrderService.create_order(user.id, _payload(120000, "MPESA"))
+
+    assert error is None
+    assert [item.quantity for item in order.order_items] == [1]
+    assert _stock(Product, product.id) == 4
+
+    # Releasing gives back what was taken, no more
+    OrderService.update_payment_status(order.order_reference, {"status": "Failed"})
+    assert _stock(Product, product.id) == 5
+
+
+def test_successful_payment_commits_hold(app, user, product):
+    _set_stock(product, 3)
+    _fill_cart(user.id, (product.id, 1, ""))
+    order, _ = OrderService.create_order(user.id, _payload(120000, "MPESA"))
+
+    OrderService.update_payment_status(order.order_reference, {"status": "Success"})
+
+    assert StockReservation.query.filter_by(order_id=order.id).one().status == "committed"
+    assert _stock(Product, product.id) == 2
+
+
+def test_expired_holds_are_released_and_fail_the_payment(app, user, product, runner):
+    _set_stock(product, 1)
+    _fill_cart(user.id, (product.id, 1, ""))
+    order, _ = OrderService.create_order(user.id, _payload(120000, "MPESA"))
+    reservation = StockReservation.query.filter_by(order_id=order.id).one()
+    reservation.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    result = runner.invoke(args=["release-stock-holds"])
+
+    assert result.exit_code == 0
+    assert "Released 1 expired stock hold(s)" in result.output
+    db.session.expire_all()
+    order = db.session.get(Order, order.id)
+    assert order.status == "Payment Failed"
+    assert order.payment.status == "Failed"
+    assert _stock(Product, product.id) == 1
+
+
+def test_checkout_reclaims_expired_holds_when_stock_is_short(app, user, admin_user, product):
+    _set_stock(product, 1)
+    _fill_cart(admin_user.id, (product.id, 1, ""))
+    held_order, _ = OrderService.create_order(admin_user.id, _payload(120000, "MPESA"))
+    StockReservation.query.filter_by(order_id=held_order.id).one().expires_at = datetime(2020, 1, 1)
+    db.session.commit()
+
+    _fill_cart(user.id, (product.id, 1, ""))
+    order, error = OrderService.create_order(user.id, _payload(120000))
+
+    assert error is None
+    assert _stock(Product, product.id) == 0
+    assert db.session.get(Order, held_order.id).status == "Payment Failed"
+
+
+def test_checkout_drops_its_row_locks_before_reclaiming_holds(
+    app, user, admin_user, product, monkeypatch
+):
+    # Reclaiming locks the held order's rows; doing so while still holding the
+    # failed attempt's locks can deadlock against another checkout (Postgres)
+    _set_stock(product, 1)
+    _fill_cart(admin_user.id, (product.id, 1, ""))
+    held_order, _ = OrderService.create_order(admin_user.id, _payload(120000, "MPESA"))
+    StockReservation.query.filter_by(order_id=held_order.id).one().expires_at = datetime(2020, 1, 1)
+    db.session.commit()
+
+    release = InventoryService.release_expired_reservations
+    in_transaction = []
+
+    def recording_release(*args, **kwargs):
+        in_transaction.append(db.session().in_transaction())
+        return release(*args, **kwargs)
+
+    monkeypatch.setattr(InventoryService, "release_expired_reservations", recording_release)
+
+    _fill_cart(user.id, (product.id, 1, ""))
+    order, error = OrderService.create_order(user.id, _payload(120000))
+
+    assert error is None
+    assert in_transaction == [False]
+    assert _stock(Product, product.id) == 0
+
+
+def test_retry_takes_released_stock_again_or_refuses(app, user, admin_user, product):
+    _set_stock(product, 1)
+    _fill_cart(user.id, (product.id, 1, ""))
+    order, _ = OrderService.create_order(user.id, _payload(120000, "MPESA"))
+    InventoryService.release_reservation(order.id)
+    db.session.commit()
+
+    assert InventoryService.hold_again(order.id) is None
+    db.session.commit()
+    assert _stock(Product, product.id) == 0
+
+    InventoryService.release_reservation(order.id)
+    _set_stock(product, 0)
+    assert InventoryService.hold_again(order.id) == "Insufficient stock for iPhone 15"
+    db.session.rollback()
+
+
+def test_canceling_an_order_restocks(app, user, admin_user, product):
+    _set_stock(product, 4)
+    _fill_cart(user.id, (product.id, 3, ""))
+    order, _ = OrderService.create_order(user.id, _payload(360000))
+    assert _stock(Product, product.id) == 1
+
+    success, _ = OrderService.update_order_status(order.id, "Canceled", admin_user.id)
+
+    assert success is True
+    assert _stock(Product, product.id) == 4
+
+
+def test_concurrent_buyers_never_oversell_last_units(file_db_app):
+    category = Category(name="Phones")
+    brand = Brand(name="Acme")
+    db.session.add_all([category, brand])
+    db.session.flush()
+    product = Product(
+        name="Promo Phone",
+        price=1000,
+        description="x",
+        image_urls=[],
+        category_id=category.id,
+        brand_id=brand.id,
+        stock=10,
+    )
+    buyers = [
+        User(username=f"buyer{i}", email=f"buyer{i}@example.com", phone_number="07")
+        for i in range(40)
+    ]
+    for buyer in buyers:
+        buyer.password_hash = "x"
+    db.session.add_all([product, *buyers])
+    db.session.commit()
+    product_id = product.id
+    for buyer in buyers:
+        _fill_cart(buyer.id, (product_id, 1, ""))
+    buyer_ids = [buyer.id for buyer in buyers]
+
+    barrier = threading.Barrier(len(buyer_ids))
+    results = []
+
+    def checkout(user_id):
+        with file_db_app.app_context():
+            barrier.wait()
+            order, error = OrderService.create_order(user_id, _payload(1000))
+            results.append(error)
+            db.session.remove()
+
+    threads = [threading.Thread(target=checkout, args=(user_id,)) for user_id in buyer_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sold = [error for error in results if error is None]
+    assert len(sold) == 10, results
+    assert set(results) - {None} == {"Insufficient stock for Promo Phone"}
+    assert _stock(Product, product_id) == 0
+    assert Order.query.count() == 10
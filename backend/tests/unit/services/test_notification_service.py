@@ -3,6 +3,8 @@ import os
 from datetime import datetime
 from types import SimpleNamespace
 
+import pytest
+
 from app import create_app
 from app.models import Notification
 from app.services.notification_service import NotificationService
@@ -172,3 +174,58 @@ def test_mark_all_as_read_handles_update_error(monkeypatch, caplog):
     assert result == 0
     assert called["rollback"] == 1
     assert "Error marking all notifications as read" in caplog.text
+
+
+# Unread counter tests
+def test_unread_counter_tracks_create_and_mark_as_read(db, user):
+    first = NotificationService.create_notification(user.id, "One")
+    NotificationService.create_notification(user.id, "Two")
+    assert NotificationService.get_unread_count(user.id) == 2
+
+    NotificationService.mark_as_read(first.id, user.id)
+    NotificationService.mark_as_read(first.id, user.id)
+    assert NotificationService.get_unread_count(user.id) == 1
+
+    NotificationService.mark_all_as_read(user.id)
+    assert NotificationService.get_unread_count(user.id) == 0
+
+
+def test_unread_counter_does_not_touch_user_updated_at(db, user):
+    before = user.updated_at
+
+    NotificationService.create_notification(user.id, "Hello")
+    db.session.refresh(user)
+
+    assert user.updated_at == before
+
+
+# Pagination tests
+def test_notifications_page_walks_all_rows_newest_first(db, user):
+    created_at = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(5):
+        # Two rows share a timestamp to exercise the id tie-break
+        db.session.add(
+            Notification(
+                user_id=user.id,
+                message=f"n{i}",
+                is_read=False,
+                created_at=created_at.replace(minute=min(i, 3)),
+            )
+        )
+    db.session.commit()
+
+    messages = []
+    cursor = None
+    while True:
+        page = NotificationService.get_notifications_page(user.id, limit=2, cursor=cursor)
+        messages.extend(n["message"] for n in page["notifications"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert messages == ["n4", "n3", "n2", "n1", "n0"]
+
+
+def test_notifications_page_rejects_bad_cursor(db, user):
+    with pytest.raises(ValueError):
+        NotificationService.get_notifications_page(user.id, cursor="not-a-cursor")
@@ -1,5 +1,8 @@
+from sqlalchemy import event, update
+
 from app.extensions import db
-from app.models import Cart, CartItem, Order
+from app.models import Cart, CartItem, Order, OrderItem, ProductVariation
+from app.utils.price_index import get_price_index
 
 
 def _order_service(app):
@@ -101,3 +104,94 @@ def test_update_payment_status_success_updates_order(app, monkeypatch, order):
     assert message == "Payment status updated"
     assert refreshed.status == "Order Placed"
     assert refreshed.payment.status == "Success"
+
+
+def test_create_order_prices_lines_from_catalog_not_stored_price(
+    app, user, product_with_variation, cart
+):
+    order_service = _order_service(app)
+    db.session.add(
+        CartItem(
+            cart_id=cart.id,
+            product_id=product_with_variation.id,
+            quantity=2,
+            variation_name="12GB - 512GB",
+            variation_price=1,
+        )
+    )
+    db.session.commit()
+
+    order, error = order_service.create_order(user.id, _order_payload(total_amount=2))
+    assert order is None
+    assert error == "Total amount does not match cart total"
+
+    order, error = order_service.create_order(user.id, _order_payload(total_amount=240000))
+    assert error is None
+    assert order.order_items[0].variation_price == 120000
+
+
+def test_create_order_items_use_the_prices_the_total_was_checked_against(
+    app, user, product_with_variation, cart
+):
+    order_service = _order_service(app)
+    db.session.add(
+        CartItem(
+            cart_id=cart.id,
+            product_id=product_with_variation.id,
+            quantity=2,
+            variation_name="12GB - 512GB",
+        )
+    )
+    db.session.commit()
+    assert get_price_index().unit_price(product_with_variation.id, "12GB - 512GB") == 120000
+
+    # The catalog row changes but this worker's price index has not caught up yet
+    db.session.execute(
+        update(ProductVariation)
+        .where(ProductVariation.product_id == product_with_variation.id)
+        .values(price=130000)
+    )
+    db.session.commit()
+
+    order, error = order_service.create_order(user.id, _order_payload(total_amount=240000))
+    assert error is None
+    assert [item.variation_price for item in order.order_items] == [120000]
+
+
+def _checkout_statement_count(app, user_id, total_amount):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_execute)
+    try:
+        order, error = _order_service(app).create_order(user_id, _order_payload(total_amount))
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_execute)
+    assert error is None
+    return order, len(statements)
+
+
+def test_create_order_statement_count_does_not_grow_with_cart_size(
+    app, user, admin_user, product, multiple_products
+):
+    db.session.add_all([Cart(user_id=user.id), Cart(user_id=admin_user.id)])
+    db.session.flush()
+    small_cart, large_cart = Cart.query.order_by(Cart.id).all()
+    db.session.add(CartItem(cart_id=small_cart.id, product_id=product.id, quantity=1))
+    db.session.add_all(
+        CartItem(cart_id=large_cart.id, product_id=p.id, quantity=2) for p in multiple_products
+    )
+    db.session.commit()
+    large_cart_id = large_cart.id
+    get_price_index().base_price(product.id)  # build the index outside the measurement
+
+    _, small_statements = _checkout_statement_count(app, user.id, float(product.price))
+    large_total = sum(float(p.price) * 2 for p in multiple_products)
+    order, large_statements = _checkout_statement_count(app, admin_user.id, large_total)
+
+    assert large_statements == small_statements
+    assert OrderItem.query.filter_by(order_id=order.id).count() == len(multiple_products)
+    assert CartItem.query.filter_by(cart_id=large_cart_id).count() == 0
+    assert Cart.query.count() == 0
@@ -419,3 +419,56 @@ def test_delete_product_handles_internal_exception(app, product, monkeypatch):
 
     assert success is False
     assert "delete boom" in error
+
+
+def test_create_and_update_fill_numeric_spec_columns(app, category, brand, monkeypatch):
+    product_service = _product_service(app)
+    monkeypatch.setattr(
+        "app.services.product_service.upload_images",
+        lambda *_args, **_kwargs: (True, ["https://example.com/p.jpg"]),
+    )
+
+    product, _ = product_service.create_product(
+        _phone_payload(category.id, brand.id, storage="1TB", display='6.7" OLED'),
+        image_files=[object()],
+    )
+
+    assert (product.ram_gb, product.storage_gb, product.battery_mah, product.display_inches) == (
+        8,
+        1024,
+        5000,
+        6.7,
+    )
+
+    product_service.update_product(product.id, {"ram": "12 GB", "battery": "Long lasting"})
+
+    assert product.ram_gb == 12
+    assert product.battery_mah is None
+
+
+def test_backfill_numeric_specs_updates_only_stale_rows(app, multiple_products, product, runner):
+    db.session.execute(
+        db.update(Product)
+        .where(Product.id == product.id)
+        .values(ram_gb=8, storage_gb=256, battery_mah=3000, display_inches=6.1)
+    )
+    db.session.commit()
+
+    result = runner.invoke(args=["backfill-spec-attributes", "--batch-size", "2"])
+
+    assert result.exit_code == 0
+    assert f"Updated numeric specs of {len(multiple_products)} product(s)" in result.output
+    rams = db.session.scalars(db.select(Product.ram_gb).order_by(Product.id)).all()
+    assert None not in rams
+
+
+def test_get_all_products_filters_spec_ranges_in_sql(app, product, product_with_variation):
+    product_service = _product_service(app)
+    product_service.update_product(product.id, {"ram": "12GB"})
+    product_service.update_product(product_with_variation.id, {"ram": "8GB"})
+
+    at_least_12 = product_service.get_all_products({"ram": (12, None)})
+    between = product_service.get_all_products({"battery": (3500, 4500), "display": (None, 6.5)})
+
+    assert [p["id"] for p in at_least_12] == [product.id]
+    assert [p["id"] for p in between] == [product_with_variation.id]
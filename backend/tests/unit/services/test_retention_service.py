@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta
+
+from app.models import AuditLog, AuditLogArchive, IdempotencyKey, Notification
+from app.services.retention_service import RetentionService
+
+
+def _days_ago(days):
+    return datetime.utcnow() - timedelta(days=days)
+
+
+def test_prune_deletes_only_old_read_notifications_in_batches(app, db, user, monkeypatch):
+    monkeypatch.setitem(app.config, "RETENTION_BATCH_SIZE", 2)
+    rows = [Notification(user_id=user.id, message=f"old read {i}", is_read=True) for i in range(5)]
+    rows += [
+        Notification(user_id=user.id, message="old unread", is_read=False),
+        Notification(user_id=user.id, message="new read", is_read=True),
+    ]
+    for row in rows:
+        row.created_at = _days_ago(1) if row.message == "new read" else _days_ago(200)
+    db.session.add_all(rows)
+    db.session.commit()
+
+    deleted = RetentionService.prune_read_notifications(max_age_days=90)
+
+    assert deleted == 5
+    remaining = {n.message for n in Notification.query.filter_by(user_id=user.id)}
+    assert {"old unread", "new read"} <= remaining
+    assert not any(message.startswith("old read") for message in remaining)
+
+
+def test_archive_moves_whole_old_months_and_keeps_recent_logs(app, db, admin_user, monkeypatch):
+    monkeypatch.setitem(app.config, "RETENTION_BATCH_SIZE", 2)
+    old = [
+        AuditLog(admin_id=admin_user.id, action="january", created_at=datetime(2020, 1, 5)),
+        AuditLog(admin_id=admin_user.id, action="january", created_at=datetime(2020, 1, 20)),
+        AuditLog(admin_id=admin_user.id, action="january", created_at=datetime(2020, 1, 31)),
+        AuditLog(admin_id=admin_user.id, action="march", created_at=datetime(2020, 3, 1)),
+    ]
+    recent = AuditLog(admin_id=admin_user.id, action="recent", created_at=_days_ago(1))
+    db.session.add_all(old + [recent])
+    db.session.commit()
+    old_ids = {log.id for log in old}
+
+    archived = RetentionService.archive_audit_logs(max_age_days=365)
+
+    assert archived == {"2020-01": 3, "2020-03": 1}
+    assert {log.action for log in AuditLog.query.all()} == {"recent"}
+    archive = AuditLogArchive.query.all()
+    assert {row.id for row in archive} == old_ids
+    assert {row.archive_month for row in archive} == {"2020-01", "2020-03"}
+    assert all(row.admin_id == admin_user.id for row in archive)
+
+
+def test_archive_with_nothing_old_returns_empty(app, db, admin_user):
+    db.session.add(AuditLog(admin_id=admin_user.id, action="recent"))
+    db.session.commit()
+
+    assert RetentionService.archive_audit_logs(max_age_days=365) == {}
+    assert AuditLog.query.count() == 1
+
+
+def test_retention_cli_commands(app, db, admin_user, runner):
+    with app.app_context():
+        db.session.add(
+            Notification(
+                user_id=admin_user.id, message="old", is_read=True, created_at=_days_ago(200)
+            )
+        )
+        db.session.add(
+            AuditLog(admin_id=admin_user.id, action="old", created_at=datetime(2020, 2, 2))
+        )
+        db.session.commit()
+
+    result = runner.invoke(args=["prune-notifications", "--days", "30"])
+    assert result.exit_code == 0
+    assert "Pruned 1 read notification(s)" in result.output
+
+    result = runner.invoke(args=["archive-audit-logs"])
+    assert result.exit_code == 0
+    assert "2020-02: archived 1 audit log(s)" in result.output
+    assert "Archived 1 audit log(s)" in result.output
+
+
+def test_prune_idempotency_keys_deletes_only_expired_keys(app, db, user):
+    db.session.add_all(
+        [
+            IdempotencyKey(
+                user_id=user.id,
+                key="old",
+                request_hash="x",
+                created_at=datetime.utcnow() - timedelta(hours=30),
+            ),
+            IdempotencyKey(user_id=user.id, key="new", request_hash="x"),
+        ]
+    )
+    db.session.commit()
+
+    assert RetentionService.prune_idempotency_keys(max_age_hours=24) == 1
+    assert [row.key for row in IdempotencyKey.query.all()] == ["new"]
@@ -0,0 +1,51 @@
+from sqlalchemy import func, select
+
+from app.models import WishList, wishlist_products
+from app.services.wishlist_service import WishlistService
+
+
+def _membership_count(db, product_id):
+    return db.session.scalar(
+        select(func.count())
+        .select_from(wishlist_products)
+        .where(wishlist_products.c.product_id == product_id)
+    )
+
+
+def test_get_wishlist_id_creates_only_when_asked(app, db, user):
+    assert WishlistService.get_wishlist_id(user.id) is None
+
+    wishlist_id = WishlistService.get_wishlist_id(user.id, create=True)
+    db.session.commit()
+
+    assert wishlist_id == WishList.query.filter_by(user_id=user.id).one().id
+    assert WishlistService.get_wishlist_id(user.id) == wishlist_id
+
+
+def test_add_product_ignores_duplicates(app, db, user, product):
+    wishlist_id = WishlistService.get_wishlist_id(user.id, create=True)
+
+    assert WishlistService.add_product(wishlist_id, product.id) is True
+    assert WishlistService.add_product(wishlist_id, product.id) is False
+    db.session.commit()
+
+    assert _membership_count(db, product.id) == 1
+
+
+def test_remove_product_reports_missing_rows(app, db, wishlist, product):
+    assert WishlistService.remove_product(wishlist.id, product.id) is True
+    assert WishlistService.remove_product(wishlist.id, product.id) is False
+    db.session.commit()
+
+    assert _membership_count(db, product.id) == 0
+
+
+def test_remove_product_everywhere_clears_every_wishlist(app, db, wishlist, product, admin_user):
+    other_id = WishlistService.get_wishlist_id(admin_user.id, create=True)
+    WishlistService.add_product(other_id, product.id)
+    db.session.commit()
+
+    assert WishlistService.remove_product_everywhere(product.id) == 2
+    db.session.commit()
+
+    assert _membership_count(db, product.id) == 0
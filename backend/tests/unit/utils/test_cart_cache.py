@@ -0,0 +1,63 @@
+from app.utils import pubsub as pubsub_module
+from app.utils.cart_cache import CartCache, get_cart_cache, invalidate_cart
+
+
+def test_cart_cache_serves_hits_until_ttl(app):
+    cache = CartCache(ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return {"items": [], "item_count": 0, "total": 0.0}
+
+    with app.app_context():
+        cache.get(1, loader)
+        cache.get("1", loader)
+
+    assert len(loads) == 1
+
+
+def test_invalidation_during_load_is_not_cached(app):
+    cache = CartCache(ttl=60)
+
+    def stale_loader():
+        # The cart changes while the view is being built
+        cache.invalidate(7)
+        return {"stale": True}
+
+    with app.app_context():
+        assert cache.get(7, stale_loader) == {"stale": True}
+        assert cache.get(7, lambda: {"stale": False}) == {"stale": False}
+
+
+def test_invalidate_cart_reaches_other_workers_through_pubsub(app, db):
+    other_worker = CartCache(ttl=60)
+    other_worker.get(3, lambda: {"version": 1})
+
+    invalidate_cart(3)
+
+    assert other_worker.get(3, lambda: {"version": 2}) == {"version": 2}
+    assert get_cart_cache().get(3, lambda: {"version": 3}) == {"version": 3}
+
+
+def test_cache_is_dropped_when_subscription_moves_to_redis(app, monkeypatch):
+    cache = CartCache(ttl=60)
+
+    class FakeRedisSubscription:
+        is_local = False
+
+        def wait(self, timeout):
+            return None
+
+        def close(self):
+            pass
+
+    with app.app_context():
+        # Subscribed while Redis was down, so other workers' invalidations were missed
+        cache.get(4, lambda: {"version": 1})
+
+        monkeypatch.setattr(pubsub_module, "get_redis", lambda: object())
+        monkeypatch.setattr(pubsub_module, "listen", lambda channel: FakeRedisSubscription())
+
+        assert cache.get(4, lambda: {"version": 2}) == {"version": 2}
+        assert cache._subscription.is_local is False
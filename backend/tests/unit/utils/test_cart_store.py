@@ -0,0 +1,277 @@
+import pytest
+import redis
+
+from app.models import Cart, CartItem
+from app.services.cart_service import CartService
+from app.services.order_service import OrderService
+from app.utils import cart_store
+from app.utils.cart_store import DIRTY_KEY, RedisCartStore
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def execute(self):
+        return [getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Hashes, sets and strings in dicts; scripts emulated in Python"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def register_script(self, source):
+        return {
+            cart_store.HYDRATE_SCRIPT: self._hydrate,
+            cart_store.SET_QUANTITY_SCRIPT: self._set_quantity,
+            cart_store.SYNC_SCRIPT: self._sync,
+            cart_store.CLEAR_SCRIPT: self._clear,
+        }[source]
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def hgetall(self, key):
+        return {field: str(value) for field, value in self.data.get(key, {}).items()}
+
+    def hget(self, key, field):
+        value = self.data.get(key, {}).get(field)
+        return None if value is None else str(value)
+
+    def hmget(self, key, *fields):
+        return [self.hget(key, field) for field in fields]
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[field] = str(value)
+        return 1
+
+    def hsetnx(self, key, field, value):
+        fields = self.data.setdefault(key, {})
+        if field in fields:
+            return 0
+        fields[field] = str(value)
+        return 1
+
+    def hincrby(self, key, field, amount):
+        fields = self.data.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+        return int(fields[field])
+
+    def hdel(self, key, *fields):
+        existing = self.data.get(key, {})
+        return sum(1 for field in fields if existing.pop(field, None) is not None)
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+        return 1
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(str(member))
+        return 1
+
+    def srem(self, key, member):
+        members = self.data.get(key, set())
+        if str(member) in members:
+            members.discard(str(member))
+            return 1
+        return 0
+
+    def spop(self, key, count):
+        members = self.data.get(key, set())
+        return [members.pop() for _ in range(min(count, len(members)))]
+
+    def _hydrate(self, keys, args):
+        if keys[0] in self.data:
+            stale = args[2]
+            if stale == "" or keys[2] in self.data or self.hget(keys[0], "_synced") != stale:
+                return 0
+            del self.data[keys[0]]
+            self.srem(keys[1], args[1])
+        values = args[3:]
+        self.data[keys[0]] = {values[i]: str(values[i + 1]) for i in range(0, len(values), 2)}
+        return 1
+
+    def _sync(self, keys, args):
+        if keys[0] not in self.data:
+            return 0
+        self.data[keys[0]]["_synced"] = str(args[0])
+        return 1
+
+    def _clear(self, keys, args):
+        synced = self.hget(keys[0], "_synced")
+        self.data[keys[0]] = {"_loaded": "1"}
+        if synced is not None:
+            self.data[keys[0]]["_synced"] = synced
+        self.expire(keys[0], args[0])
+        self.sadd(keys[1], args[1])
+        return 1
+
+    def _set_quantity(self, keys, args):
+        fields = self.data.get(keys[0], {})
+        if args[0] not in fields:
+            return 0
+        fields[args[0]] = str(args[1])
+        self.sadd(keys[1], args[3])
+        return 1
+
+
+@pytest.fixture
+def fake_redis(app, monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(cart_store, "get_redis", lambda: fake)
+    monkeypatch.setitem(app.config, "CART_STORE_BACKEND", "redis")
+    monkeypatch.setitem(app.config, "CART_WRITE_BEHIND_SECONDS", 0)
+    return fake
+
+
+def _sql_lines(cart_id):
+    return {
+        (item.product_id, item.variation_name): item.quantity
+        for item in CartItem.query.filter_by(cart_id=cart_id)
+    }
+
+
+def test_store_add_remove_and_lines_round_trip():
+    store = RedisCartStore(FakeRedis(), ttl=60)
+
+    store.add(5, [{"product_id": 1, "variation_name": None, "quantity": 2}])
+    store.add(5, [{"product_id": 1, "variation_name": "8GB - 256GB", "quantity": 1}])
+    store.add(
+        5,
+        [
+            {
+                "product_id": 1,
+                "variation_name": "8GB - 256GB",
+                "quantity": 2,
+                "variation_price": 90000,
+            }
+        ],
+    )
+
+    assert store.lines(5) == [
+        {"product_id": 1, "variation_name": "", "quantity": 2, "variation_price": None},
+        {"product_id": 1, "variation_name": "8GB - 256GB", "quantity": 3, "variation_price": 90000},
+    ]
+    assert store.remove(5, 1, None) is True
+    assert store.remove(5, 1, None) is False
+    assert store.set_quantity(5, 1, None, 4) is False
+    assert store.set_quantity(5, 1, "8GB - 256GB", 4) is True
+    assert store.pop_dirty(10) == [5]
+
+
+def test_cart_operations_stay_in_redis_until_flushed(app, db, user, product, fake_redis):
+    assert CartService.add_to_cart(user.id, product.id, 2)[0] is True
+    assert CartService.update_cart_item(str(user.id), product.id, 5)[0] is True
+    assert CartService.get_cart_view(user.id)["item_count"] == 5
+
+    # Nothing written to SQL yet
+    assert Cart.query.filter_by(user_id=user.id).first() is None
+
+    assert CartService.flush_dirty_carts() == 1
+    cart = Cart.query.filter_by(user_id=user.id).one()
+    assert _sql_lines(cart.id) == {(product.id, ""): 5}
+    assert fake_redis.data[DIRTY_KEY] == set()
+
+
+def test_redis_cart_is_hydrated_from_sql(app, db, cart_with_items, product, fake_redis):
+    user_id = cart_with_items.user_id
+
+    success, _ = CartService.add_to_cart(user_id, product.id, 1)
+
+    assert success is True
+    view = CartService.get_cart_view(user_id)
+    quantities = {item["product_id"]: item["quantity"] for item in view["items"]}
+    assert quantities[product.id] == 3
+    assert len(quantities) == 2
+
+
+def test_checkout_persists_redis_cart_and_forgets_it(app, db, user, product, fake_redis):
+    CartService.add_to_cart(user.id, product.id, 1)
+
+    order, error = OrderService.create_order(
+        user.id,
+        {
+            "address": {
+                "firstName": "A",
+                "lastName": "B",
+                "email": "a@example.com",
+                "phone": "0712345678",
+                "city": "Nairobi",
+                "street": "1 Street",
+            },
+            "payment_method": "COD",
+            "total_amount": product.price,
+        },
+    )
+
+    assert error is None
+    assert [item.product_id for item in order.order_items] == [product.id]
+    assert RedisCartStore.key(user.id) not in fake_redis.data
+    assert CartService.get_cart_view(user.id)["items"] == []
+
+
+def test_cart_falls_back_to_sql_when_redis_fails(app, db, user, product, fake_redis, monkeypatch):
+    def broken_pipeline():
+        raise redis.ConnectionError("connection lost")
+
+    monkeypatch.setattr(fake_redis, "pipeline", broken_pipeline)
+    monkeypatch.setattr("app.services.cart_service.mark_unavailable", lambda error=None: None)
+
+    success, _ = CartService.add_to_cart(user.id, product.id, 1)
+
+    assert success is True
+    cart = Cart.query.filter_by(user_id=user.id).one()
+    assert _sql_lines(cart.id) == {(product.id, ""): 1}
+
+
+@pytest.mark.parametrize("first", ["request", "write_behind"])
+def test_sql_writes_during_outage_replace_stale_redis_cart(
+    app, db, cart_with_items, product, fake_redis, monkeypatch, first
+):
+    user_id = cart_with_items.user_id
+    CartService.add_to_cart(user_id, product.id, 1)
+    assert CartService.flush_dirty_carts() == 1
+    CartService.add_to_cart(user_id, product.id, 1)  # pending flush: quantity 4
+
+    # Redis goes down; the change is written to SQL instead
+    monkeypatch.setattr(cart_store, "get_redis", lambda: None)
+    assert CartService.update_cart_item(user_id, product.id, 7)[0] is True
+
+    # Redis comes back still holding the old cart and its pending flush
+    monkeypatch.setattr(cart_store, "get_redis", lambda: fake_redis)
+    assert fake_redis.data[RedisCartStore.key(user_id)][f"q:{product.id}|"] == "4"
+    if first == "request":
+        quantities = {
+            item["product_id"]: item["quantity"]
+            for item in CartService.get_cart_view(user_id)["items"]
+        }
+        assert quantities[product.id] == 7
+    assert CartService.flush_dirty_carts() == 0
+    assert _sql_lines(cart_with_items.id)[(product.id, "")] == 7
+
+    CartService.add_to_cart(user_id, product.id, 1)
+    assert CartService.flush_dirty_carts() == 1
+    assert _sql_lines(cart_with_items.id)[(product.id, "")] == 8
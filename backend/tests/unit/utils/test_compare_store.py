@@ -0,0 +1,140 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+import redis
+
+from app.models import Compare, CompareItem
+from app.services.compare_service import CompareService
+from app.utils import compare_store
+from app.utils.compare_store import ADDED, ALREADY_PRESENT, FULL, RedisCompareStore
+
+
+class FakeRedis:
+    """Sorted sets as {member: score} dicts; the add script emulated in Python"""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+        self.writes = 0
+
+    def register_script(self, source):
+        return self._add
+
+    def zrangebyscore(self, key, minimum, maximum):
+        exclusive = minimum.startswith("(")
+        cutoff = float(minimum.lstrip("("))
+        members = sorted(self.data.get(key, {}).items(), key=lambda item: item[1])
+        return [m for m, score in members if score > cutoff or (not exclusive and score == cutoff)]
+
+    def zrem(self, key, member):
+        self.writes += 1
+        return int(self.data.get(key, {}).pop(str(member), None) is not None)
+
+    def delete(self, *keys):
+        self.writes += 1
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def _add(self, keys, args):
+        self.writes += 1
+        now, ttl, max_items, member = float(args[0]), int(args[1]), int(args[2]), str(args[3])
+        members = self.data.setdefault(keys[0], {})
+        for expired in [m for m, score in members.items() if score <= now - ttl]:
+            del members[expired]
+        if member in members:
+            return ALREADY_PRESENT
+        if len(members) >= max_items:
+            return FULL
+        members[member] = now
+        self.ttls[keys[0]] = ttl
+        return ADDED
+
+
+@pytest.fixture
+def fake_redis(app, monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(compare_store, "get_redis", lambda: fake)
+    return fake
+
+
+def test_store_caps_list_and_ignores_duplicates():
+    fake = FakeRedis()
+    store = RedisCompareStore(fake, ttl=3600, max_items=3)
+
+    assert [store.add(7, product_id) for product_id in (1, 2, 2, 3, 4)] == [
+        ADDED,
+        ADDED,
+        ALREADY_PRESENT,
+        ADDED,
+        FULL,
+    ]
+    assert store.product_ids(7) == [1, 2, 3]
+    assert fake.ttls["compare:7"] == 3600
+    assert store.remove(7, 2) is True
+    assert store.remove(7, 2) is False
+    assert store.clear(7) is True
+    assert store.clear(7) is False
+
+
+def test_expired_members_are_hidden_on_read_and_trimmed_on_add():
+    fake = FakeRedis()
+    store = RedisCompareStore(fake, ttl=3600, max_items=3)
+    now = time.time()
+    fake.data["compare:7"] = {"1": now - 7200, "2": now - 60, "3": now - 30}
+
+    assert store.product_ids(7) == [2, 3]
+    assert fake.writes == 0
+
+    assert store.add(7, 4) == ADDED
+    assert store.product_ids(7) == [2, 3, 4]
+    assert "1" not in fake.data["compare:7"]
+
+
+def test_service_uses_redis_without_touching_sql(app, db, user, multiple_products, fake_redis):
+    for product in multiple_products[:3]:
+        assert CompareService.add_product(user.id, product.id) == ADDED
+    assert CompareService.add_product(user.id, multiple_products[3].id) == FULL
+    assert CompareService.add_product(user.id, 99999) is None
+
+    assert CompareService.get_product_ids(user.id) == [p.id for p in multiple_products[:3]]
+    assert Compare.query.count() == 0
+
+
+def test_service_falls_back_to_sql_when_redis_fails(
+    app, db, user, product, fake_redis, monkeypatch
+):
+    def broken(*args, **kwargs):
+        raise redis.ConnectionError("down")
+
+    monkeypatch.setattr(RedisCompareStore, "add", broken)
+    monkeypatch.setattr(RedisCompareStore, "product_ids", broken)
+
+    assert CompareService.add_product(user.id, product.id) == ADDED
+    assert CompareService.get_product_ids(user.id) == [product.id]
+    assert CompareItem.query.count() == 1
+
+
+def test_sql_fallback_read_hides_expired_rows_without_deleting(app, db, user, multiple_products):
+    compare = Compare(user_id=user.id)
+    db.session.add(compare)
+    db.session.flush()
+    db.session.add_all(
+        [
+            CompareItem(
+                compare_id=compare.id,
+                product_id=multiple_products[0].id,
+                created_at=datetime.utcnow() - timedelta(hours=25),
+            ),
+            CompareItem(compare_id=compare.id, product_id=multiple_products[1].id),
+        ]
+    )
+    db.session.commit()
+
+    assert CompareService.get_product_ids(user.id) == [multiple_products[1].id]
+    assert CompareItem.query.count() == 2
+
+    # The expired row does not count towards the cap and is pruned by the next add
+    assert CompareService.add_product(user.id, multiple_products[2].id) == ADDED
+    assert CompareService.add_product(user.id, multiple_products[3].id) == ADDED
+    assert CompareService.add_product(user.id, multiple_products[4].id) == FULL
+    assert CompareItem.query.count() == 3
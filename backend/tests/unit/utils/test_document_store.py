@@ -0,0 +1,59 @@
+from app.utils.document_store import (
+    DiskDocumentStore,
+    MemoryDocumentStore,
+    _create_store,
+)
+
+
+def test_memory_store_replaces_older_versions():
+    store = MemoryDocumentStore()
+    store.put("PHK-1/invoice/v1", b"old")
+    store.put("PHK-1/receipt/v1", b"receipt")
+    store.put("PHK-1/invoice/v2", b"new")
+
+    assert store.get("PHK-1/invoice/v1") is None
+    assert store.get("PHK-1/invoice/v2") == b"new"
+    assert store.get("PHK-1/receipt/v1") == b"receipt"
+    assert store.path("PHK-1/invoice/v2") is None
+
+
+def test_memory_store_evicts_least_recently_used():
+    store = MemoryDocumentStore(max_items=2)
+    store.put("PHK-1/invoice/v1", b"one")
+    store.put("PHK-2/invoice/v1", b"two")
+    store.get("PHK-1/invoice/v1")
+    store.put("PHK-3/invoice/v1", b"three")
+
+    assert store.get("PHK-1/invoice/v1") == b"one"
+    assert store.get("PHK-2/invoice/v1") is None
+    assert store.get("PHK-3/invoice/v1") == b"three"
+
+
+def test_disk_store_writes_file_and_drops_stale_versions(tmp_path):
+    store = DiskDocumentStore(str(tmp_path))
+    store.put("PHK-1/invoice/v1", b"old")
+    store.put("PHK-1/receipt/v1", b"receipt")
+    store.put("PHK-1/invoice/v2", b"new")
+
+    path = store.path("PHK-1/invoice/v2")
+    assert path is not None
+    assert open(path, "rb").read() == b"new"
+    assert store.path("PHK-1/invoice/v1") is None
+    assert store.get("PHK-1/receipt/v1") == b"receipt"
+    assert sorted(p.name for p in (tmp_path / "PHK-1").iterdir()) == [
+        "invoice-v2.pdf",
+        "receipt-v1.pdf",
+    ]
+
+
+def test_disk_store_miss_returns_none(tmp_path):
+    store = DiskDocumentStore(str(tmp_path))
+
+    assert store.get("PHK-404/invoice/v1") is None
+    assert store.path("PHK-404/invoice/v1") is None
+
+
+def test_create_store_falls_back_to_disk_without_s3_bucket(tmp_path):
+    store = _create_store({"DOCUMENT_CACHE_BACKEND": "s3", "DOCUMENT_CACHE_DIR": str(tmp_path)})
+
+    assert isinstance(store, DiskDocumentStore)
@@ -0,0 +1,94 @@
+import queue
+
+from app.utils import event_hub as event_hub_module
+from app.utils import pubsub as pubsub_module
+from app.utils.event_hub import EventHub, format_sse
+from app.utils.pubsub import listen, publish
+
+
+def test_format_sse_includes_id_event_and_multiline_data():
+    assert format_sse('{"a": 1}', "notification", 7) == (
+        'id: 7\nevent: notification\ndata: {"a": 1}\n\n'
+    )
+    assert format_sse("one\ntwo") == "data: one\ndata: two\n\n"
+
+
+def test_dispatch_routes_messages_by_key(app):
+    hub = EventHub(app, "hub:routing")
+    hub._ensure_running = lambda: None
+    first = hub.register(1)
+    second = hub.register(2)
+
+    hub.dispatch({"user_id": 1, "notification": {"id": 10}})
+
+    assert first.get_nowait()["notification"]["id"] == 10
+    assert second.empty()
+
+
+def test_full_inbox_drops_oldest_message(app):
+    hub = EventHub(app, "hub:full", queue_size=2)
+    hub._ensure_running = lambda: None
+    inbox = hub.register(1)
+
+    for i in range(3):
+        hub.dispatch({"user_id": 1, "n": i})
+
+    assert [inbox.get_nowait()["n"] for _ in range(2)] == [1, 2]
+
+
+def test_unregister_removes_listener(app):
+    hub = EventHub(app, "hub:unregister")
+    hub._ensure_running = lambda: None
+    inbox = hub.register(1)
+
+    hub.unregister(1, inbox)
+    hub.dispatch({"user_id": 1})
+
+    assert hub.listener_count() == 0
+    assert inbox.empty()
+
+
+def test_published_messages_reach_registered_inbox(app):
+    hub = EventHub(app, "hub:live")
+    try:
+        with app.app_context():
+            inbox = hub.register(5)
+            publish("hub:live", {"user_id": 5, "value": "hello"})
+            publish("hub:live", {"user_id": 6, "value": "other"})
+
+            assert inbox.get(timeout=2) == {"user_id": 5, "value": "hello"}
+            try:
+                extra = inbox.get(timeout=0.2)
+            except queue.Empty:
+                extra = None
+            assert extra is None
+    finally:
+        hub.stop()
+
+
+class FakeRedisSubscription:
+    is_local = False
+
+    def wait(self, timeout):
+        return None
+
+    def close(self):
+        pass
+
+
+def test_hub_moves_to_redis_once_it_is_back(app, monkeypatch):
+    hub = EventHub(app, "hub:recovering")
+    with app.app_context():
+        subscription = listen("hub:recovering")
+        monkeypatch.setattr(event_hub_module, "POLL_SECONDS", 0.01)
+
+        # Redis still down: keep the local subscription
+        assert hub._consume(subscription) is subscription
+
+        monkeypatch.setattr(pubsub_module, "get_redis", lambda: object())
+        monkeypatch.setattr(pubsub_module, "listen", lambda channel: FakeRedisSubscription())
+
+        replacement = hub._consume(subscription)
+
+        assert replacement.is_local is False
+        assert subscription.wait(timeout=0) is None
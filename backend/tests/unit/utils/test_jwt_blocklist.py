@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+from app.models import BlacklistToken
+from app.utils import pubsub as pubsub_module
+from app.utils.jwt import blocklist as blocklist_module
+from app.utils.jwt.blocklist import (
+    BloomFilter,
+    TokenBlocklist,
+    is_token_revoked,
+    purge_expired_tokens,
+    revoke_token,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+
+class FakeRedisSubscription:
+    is_local = False
+
+    def wait(self, timeout):
+        return None
+
+    def close(self):
+        pass
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    members = [f"jti-{i}" for i in range(1000)]
+    for member in members:
+        bloom.add(member)
+
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+
+    assert all(member in bloom for member in members)
+    assert false_positives < 300
+
+
+def test_revoked_token_is_detected(app, db):
+    with app.app_context():
+        revoke_token("jti-revoked", datetime.utcnow() + timedelta(hours=1))
+
+        assert is_token_revoked("jti-revoked") is True
+        assert BlacklistToken.query.filter_by(token="jti-revoked").count() == 1
+
+
+def test_unrevoked_token_skips_lookup(app, db, monkeypatch):
+    with app.app_context():
+        revoke_token("jti-revoked", datetime.utcnow() + timedelta(hours=1))
+
+        def fail_lookup(self, jti):
+            raise AssertionError(f"unexpected lookup for {jti}")
+
+        monkeypatch.setattr(TokenBlocklist, "_lookup", fail_lookup)
+
+        assert is_token_revoked("jti-active") is False
+
+
+def test_revocation_reaches_other_workers_through_pubsub(app, db):
+    with app.app_context():
+        other_worker = TokenBlocklist(capacity=1000, rebuild_seconds=3600)
+        assert other_worker.is_revoked("jti-shared") is False
+
+        revoke_token("jti-shared", datetime.utcnow() + timedelta(hours=1))
+
+        assert other_worker.is_revoked("jti-shared") is True
+
+
+def test_worker_resubscribes_and_rebuilds_when_redis_returns(app, db, monkeypatch):
+    with app.app_context():
+        # Subscribed while Redis was down: only this process's revocations arrive
+        worker = TokenBlocklist(capacity=1000, rebuild_seconds=3600)
+        assert worker.is_revoked("jti-missed") is False
+
+        # Revoked by another process; its announcement went out over Redis
+        db.session.add(
+            BlacklistToken(token="jti-missed", expires_at=datetime.utcnow() + timedelta(hours=1))
+        )
+        db.session.commit()
+        assert worker.is_revoked("jti-missed") is False
+
+        monkeypatch.setattr(pubsub_module, "get_redis", lambda: FakeRedis())
+        monkeypatch.setattr(pubsub_module, "listen", lambda channel: FakeRedisSubscription())
+
+        assert worker.is_revoked("jti-missed") is True
+        assert worker._subscription.is_local is False
+
+
+def test_expired_revocation_is_not_reported(app, db):
+    with app.app_context():
+        db.session.add(
+            BlacklistToken(token="jti-old", expires_at=datetime.utcnow() - timedelta(minutes=1))
+        )
+        db.session.commit()
+
+        assert is_token_revoked("jti-old") is False
+
+
+def test_revoke_caches_token_in_redis_with_expiry_ttl(app, db, monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(blocklist_module, "get_redis", lambda: fake_redis)
+
+    with app.app_context():
+        revoke_token("jti-redis", datetime.utcnow() + timedelta(minutes=10))
+
+        assert 590 <= fake_redis.ttls["jwt:blocklist:jti-redis"] <= 600
+        assert is_token_revoked("jti-redis") is True
+
+
+def test_redis_miss_falls_back_to_database_and_repopulates(app, db, monkeypatch):
+    fake_redis = FakeRedis()
+    monkeypatch.setattr(blocklist_module, "get_redis", lambda: fake_redis)
+
+    with app.app_context():
+        db.session.add(
+            BlacklistToken(token="jti-db", expires_at=datetime.utcnow() + timedelta(minutes=5))
+        )
+        db.session.commit()
+
+        assert is_token_revoked("jti-db") is True
+        assert "jwt:blocklist:jti-db" in fake_redis.values
+
+
+def test_purge_expired_tokens_keeps_active_rows(app, db):
+    now = datetime.utcnow()
+    with app.app_context():
+        db.session.add_all(
+            [
+                BlacklistToken(token="expired", expires_at=now - timedelta(seconds=1)),
+                BlacklistToken(token="active", expires_at=now + timedelta(hours=1)),
+                BlacklistToken(token="legacy-old", created_at=now - timedelta(days=2)),
+                BlacklistToken(token="legacy-new", created_at=now - timedelta(hours=1)),
+            ]
+        )
+        db.session.commit()
+
+        assert purge_expired_tokens() == 2
+        remaining = {token.token for token in BlacklistToken.query.all()}
+
+    assert remaining == {"active", "legacy-new"}
+
+
+def test_purge_expired_tokens_cli_command(app, db, runner):
+    with app.app_context():
+        db.session.add(
+            BlacklistToken(token="expired", expires_at=datetime.utcnow() - timedelta(days=1))
+        )
+        db.session.commit()
+
+    result = runner.invoke(args=["purge-expired-tokens"])
+
+    assert result.exit_code == 0
+    assert "Purged 1 expired blocklisted token(s)" in result.output
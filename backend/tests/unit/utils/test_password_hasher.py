@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.utils.password_hasher import PasswordHasher, PasswordHasherBusy, normalize_method
+
+CHEAP_METHOD = "pbkdf2:sha256:1000"
+
+
+def test_normalize_method_expands_defaults():
+    assert normalize_method("scrypt") == "scrypt:32768:8:1"
+    assert normalize_method("pbkdf2:sha512:5000") == "pbkdf2:sha512:5000"
+    assert normalize_method("pbkdf2").startswith("pbkdf2:sha256:")
+
+
+@pytest.mark.parametrize("method", ["bcrypt", "scrypt:16384", "pbkdf2:sha256:1:2"])
+def test_normalize_method_rejects_invalid_methods(method):
+    with pytest.raises(ValueError):
+        normalize_method(method)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_hash_and_check_round_trip(workers):
+    hasher = PasswordHasher(CHEAP_METHOD, workers=workers, max_pending=4, queue_timeout=1)
+    try:
+        password_hash = hasher.hash("secret-password")
+
+        assert password_hash.startswith(f"{CHEAP_METHOD}$")
+        assert hasher.check(password_hash, "secret-password") is True
+        assert hasher.check(password_hash, "wrong-password") is False
+    finally:
+        hasher.shutdown()
+
+
+def test_needs_rehash_when_cost_changes():
+    hasher = PasswordHasher(CHEAP_METHOD, workers=0, max_pending=1, queue_timeout=1)
+
+    assert hasher.needs_rehash(generate_password_hash("x", method=CHEAP_METHOD)) is False
+    assert hasher.needs_rehash(generate_password_hash("x", method="pbkdf2:sha256:2000")) is True
+    assert hasher.needs_rehash(generate_password_hash("x")) is True
+
+
+def test_saturated_pool_rejects_new_work():
+    hasher = PasswordHasher(CHEAP_METHOD, workers=1, max_pending=1, queue_timeout=0.05)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_check(password_hash, password):
+        started.set()
+        release.wait(timeout=5)
+        return True
+
+    worker = threading.Thread(target=hasher._run, args=("check", slow_check, "hash", "pw"))
+    worker.start()
+    try:
+        assert started.wait(timeout=5)
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("another-password")
+    finally:
+        release.set()
+        worker.join()
+        hasher.shutdown()
+
+
+def test_timed_out_hash_keeps_its_slot_until_it_finishes():
+    hasher = PasswordHasher(
+        CHEAP_METHOD, workers=2, max_pending=1, queue_timeout=0.05, hash_timeout=0.05
+    )
+    release = threading.Event()
+
+    def slow_check(password_hash, password):
+        release.wait(timeout=5)
+        return True
+
+    try:
+        assert hasher.workers == 1
+        with pytest.raises(PasswordHasherBusy):
+            hasher._run("check", slow_check, "hash", "pw")
+        with pytest.raises(PasswordHasherBusy):
+            hasher.hash("another-password")
+
+        release.set()
+        hasher._get_executor().submit(lambda: None).result(timeout=5)
+        assert hasher.hash("another-password").startswith(f"{CHEAP_METHOD}$")
+    finally:
+        release.set()
+        hasher.shutdown()
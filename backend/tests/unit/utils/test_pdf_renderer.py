@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+
+from app.utils import pdf_renderer
+from app.utils.pdf_renderer import PdfRenderPool, PdfRenderUnavailable, render_pdf
+
+
+def _snapshot():
+    return {
+        "order_reference": "PHK-PDF-001",
+        "status": "Delivered",
+        "created_at": datetime(2026, 1, 10, 8, 45),
+        "total_amount": 1200,
+        "rendered_at": datetime(2026, 1, 11, 9, 0),
+        "payment": {
+            "payment_method": "MPESA",
+            "status": "Failed",
+            "amount": 1200,
+            "transaction_id": None,
+            "mpesa_receipt": None,
+            "created_at": datetime(2026, 1, 10, 8, 50),
+        },
+        "address": {
+            "first_name": "Jane",
+            "last_name": "Doe",
+            "email": "jane@example.com",
+            "phone": "0712345678",
+            "street": "1 Market St",
+            "city": "Nairobi",
+            "additional_info": None,
+        },
+        "order_items": [
+            {
+                "product": {"name": "Pixel 9", "price": 1200},
+                "variation_name": None,
+                "variation_price": None,
+                "quantity": 1,
+            }
+        ],
+    }
+
+
+def _sample_value(metric, **labels):
+    for sample in metric.collect()[0].samples:
+        if sample.name.endswith("_total") and sample.labels == labels:
+            return sample.value
+    return 0
+
+
+@pytest.mark.parametrize("doc_type", ["invoice", "receipt", "payment_slip"])
+def test_inline_pool_renders_each_document_type(doc_type):
+    pool = PdfRenderPool(workers=0, max_pending=1, queue_timeout=0, render_timeout=5)
+
+    content = pool.render(doc_type, _snapshot())
+
+    assert content.startswith(b"%PDF")
+
+
+def test_pool_rejects_when_all_slots_are_taken():
+    pool = PdfRenderPool(workers=0, max_pending=1, queue_timeout=0, render_timeout=5)
+    before = _sample_value(pdf_renderer.PDF_RENDER_TOTAL, doc_type="invoice", outcome="rejected")
+    pool._slots.acquire()
+
+    try:
+        with pytest.raises(PdfRenderUnavailable, match="busy"):
+            pool.render("invoice", _snapshot())
+    finally:
+        pool._slots.release()
+
+    after = _sample_value(pdf_renderer.PDF_RENDER_TOTAL, doc_type="invoice", outcome="rejected")
+    assert after == before + 1
+
+
+def test_process_pool_renders_and_times_out():
+    pool = PdfRenderPool(workers=1, max_pending=2, queue_timeout=1, render_timeout=0.001)
+
+    try:
+        # Spawning the worker alone takes longer than the render timeout
+        with pytest.raises(PdfRenderUnavailable, match="timed out"):
+            pool.render("invoice", _snapshot())
+
+        pool.render_timeout = 60
+        content = pool.render("receipt", _snapshot())
+    finally:
+        pool.shutdown()
+
+    assert content.startswith(b"%PDF")
+
+
+def test_render_pdf_returns_none_and_counts_errors(app):
+    before = _sample_value(pdf_renderer.PDF_RENDER_TOTAL, doc_type="statement", outcome="error")
+
+    with app.app_context():
+        assert render_pdf("statement", _snapshot()) is None
+
+    after = _sample_value(pdf_renderer.PDF_RENDER_TOTAL, doc_type="statement", outcome="error")
+    assert after == before + 1
@@ -0,0 +1,56 @@
+from app.models import Product, ProductVariation
+from app.utils.price_index import (
+    PriceIndex,
+    bump_catalog_version,
+    get_price_index,
+    split_variation_name,
+)
+
+
+def test_split_variation_name():
+    assert split_variation_name("8GB - 256GB") == ("8GB", "256GB")
+    assert split_variation_name("") is None
+    assert split_variation_name("Blue") is None
+
+
+def test_price_index_reads_products_and_variations(app, db, product, product_with_variation):
+    index = get_price_index()
+
+    assert index.base_price(product.id) == 120000
+    assert index.variation_price(product_with_variation.id, "12GB - 512GB") == 120000
+    assert index.variation_price(product_with_variation.id, "4GB - 64GB") is None
+    assert index.unit_price(product_with_variation.id) == 100000
+    assert index.unit_price(999999) is None
+
+
+def test_unit_price_falls_back_for_removed_variations(app, db, product_with_variation):
+    index = get_price_index()
+
+    assert index.unit_price(product_with_variation.id, "4GB - 64GB", fallback=95000) == 95000
+    assert index.unit_price(product_with_variation.id, "4GB - 64GB") == 100000
+
+
+def test_price_index_is_reused_until_catalog_changes(app, db, product):
+    index = get_price_index()
+    assert index.base_price(product.id) == 120000
+
+    db.session.get(Product, product.id).price = 99000
+    db.session.commit()
+    assert index.base_price(product.id) == 120000
+
+    bump_catalog_version()
+    assert index.base_price(product.id) == 99000
+
+
+def test_catalog_change_reaches_other_workers_through_pubsub(app, db, product_with_variation):
+    other_worker = PriceIndex(ttl=300)
+    assert other_worker.variation_price(product_with_variation.id, "8GB - 256GB") == 100000
+
+    variation = ProductVariation.query.filter_by(
+        product_id=product_with_variation.id, ram="8GB"
+    ).one()
+    variation.price = 85000
+    db.session.commit()
+    bump_catalog_version()
+
+    assert other_worker.variation_price(product_with_variation.id, "8GB - 256GB") == 85000
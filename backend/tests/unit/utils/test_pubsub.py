@@ -0,0 +1,97 @@
+import threading
+
+from app.utils import pubsub as pubsub_module
+from app.utils.pubsub import listen, publish, resubscribe_to_redis
+
+
+def test_publish_delivers_to_local_subscriber(app):
+    with app.app_context():
+        with listen("orders:test") as subscription:
+            publish("orders:test", {"status": "Success"})
+
+            assert subscription.wait(timeout=1) == {"status": "Success"}
+
+
+def test_wait_returns_none_on_timeout(app):
+    with app.app_context():
+        with listen("orders:quiet") as subscription:
+            assert subscription.wait(timeout=0) is None
+
+
+def test_publish_does_not_reach_other_channels(app):
+    with app.app_context():
+        with listen("orders:a") as subscription:
+            publish("orders:b", {"status": "Failed"})
+
+            assert subscription.wait(timeout=0.05) is None
+
+
+def test_wait_wakes_when_published_from_another_thread(app):
+    with app.app_context():
+        with listen("orders:threaded") as subscription:
+
+            def _publish():
+                with app.app_context():
+                    publish("orders:threaded", {"n": 1})
+
+            publisher = threading.Timer(0.05, _publish)
+            publisher.start()
+
+            assert subscription.wait(timeout=5) == {"n": 1}
+            publisher.join()
+
+
+def test_closed_subscription_stops_receiving(app):
+    with app.app_context():
+        subscription = listen("orders:closed")
+        subscription.close()
+
+        publish("orders:closed", {"n": 1})
+
+        assert subscription.wait(timeout=1) is None
+
+
+class FakePubSub:
+    def __init__(self):
+        self.channels = []
+        self.closed = False
+
+    def subscribe(self, channel):
+        self.channels.append(channel)
+
+    def get_message(self, timeout):
+        return None
+
+    def close(self):
+        self.closed = True
+
+
+class FakeRedis:
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub()
+
+
+def test_resubscribe_keeps_local_subscription_while_redis_is_down(app):
+    with app.app_context():
+        with listen("orders:down") as subscription:
+            assert subscription.is_local is True
+            assert resubscribe_to_redis(subscription) is None
+
+            publish("orders:down", {"n": 1})
+            assert subscription.wait(timeout=1) == {"n": 1}
+
+
+def test_resubscribe_moves_local_subscription_to_redis(app, monkeypatch):
+    with app.app_context():
+        subscription = listen("orders:back")
+        monkeypatch.setattr(pubsub_module, "get_redis", lambda: FakeRedis())
+
+        replacement = resubscribe_to_redis(subscription)
+
+        assert replacement.is_local is False
+        assert replacement.channel == "orders:back"
+        assert replacement._pubsub.channels == ["orders:back"]
+        # The local inbox is released
+        assert subscription.wait(timeout=0) is None
+        assert resubscribe_to_redis(replacement) is None
+        replacement.close()
@@ -0,0 +1,73 @@
+import pytest
+
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBuckets, RateLimiter, parse_limit
+
+
+class FakeScript:
+    def __init__(self, result):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, keys, args):
+        self.calls.append((keys, args))
+        return self.result
+
+
+class FakeRedis:
+    def __init__(self, result):
+        self.script = FakeScript(result)
+
+    def register_script(self, _source):
+        return self.script
+
+
+def test_parse_limit():
+    assert parse_limit("10/minute") == (10, 60)
+    assert parse_limit("3/hours") == (3, 3600)
+
+
+@pytest.mark.parametrize("limit", ["10", "10/fortnight", "ten/minute"])
+def test_parse_limit_rejects_malformed_limits(limit):
+    with pytest.raises(ValueError):
+        parse_limit(limit)
+
+
+def test_memory_bucket_allows_burst_then_rejects(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    buckets = MemoryBuckets()
+
+    assert [buckets.hit("k", 3, 60)[0] for _ in range(3)] == [True, True, True]
+    allowed, retry_after = buckets.hit("k", 3, 60)
+    assert allowed is False
+    assert retry_after == pytest.approx(20)
+
+    # One token refills every 20 seconds
+    now[0] += 20
+    assert buckets.hit("k", 3, 60)[0] is True
+    assert buckets.hit("other", 3, 60)[0] is True
+
+
+def test_memory_buckets_evict_least_recently_used():
+    buckets = MemoryBuckets(max_keys=2)
+    for key in ("a", "b", "c"):
+        buckets.hit(key, 1, 60)
+
+    # "a" was evicted, so it starts with a full bucket again
+    assert buckets.hit("a", 1, 60)[0] is True
+    assert buckets.hit("c", 1, 60)[0] is False
+
+
+def test_limiter_uses_redis_script_when_available(app, monkeypatch):
+    fake = FakeRedis([0, 1500])
+    monkeypatch.setattr(rate_limit, "get_redis", lambda: fake)
+
+    with app.app_context():
+        allowed, retry_after = RateLimiter([]).check("login", "ip:1.2.3.4", 10, 60)
+
+    assert allowed is False
+    assert retry_after == 1.5
+    keys, args = fake.script.calls[0]
+    assert keys == ["ratelimit:login:ip:1.2.3.4"]
+    assert args[0] == 10 and args[3] == 60
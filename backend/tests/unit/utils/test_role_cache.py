@@ -0,0 +1,77 @@
+from sqlalchemy import event
+
+from app.extensions import db as _db
+from app.models import User
+from app.utils.pubsub import publish
+from app.utils.role_cache import RoleCache, get_user_role, invalidate_user_role
+
+
+def _demote(db, user_id):
+    db.session.get(User, user_id).role = "user"
+    db.session.commit()
+
+
+def _count_user_selects(app):
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "users" in statement:
+            statements.append(statement)
+
+    engine = _db.engine
+    event.listen(engine, "before_cursor_execute", before_execute)
+    return statements, lambda: event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def test_role_is_served_from_cache_after_first_lookup(app, db, admin_user):
+    user_id = admin_user.id
+    with app.app_context():
+        statements, stop = _count_user_selects(app)
+        try:
+            assert get_user_role(user_id) == "admin"
+            assert get_user_role(user_id) == "admin"
+            assert get_user_role(user_id) == "admin"
+        finally:
+            stop()
+
+    assert len(statements) == 1
+
+
+def test_invalidate_reloads_role(app, db, admin_user):
+    user_id = admin_user.id
+    with app.app_context():
+        assert get_user_role(user_id) == "admin"
+
+        _demote(db, user_id)
+        assert get_user_role(user_id) == "admin"
+
+        invalidate_user_role(user_id)
+        assert get_user_role(user_id) == "user"
+
+
+def test_missing_user_has_no_role(app, db):
+    with app.app_context():
+        assert get_user_role(999) is None
+
+
+def test_expired_entry_is_reloaded(app, db, admin_user):
+    user_id = admin_user.id
+    with app.app_context():
+        cache = RoleCache(ttl=0)
+        assert cache.get_role(user_id) == "admin"
+
+        _demote(db, user_id)
+        assert cache.get_role(user_id) == "user"
+
+
+def test_invalidation_from_another_worker_is_applied(app, db, admin_user):
+    user_id = admin_user.id
+    with app.app_context():
+        cache = RoleCache(ttl=60)
+        assert cache.get_role(user_id) == "admin"
+
+        _demote(db, user_id)
+
+        # Simulates a peer worker announcing the change
+        publish("auth:roles", {"user_id": user_id})
+        assert cache.get_role(user_id) == "user"
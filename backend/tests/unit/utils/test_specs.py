@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from app.utils.specs import (
+    SpecCache,
+    parse_battery_mah,
+    parse_capacity_gb,
+    parse_display_inches,
+    parse_megapixels,
+    parse_specs,
+)
+
+
+def test_capacity_is_normalized_to_gb():
+    assert parse_capacity_gb("8GB") == 8
+    assert parse_capacity_gb("1TB SSD") == 1024
+    assert parse_capacity_gb("512 MB") == 0.5
+    assert parse_capacity_gb("12 GB + 12GB virtual") == 12
+    assert parse_capacity_gb("Expandable") is None
+
+
+def test_battery_display_and_camera_units():
+    assert parse_battery_mah("4,500 mAh with 45W charging") == 4500
+    assert parse_battery_mah("Up to 18 hours") is None
+    assert parse_display_inches('6.7" AMOLED') == 6.7
+    assert parse_display_inches("6.1-inch OLED") == 6.1
+    assert parse_display_inches("14 inches") == 14
+    assert parse_display_inches("120Hz LTPO") is None
+    assert parse_megapixels("50MP + 12MP + 10MP") == 50
+
+
+def test_parse_specs_leaves_missing_fields_empty():
+    audio = SimpleNamespace(battery=" 30 hours ", ram=None)
+
+    specs = parse_specs(audio)
+
+    assert specs["battery"] == {"raw": "30 hours", "value": None}
+    assert specs["ram"] == {"raw": None, "value": None}
+    assert specs["main_camera"] == {"raw": None, "value": None}
+
+
+def test_spec_cache_misses_on_new_version_and_evicts_oldest():
+    cache = SpecCache(max_entries=2)
+    cache.put(1, "v1", {"ram": 8})
+    cache.put(2, "v1", {"ram": 12})
+
+    assert cache.get(1, "v1") == {"ram": 8}
+    assert cache.get(1, "v2") is None
+
+    cache.put(3, "v1", {"ram": 16})
+
+    assert cache.get(2, "v1") is None
+    assert cache.get(1, "v1") == {"ram": 8}
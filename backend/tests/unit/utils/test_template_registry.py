@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from app.utils import template_registry
+
+
+def test_get_template_compiles_once_per_process():
+    first = template_registry.get_template("emails/base.html")
+    second = template_registry.get_template("emails/base.html")
+
+    assert first is second
+
+
+def test_render_escapes_context_by_default():
+    html = template_registry.render(
+        "emails/base.html", subject="<script>", content="<b>ok</b>", current_year=2026
+    )
+
+    assert "&lt;script&gt;" in html
+    assert "<b>ok</b>" in html
+
+
+def test_render_payment_slip_template():
+    order = SimpleNamespace(
+        order_reference="PHK-42",
+        address=SimpleNamespace(
+            first_name="Jane", last_name="Doe", email="jane@example.com", phone="0712"
+        ),
+    )
+    payment = SimpleNamespace(
+        created_at=SimpleNamespace(strftime=lambda _fmt: "Jan 01, 2026 10:00"),
+        status="Failed",
+        payment_method="MPESA",
+        amount=100,
+        transaction_id=None,
+        mpesa_receipt=None,
+    )
+
+    html = template_registry.render("emails/payment_slip.html", order=order, payment=payment)
+
+    assert "Payment Receipt - Order #PHK-42" in html
+    assert "Transaction ID: N/A" in html
+    assert "M-Pesa Receipt" not in html
+
+
+def test_configure_writes_bytecode_cache(tmp_path):
+    try:
+        template_registry.configure(str(tmp_path))
+        template_registry.get_template("documents/invoice.html")
+
+        assert any(tmp_path.iterdir())
+    finally:
+        template_registry.configure(None)
@@ -0,0 +1,38 @@
+import io
+import zipfile
+
+from app.utils.zip_stream import stream_zip
+
+
+def test_stream_zip_yields_a_chunk_per_entry_and_valid_archive():
+    entries = [("a.pdf", b"%PDF-a"), ("b.pdf", b"%PDF-b" * 100)]
+
+    chunks = list(stream_zip(iter(entries)))
+
+    # One chunk per entry plus the central directory
+    assert len(chunks) == 3
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.read("a.pdf") == b"%PDF-a"
+        assert archive.read("b.pdf") == b"%PDF-b" * 100
+
+
+def test_stream_zip_consumes_entries_lazily():
+    consumed = []
+
+    def entries():
+        for name in ["one.pdf", "two.pdf"]:
+            consumed.append(name)
+            yield name, b"data"
+
+    stream = stream_zip(entries())
+    next(stream)
+
+    assert consumed == ["one.pdf"]
+
+
+def test_stream_zip_with_no_entries_is_a_valid_empty_archive():
+    data = b"".join(stream_zip([]))
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.namelist() == []
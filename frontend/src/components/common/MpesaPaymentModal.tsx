@@ -29,7 +29,7 @@ const MpesaPaymentModal = ({
   const {
     initiateMpesaPayment,
     retryMpesaPayment,
-    fetchPaymentStatus,
+    waitForPaymentStatus,
     clearCartAfterPayment,
     isProcessing,
   } = usePayment();
@@ -41,15 +41,13 @@ const MpesaPaymentModal = ({
   const [failureReason, setFailureReason] = useState("");
   const [activeOrderReference, setActiveOrderReference] = useState(orderReference || "");
 
-  const pollIntervalRef = useRef<ReturnType<typeof setInterval> | null>(null);
+  // Bumped to cancel the active long-poll loop
+  const pollGenerationRef = useRef(0);
 
   const isRetry = mode === "retry";
 
   const clearPolling = () => {
-    if (pollIntervalRef.current) {
-      clearInterval(pollIntervalRef.current);
-      pollIntervalRef.current = null;
-    }
+    pollGenerationRef.current += 1;
   };
 
   useEffect(() => {
@@ -97,31 +95,46 @@ const MpesaPaymentModal = ({
     setCountdown(120);
     setPaymentStatus("pending");
 
-    pollIntervalRef.current = setInterval(async () => {
-      try {
-        const statusData = await fetchPaymentStatus(reference);
-        const rawStatus = statusData.payment_status || "";
-        const normalized = rawStatus.toLowerCase();
-
-        if (normalized === "success") {
-          setPaymentStatus("success");
-          setTransactionId(statusData.transaction_id || statusData.mpesa_receipt || "");
-          clearPolling();
-          clearCartAfterPayment();
-          toast.success("Payment successful!");
-          return;
-        }
-
-        if (normalized === "failed") {
-          setPaymentStatus("failed");
-          setFailureReason(statusData.failure_reason || "Payment failed");
-          clearPolling();
-          toast.error("Payment failed");
+    const generation = pollGenerationRef.current;
+
+    const waitForStatus = async () => {
+      let lastStatus = "Pending";
+
+      while (pollGenerationRef.current === generation) {
+        try {
+          const statusData = await waitForPaymentStatus(reference, lastStatus);
+          if (pollGenerationRef.current !== generation) {
+            return;
+          }
+
+          const rawStatus = statusData.payment_status || "";
+          const normalized = rawStatus.toLowerCase();
+          lastStatus = rawStatus || lastStatus;
+
+          if (normalized === "success") {
+            setPaymentStatus("success");
+            setTransactionId(statusData.transaction_id || statusData.mpesa_receipt || "");
+            clearPolling();
+            clearCartAfterPayment();
+            toast.success("Payment successful!");
+            return;
+          }
+
+          if (normalized === "failed") {
+            setPaymentStatus("failed");
+            setFailureReason(statusData.failure_reason || "Payment failed");
+            clearPolling();
+            toast.error("Payment failed");
+            return;
+          }
+        } catch (error) {
+          console.error("Status check error:", error);
+          await new Promise((resolve) => setTimeout(resolve, 5000));
         }
-      } catch (error) {
-        console.error("Status check error:", error);
       }
-    }, 5000);
+    };
+
+    void waitForStatus();
   };
 
   const initiatePayment = async () => {
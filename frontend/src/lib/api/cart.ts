@@ -20,7 +20,19 @@ interface CartResponse {
   message: string;
 }
 
-interface AddToCartPayload {
+interface BulkAddResponse {
+  success: boolean;
+  data: {
+    added: number;
+    skipped: number[];
+  };
+  message: string;
+}
+
+// Matches BULK_MAX_ITEMS of POST /api/cart/bulk
+export const CART_BULK_MAX_ITEMS = 100;
+
+export interface AddToCartPayload {
   productId: number;
   quantity: number;
   selectedVariation?: ProductVariation;
@@ -41,6 +53,11 @@ export const cartAPI = {
     return await apiClient.post("/cart", payload);
   },
 
+  // Add many lines in one request (at most CART_BULK_MAX_ITEMS)
+  bulkAdd: async (items: AddToCartPayload[]): Promise<BulkAddResponse> => {
+    return await apiClient.post("/cart/bulk", { items });
+  },
+
   updateQuantity: async (
     productId: number,
     quantity: number,
@@ -90,7 +90,11 @@ apiClient.interceptors.response.use(
       error.response?.data?.error ||
       "An error occurred";
 
-    return Promise.reject(new Error(errorMessage));
+    // Keep the HTTP status (undefined when no response arrived) for callers
+    // that must tell a definitive rejection from a lost request
+    return Promise.reject(
+      Object.assign(new Error(errorMessage), { status: error.response?.status })
+    );
   }
 );
 
@@ -1,4 +1,31 @@
 import { apiClient } from "./client";
+import { Product } from "@/lib/types/product";
+
+export interface CompareSpecValue {
+  raw: string | null;
+  value: number | null;
+}
+
+export interface CompareMatrix {
+  products: {
+    id: number;
+    name: string;
+    brand: string;
+    category: string;
+    type: string;
+    price: number;
+    hasVariation: boolean;
+    image_url: string | null;
+  }[];
+  rows: {
+    key: string;
+    label: string;
+    unit: string | null;
+    values: CompareSpecValue[];
+    differs: boolean;
+    best: number[];
+  }[];
+}
 
 interface CompareResponse {
   success: boolean;
@@ -18,6 +45,22 @@ export const compareAPI = {
     }
   },
 
+  // Compared products with their spec fields, oldest first, in one request
+  getProducts: async (): Promise<Product[]> => {
+    try {
+      const response: { data: { products: Product[] } } = await apiClient.get("/compare/products");
+      return response.data.products;
+    } catch {
+      return [];
+    }
+  },
+
+  // Aligned spec matrix (raw text plus parsed GB/mAh/inch/MP values) for the compare page
+  getMatrix: async (): Promise<CompareMatrix> => {
+    const response: { data: CompareMatrix } = await apiClient.get("/compare/matrix");
+    return response.data;
+  },
+
   addItem: async (productId: number): Promise<CompareResponse> => {
     return await apiClient.post("/compare", { product_id: productId });
   },
@@ -55,8 +55,13 @@ export const ordersAPI = {
     return order;
   },
 
-  create: async (orderData: Record<string, unknown>): Promise<Order> => {
-    const response = await apiClient.post("/orders", orderData);
+  create: async (
+    orderData: Record<string, unknown>,
+    idempotencyKey?: string
+  ): Promise<Order> => {
+    const response = await apiClient.post("/orders", orderData, {
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
+    });
     const order = extractOrder(response);
     if (!order) {
       throw new Error("Failed to create order");
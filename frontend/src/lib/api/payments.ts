@@ -31,6 +31,7 @@ export interface MpesaPaymentStatus {
   failure_reason?: string | null;
   created_at?: string;
   updated_at?: string;
+  changed?: boolean;
 }
 
 interface MpesaInitiatePayload {
@@ -54,9 +55,12 @@ const extractApiData = <T>(response: unknown): T | null => {
 
 export const paymentsAPI = {
   initiateMpesaPayment: async (
-    payload: MpesaInitiatePayload
+    payload: MpesaInitiatePayload,
+    idempotencyKey?: string
   ): Promise<MpesaInitiateResponse> => {
-    const response = await apiClient.post("/payments/mpesa/initiate", payload);
+    const response = await apiClient.post("/payments/mpesa/initiate", payload, {
+      headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : undefined,
+    });
     const data = extractApiData<MpesaInitiateResponse>(response);
     if (!data) {
       throw new Error("Failed to initiate payment");
@@ -87,4 +91,20 @@ export const paymentsAPI = {
     }
     return data;
   },
+
+  waitForPaymentStatus: async (
+    orderReference: string,
+    lastStatus: string
+  ): Promise<MpesaPaymentStatus> => {
+    // Long-poll: the server holds the request until the status changes or times out
+    const response = await apiClient.get(
+      `/payments/status/${orderReference}/wait`,
+      { params: { last_status: lastStatus }, timeout: 35000 }
+    );
+    const data = extractApiData<MpesaPaymentStatus>(response);
+    if (!data) {
+      throw new Error("Failed to fetch payment status");
+    }
+    return data;
+  },
 };
@@ -17,6 +17,18 @@ interface WishlistResponse {
   message: string;
 }
 
+interface BulkAddResponse {
+  success: boolean;
+  data: {
+    added: number;
+    skipped: number[];
+  };
+  message: string;
+}
+
+// Matches BULK_MAX_ITEMS of POST /api/wishlist/bulk
+export const WISHLIST_BULK_MAX_ITEMS = 100;
+
 export const wishlistAPI = {
   getAll: async (): Promise<WishlistItem[]> => {
     const response: WishlistResponse = await apiClient.get("/wishlist");
@@ -27,6 +39,11 @@ export const wishlistAPI = {
     return await apiClient.post("/wishlist", { product_id: productId });
   },
 
+  // Add many products in one request (at most WISHLIST_BULK_MAX_ITEMS)
+  bulkAdd: async (productIds: number[]): Promise<BulkAddResponse> => {
+    return await apiClient.post("/wishlist/bulk", { product_ids: productIds });
+  },
+
   removeItem: async (productId: number): Promise<{ success: boolean; message: string }> => {
     return await apiClient.delete(`/wishlist/${productId}`);
   },
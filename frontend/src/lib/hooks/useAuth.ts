@@ -20,7 +20,7 @@ export const useAuth = () => {
         await cart.syncWithServer(auth.token);
       }
 
-      await wishlist.syncWithServer();
+      await wishlist.syncWithServer(true);
       await compare.syncWithServer();
 
       router.push("/");
@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useRef, useState } from "react";
 import { useRouter } from "next/navigation";
 import { ordersAPI } from "@/lib/api/orders";
 import { paymentsAPI } from "@/lib/api/payments";
@@ -19,8 +19,30 @@ type PaymentMethod = "COD" | "MPESA" | "PAYPAL" | "CARD";
 
 export const usePayment = () => {
   const router = useRouter();
-  const { getTotal, clearCart } = useCartStore();
+  const { getTotal, clearCart, items } = useCartStore();
   const [isProcessing, setIsProcessing] = useState(false);
+  // One Idempotency-Key per checkout: it is reused by every attempt of the same
+  // request (same cart and payload) until the server answers definitively, so a
+  // retry after a timeout or dropped connection replays the first order / STK push
+  // instead of creating another one
+  const checkoutKeyRef = useRef<{ key: string; request: string } | null>(null);
+
+  const getCheckoutKey = (payload: object) => {
+    const request = JSON.stringify([items, payload]);
+    if (checkoutKeyRef.current?.request !== request) {
+      checkoutKeyRef.current = { key: crypto.randomUUID(), request };
+    }
+    return checkoutKeyRef.current.key;
+  };
+
+  // 2xx and 4xx are final answers for this key; no status (network error,
+  // timeout), 409 (still processing) and 5xx (key released) keep it for a retry
+  const settleCheckoutKey = (error?: unknown) => {
+    const status = (error as { status?: number } | undefined)?.status;
+    if (error === undefined || (status && status >= 400 && status < 500 && status !== 409)) {
+      checkoutKeyRef.current = null;
+    }
+  };
 
   const normalizePhoneNumber = (phone: string) => {
     const digits = phone.replace(/\D/g, "");
@@ -77,8 +99,9 @@ export const usePayment = () => {
         payment_method: paymentMethod,
       };
 
-      const order = await ordersAPI.create(orderData);
-      
+      const order = await ordersAPI.create(orderData, getCheckoutKey(orderData));
+      settleCheckoutKey();
+
       if (paymentMethod === "COD") {
         toast.success("Order placed successfully!");
         clearCart();
@@ -87,6 +110,7 @@ export const usePayment = () => {
 
       return order;
     } catch (error) {
+      settleCheckoutKey(error);
       console.error("Order creation error:", error);
       toast.error("Failed to place order. Please try again.");
       return null;
@@ -120,8 +144,11 @@ export const usePayment = () => {
         address: formData,
       };
 
-      return await paymentsAPI.initiateMpesaPayment(payload);
+      const response = await paymentsAPI.initiateMpesaPayment(payload, getCheckoutKey(payload));
+      settleCheckoutKey();
+      return response;
     } catch (error) {
+      settleCheckoutKey(error);
       const message = error instanceof Error ? error.message : "Failed to initiate payment";
       toast.error(message);
       return null;
@@ -165,6 +192,10 @@ export const usePayment = () => {
     return paymentsAPI.getPaymentStatus(orderReference);
   };
 
+  const waitForPaymentStatus = async (orderReference: string, lastStatus: string) => {
+    return paymentsAPI.waitForPaymentStatus(orderReference, lastStatus);
+  };
+
   const clearCartAfterPayment = () => {
     clearCart();
   };
@@ -174,6 +205,7 @@ export const usePayment = () => {
     initiateMpesaPayment,
     retryMpesaPayment,
     fetchPaymentStatus,
+    waitForPaymentStatus,
     clearCartAfterPayment,
     isProcessing,
     validateFormData,
@@ -1,6 +1,12 @@
 import { create } from "zustand";
 import { persist } from "zustand/middleware";
-import { cartAPI, CartData, CartItemData } from "@/lib/api/cart";
+import {
+  AddToCartPayload,
+  cartAPI,
+  CART_BULK_MAX_ITEMS,
+  CartData,
+  CartItemData,
+} from "@/lib/api/cart";
 import { ProductVariation } from "@/lib/types/product";
 import { STORAGE_KEYS } from "@/lib/utils/constants";
 import { toast } from "sonner";
@@ -167,22 +173,20 @@ export const useCartStore = create<CartState>()(
         try {
           const { items, variations } = get();
 
-          // If user has local cart items, sync them to server
-          if (Object.keys(items).length > 0) {
-            // Send each item to server
-            for (const productId in items) {
-              for (const variationKey in items[productId]) {
-                const item = items[productId][variationKey];
-                const variation = variations[variationKey];
-
-                await cartAPI.addItem({
-                  productId: parseInt(productId),
-                  quantity: item.quantity,
-                  selectedVariation: variation,
-                });
-              }
+          // Push the local (guest) cart with POST /cart/bulk, not one request per line
+          const lines: AddToCartPayload[] = [];
+          for (const productId in items) {
+            for (const variationKey in items[productId]) {
+              lines.push({
+                productId: parseInt(productId),
+                quantity: items[productId][variationKey].quantity,
+                selectedVariation: variations[variationKey],
+              });
             }
           }
+          for (let start = 0; start < lines.length; start += CART_BULK_MAX_ITEMS) {
+            await cartAPI.bulkAdd(lines.slice(start, start + CART_BULK_MAX_ITEMS));
+          }
 
           // Then fetch the complete cart from server
           const serverCart = await cartAPI.getCart();
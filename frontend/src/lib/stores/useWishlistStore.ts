@@ -1,5 +1,5 @@
 import { create } from "zustand";
-import { wishlistAPI, WishlistItem } from "@/lib/api/wishlist";
+import { wishlistAPI, WishlistItem, WISHLIST_BULK_MAX_ITEMS } from "@/lib/api/wishlist";
 import { toast } from "sonner";
 
 interface WishlistState {
@@ -9,7 +9,7 @@ interface WishlistState {
   // Actions
   addItem: (productId: number) => Promise<void>;
   removeItem: (productId: number) => Promise<void>;
-  syncWithServer: () => Promise<void>;
+  syncWithServer: (pushLocal?: boolean) => Promise<void>;
   clearWishlist: () => void;
 
   // Computed
@@ -53,9 +53,15 @@ export const useWishlistStore = create<WishlistState>((set, get) => ({
     }
   },
 
-  syncWithServer: async () => {
+  syncWithServer: async (pushLocal = false) => {
     set({ isLoading: true });
     try {
+      // After login, push local items in one POST /wishlist/bulk before reloading
+      const productIds = pushLocal ? get().items.map((item) => item.id) : [];
+      for (let start = 0; start < productIds.length; start += WISHLIST_BULK_MAX_ITEMS) {
+        await wishlistAPI.bulkAdd(productIds.slice(start, start + WISHLIST_BULK_MAX_ITEMS));
+      }
+
       const items = await wishlistAPI.getAll();
       set({ items, isLoading: false });
     } catch (error) {